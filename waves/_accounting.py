@@ -0,0 +1,300 @@
+"""Internal API module implementing per-task resource accounting for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections.abc
+import contextlib
+import datetime
+import json
+import os
+import pathlib
+import re
+import shlex
+import sys
+import tempfile
+import threading
+import time
+import typing
+
+import SCons.Action
+import SCons.Errors
+
+from waves import _scheduler, _settings, _workers
+
+_exclude_from_namespace = set(globals().keys())
+
+#: Python script running a command and writing the command resource usage, including all waited for descendants
+_rusage_script = """import json, os, subprocess, sys
+process = subprocess.Popen(sys.argv[2:])
+_pid, status, usage = os.wait4(process.pid, 0)
+with open(sys.argv[1], "w") as usage_file:
+    json.dump({"user_time": usage.ru_utime, "system_time": usage.ru_stime, "max_rss": usage.ru_maxrss}, usage_file)
+exit_code = os.waitstatus_to_exitcode(status)
+sys.exit(exit_code if exit_code >= 0 else 128 - exit_code)
+"""
+
+_set_name_regex = re.compile(
+    re.escape(_settings._default_set_name_template).replace(re.escape(_settings._template_placeholder), r"\d+")
+)
+
+
+def _rss_megabytes(max_rss: float) -> float:
+    """Return the ``ru_maxrss`` resource usage in megabytes.
+
+    :param max_rss: Maximum resident set size. Bytes on macOS, kilobytes on all other systems.
+
+    :returns: maximum resident set size in megabytes
+    """
+    if sys.platform == "darwin":
+        return max_rss / 1024.0 / 1024.0
+    return max_rss / 1024.0
+
+
+def _thread_times() -> tuple[float, float]:
+    """Return the user and system CPU time of the calling thread.
+
+    :returns: user and system CPU seconds. Systems without per-thread resource usage report the combined CPU time as
+        user time.
+    """
+    try:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_THREAD)
+    except (ImportError, AttributeError, OSError):
+        return time.thread_time(), 0.0
+    return usage.ru_utime, usage.ru_stime
+
+
+def _parameter_set(targets: list[str]) -> str | None:
+    """Return the parameter set name of a task from the default WAVES parameter set directory names.
+
+    :param targets: Task target paths
+
+    :returns: parameter set name. None if no target is in a parameter set directory.
+    """
+    for target in targets:
+        for part in reversed(pathlib.Path(target).parts[:-1]):
+            if _set_name_regex.fullmatch(part):
+                return part
+    return None
+
+
+class AccountingLog:
+    """Thread safe JSON lines task accounting log shared by all SCons worker threads.
+
+    Every record is tagged with a ``build`` identifier unique to the SCons process, such that the records of repeated
+    builds appended to the same log may be summarized separately.
+
+    :param path: JSON lines accounting log
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.build = f"{datetime.datetime.now().astimezone().isoformat(timespec='seconds')}-{os.getpid()}"
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        """Append a task record to the accounting log.
+
+        :param record: Task record
+        """
+        line = json.dumps({"build": self.build, **record})
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open(mode="a") as log:
+                log.write(f"{line}\n")
+
+
+class AccountingSpawn:
+    """SCons ``SPAWN`` wrapper recording the resource usage of each command.
+
+    Commands are run by a Python script which waits for the command shell and writes the resource usage of the shell
+    and all waited for descendants. Systems without ``os.wait4`` run the commands without resource usage.
+
+    :param spawn: Wrapped SCons ``SPAWN`` function
+    :param usage: List to which the resource usage dictionary of each command is appended
+    """
+
+    def __init__(self, spawn: collections.abc.Callable, usage: list[dict]) -> None:
+        self.spawn = spawn
+        self.usage = usage
+
+    def __call__(
+        self,
+        sh: str,
+        escape: collections.abc.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Run the command and record its resource usage.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        if not hasattr(os, "wait4"):
+            return self.spawn(sh, escape, cmd, args, env)
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            usage_file = pathlib.Path(temporary_directory) / "usage.json"
+            arguments = [
+                shlex.quote(sys.executable),
+                "-c",
+                shlex.quote(_rusage_script),
+                shlex.quote(str(usage_file)),
+                sh,
+                "-c",
+                shlex.quote(" ".join(args)),
+            ]
+            exit_code = self.spawn(sh, escape, arguments[0], arguments, env)
+            with contextlib.suppress(OSError, ValueError):
+                self.usage.append(json.loads(usage_file.read_text()))
+        return exit_code
+
+
+class AccountingAction(_scheduler.WrapperAction):
+    """SCons action wrapper recording the resource usage of each task in the construction environment accounting log.
+
+    Records the task ``targets``, ``builder``, ``parameter_set``, ``start`` time, ``wall_time``, ``user_time``,
+    ``system_time``, peak ``max_rss`` in megabytes, ``exit_code``, and ``bytes_written`` as the total size of the task
+    target files. CPU times include the command processes and the SCons worker thread, e.g. Python function actions.
+    The peak resident set size is the largest of the task's command processes. If the task construction environment has
+    no accounting log, or SCons is not executing actions, e.g. ``scons -n``, the wrapped action runs without recording.
+
+    The command resource usage is measured by the innermost ``SPAWN`` function, see :class:`waves._scheduler.TaskSpawn`,
+    so ``SPAWN`` wrappers matching task commands, e.g. ``sbatch`` polling and ``waves slurm_export`` reconciliation,
+    are unchanged. Commands which these wrappers run without the wrapped ``SPAWN`` function, e.g. polled ``sbatch``
+    jobs, are recorded without their command resource usage.
+
+    :param action: Wrapped SCons action
+    :param builder: Builder name recorded with each task. If None, the builder name is resolved from the construction
+        environment ``BUILDERS``.
+    """
+
+    def __init__(self, action: SCons.Action.ActionBase, builder: str | None = None) -> None:
+        super().__init__(action)
+        self.builder = builder
+
+    def __call__(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action and append the task record to the accounting log.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: wrapped action exit status
+        """
+        log = env.get(_settings._task_accounting_variable)
+        if log is None or not SCons.Action.execute_actions:
+            return self.action(target, source, env, *args, **kwargs)
+
+        # SCons executors pass empty node lists to their actions. Record the executor nodes.
+        executor = kwargs.get("executor")
+        targets = executor.get_all_targets() if executor else target
+        usage: list[dict] = []
+        start = time.time()
+        start_wall = time.monotonic()
+        start_user, start_system = _thread_times()
+        with _scheduler._task_spawn(env, lambda spawn: AccountingSpawn(spawn, usage)) as accounted:
+            status = self.action(target, source, accounted, *args, **kwargs)
+        wall_time = time.monotonic() - start_wall
+        end_user, end_system = _thread_times()
+
+        target_paths = [node.get_abspath() for node in targets]
+        exit_code = status.status if isinstance(status, SCons.Errors.BuildError) else int(status or 0)
+        log.write(
+            {
+                "targets": target_paths,
+                "builder": self.builder or self.builder_name(targets, env),
+                "parameter_set": _parameter_set(target_paths),
+                "start": datetime.datetime.fromtimestamp(start).astimezone().isoformat(timespec="seconds"),
+                "wall_time": wall_time,
+                "user_time": end_user - start_user + sum(command["user_time"] for command in usage),
+                "system_time": end_system - start_system + sum(command["system_time"] for command in usage),
+                "max_rss": max((_rss_megabytes(command["max_rss"]) for command in usage), default=None),
+                "exit_code": exit_code,
+                "bytes_written": sum(path.stat().st_size for path in map(pathlib.Path, target_paths) if path.is_file()),
+            }
+        )
+        return status
+
+    @staticmethod
+    def builder_name(targets: list, env: typing.Any) -> str:  # noqa: ANN401
+        """Return the construction environment builder name of a task.
+
+        :param targets: Task target nodes
+        :param env: Task construction environment
+
+        :returns: builder name. The builder class name if the builder is not found in the construction environment.
+        """
+        builder = targets[0].get_builder() if targets else None
+        if builder is None:
+            return "unknown"
+        for name, candidate in env.get("BUILDERS", {}).items():
+            if candidate is builder:
+                return name
+        return type(builder).__name__
+
+
+def _builder_name(node: typing.Any) -> str | None:  # noqa: ANN401
+    """Return the builder name of a target node.
+
+    The name recorded by a :class:`AccountingAction` takes precedence over the construction
+    environment ``BUILDERS`` name, such that the names match the task accounting log records.
+
+    :param node: SCons target node
+
+    :returns: builder name. None if the node has no builder.
+    """
+    builder = node.get_builder() if node.has_builder() else None
+    if builder is None:
+        return None
+    action = builder.action
+    while isinstance(action, _scheduler.WrapperAction):
+        if isinstance(action, AccountingAction) and action.builder:
+            return action.builder
+        action = action.action
+    return AccountingAction.builder_name([node], node.get_build_env())
+
+
+def accounting_builder(builder: typing.Any, name: str | None = None) -> typing.Any:  # noqa: ANN401
+    """Wrap a builder's action with :class:`AccountingAction`, unless the action is already wrapped.
+
+    Builder actions wrapped by :class:`waves._scheduler.ResourceAction` are wrapped inside the resource admission, such
+    that the recorded wall time does not include the time waiting for resources. Builder actions wrapped by
+    :class:`waves._workers.PythonWorkerAction` or :class:`waves._workers.MatlabEngineAction` are wrapped outside the
+    worker pool, such that tasks run in the worker pool are recorded.
+
+    :param builder: SCons builder
+    :param name: Builder name recorded with each task
+
+    :returns: modified builder
+    """
+    wrapper = builder
+    while isinstance(wrapper.action, _scheduler.WrapperAction) and not isinstance(
+        wrapper.action, (AccountingAction, _workers.PythonWorkerAction, _workers.MatlabEngineAction)
+    ):
+        wrapper = wrapper.action
+    if not isinstance(wrapper.action, AccountingAction):
+        wrapper.action = AccountingAction(wrapper.action, builder=name)
+    return builder
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
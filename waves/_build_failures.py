@@ -0,0 +1,192 @@
+"""Internal API module implementing the bounded build failure reports for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections
+import io
+import pathlib
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+#: First line markers of the known error signatures and True if the marker may be indented
+_signature_markers = ((b"***ERROR", True), (b"Traceback (most recent call last):", False))
+_traceback_start = b"Traceback"
+#: Maximum length in bytes of the lines searched for error signatures. Longer lines are truncated.
+_max_line_length = 64 * 1024
+
+
+def _stdout_path(node_path: str | pathlib.Path) -> pathlib.Path | None:
+    """Return the STDOUT file of a target node.
+
+    :param node_path: Target node absolute path
+
+    :returns: existing ``target.stdout`` or ``target.with_suffix(".stdout")`` file. None if neither file exists.
+    """
+    node_path = pathlib.Path(node_path)
+    stdout_path_options = [
+        node_path.parent / f"{node_path}{_settings._stdout_extension}",
+        node_path.with_suffix(_settings._stdout_extension),
+    ]
+    return next((path.resolve() for path in stdout_path_options if path.exists()), None)
+
+
+def _read_tail(path: pathlib.Path, tail_bytes: int | None, tail_lines: int | None) -> tuple[str, bool]:
+    """Return the last lines of a file without reading the rest of the file.
+
+    :param path: File path
+    :param tail_bytes: Maximum number of bytes read from the end of the file. If None, read the entire file.
+    :param tail_lines: Maximum number of lines. If None, return all lines read.
+
+    :returns: tail text and True if the text is truncated
+    """
+    size = path.stat().st_size
+    start = 0 if tail_bytes is None else max(size - tail_bytes, 0)
+    with path.open("rb") as file:
+        file.seek(start)
+        data = file.read()
+    if start > 0:
+        data = data.partition(b"\n")[2]
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    truncated = start > 0
+    if tail_lines is not None and len(lines) > tail_lines:
+        lines = lines[len(lines) - tail_lines :]
+        truncated = True
+    return "\n".join(lines), truncated
+
+
+def _signature_start(region: bytes, position: int) -> int:
+    """Return the start of the first line of the next error signature.
+
+    :param region: File content
+    :param position: Start of the line to search from
+
+    :returns: index of the start of the first line of the next error signature. -1 if there is no error signature.
+    """
+    start = -1
+    for marker, indented in _signature_markers:
+        index = region.find(marker, position)
+        while index != -1 and (start == -1 or index < start):
+            line_start = region.rfind(b"\n", position, index) + 1 or position
+            prefix = region[line_start:index]
+            if not prefix or (indented and not prefix.strip(b" \t")):
+                start = line_start
+                break
+            index = region.find(marker, index + 1)
+    return start
+
+
+def _error_signatures(
+    source: pathlib.Path | bytes,
+    max_signatures: int = 10,
+    max_lines: int = 20,
+    block_size: int = 1024 * 1024,
+) -> tuple[list[str], bool]:
+    """Return the known error signatures of a file or of file content by streaming through the content in blocks.
+
+    Error signatures start with an Abaqus ``***ERROR`` line or a Python ``Traceback (most recent call last):`` line
+    and continue with the following indented lines. Python tracebacks end with the first unindented line, the exception
+    message. The blocks are searched for the first line markers of the error signatures, so lines outside of error
+    signatures are not split into lines. Lines longer than ``_max_line_length`` are truncated.
+
+    :param source: File path or file content
+    :param max_signatures: Maximum number of error signatures. The file is not read past the first signature after
+        the maximum number of signatures.
+    :param max_lines: Maximum number of lines per error signature. Longer signatures keep their last lines.
+    :param block_size: Read block size in bytes
+
+    :returns: error signatures and True if the file contains more than ``max_signatures`` signatures
+    """
+    signatures: list[str] = []
+    current: collections.deque[bytes] | None = None
+    traceback = False
+    more = False
+
+    def finish() -> None:
+        """Add the current error signature."""
+        nonlocal current
+        if current is not None:
+            signatures.append("\n".join(line.decode("utf-8", errors="replace").rstrip() for line in current))
+        current = None
+
+    def search(region: bytes) -> None:
+        """Collect the error signatures of complete lines.
+
+        :param region: File content ending at the end of a line or at the end of the file
+        """
+        nonlocal current, traceback, more
+        position = 0
+        while position < len(region):
+            if current is None:
+                start = _signature_start(region, position)
+                if start == -1:
+                    return
+                if len(signatures) >= max_signatures:
+                    more = True
+                    return
+                position = start
+                traceback = region.startswith(_traceback_start, position)
+                current = collections.deque(maxlen=max_lines)
+            elif region[position : position + 1] not in (b" ", b"\t"):
+                if traceback and region[position : position + 1] not in (b"\n", b"\r"):
+                    newline = region.find(b"\n", position)
+                    newline = len(region) if newline == -1 else newline
+                    current.append(region[position:newline])
+                    position = newline + 1
+                finish()
+                continue
+            newline = region.find(b"\n", position)
+            newline = len(region) if newline == -1 else newline
+            current.append(region[position:newline])
+            position = newline + 1
+
+    carry = b""
+    skipping = False
+    with io.BytesIO(source) if isinstance(source, bytes) else source.open("rb") as file:
+        while not more:
+            block = file.read(block_size)
+            if not block:
+                search(carry)
+                break
+            if skipping:
+                newline = block.find(b"\n")
+                if newline == -1:
+                    continue
+                block = block[newline:]
+                skipping = False
+            buffer = carry + block
+            end = buffer.rfind(b"\n") + 1
+            if end == 0:
+                skipping = len(buffer) > _max_line_length
+                carry = buffer[:_max_line_length]
+                continue
+            carry = buffer[end:]
+            search(buffer[:end])
+    finish()
+    return signatures, more
+
+
+def _summary_table(rows: list[tuple[str, str, str, str]], width: int = 120) -> str:
+    """Return the build failure summary table.
+
+    :param rows: Target, exit status, error signature count, and first error line of each failed target
+    :param width: Maximum line width. The first error line is truncated to fit.
+
+    :returns: table text
+    """
+    header = ("Target", "Exit", "Errors", "First error")
+    columns = [max(len(row[index]) for row in [header, *rows]) for index in range(3)]
+    lines = []
+    for row in [header, *rows]:
+        line = "  ".join(value.ljust(column) for value, column in zip(row[:3], columns, strict=True))
+        line = f"{line}  {row[3]}".rstrip()
+        lines.append(line if len(line) <= width else f"{line[: width - 3]}...")
+    return "\n".join(lines)
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
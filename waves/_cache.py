@@ -0,0 +1,369 @@
+"""Internal API module implementing the shared artifact build cache for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import errno
+import gzip
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+import typing
+
+import SCons.CacheDir
+import SCons.Environment
+import SCons.Errors
+import SCons.Node
+import SCons.Node.FS
+import SCons.Util
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+#: Linux ``FICLONE`` ioctl request number cloning the extents of one file into another
+_ficlone = 0x40049409
+
+#: Cache hit retrieval and cache push link modes
+_link_modes = ("copy", "reflink", "hardlink")
+
+
+def _reflink(source: str, destination: str) -> None:
+    """Clone a file as a copy-on-write reflink.
+
+    :param source: Source file
+    :param destination: Destination file
+
+    :raises OSError: If the platform or file system does not support reflinks
+    """
+    try:
+        import fcntl
+    except ImportError as err:
+        raise OSError(errno.EOPNOTSUPP, "reflinks require the fcntl module") from err
+    try:
+        with open(source, "rb") as source_file, open(destination, "wb") as destination_file:  # noqa: PTH123
+            fcntl.ioctl(destination_file.fileno(), _ficlone, source_file.fileno())
+    except OSError:
+        pathlib.Path(destination).unlink(missing_ok=True)
+        raise
+
+
+def _link(source: str, destination: str, mode: str) -> bool:
+    """Hardlink or reflink a file, falling back to the next cheaper link mode.
+
+    ``hardlink`` falls back to ``reflink``, e.g. across file systems, and ``reflink`` falls back to no link.
+
+    :param source: Source file
+    :param destination: Destination file, which must not exist
+    :param mode: Link mode. One of ``_link_modes``.
+
+    :returns: True if the destination was linked. False if the file must be copied.
+    """
+    if mode == "hardlink":
+        try:
+            os.link(source, destination)
+            return True
+        except OSError:
+            pass
+    if mode in ("hardlink", "reflink"):
+        try:
+            _reflink(source, destination)
+            shutil.copystat(source, destination)
+            return True
+        except OSError:
+            pass
+    return False
+
+
+def _format_bytes(size: float) -> str:
+    """Return a human readable binary prefix size.
+
+    :param size: Size in bytes
+
+    :returns: size string, e.g. ``1.5 GiB``
+    """
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size) < 1024.0 or unit == "TiB":
+            break
+        size /= 1024.0
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
+class ArtifactCacheDir(SCons.CacheDir.CacheDir):
+    """SCons ``CacheDir`` class for shared caches of large simulation artifacts.
+
+    Use :meth:`configure` to create a configured class for the ``env.CacheDir`` ``custom_class`` argument.
+
+    * Cache hits are retrieved, and built targets pushed, as hardlinks or copy-on-write reflinks where the file system
+      supports them, so multi-GB files are neither copied nor stored twice. Hardlinked targets share their content with
+      the cache entry, so tasks must replace and never modify their targets in place, e.g. targets declared
+      ``Precious``. Reflinks are independent copies.
+    * :meth:`maintain` compresses entries that were not used for ``compress_after`` seconds. Compressed entries are
+      decompressed transparently when retrieved.
+    * :meth:`maintain` evicts the least recently used entries until the cache is within ``size_budget`` bytes. SCons
+      updates the modification time of cache entries when they are retrieved.
+    * The :attr:`statistics` counters record the requests, hits, retrieved bytes, linked bytes, compressed entries, and
+      evicted entries of the current build. See :meth:`report`.
+
+    Entries removed by another build's maintenance while they are retrieved are treated as cache misses.
+    """
+
+    #: Cache hit retrieval and cache push link mode. One of ``copy``, ``reflink``, or ``hardlink``.
+    link: str = "reflink"
+    #: Seconds since last use before entries are compressed. If None, entries are not compressed.
+    compress_after: float | None = None
+    #: Cache size budget in bytes. If None, entries are not evicted.
+    size_budget: int | None = None
+    #: Build statistics counters shared by all instances of a configured class
+    statistics: typing.ClassVar[dict[str, int]] = {}
+    _statistics_lock = threading.Lock()
+
+    @classmethod
+    def configure(
+        cls,
+        link: str = "reflink",
+        compress_after: float | None = None,
+        size_budget: int | None = None,
+    ) -> type["ArtifactCacheDir"]:
+        """Return a configured cache class with its own build statistics.
+
+        :param link: Cache hit retrieval and cache push link mode. One of ``copy``, ``reflink``, or ``hardlink``.
+        :param compress_after: Seconds since last use before entries are compressed. If None, entries are not
+            compressed.
+        :param size_budget: Cache size budget in bytes. If None, entries are not evicted.
+
+        :returns: configured ``CacheDir`` class
+
+        :raises RuntimeError: If the link mode is not supported
+        """
+        if link not in _link_modes:
+            raise RuntimeError(f"Cache link mode '{link}' must be one of: {', '.join(_link_modes)}")
+        attributes = {
+            "link": link,
+            "compress_after": compress_after,
+            "size_budget": size_budget,
+            "statistics": dict.fromkeys(
+                ("requests", "hits", "retrieved", "linked", "compressed", "evicted", "evicted_bytes"), 0
+            ),
+        }
+        return type(cls.__name__, (cls,), attributes)
+
+    @classmethod
+    def count(cls, **counts: int) -> None:
+        """Add to the build statistics counters.
+
+        :param counts: Counter increments by counter name
+        """
+        with cls._statistics_lock:
+            for key, value in counts.items():
+                cls.statistics[key] = cls.statistics.get(key, 0) + value
+
+    def cachepath(self, node: SCons.Node.Node) -> tuple:
+        """Return the cache directory and the cache entry of a node, preferring uncompressed entries.
+
+        :param node: SCons node
+
+        :returns: cache directory and cache entry path. Tuple of None if the cache is not enabled.
+        """
+        cachedir, cachefile = super().cachepath(node)
+        if cachefile is not None and not os.path.exists(cachefile):  # noqa: PTH110
+            compressed = f"{cachefile}{_settings._cache_compressed_suffix}"
+            if os.path.exists(compressed):  # noqa: PTH110
+                return cachedir, compressed
+        return cachedir, cachefile
+
+    def retrieve(self, node: SCons.Node.Node) -> bool:
+        """Retrieve a node from the cache and count the request.
+
+        :param node: SCons node
+
+        :returns: True if the node was retrieved from the cache
+        """
+        if not self.is_enabled():
+            return False
+        try:
+            retrieved = super().retrieve(node)
+        except (OSError, SCons.Errors.BuildError):
+            pathlib.Path(node.get_internal_path()).unlink(missing_ok=True)
+            retrieved = False
+        size = 0
+        if retrieved and os.path.isfile(node.get_internal_path()):  # noqa: PTH113
+            size = os.path.getsize(node.get_internal_path())  # noqa: PTH202
+        self.count(requests=1, hits=int(retrieved), retrieved=size)
+        return retrieved
+
+    def get_cachedir_csig(self, node: SCons.Node.Node) -> str:
+        """Return the content signature of a node's cache entry, decompressing compressed entries.
+
+        :param node: SCons node
+
+        :returns: content signature
+        """
+        _cachedir, cachefile = self.cachepath(node)
+        if not cachefile or not cachefile.endswith(_settings._cache_compressed_suffix):
+            return super().get_cachedir_csig(node)
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            decompressed = pathlib.Path(temporary_directory) / "entry"
+            with gzip.open(cachefile, "rb") as source, decompressed.open("wb") as destination:
+                shutil.copyfileobj(source, destination)
+            return SCons.Util.hash_file_signature(str(decompressed), SCons.Node.FS.File.hash_chunksize)
+
+    @classmethod
+    def copy_from_cache(cls, env: SCons.Environment.Environment, src: str, dst: str) -> str:
+        """Retrieve a cache entry as a link, a decompressed file, or a copy.
+
+        Entries compressed or removed by another build's maintenance after the cache lookup are retrieved from the
+        compressed entry.
+
+        :param env: SCons construction environment
+        :param src: Cache entry
+        :param dst: Target file
+
+        :returns: target file
+        """
+        compressed_suffix = _settings._cache_compressed_suffix
+        if not src.endswith(compressed_suffix) and not os.path.exists(src):  # noqa: PTH110
+            src = f"{src}{compressed_suffix}"
+        if src.endswith(compressed_suffix):
+            with gzip.open(src, "rb") as source, open(dst, "wb") as destination:  # noqa: PTH123
+                shutil.copyfileobj(source, destination)
+            shutil.copystat(src, dst)
+            return dst
+        if _link(src, dst, cls.link):
+            cls.count(linked=os.path.getsize(dst))  # noqa: PTH202
+            return dst
+        return super().copy_from_cache(env, src, dst)
+
+    @classmethod
+    def copy_to_cache(cls, env: SCons.Environment.Environment, src: str, dst: str) -> str:
+        """Push a built target to the cache as a link or a copy.
+
+        :param env: SCons construction environment
+        :param src: Target file
+        :param dst: Temporary cache entry
+
+        :returns: temporary cache entry
+        """
+        if _link(src, dst, cls.link):
+            cls.count(linked=os.path.getsize(dst))  # noqa: PTH202
+            return dst
+        return super().copy_to_cache(env, src, dst)
+
+    @classmethod
+    def maintain(cls, path: str | pathlib.Path, now: float | None = None) -> None:
+        """Compress cold cache entries and evict the least recently used entries to the size budget.
+
+        Entries in use by concurrent builds may be compressed or evicted. Concurrent builds retrieve compressed entries
+        and rebuild evicted entries.
+
+        :param path: Cache directory
+        :param now: Current time in seconds since the epoch. If None, use the current time.
+        """
+        now = time.time() if now is None else now
+        compressed_suffix = _settings._cache_compressed_suffix
+        entries = []
+        for subdirectory in pathlib.Path(path).iterdir():
+            if not subdirectory.is_dir():
+                continue
+            for entry in subdirectory.iterdir():
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if (
+                    cls.compress_after is not None
+                    and not entry.name.endswith(compressed_suffix)
+                    and now - stat.st_mtime > cls.compress_after
+                ):
+                    compressed = cls._compress(entry, stat)
+                    if compressed is not None:
+                        entries.append((compressed[1].st_mtime, compressed[1].st_size, compressed[0]))
+                        continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        if cls.size_budget is None:
+            return
+        total = sum(size for _mtime, size, _entry in entries)
+        for _mtime, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= cls.size_budget:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            cls.count(evicted=1, evicted_bytes=size)
+
+    @classmethod
+    def _compress(cls, entry: pathlib.Path, stat: os.stat_result) -> tuple[pathlib.Path, os.stat_result] | None:
+        """Replace a cache entry by its compressed entry, keeping the entry permissions and modification time.
+
+        :param entry: Cache entry
+        :param stat: Cache entry status
+
+        :returns: compressed entry and its status. None if the entry could not be compressed.
+        """
+        compressed = entry.with_name(f"{entry.name}{_settings._cache_compressed_suffix}")
+        temporary = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=entry.parent, prefix=".", delete=False) as temporary_file:
+                temporary = pathlib.Path(temporary_file.name)
+                with entry.open("rb") as source, gzip.GzipFile(fileobj=temporary_file, mode="wb", mtime=0) as gzipped:
+                    shutil.copyfileobj(source, gzipped)
+            temporary.chmod(stat.st_mode & 0o7777)
+            os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            temporary.replace(compressed)
+            entry.unlink()
+            cls.count(compressed=1)
+            return compressed, compressed.stat()
+        except OSError:
+            if temporary is not None:
+                temporary.unlink(missing_ok=True)
+            return None
+
+    @classmethod
+    def finish(cls, path: str | pathlib.Path, report: bool = True) -> None:
+        """Maintain the cache and print the build statistics report at the end of the build.
+
+        The cache is not maintained with the SCons ``--cache-disable`` and ``--cache-readonly`` options.
+
+        :param path: Cache directory
+        :param report: Print the build statistics report to STDOUT
+        """
+        if not SCons.CacheDir.cache_enabled or not pathlib.Path(path).is_dir():
+            return
+        if not SCons.CacheDir.cache_readonly:
+            cls.maintain(path)
+        if report:
+            print(cls.report(path))
+
+    @classmethod
+    def report(cls, path: str | pathlib.Path) -> str:
+        """Return the build statistics report.
+
+        :param path: Cache directory
+
+        :returns: single line report of the build statistics
+        """
+        statistics = cls.statistics
+        requests = statistics.get("requests", 0)
+        hits = statistics.get("hits", 0)
+        hit_rate = 100.0 * hits / requests if requests > 0 else 0.0
+        report = (
+            f"WAVES artifact cache '{path}': {requests} requests, {hits} hits ({hit_rate:.1f}%), "
+            f"{requests - hits} misses, {_format_bytes(statistics.get('retrieved', 0))} retrieved instead of built, "
+            f"{_format_bytes(statistics.get('linked', 0))} linked instead of copied"
+        )
+        if statistics.get("compressed", 0):
+            report += f", {statistics['compressed']} entries compressed"
+        if statistics.get("evicted", 0):
+            report += f", {statistics['evicted']} entries evicted ({_format_bytes(statistics['evicted_bytes'])})"
+        return report
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
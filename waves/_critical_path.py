@@ -0,0 +1,282 @@
+"""Internal API module implementing the ``critical_path`` subcommand behavior.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the CLI implementation
+to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import argparse
+import itertools
+import os
+import pathlib
+import subprocess
+
+import networkx
+import pandas
+
+from waves import _settings, _task_report, _visualize
+
+_exclude_from_namespace = set(globals().keys())
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return a 'no-help' parser for the critical_path subcommand.
+
+    :return: parser
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        "TARGET",
+        nargs="+",
+        help="SCons target(s)",
+    )
+    parser.add_argument(
+        "--log",
+        type=pathlib.Path,
+        default=_settings._task_accounting_default_log,
+        help="Task accounting log relative or absolute path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sconstruct",
+        type=pathlib.Path,
+        default=_settings._default_sconstruct,
+        help="Path to SConstruct file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--input-file",
+        type=str,
+        help="Path to text file with output from SCons tree command (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        nargs="+",
+        type=int,
+        default=_settings._critical_path_default_jobs,
+        help="Number of parallel jobs for the theoretical speedup table (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=10,
+        help="Number of tasks to report that most shorten the makespan (default: %(default)s)",
+    )
+
+    return parser
+
+
+def main(
+    targets: list[str],
+    scons_args: list | None = None,
+    log: pathlib.Path = _settings._task_accounting_default_log,
+    sconstruct: pathlib.Path = _settings._default_sconstruct,
+    input_file: str | pathlib.Path | None = None,
+    jobs: list[int] = _settings._critical_path_default_jobs,
+    count: int = 10,
+) -> None:
+    """Print the critical path, total work, and theoretical speedup of an SCons build from recorded task durations.
+
+    Task durations are the most recent successful task wall times in a task accounting log written by
+    :meth:`waves.scons_extensions.task_accounting`. Tasks without a recorded duration are assumed to take no time.
+
+    :param targets: Strings specifying SCons targets
+    :param scons_args: list of SCons arguments
+    :param log: Task accounting log
+    :param sconstruct: Path to an SConstruct file or parent directory
+    :param input_file: Path to text file storing output from SCons tree command
+    :param jobs: Number of parallel jobs for the theoretical speedup table
+    :param count: Number of tasks to report that most shorten the makespan
+
+    :raises RuntimeError: If the SConstruct file, input file, or log does not exist, or if no task of the SCons tree
+        has a recorded duration
+    """
+    if not scons_args:
+        scons_args = []
+    sconstruct = pathlib.Path(sconstruct).resolve()
+    if not sconstruct.is_file():
+        sconstruct = sconstruct / "SConstruct"
+    if not sconstruct.exists() and not input_file:
+        raise RuntimeError(f"\t{sconstruct} does not exist.")
+
+    if input_file:
+        input_file = pathlib.Path(input_file)
+        if not input_file.exists():
+            raise RuntimeError(f"\t{input_file} does not exist.")
+        tree_output = input_file.read_text()
+    else:
+        scons_command = [_settings._scons_command, *targets, f"--sconstruct={sconstruct.name}"]
+        scons_command.extend(scons_args)
+        scons_command.extend(_settings._scons_visualize_arguments)
+        tree_output = subprocess.check_output(scons_command, cwd=sconstruct.parent).decode("utf-8")
+
+    graph = _visualize.parse_output(tree_output.splitlines())
+    graph = _visualize.ancestor_subgraph(graph, targets)
+    graph, tasks = _task_graph(graph, _task_report._task_durations(log), sconstruct.parent)
+    span, path = _critical_path(graph)
+    if span <= 0.0:
+        raise RuntimeError(f"No task of the SCons tree has a recorded duration in '{log}'.")
+
+    path_tasks = _path_tasks(graph, path)
+    work = sum(tasks.values())
+    print(
+        f"Critical path: {span:.1f} s across {len(path_tasks)} tasks. Total work: {work:.1f} s across {len(tasks)} "
+        f"tasks. Average parallelism: {work / span:.2f}\n"
+    )
+    with pandas.option_context("display.max_columns", None, "display.width", None, "display.max_colwidth", 80):
+        print(f"Critical path tasks\n{_path_table(graph, path_tasks)}\n")
+        print(f"Theoretical speedup\n{_speedup(work, span, jobs)}\n")
+        print(f"Tasks that most shorten the makespan\n{_shortening(graph, path_tasks, count)}")
+
+
+def _task_graph(
+    graph: networkx.DiGraph,
+    durations: dict[tuple[str, ...], float],
+    root: pathlib.Path,
+) -> tuple[networkx.DiGraph, dict[str, float]]:
+    """Add the ``task`` and ``duration`` node attributes to an SCons directed graph from recorded task durations.
+
+    Every target node of a recorded task is assigned the task duration and the first task target path as the task name.
+    Nodes without a recorded task, e.g. source files, are assigned a zero duration and no task name.
+
+    :param graph: SCons directed graph with edges from dependency to target. See :meth:`waves._visualize.parse_output`.
+    :param durations: Task wall time by task target absolute paths
+    :param root: SCons working directory used to resolve the relative graph node paths
+
+    :returns: graph with the ``task`` and ``duration`` node attributes, recorded task duration by task name for tasks
+        in the graph
+    """
+    node_tasks = {}
+    for targets, duration in durations.items():
+        node_tasks.update(dict.fromkeys(targets, (targets[0], duration)))
+    tasks = {}
+    for node in graph.nodes:
+        task, duration = node_tasks.get(os.path.normpath(root / node), (None, 0.0))
+        graph.nodes[node]["task"] = task
+        graph.nodes[node]["duration"] = duration
+        if task is not None:
+            tasks[task] = duration
+    return graph, tasks
+
+
+def _critical_path(graph: networkx.DiGraph, weights: dict[str, float] | None = None) -> tuple[float, list[str]]:
+    """Return the longest node duration weighted path of a directed acyclic graph.
+
+    :param graph: Directed acyclic graph with the ``duration`` node attribute. See :meth:`_task_graph`.
+    :param weights: Duration overrides by node name
+
+    :returns: path duration, path nodes in dependency order
+    """
+    if weights is None:
+        weights = {}
+    finish: dict[str, float] = {}
+    previous: dict[str, str | None] = {}
+    for node in networkx.topological_sort(graph):
+        start, previous[node] = max(
+            ((finish[predecessor], predecessor) for predecessor in graph.predecessors(node)), default=(0.0, None)
+        )
+        finish[node] = start + weights.get(node, graph.nodes[node].get("duration", 0.0))
+    if not finish:
+        return 0.0, []
+    node = max(finish, key=finish.__getitem__)
+    span = finish[node]
+    path = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return span, path[::-1]
+
+
+def _path_tasks(graph: networkx.DiGraph, path: list[str]) -> list[str]:
+    """Return the task names of a path in path order.
+
+    :param graph: Directed graph with the ``task`` node attribute. See :meth:`_task_graph`.
+    :param path: Path nodes
+
+    :returns: task names without repetition. Nodes without a task are skipped.
+    """
+    tasks = [graph.nodes[node]["task"] for node in path if graph.nodes[node].get("task") is not None]
+    return list(dict.fromkeys(tasks))
+
+
+def _path_table(graph: networkx.DiGraph, tasks: list[str]) -> pandas.DataFrame:
+    """Return the duration and cumulative finish time of critical path tasks.
+
+    :param graph: Directed graph with the ``task`` and ``duration`` node attributes. See :meth:`_task_graph`.
+    :param tasks: Critical path task names in path order
+
+    :returns: critical path table indexed by task name
+    """
+    durations = {graph.nodes[node]["task"]: graph.nodes[node]["duration"] for node in graph.nodes}
+    table = pandas.DataFrame({"task": tasks, "wall_time": [durations[task] for task in tasks]})
+    return table.assign(finish=table["wall_time"].cumsum()).set_index("task")
+
+
+def _speedup(work: float, span: float, jobs: list[int]) -> pandas.DataFrame:
+    """Return the theoretical makespan bounds and speedup for a number of parallel jobs.
+
+    The minimum makespan is bounded below by both the critical path and the total work divided evenly across the jobs.
+    The greedy makespan is the upper bound of any scheduler that never idles a job while a task is ready, e.g. ``scons
+    -j``.
+
+    :param work: Total task duration
+    :param span: Critical path duration
+    :param jobs: Number of parallel jobs
+
+    :returns: makespan bounds and maximum speedup table indexed by number of jobs
+    """
+    minimum = [max(work / job, span) for job in jobs]
+    table = pandas.DataFrame(
+        {
+            "jobs": jobs,
+            "minimum_makespan": minimum,
+            "greedy_makespan": [(work - span) / job + span for job in jobs],
+            "maximum_speedup": [work / makespan for makespan in minimum],
+        }
+    )
+    return table.set_index("jobs")
+
+
+def _shortening(graph: networkx.DiGraph, tasks: list[str], count: int) -> pandas.DataFrame:
+    """Return the critical path tasks sorted by the makespan reduction from removing each task duration.
+
+    Removing one task duration shortens the makespan until another path becomes critical, so the reduction may be
+    less than the task duration.
+
+    :param graph: Directed graph with the ``task`` and ``duration`` node attributes. See :meth:`_task_graph`.
+    :param tasks: Critical path task names
+    :param count: Number of tasks
+
+    :returns: task duration and makespan reduction table indexed by task name
+    """
+    span, _path = _critical_path(graph)
+    rows = []
+    for task in tasks:
+        nodes = [node for node in graph.nodes if graph.nodes[node]["task"] == task]
+        reduced, _path = _critical_path(graph, weights=dict.fromkeys(nodes, 0.0))
+        rows.append({"task": task, "wall_time": graph.nodes[nodes[0]]["duration"], "reduction": span - reduced})
+    table = pandas.DataFrame.from_records(rows, columns=["task", "wall_time", "reduction"])
+    return table.sort_values("reduction", ascending=False, kind="stable").head(count).set_index("task")
+
+
+def _mark_critical_path(graph: networkx.DiGraph, log: pathlib.Path, root: pathlib.Path) -> networkx.DiGraph:
+    """Add the boolean ``critical_path`` node and edge attributes to an SCons directed graph.
+
+    :param graph: SCons directed graph with edges from dependency to target. See :meth:`waves._visualize.parse_output`.
+    :param log: Task accounting log
+    :param root: SCons working directory used to resolve the relative graph node paths
+
+    :returns: graph with the ``critical_path`` node and edge attributes
+
+    :raises RuntimeError: If the log does not exist or contains no task records
+    """
+    durations = _task_report._task_durations(log)
+    task_graph, _tasks = _task_graph(networkx.DiGraph(graph), durations, root)
+    _span, path = _critical_path(task_graph)
+    path_edges = set(itertools.pairwise(path))
+    networkx.set_node_attributes(graph, {node: node in path for node in graph.nodes}, "critical_path")
+    networkx.set_edge_attributes(graph, {edge: edge in path_edges for edge in graph.edges}, "critical_path")
+    return graph
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,248 @@
+"""Internal API module implementing the large file content decider for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections.abc
+import hashlib
+import json
+import pathlib
+import tempfile
+import threading
+
+import SCons.Node
+import SCons.Node.FS
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+
+def _sampled_fingerprint(path: str | pathlib.Path, size: int, block_size: int, blocks: int) -> str:
+    """Return a content fingerprint of a file from its size and evenly spaced sample blocks.
+
+    Files no larger than ``blocks`` sample blocks are fingerprinted from their entire content.
+
+    :param path: File path
+    :param size: File size in bytes
+    :param block_size: Sample block size in bytes
+    :param blocks: Number of sample blocks, including the first and last block of the file
+
+    :returns: fingerprint string prefixed with ``_settings._fingerprint_prefix``
+    """
+    digest = hashlib.blake2b(str(size).encode("utf-8"), digest_size=16)
+    with pathlib.Path(path).open("rb") as file:
+        if size <= block_size * blocks:
+            for chunk in iter(lambda: file.read(block_size), b""):
+                digest.update(chunk)
+        else:
+            for index in range(blocks):
+                file.seek(index * (size - block_size) // (blocks - 1))
+                digest.update(file.read(block_size))
+    return f"{_settings._fingerprint_prefix}{digest.hexdigest()}"
+
+
+class FingerprintCache:
+    """Persistent cache of large file fingerprints keyed by absolute path, size, and modification time.
+
+    Files with an unchanged size and modification time reuse the cached fingerprint without reading the file.
+
+    :param cache_file: JSON cache file. If None, fingerprints are cached for the current process only.
+    :param block_size: Sample block size in bytes
+    :param blocks: Number of sample blocks per file
+    """
+
+    def __init__(
+        self,
+        cache_file: str | pathlib.Path | None = None,
+        block_size: int = 1024 * 1024,
+        blocks: int = 16,
+    ) -> None:
+        self.cache_file = pathlib.Path(cache_file) if cache_file is not None else None
+        self.block_size = block_size
+        self.blocks = max(blocks, 2)
+        self._lock = threading.Lock()
+        self._modified = False
+        self._cache: dict[str, list] = {}
+        if self.cache_file is not None:
+            try:
+                cache = json.loads(self.cache_file.read_text())
+            except (OSError, ValueError):
+                cache = {}
+            if isinstance(cache, dict) and cache.get("sample") == [self.block_size, self.blocks]:
+                self._cache = cache.get("files", {})
+
+    def fingerprint(self, path: str) -> str | None:
+        """Return the fingerprint of a file.
+
+        :param path: Absolute file path
+
+        :returns: fingerprint string. None if the file does not exist or can not be read.
+        """
+        try:
+            stat = pathlib.Path(path).stat()
+            with self._lock:
+                cached = self._cache.get(path)
+            if cached is not None and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+                return cached[2]
+            fingerprint = _sampled_fingerprint(path, stat.st_size, self.block_size, self.blocks)
+        except OSError:
+            return None
+        with self._lock:
+            self._cache[path] = [stat.st_size, stat.st_mtime_ns, fingerprint]
+            self._modified = True
+        return fingerprint
+
+    def save(self) -> None:
+        """Write the cache file if fingerprints were added or updated."""
+        with self._lock:
+            if self.cache_file is None or not self._modified:
+                return
+            cache = {"sample": [self.block_size, self.blocks], "files": self._cache}
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.cache_file.parent, prefix=f".{self.cache_file.name}.", delete=False
+            ) as temporary_file:
+                temporary = pathlib.Path(temporary_file.name)
+                temporary_file.write(json.dumps(cache))
+            temporary.replace(self.cache_file)
+            self._modified = False
+
+
+class LargeFileDecider:
+    """SCons ``Decider`` function using sampled fingerprints as the content signature of large files.
+
+    Large files are files with one of the ``extensions`` or at least ``size_threshold`` bytes. After :meth:`enable`,
+    the content signature (``csig``) of large file nodes decided by this decider, or built in a construction environment
+    using this decider, is a sampled fingerprint from :class:`FingerprintCache`. SCons then neither hashes the entire
+    file when deciding if a dependency changed nor when recording a newly built target. All other nodes are decided by
+    the ``fallback`` decider function.
+
+    Dependencies recorded with a full content hash before the decider was enabled are compared once against their full
+    content hash, so enabling the decider does not rebuild up-to-date targets.
+
+    :param fallback: Decider function for all other nodes, e.g. the construction environment's previous
+        ``decide_target`` function
+    :param cache: Fingerprint cache
+    :param extensions: Large file extensions, e.g. ``.odb``. Compared case insensitive.
+    :param size_threshold: Minimum size in bytes of large files with other extensions. If None, only files with the
+        ``extensions`` are large files.
+    """
+
+    def __init__(
+        self,
+        fallback: collections.abc.Callable,
+        cache: FingerprintCache,
+        extensions: collections.abc.Iterable[str] = (".odb", ".h5"),
+        size_threshold: int | None = None,
+    ) -> None:
+        self.fallback = fallback
+        self.cache = cache
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.size_threshold = size_threshold
+        self._nodes: set[SCons.Node.Node] = set()
+
+    def enable(self) -> None:
+        """Use the sampled fingerprints as the content signature of large file nodes of this decider.
+
+        SCons file nodes do not allow per-node methods, so the ``SCons.Node.FS.File.get_csig`` method is replaced for
+        all file nodes of the SCons process. The replacement defers to the SCons content signature for nodes that are
+        not large file nodes of an enabled decider, see :meth:`scoped`.
+        """
+        if self not in _enabled_deciders:
+            _enabled_deciders.append(self)
+        SCons.Node.FS.File.get_csig = _get_csig
+
+    def scoped(self, node: SCons.Node.Node) -> bool:
+        """Return True if the node was decided by this decider or is built in a construction environment using it.
+
+        :param node: SCons node
+
+        :returns: True if the content signature of the node may be a sampled fingerprint of this decider
+        """
+        return node in self._nodes or getattr(node.env, "decide_target", None) is self
+
+    def large(self, node: SCons.Node.Node) -> bool:
+        """Return True if the node is a large file node.
+
+        :param node: SCons node
+
+        :returns: True for file nodes with one of the large file extensions or at least the threshold size
+        """
+        if not isinstance(node, SCons.Node.FS.File):
+            return False
+        if node.get_suffix().lower() in self.extensions:
+            return True
+        return self.size_threshold is not None and node.rexists() and node.get_size() >= self.size_threshold
+
+    def csig(self, node: SCons.Node.FS.File) -> str:
+        """Return the sampled fingerprint content signature of a large file node.
+
+        Files that do not exist or can not be read use the SCons content signature.
+
+        :param node: Large file node
+
+        :returns: content signature
+        """
+        fingerprint = self.cache.fingerprint(node.rfile().get_abspath())
+        if fingerprint is None:
+            return _scons_get_csig(node)
+        node.get_ninfo().csig = fingerprint
+        return fingerprint
+
+    def __call__(
+        self,
+        dependency: SCons.Node.Node,
+        target: SCons.Node.Node,
+        prev_ni: SCons.Node.NodeInfoBase | None,
+        repo_node: SCons.Node.Node | None = None,
+    ) -> bool:
+        """Return True if the dependency changed since the target was last built.
+
+        :param dependency: Dependency node
+        :param target: Target node
+        :param prev_ni: Dependency node information recorded when the target was last built
+        :param repo_node: Repository node
+
+        :returns: True if the dependency changed
+        """
+        if not self.large(dependency):
+            return self.fallback(dependency, target, prev_ni, repo_node)
+        self._nodes.add(dependency)
+        current = dependency.get_csig()
+        previous = getattr(prev_ni, "csig", None)
+        if previous is None:
+            return True
+        if current.startswith(_settings._fingerprint_prefix) and not previous.startswith(_settings._fingerprint_prefix):
+            return dependency.get_content_hash() != previous
+        return current != previous
+
+
+_scons_get_csig = SCons.Node.FS.File.get_csig
+_enabled_deciders: list[LargeFileDecider] = []
+
+
+def _get_csig(node: SCons.Node.FS.File) -> str:
+    """Return the content signature of a file node, using the sampled fingerprint for large files of enabled deciders.
+
+    Replaces ``SCons.Node.FS.File.get_csig`` for the SCons process after :meth:`LargeFileDecider.enable`.
+
+    :param node: File node
+
+    :returns: content signature
+    """
+    ninfo = node.get_ninfo()
+    try:
+        return ninfo.csig
+    except AttributeError:
+        pass
+    for decider in _enabled_deciders:
+        if decider.scoped(node) and decider.large(node):
+            return decider.csig(node)
+    return _scons_get_csig(node)
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,314 @@
+"""Internal API module implementing batched Abaqus CAE journal sessions for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections
+import hashlib
+import json
+import pathlib
+import shlex
+import sys
+import threading
+import typing
+
+_exclude_from_namespace = set(globals().keys())
+
+_session_script_name = "abaqus_journal_session.py"
+_session_tasks_name = "tasks.json"
+_session_stdout_name = "abaqus_journal_session.stdout"
+_status_extension = ".status"
+_start_extension = ".start"
+
+#: Unquoted shell characters that prevent a journal command from running without the shell
+_shell_characters = frozenset("$`*?[~;|&<>(){}")
+
+# Abaqus Python may be Python 2.7 or Python 3, so the session script must run with either interpreter
+_session_script = r"""import json
+import os
+import sys
+import traceback
+
+session_arguments = sys.argv[: sys.argv.index("--")] if "--" in sys.argv else sys.argv[:1]
+with open(sys.argv[-1]) as tasks_file:
+    tasks = json.load(tasks_file)
+session_directory, session_path = os.getcwd(), list(sys.path)
+for task in tasks:
+    open(task["start"], "w").close()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    status = 0
+    try:
+        os.chdir(task["cwd"])
+        output = os.open(task["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 438)
+        os.dup2(output, 1)
+        os.dup2(output, 2)
+        os.close(output)
+        script = os.path.abspath(task["script"])
+        prefix = [script if os.path.basename(argument) == "abaqus_journal_session.py" else argument
+                  for argument in session_arguments]
+        sys.argv = prefix + ["--"] + task["arguments"]
+        sys.path.insert(0, os.path.dirname(script))
+        try:
+            import abaqus
+            abaqus.Mdb()
+        except (ImportError, AttributeError):
+            pass
+        with open(script) as script_file:
+            source = script_file.read()
+        exec(compile(source, script, "exec"), {"__name__": "__main__", "__file__": script})
+    except SystemExit as err:
+        if err.code is None or isinstance(err.code, int):
+            status = (err.code or 0) & 255
+        else:
+            sys.stderr.write("%s\n" % (err.code,))
+            status = 1
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+        os.chdir(session_directory)
+        sys.path[:] = session_path
+    with open(task["status"], "w") as status_file:
+        status_file.write("%d\n" % status)
+"""
+
+
+def _unquote(argument: str) -> str | None:
+    """Return the value of an SCons escaped command argument.
+
+    :param argument: SCons escaped command argument
+
+    :returns: argument value. None if the argument is not a single word without shell expansions.
+    """
+    quoted = argument.startswith("'") and argument.endswith("'") and len(argument) > 1
+    if not quoted and _shell_characters.intersection(argument):
+        return None
+    try:
+        words = shlex.split(argument)
+    except ValueError:
+        return None
+    return words[0] if len(words) == 1 else None
+
+
+def _parse_journal_task(args: list[str], program: str = "abaqus") -> dict | None:
+    """Return the batchable task description of an Abaqus CAE journal command.
+
+    Batchable commands match the :meth:`waves.scons_extensions.abaqus_journal_builder_factory` default action with
+    optional Abaqus options and journal arguments:
+    ``[cd directory &&] program cae -noGUI journal [options] -- [arguments] > stdout 2>&1``. The ``-noGUI=journal`` and
+    ``noGUI=journal`` option forms are also recognized.
+
+    :param args: SCons escaped command arguments
+    :param program: The Abaqus command line executable absolute or relative path
+
+    :returns: Task dictionary with the escaped ``program``, the Abaqus ``options``, and the journal ``script``,
+        ``arguments``, working directory ``cwd``, and ``stdout`` file. None if the command is not a batchable Abaqus
+        CAE journal command.
+    """
+    cwd = pathlib.Path.cwd()
+    tokens = list(args)
+    if len(tokens) > 3 and tokens[0] == "cd" and tokens[2] == "&&":
+        directory = _unquote(tokens[1])
+        if directory is None:
+            return None
+        cwd = cwd / directory
+        tokens = tokens[3:]
+    if len(tokens) < 6 or tokens[-3] != ">" or tokens[-1] != "2>&1":
+        return None
+    stdout = _unquote(tokens[-2])
+    command = tokens[:-3]
+    if pathlib.PurePath(_unquote(command[0]) or "").name != pathlib.PurePath(program).name or command[1] != "cae":
+        return None
+    if "--" not in command:
+        return None
+    separator = command.index("--")
+    options = command[2:separator]
+    script = None
+    abaqus_options = []
+    index = 0
+    while index < len(options):
+        option, equals, value = options[index].partition("=")
+        if option.lower() in ("-nogui", "nogui") and script is None:
+            if not equals:
+                index += 1
+                if index >= len(options):
+                    return None
+                value = options[index]
+            script = _unquote(value)
+            if script is None:
+                return None
+        elif _unquote(options[index]) is None:
+            return None
+        else:
+            abaqus_options.append(options[index])
+        index += 1
+    arguments = [_unquote(argument) for argument in command[separator + 1 :]]
+    if script is None or stdout is None or None in arguments:
+        return None
+    return {
+        "program": command[0],
+        "options": abaqus_options,
+        "script": script,
+        "arguments": arguments,
+        "cwd": str(cwd),
+        "stdout": stdout,
+    }
+
+
+class JournalSessionSpawn:
+    """SCons ``SPAWN`` construction variable replacement running Abaqus CAE journal tasks in shared CAE sessions.
+
+    Commands that run a journal with ``program cae -noGUI`` are collected for ``window`` seconds after the first task
+    arrives. Collected tasks with the same Abaqus program, Abaqus options, and environment variables run one after
+    another in a single ``-noGUI`` session, at most ``max_tasks`` tasks per session. Each journal runs as ``__main__``
+    with its own ``sys.argv`` journal arguments, working directory, STDOUT file, and a new, empty model database. The
+    task targets and STDOUT files are unchanged. Each calling SCons worker thread blocks until its session finishes and
+    returns the exit code of its own journal.
+
+    Journals raising exceptions or calling ``sys.exit`` fail only their own task. If the session exits while running a
+    journal, e.g. with ``os._exit`` or a segmentation fault, the journal fails with the session exit code and the tasks
+    not yet started in the session are executed with the original ``SPAWN`` function. All other commands are passed
+    through to the original ``SPAWN`` function.
+
+    :param spawn: Original SCons ``SPAWN`` function
+    :param session_directory: Directory for the session journals, task lists, task status files, and session output
+    :param program: The Abaqus command line executable absolute or relative path
+    :param window: Seconds to collect ready tasks before starting sessions
+    :param max_tasks: Maximum number of tasks per session. If None, all collected tasks run in one session.
+    """
+
+    def __init__(
+        self,
+        spawn: typing.Callable,
+        session_directory: str | pathlib.Path,
+        program: str = "abaqus",
+        window: float = 5.0,
+        max_tasks: int | None = None,
+    ) -> None:
+        self.spawn = spawn
+        self.session_directory = pathlib.Path(session_directory)
+        self.program = program
+        self.window = window
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._pending: list[tuple[dict, dict]] = []
+        self._timer: threading.Timer | None = None
+
+    def __call__(
+        self,
+        sh: str,
+        escape: typing.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Queue Abaqus CAE journal tasks for a shared session and block until the task finishes.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        task = _parse_journal_task(args, self.program)
+        if task is None:
+            return self.spawn(sh, escape, cmd, args, env)
+
+        result: dict = {"event": threading.Event(), "exit_code": 1, "retry": False}
+        with self._lock:
+            self._pending.append(({**task, "sh": sh, "escape": escape, "env": env}, result))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        result["event"].wait()
+        if result["retry"]:
+            return self.spawn(sh, escape, cmd, args, env)
+        return result["exit_code"]
+
+    def _flush(self) -> None:
+        """Group the collected tasks into sessions and start one session thread per session."""
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._timer = None
+        groups: dict[str, list[tuple[dict, dict]]] = collections.defaultdict(list)
+        for task, result in pending:
+            key = json.dumps([task["program"], task["options"], sorted(task["env"].items())], default=str)
+            groups[key].append((task, result))
+        for group in groups.values():
+            size = self.max_tasks or len(group)
+            for start in range(0, len(group), size):
+                thread = threading.Thread(target=self._run, args=(group[start : start + size],), daemon=True)
+                thread.start()
+
+    def _run(self, session: list[tuple[dict, dict]]) -> None:
+        """Run a single CAE session and release the waiting SCons worker threads.
+
+        :param session: Task dictionaries and result dictionaries in session order
+        """
+        try:
+            first = session[0][0]
+            tasks = [{key: task[key] for key in ("script", "arguments", "cwd", "stdout")} for task, _result in session]
+            key = hashlib.md5(json.dumps(tasks, sort_keys=True).encode("utf-8"), usedforsecurity=False).hexdigest()
+            directory = self.session_directory / key
+            directory.mkdir(parents=True, exist_ok=True)
+            for index, task in enumerate(tasks):
+                task["start"] = str(directory / f"{index}{_start_extension}")
+                task["status"] = str(directory / f"{index}{_status_extension}")
+                pathlib.Path(task["start"]).unlink(missing_ok=True)
+                pathlib.Path(task["status"]).unlink(missing_ok=True)
+            script = directory / _session_script_name
+            script.write_text(_session_script)
+            tasks_file = directory / _session_tasks_name
+            tasks_file.write_text(json.dumps(tasks, indent=2))
+            stdout = directory / _session_stdout_name
+            args = [
+                "cd",
+                shlex.quote(str(directory)),
+                "&&",
+                first["program"],
+                "cae",
+                "-noGUI",
+                shlex.quote(str(script)),
+                *first["options"],
+                "--",
+                shlex.quote(str(tasks_file)),
+                ">",
+                shlex.quote(str(stdout)),
+                "2>&1",
+            ]
+            exit_code = self.spawn(first["sh"], first["escape"], first["program"], args, first["env"])
+            started = any(pathlib.Path(task["start"]).exists() for task in tasks)
+            for task, (_task, result) in zip(tasks, session, strict=True):
+                try:
+                    result["exit_code"] = int(pathlib.Path(task["status"]).read_text().strip())
+                    continue
+                except (OSError, ValueError):
+                    pass
+                if started and not pathlib.Path(task["start"]).exists():
+                    result["retry"] = True
+                    continue
+                sys.stderr.write(f"Abaqus CAE journal session '{directory}' did not finish '{task['script']}'\n")
+                result["exit_code"] = exit_code or 1
+            if not started and stdout.exists():
+                sys.stderr.write(stdout.read_text())
+        finally:
+            for _task, result in session:
+                result["event"].set()
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -7,7 +7,21 @@ Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAV
 import argparse
 import sys
 
-from waves import __version__, _build, _docs, _fetch, _parameter_study, _print_study, _qoi, _settings, _visualize
+from waves import (
+    __version__,
+    _build,
+    _critical_path,
+    _docs,
+    _fetch,
+    _parameter_study,
+    _print_study,
+    _qoi,
+    _settings,
+    _slurm_export,
+    _status,
+    _task_report,
+    _visualize,
+)
 from waves.exceptions import WAVESError
 
 _exclude_from_namespace = set(globals().keys())
@@ -56,6 +70,8 @@ def main() -> None:
                 transparent=args.transparent,
                 break_paths=args.break_paths,
                 input_file=args.input_file,
+                critical_path=args.critical_path,
+                critical_path_color=args.critical_path_color,
             )
         elif args.subcommand == "build":
             _build.main(
@@ -65,6 +81,30 @@ def main() -> None:
                 working_directory=args.working_directory,
                 git_clone_directory=args.git_clone_directory,
             )
+        elif args.subcommand == "slurm_export":
+            _slurm_export.main(
+                args.TARGET,
+                scons_args=unknown,
+                sconstruct=args.sconstruct,
+                manifest=args.manifest,
+                sbatch_program=args.sbatch_program,
+                sbatch_options=args.sbatch_options,
+                reconcile=args.reconcile,
+            )
+        elif args.subcommand == "task_report":
+            _task_report.main(args.LOG, all_builds=args.all_builds, slowest=args.slowest)
+        elif args.subcommand == "status":
+            _status.main(args.STREAM, log=args.log, watch=args.watch)
+        elif args.subcommand == "critical_path":
+            _critical_path.main(
+                args.TARGET,
+                scons_args=unknown,
+                log=args.log,
+                sconstruct=args.sconstruct,
+                input_file=args.input_file,
+                jobs=args.jobs,
+                count=args.count,
+            )
         elif args.subcommand in _settings._parameter_study_subcommands:
             _parameter_study.main(
                 args.subcommand,
@@ -154,6 +194,49 @@ def get_parser() -> argparse.ArgumentParser:
         parents=[_build.get_parser()],
     )
 
+    subparsers.add_parser(
+        "slurm_export",
+        help="Submit SCons tasks as SLURM jobs",
+        description=(
+            "Submit the out-of-date SCons tasks as SLURM jobs with ``afterok`` dependency chains matching the SCons "
+            "directed acyclic graph. Re-run with ``--reconcile`` after the jobs finish to record the task signatures "
+            "without re-running the tasks. Unknown arguments are passed through to SCons."
+        ),
+        parents=[_slurm_export.get_parser()],
+    )
+
+    subparsers.add_parser(
+        "task_report",
+        help="Summarize a task accounting log",
+        description=(
+            "Summarize the task wall time, CPU time, peak memory, and bytes written recorded by the "
+            "``waves.scons_extensions.task_accounting`` log by builder, by parameter set, and by slowest tasks."
+        ),
+        parents=[_task_report.get_parser()],
+    )
+
+    subparsers.add_parser(
+        "status",
+        help="Report the progress of an SCons build",
+        description=(
+            "Report the completion percentage, running tasks, and ETA of the latest build in the progress event stream "
+            "written by ``waves.scons_extensions.progress_stream``. The ETA uses the historical task durations of the "
+            "``waves.scons_extensions.task_accounting`` log."
+        ),
+        parents=[_status.get_parser()],
+    )
+
+    subparsers.add_parser(
+        "critical_path",
+        help="Report the critical path of an SCons build",
+        description=(
+            "Report the critical path, total work, and theoretical speedup of the SCons directed acyclic graph from "
+            "the task durations recorded by the ``waves.scons_extensions.task_accounting`` log. Reports the critical "
+            "path tasks that most shorten the makespan. Unknown arguments are passed through to SCons."
+        ),
+        parents=[_critical_path.get_parser()],
+    )
+
     for subcommand in _settings._parameter_study_subcommands:
         subparsers.add_parser(
             subcommand,
@@ -0,0 +1,159 @@
+"""Internal API module implementing longest expected duration first task ordering for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections.abc
+import typing
+
+import SCons.Taskmaster
+
+from waves import _accounting, _progress
+
+_exclude_from_namespace = set(globals().keys())
+
+
+class LongestFirstOrder:
+    """SCons Taskmaster dependency order function visiting the longest expected dependency chains first.
+
+    The SCons Taskmaster walks the dependency graph depth first and starts tasks in the order their dependencies are
+    found ready. Sorting the unvisited dependencies of each node by the expected duration of their longest dependency
+    chain starts the tasks on the longest chains first, which shortens the tail of a parallel build.
+
+    The expected duration of a task is the most recent recorded duration of any of its targets, then the builder
+    estimate, then the recorded median duration of the builder, then the default estimate.
+
+    :param durations: Recorded task duration by target absolute path
+    :param builder_durations: Recorded median task duration by builder name
+    :param estimates: User task duration estimates by builder name
+    :param default: Task duration estimate for tasks without a recorded duration or estimate
+    """
+
+    def __init__(
+        self,
+        durations: dict[str, float],
+        builder_durations: dict[str, float],
+        estimates: dict[str, float] | None = None,
+        default: float = 0.0,
+    ) -> None:
+        self.durations = durations
+        self.builder_durations = builder_durations
+        self.estimates = estimates if estimates is not None else {}
+        self.default = default
+        self.order: collections.abc.Callable[[list], list] = lambda dependencies: dependencies
+        self._priorities: dict[typing.Any, float] = {}
+
+    def __call__(self, dependencies: list) -> list:
+        """Return the dependencies in Taskmaster candidate stack order with the longest expected chain last.
+
+        The SCons order function, e.g. ``scons --random``, is applied first, such that ties keep the SCons order.
+
+        :param dependencies: Unvisited dependency nodes
+
+        :returns: sorted dependency nodes
+        """
+        return sorted(self.order(dependencies), key=self.priority)
+
+    def expected_duration(self, node: typing.Any) -> float:  # noqa: ANN401
+        """Return the expected duration of the task building a node.
+
+        :param node: SCons node
+
+        :returns: expected task duration. Zero for source nodes.
+        """
+        if not node.has_builder():
+            return 0.0
+        executor = node.get_executor()
+        targets = executor.get_all_targets() if executor else [node]
+        for target in targets:
+            duration = self.durations.get(target.get_abspath())
+            if duration is not None:
+                return duration
+        builder = _accounting._builder_name(node)
+        if builder is None:
+            return self.default
+        if builder in self.estimates:
+            return self.estimates[builder]
+        return self.builder_durations.get(builder, self.default)
+
+    def priority(self, node: typing.Any) -> float:  # noqa: ANN401
+        """Return the expected duration of the longest dependency chain ending with a node.
+
+        Dependencies are not scanned, so implicit dependencies found by scanners are only included after SCons scans
+        the node.
+
+        :param node: SCons node
+
+        :returns: longest expected dependency chain duration
+        """
+        # Iterative post-order walk. Dependency cycles are reported by SCons and are broken here by skipping nodes on
+        # the current walk.
+        visiting = set()
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._priorities:
+                continue
+            children = current.children(scan=0)
+            if expanded:
+                chain = max((self._priorities.get(child, 0.0) for child in children), default=0.0)
+                self._priorities[current] = self.expected_duration(current) + chain
+                visiting.discard(current)
+                continue
+            visiting.add(current)
+            stack.append((current, True))
+            stack.extend(
+                (child, False) for child in children if child not in self._priorities and child not in visiting
+            )
+        return self._priorities[node]
+
+
+class OrderedTaskmaster(SCons.Taskmaster.Taskmaster):
+    """SCons Taskmaster composing the SCons dependency order function and task class with WAVES hooks.
+
+    SCons does not expose the Taskmaster dependency order function or task class. The class attribute ``ordering`` is
+    set by :meth:`waves.scons_extensions.longest_first_order` and the class attribute ``progress`` is set by
+    :meth:`waves.scons_extensions.progress_stream`. Both methods require :func:`install`.
+    """
+
+    ordering: LongestFirstOrder | None = None
+    progress: _progress.ProgressStream | None = None
+
+    def __init__(
+        self,
+        targets: list | None = None,
+        tasker: typing.Any = None,  # noqa: ANN401
+        order: collections.abc.Callable[[list], list] | None = None,
+        trace: typing.Any = None,  # noqa: ANN401
+    ) -> None:
+        if self.ordering is not None:
+            if order is not None:
+                self.ordering.order = order
+            order = self.ordering
+        targets = targets if targets is not None else []
+        if self.progress is not None:
+            tasker = _progress.progress_task(tasker or SCons.Taskmaster.OutOfDateTask, self.progress)
+            self.progress.write("build_start", tasks=_progress._task_count(targets))
+        super().__init__(targets, tasker, order, trace)
+
+
+def install() -> None:
+    """Replace the SCons Taskmaster class with :class:`OrderedTaskmaster` for the whole SCons process."""
+    SCons.Taskmaster.Taskmaster = OrderedTaskmaster
+
+
+def _check_installed(method: str) -> None:
+    """Raise an exception if the SCons Taskmaster class is not :class:`OrderedTaskmaster`.
+
+    :param method: Name of the method requiring the ordered Taskmaster
+
+    :raises RuntimeError: If :func:`install` was not called
+    """
+    if SCons.Taskmaster.Taskmaster is not OrderedTaskmaster:
+        raise RuntimeError(f"'{method}' requires 'waves.scons_extensions.ordered_taskmaster()' to be called first")
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,165 @@
+"""Internal API module implementing the live build progress event stream for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import datetime
+import json
+import os
+import pathlib
+import socket
+import threading
+import time
+import typing
+
+import SCons.Node.FS
+
+from waves import _accounting
+
+_exclude_from_namespace = set(globals().keys())
+
+_socket_prefix = "unix:"
+
+
+class ProgressStream:
+    """Thread safe JSON lines build progress event stream shared by all SCons worker threads.
+
+    Events are appended to a file or sent to a listening local (Unix domain) stream socket. Socket streams are
+    specified with a ``unix:`` prefix, e.g. ``unix:/tmp/waves_progress.sock``. If no process listens on the socket,
+    events are dropped without failing the build.
+
+    Every event is tagged with a ``build`` identifier unique to the SCons process, the ``event`` name, and the event
+    ``time`` in seconds since the epoch.
+
+    :param stream: JSON lines file path or ``unix:`` prefixed socket path
+    """
+
+    def __init__(self, stream: str | pathlib.Path) -> None:
+        self.stream = str(stream)
+        self.build = f"{datetime.datetime.now().astimezone().isoformat(timespec='seconds')}-{os.getpid()}"
+        self._lock = threading.Lock()
+        self._socket: socket.socket | None = None
+
+    def write(self, event: str, **fields: typing.Any) -> None:  # noqa: ANN401
+        """Write one progress event.
+
+        :param event: Event name
+        :param fields: Event fields
+        """
+        line = f"{json.dumps({'build': self.build, 'event': event, 'time': time.time(), **fields})}\n"
+        with self._lock:
+            if self.stream.startswith(_socket_prefix):
+                self._send(line)
+            else:
+                path = pathlib.Path(self.stream)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open(mode="a") as stream:
+                    stream.write(line)
+
+    def _send(self, line: str) -> None:
+        """Send an event line to the socket, connecting on first use and dropping events without a listener.
+
+        :param line: Event line
+        """
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._socket.connect(self.stream.removeprefix(_socket_prefix))
+            self._socket.sendall(line.encode("utf-8"))
+        except OSError:
+            if self._socket is not None:
+                self._socket.close()
+            self._socket = None
+
+    def task_fields(self, targets: list) -> dict[str, typing.Any]:
+        """Return the task identifying event fields.
+
+        :param targets: Task target nodes
+
+        :returns: task ``targets``, ``builder``, and ``parameter_set`` fields
+        """
+        target_paths = [node.get_abspath() for node in targets]
+        return {
+            "targets": target_paths,
+            "builder": _accounting._builder_name(targets[0]) if targets else None,
+            "parameter_set": _accounting._parameter_set(target_paths),
+        }
+
+
+def _is_task(node: typing.Any) -> bool:  # noqa: ANN401
+    """Return True if a node is a file or not yet disambiguated file system entry target built by a builder.
+
+    Alias, value, and directory nodes are not reported as tasks.
+
+    :param node: SCons node
+
+    :returns: True if the node is a built file
+    """
+    return isinstance(node, SCons.Node.FS.Base) and not isinstance(node, SCons.Node.FS.Dir) and node.has_builder()
+
+
+def _task_count(nodes: list) -> int:
+    """Return the number of tasks building a list of nodes and their dependencies.
+
+    Dependencies are not scanned, so tasks only found by scanners are not counted.
+
+    :param nodes: SCons nodes
+
+    :returns: number of builder executors
+    """
+    executors = set()
+    visited = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        if _is_task(node):
+            executors.add(node.get_executor())
+        stack.extend(child for child in node.children(scan=0) if child not in visited)
+    return len(executors)
+
+
+def progress_task(tasker: type, stream: ProgressStream) -> type:
+    """Return a subclass of an SCons Taskmaster task class writing task progress events.
+
+    Tasks write a ``start`` event before execution, and a ``finish`` event with the task ``wall_time`` or a ``failure``
+    event with the task ``wall_time`` and error ``message`` after execution. Up-to-date tasks write an ``up_to_date``
+    event. Source files, aliases, values, and directories write no events.
+
+    :param tasker: SCons Taskmaster task class
+    :param stream: Progress event stream
+
+    :returns: progress task class
+    """
+
+    class ProgressTask(tasker):  # type: ignore[valid-type,misc]
+        def make_ready(self) -> None:
+            super().make_ready()
+            if not self.out_of_date and self.targets and _is_task(self.targets[0]):
+                stream.write("up_to_date", **stream.task_fields(self.targets))
+
+        def execute(self) -> None:
+            if not self.targets or not _is_task(self.targets[0]):
+                super().execute()
+                return
+            fields = stream.task_fields(self.targets)
+            stream.write("start", **fields)
+            start = time.monotonic()
+            try:
+                super().execute()
+            except Exception as err:
+                message = getattr(err, "errstr", None) or str(err)
+                stream.write("failure", wall_time=time.monotonic() - start, message=message, **fields)
+                raise
+            stream.write("finish", wall_time=time.monotonic() - start, **fields)
+
+    ProgressTask.__name__ = f"Progress{tasker.__name__}"
+    return ProgressTask
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
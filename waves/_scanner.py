@@ -0,0 +1,190 @@
+"""Internal API module implementing the persistent dependency scanner cache and file readers for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import atexit
+import codecs
+import json
+import pathlib
+import tempfile
+import threading
+
+import SCons.Util
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+
+class ScanCache:
+    """Persistent cache of dependency scanner results keyed by scanner and file key.
+
+    The file key from :func:`_file_key` is the absolute path, size, and modification time of the file. Files with an
+    unchanged file key reuse the cached dependencies without reading the file. When the cache
+    file is written, the entries used by the current build and the most recent older entries are kept, at most
+    ``max_entries`` entries per scanner.
+
+    :param cache_file: JSON cache file. If None, scanner results are cached for the current process only.
+    :param max_entries: Maximum number of cached files per scanner
+    """
+
+    def __init__(
+        self,
+        cache_file: str | pathlib.Path | None = None,
+        max_entries: int = _settings._scanner_cache_max_entries,
+    ) -> None:
+        self.cache_file = pathlib.Path(cache_file) if cache_file is not None else None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._modified = False
+        self._cache: dict[str, dict[str, list[str]]] = {}
+        self._used: dict[str, dict[str, list[str]]] = {}
+        if self.cache_file is not None:
+            try:
+                cache = json.loads(self.cache_file.read_text())
+            except (OSError, ValueError):
+                cache = {}
+            if isinstance(cache, dict):
+                self._cache = cache
+
+    def get(self, scanner: str, key: str) -> list[str] | None:
+        """Return the cached dependencies of a file.
+
+        :param scanner: Scanner key, e.g. the regular expression pattern and flags
+        :param key: File key
+
+        :returns: cached dependencies. None if the file was not scanned with the same file key.
+        """
+        with self._lock:
+            includes = self._cache.get(scanner, {}).get(key)
+            if includes is not None:
+                self._used.setdefault(scanner, {})[key] = includes
+            return includes
+
+    def set(self, scanner: str, key: str, includes: list[str]) -> None:
+        """Cache the dependencies of a file.
+
+        :param scanner: Scanner key, e.g. the regular expression pattern and flags
+        :param key: File key
+        :param includes: Dependencies found by the scanner
+        """
+        with self._lock:
+            self._cache.setdefault(scanner, {})[key] = includes
+            self._used.setdefault(scanner, {})[key] = includes
+            self._modified = True
+
+    def save(self) -> None:
+        """Write the cache file if scanner results were added."""
+        with self._lock:
+            if self.cache_file is None or not self._modified:
+                return
+            cache = {}
+            for scanner, entries in self._cache.items():
+                used = self._used.get(scanner, {})
+                older = [(csig, includes) for csig, includes in entries.items() if csig not in used]
+                room = max(self.max_entries - len(used), 0)
+                kept = dict(older[max(len(older) - room, 0) :] if room else [])
+                kept.update(list(used.items())[-self.max_entries :])
+                cache[scanner] = kept
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.cache_file.parent, prefix=f".{self.cache_file.name}.", delete=False
+            ) as temporary_file:
+                temporary = pathlib.Path(temporary_file.name)
+                temporary_file.write(json.dumps(cache))
+            temporary.replace(self.cache_file)
+            self._modified = False
+
+
+def _abaqus_keyword_text(path: str | pathlib.Path, block_size: int = _settings._scanner_block_size) -> str:
+    """Return the keyword lines of an Abaqus input file without reading the data lines into memory.
+
+    The file is read in blocks of ``block_size`` bytes. Keyword lines start with ``*``. Keyword lines ending with a
+    comma continue on the next line, which is returned with the keyword line. Data lines are skipped without splitting
+    them into lines, so the memory use does not depend on the file size. UTF-16 and UTF-32 encoded files are read
+    entirely.
+
+    :param path: Abaqus input file
+    :param block_size: Read block size in bytes
+
+    :returns: keyword lines and their continuation lines separated by newlines, decoded as SCons decodes file contents
+    """
+    records = []
+    lines: list[bytes] = []
+    current = b""
+    in_record = False
+    at_line_start = True
+    with pathlib.Path(path).open("rb") as file:
+        block = file.read(block_size)
+        if block.startswith(codecs.BOM_UTF8):
+            block = block[len(codecs.BOM_UTF8) :]
+        elif block.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_BE)):
+            return SCons.Util.to_Text(block + file.read())
+        while block:
+            position = 0
+            while position < len(block):
+                if in_record:
+                    newline = block.find(b"\n", position)
+                    if newline == -1:
+                        current += block[position:]
+                        break
+                    lines.append(current + block[position:newline])
+                    current = b""
+                    position = newline + 1
+                    at_line_start = True
+                    if not lines[-1].rstrip().endswith(b","):
+                        records.append(b"\n".join(lines))
+                        lines = []
+                        in_record = False
+                elif at_line_start and block[position : position + 1] == b"*":
+                    in_record = True
+                else:
+                    keyword = block.find(b"\n*", position)
+                    if keyword == -1:
+                        at_line_start = block.endswith(b"\n")
+                        break
+                    position = keyword + 1
+                    at_line_start = True
+            block = file.read(block_size)
+    if in_record:
+        records.append(b"\n".join([*lines, current]))
+    return SCons.Util.to_Text(b"\n".join(records))
+
+
+def _file_key(path: str | pathlib.Path) -> str:
+    """Return the scanner cache key of a file without reading the file.
+
+    :param path: Absolute file path
+
+    :returns: file key from the file size, modification time, and path
+    """
+    stat = pathlib.Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{path}"
+
+
+_shared_caches: dict[str, ScanCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def _shared_cache(cache_file: str) -> ScanCache:
+    """Return the scanner cache of a cache file shared by all scanners of the build.
+
+    The cache file is written at the end of the build.
+
+    :param cache_file: Absolute JSON cache file path
+
+    :returns: scanner cache
+    """
+    with _shared_caches_lock:
+        if cache_file not in _shared_caches:
+            cache = ScanCache(cache_file)
+            _shared_caches[cache_file] = cache
+            atexit.register(cache.save)
+        return _shared_caches[cache_file]
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
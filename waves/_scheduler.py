@@ -0,0 +1,810 @@
+"""Internal API module implementing resource aware local task admission and task timeouts for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections.abc
+import contextlib
+import math
+import os
+import pathlib
+import re
+import shlex
+import sys
+import tempfile
+import threading
+import time
+import typing
+
+import SCons.Action
+import SCons.Errors
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+_amount_suffixes = {"K": 1.0 / 1024.0, "M": 1.0, "G": 1024.0, "T": 1024.0 * 1024.0}
+_amount_regex = re.compile(r"^\s*(?P<number>[0-9]*\.?[0-9]+)\s*(?P<suffix>[KMGT]?)B?\s*$", re.IGNORECASE)
+
+#: ``sbatch --wait`` commands. Killing the waiting ``sbatch`` process does not stop the SLURM job.
+_sbatch_wait_regex = re.compile(
+    r"(?<![\w./-])(?:[\w./-]*/)?sbatch(?:[^\S\n]+(?!--wrap\b)\S+)*?[^\S\n]+--wait(?![\w=-])"
+)
+
+_timeout_script = """import os, pathlib, signal, subprocess, sys
+timeout, grace = float(sys.argv[2]), float(sys.argv[3])
+process = subprocess.Popen(sys.argv[4:], start_new_session=True)
+try:
+    status = process.wait(timeout=timeout)
+    sys.exit(status if status >= 0 else 128 - status)
+except subprocess.TimeoutExpired:
+    pathlib.Path(sys.argv[1]).touch()
+    for sig, wait in ((signal.SIGTERM, grace), (getattr(signal, "SIGKILL", signal.SIGTERM), None)):
+        try:
+            os.killpg(process.pid, sig) if hasattr(os, "killpg") else process.kill()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=wait)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+    print(f"WAVES timeout: killed process group {process.pid} after {timeout:g} seconds", file=sys.stderr)
+    sys.exit(124)
+"""
+
+
+def _parse_amount(value: str | float | None) -> float:
+    """Return the numeric amount of a resource specification.
+
+    Amounts may use the sbatch ``--mem`` style ``K``, ``M``, ``G``, and ``T`` suffixes, which are returned in
+    megabytes. Amounts without a suffix are returned unchanged.
+
+    :param value: Resource amount, e.g. ``4``, ``2.5``, or ``16G``. None or an empty string is zero.
+
+    :returns: resource amount
+
+    :raises RuntimeError: If the resource amount is malformed or negative
+    """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        if value < 0:
+            raise RuntimeError(f"Resource amount '{value}' must be non-negative")
+        return float(value)
+    if not value.strip():
+        return 0.0
+    match = _amount_regex.match(value)
+    if match is None:
+        raise RuntimeError(f"Malformed resource amount '{value}'")
+    number = float(match.group("number"))
+    suffix = match.group("suffix").upper()
+    return number * _amount_suffixes[suffix] if suffix else number
+
+
+def _abaqus_tokens(cpus: str | float | None) -> int:
+    """Return the Abaqus analysis licence tokens required by a job.
+
+    Uses the Abaqus token formula ``floor(5 * cpus ** 0.422)``.
+
+    :param cpus: Number of job CPUs. None or an empty string is one CPU.
+
+    :returns: licence tokens
+
+    :raises RuntimeError: If the number of CPUs is malformed or negative
+    """
+    cpus = max(_parse_amount(cpus), 1.0)
+    return int(5.0 * cpus**0.422)
+
+
+def _abaqus_task_tokens(target: list, source: list, env: typing.Any) -> int:  # noqa: ANN401
+    """Return the Abaqus analysis licence tokens required by a task's ``cpus`` construction variable.
+
+    :param target: Task target nodes
+    :param source: Task source nodes
+    :param env: Task construction environment
+
+    :returns: licence tokens
+    """
+    return _abaqus_tokens(env.subst("${cpus}", target=target, source=source))
+
+
+def _system_memory() -> float | None:
+    """Return the physical memory of the local system in megabytes.
+
+    :returns: physical memory. None if the system does not report the physical memory.
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024.0 / 1024.0
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _read_tail(path: pathlib.Path, tail_bytes: int) -> str:
+    """Return the end of a text file without reading the rest of the file.
+
+    :param path: File path
+    :param tail_bytes: Maximum number of bytes read from the end of the file
+
+    :returns: tail text
+    """
+    with path.open("rb") as file:
+        file.seek(max(path.stat().st_size - tail_bytes, 0))
+        return file.read().decode("utf-8", errors="replace")
+
+
+def _parse_cpu_list(value: str) -> list[int]:
+    """Return the CPU IDs of a Linux CPU list, e.g. ``0-3,8``.
+
+    :param value: CPU list
+
+    :returns: sorted CPU IDs
+
+    :raises RuntimeError: If the CPU list is malformed
+    """
+    cores: set[int] = set()
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        first, _separator, last = item.partition("-")
+        try:
+            cores.update(range(int(first), int(last or first) + 1))
+        except ValueError as err:
+            raise RuntimeError(f"Malformed CPU list '{value}'") from err
+    return sorted(cores)
+
+
+def _format_cpu_list(cores: collections.abc.Iterable[int]) -> str:
+    """Return the compact Linux CPU list of CPU IDs, e.g. ``0-3,8``.
+
+    :param cores: CPU IDs
+
+    :returns: CPU list
+    """
+    ranges: list[list[int]] = []
+    for core in sorted(set(cores)):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def _numa_nodes(root: pathlib.Path = pathlib.Path("/sys/devices/system/node")) -> list[list[int]]:
+    """Return the CPU IDs of each NUMA node of the local system.
+
+    :param root: Linux NUMA node sysfs directory
+
+    :returns: CPU IDs per NUMA node. Empty if the system does not report NUMA nodes.
+    """
+    nodes = []
+    for cpulist in sorted(root.glob("node[0-9]*/cpulist"), key=lambda path: int(path.parent.name[4:])):
+        with contextlib.suppress(OSError, RuntimeError):
+            nodes.append(_parse_cpu_list(cpulist.read_text()))
+    return [node for node in nodes if node]
+
+
+def _select_cores(free: collections.abc.Iterable[int], count: int, numa_nodes: list[list[int]]) -> list[int]:
+    """Return a set of free CPU IDs, preferring CPUs on a single NUMA node.
+
+    The NUMA node with the fewest free CPUs that still fits the request is chosen to limit fragmentation. Requests
+    which do not fit on any single NUMA node span the NUMA nodes with the most free CPUs.
+
+    :param free: Free CPU IDs
+    :param count: Number of requested CPUs
+    :param numa_nodes: CPU IDs per NUMA node. CPUs without a NUMA node are treated as one additional NUMA node.
+
+    :returns: sorted selected CPU IDs
+    """
+    free = set(free)
+    unassigned = free.difference(*numa_nodes)
+    nodes = [[core for core in node if core in free] for node in [*numa_nodes, sorted(unassigned)]]
+    fitting = [node for node in nodes if len(node) >= count]
+    if fitting:
+        return min(fitting, key=len)[:count]
+    selected: list[int] = []
+    for node in sorted(nodes, key=len, reverse=True):
+        selected.extend(node[: count - len(selected)])
+    return sorted(selected)
+
+
+class ResourcePool:
+    """Thread safe pool of local resources shared by all SCons worker threads.
+
+    Requests are admitted first-come, first-served per resource: a request is admitted when every requested amount fits
+    in the free amount less the amounts of all earlier waiting requests. Earlier waiting requests therefore reserve
+    their resources against later, smaller requests, while later requests for uncontested resources are not blocked.
+    Resources without a capacity are not limited.
+
+    When constructed with CPU IDs, each admitted task is also assigned a disjoint set of CPU IDs with the requested
+    number of CPUs, preferring CPUs on a single NUMA node. CPU requests are rounded up to whole CPUs.
+
+    :param capacity: Resource name to total amount mapping, e.g. ``{"cpus": 32, "memory": "128G"}``
+    :param cores: CPU IDs assigned to admitted tasks. If provided, the ``cpus`` capacity is the number of CPU IDs.
+    :param numa_nodes: CPU IDs per NUMA node
+    :param affinity: Affinity command template with a ``{cores}`` CPU list field, e.g.
+        ``taskset --cpu-list {cores}``. Used to pin the commands of tasks with assigned CPUs.
+    """
+
+    def __init__(
+        self,
+        capacity: dict[str, str | float],
+        cores: collections.abc.Iterable[int] | None = None,
+        numa_nodes: list[list[int]] | None = None,
+        affinity: str | None = None,
+    ) -> None:
+        self.capacity = {name: _parse_amount(amount) for name, amount in capacity.items()}
+        self.cores = sorted(set(cores)) if cores is not None else None
+        if self.cores is not None:
+            self.capacity["cpus"] = float(len(self.cores))
+        self.numa_nodes = numa_nodes if numa_nodes is not None else []
+        self.affinity = affinity
+        self._used: collections.Counter = collections.Counter()
+        self._assigned: set[int] = set()
+        self._waiting: list[dict[str, float]] = []
+        self._condition = threading.Condition()
+
+    def _limited(self, request: collections.abc.Mapping[str, str | float]) -> dict[str, float]:
+        """Return the parsed amounts of the limited resources of a request.
+
+        :param request: Resource name to requested amount mapping
+
+        :returns: Resource name to non-zero requested amount mapping for resources with a capacity
+
+        :raises RuntimeError: If a request exceeds the resource capacity
+        """
+        limited = {}
+        for name, amount in request.items():
+            if name not in self.capacity:
+                continue
+            value = _parse_amount(amount)
+            if name == "cpus" and self.cores is not None:
+                value = float(math.ceil(value))
+            if value > self.capacity[name]:
+                capacity = self.capacity[name]
+                raise RuntimeError(f"Task requests {value:g} '{name}', which exceeds the capacity {capacity:g}")
+            if value > 0.0:
+                limited[name] = value
+        return limited
+
+    def _fits(self, request: dict[str, float], reserved: collections.Counter) -> bool:
+        """Return True if the request fits in the free resources less the reserved resources.
+
+        :param request: Resource name to requested amount mapping
+        :param reserved: Resource name to amount reserved by earlier waiting requests
+
+        :returns: True if the request can be admitted
+        """
+        return all(
+            self._used[name] + reserved[name] + amount <= self.capacity[name] for name, amount in request.items()
+        )
+
+    @contextlib.contextmanager
+    def acquire(
+        self, request: collections.abc.Mapping[str, str | float]
+    ) -> collections.abc.Generator[list[int], None, None]:
+        """Block until the requested resources are free and hold them for the duration of the context.
+
+        :param request: Resource name to requested amount mapping
+
+        :returns: CPU IDs assigned for the duration of the context. Empty if the pool does not assign CPU IDs.
+
+        :raises RuntimeError: If a request exceeds the resource capacity
+        """
+        limited = self._limited(request)
+        with self._condition:
+            self._waiting.append(limited)
+            try:
+                while True:
+                    # Equal requests are distinct waiting entries, so search by identity
+                    position = next(index for index, waiting in enumerate(self._waiting) if waiting is limited)
+                    reserved: collections.Counter = collections.Counter()
+                    for waiting in self._waiting[:position]:
+                        reserved.update(waiting)
+                    if self._fits(limited, reserved):
+                        break
+                    self._condition.wait()
+            finally:
+                position = next(index for index, waiting in enumerate(self._waiting) if waiting is limited)
+                del self._waiting[position]
+            self._used.update(limited)
+            cores = []
+            if self.cores is not None and limited.get("cpus"):
+                free = [core for core in self.cores if core not in self._assigned]
+                cores = _select_cores(free, int(limited["cpus"]), self.numa_nodes)
+                self._assigned.update(cores)
+            # Later waiting requests may have been blocked only by this request's reservation
+            self._condition.notify_all()
+        try:
+            yield cores
+        finally:
+            with self._condition:
+                self._used.subtract(limited)
+                self._assigned.difference_update(cores)
+                self._condition.notify_all()
+
+
+class AffinitySpawn:
+    """SCons ``SPAWN`` wrapper running commands with an affinity command prefix.
+
+    The SCons escaped command is run in a shell started by the affinity command, such that compound commands, e.g.
+    ``cd directory && solver``, and their child processes inherit the CPU affinity.
+
+    :param spawn: Wrapped SCons ``SPAWN`` function
+    :param prefix: Affinity command, e.g. ``taskset --cpu-list 0-3``
+    """
+
+    def __init__(self, spawn: collections.abc.Callable, prefix: str) -> None:
+        self.spawn = spawn
+        self.prefix = prefix
+
+    def __call__(
+        self,
+        sh: str,
+        escape: collections.abc.Callable,
+        cmd: str,  # noqa: ARG002
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Run the command with the affinity command prefix.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        arguments = [*shlex.split(self.prefix), sh, "-c", shlex.quote(" ".join(args))]
+        return self.spawn(sh, escape, arguments[0], arguments, env)
+
+
+class TimeoutSpawn:
+    """SCons ``SPAWN`` wrapper killing commands which run longer than a wall clock timeout.
+
+    Commands are run by a Python script which starts the command shell in a new session, such that the shell and all
+    of its child processes, e.g. solver or MPI processes, belong to one process group. When the timeout expires, the
+    process group is sent ``SIGTERM``, then ``SIGKILL`` if it is still running after the grace period. Timed out
+    commands exit with code 124. :class:`TimeoutAction` applies this wrapper to the innermost ``SPAWN`` function, see
+    :class:`TaskSpawn`.
+
+    :param spawn: Wrapped SCons ``SPAWN`` function
+    :param timeout: Wall clock timeout in seconds
+    :param grace: Seconds to wait between ``SIGTERM`` and ``SIGKILL``
+    :param expired: List to which the timeout is appended for each timed out command
+    """
+
+    def __init__(self, spawn: collections.abc.Callable, timeout: float, grace: float, expired: list[float]) -> None:
+        self.spawn = spawn
+        self.timeout = timeout
+        self.grace = grace
+        self.expired = expired
+
+    def __call__(
+        self,
+        sh: str,
+        escape: collections.abc.Callable,
+        cmd: str,  # noqa: ARG002
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Run the command with the timeout.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            expired_file = pathlib.Path(temporary_directory) / "expired"
+            arguments = [
+                shlex.quote(sys.executable),
+                "-c",
+                shlex.quote(_timeout_script),
+                shlex.quote(str(expired_file)),
+                f"{self.timeout:g}",
+                f"{self.grace:g}",
+                sh,
+                "-c",
+                shlex.quote(" ".join(args)),
+            ]
+            exit_code = self.spawn(sh, escape, arguments[0], arguments, env)
+            if expired_file.exists():
+                self.expired.append(self.timeout)
+        return exit_code
+
+
+#: ``SPAWN`` wrapper factories of the task running in each SCons worker thread, applied by :class:`TaskSpawn`
+_task_spawn_factories = threading.local()
+_task_spawn_lock = threading.Lock()
+
+
+class TaskSpawn:
+    """SCons ``SPAWN`` wrapper applying the ``SPAWN`` wrapper factories of the task running in the calling thread.
+
+    The task wrapper factories are added by :func:`_task_spawn`. The ``TaskSpawn`` is the innermost wrapper of the
+    ``SPAWN`` wrapper chain, so the wrappers matching task commands, e.g. :class:`waves._slurm.SbatchPollSpawn`,
+    :class:`waves._slurm.ReconcileSpawn`, and :class:`waves._ssh.SSHMultiplexSpawn`, receive the unmodified task
+    commands. Commands run by these wrappers without calling the wrapped ``SPAWN`` function are not modified. Without
+    task wrapper factories, commands are passed through to the wrapped ``SPAWN`` function.
+
+    :param spawn: Wrapped SCons ``SPAWN`` function
+    """
+
+    def __init__(self, spawn: collections.abc.Callable) -> None:
+        self.spawn = spawn
+
+    def __call__(
+        self,
+        sh: str,
+        escape: collections.abc.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Run the command with the task ``SPAWN`` wrappers of the calling thread.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        spawn = self.spawn
+        for factory in getattr(_task_spawn_factories, "factories", ()):
+            spawn = factory(spawn)
+        return spawn(sh, escape, cmd, args, env)
+
+
+@contextlib.contextmanager
+def _task_spawn(
+    env: typing.Any,  # noqa: ANN401
+    factory: collections.abc.Callable[[collections.abc.Callable], collections.abc.Callable],
+) -> collections.abc.Generator[typing.Any, None, None]:
+    """Wrap the innermost ``SPAWN`` function for the commands of the task running in the calling thread.
+
+    A :class:`TaskSpawn` is inserted below the innermost ``SPAWN`` wrapper with a ``spawn`` attribute, once per
+    ``SPAWN`` wrapper chain. Nested calls wrap the ``SPAWN`` wrappers of the enclosing calls.
+
+    :param env: Task construction environment
+    :param factory: Callable returning the wrapper ``SPAWN`` function of the wrapped ``SPAWN`` function
+
+    :returns: task construction environment to run the task actions with
+    """
+    spawn = env["SPAWN"]
+    if not hasattr(spawn, "spawn"):
+        env = env.Override({"SPAWN": TaskSpawn(spawn)})
+    else:
+        with _task_spawn_lock:
+            layer = spawn
+            while not isinstance(layer, TaskSpawn) and hasattr(layer.spawn, "spawn"):
+                layer = layer.spawn
+            if not isinstance(layer, TaskSpawn):
+                layer.spawn = TaskSpawn(layer.spawn)
+    factories = getattr(_task_spawn_factories, "factories", ())
+    _task_spawn_factories.factories = (*factories, factory)
+    try:
+        yield env
+    finally:
+        _task_spawn_factories.factories = factories
+
+
+class WrapperAction(SCons.Action.ActionBase):
+    """SCons action wrapper base class delegating the action strings and build signature to the wrapped action.
+
+    Derived classes override ``__call__`` to modify the wrapped action execution. The wrapped action's command strings,
+    build signature, and implicit dependencies are unchanged, so wrapping or unwrapping an action does not rebuild
+    targets.
+
+    :param action: Wrapped SCons action
+    """
+
+    def __init__(self, action: SCons.Action.ActionBase) -> None:
+        self.action = action
+        self.varlist = ()
+        self.targets = "$TARGETS"
+
+    def __str__(self) -> str:
+        """Return the wrapped action string."""
+        return str(self.action)
+
+    def __call__(self, *args, **kwargs) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action."""
+        return self.action(*args, **kwargs)
+
+    def genstring(self, *args, **kwargs) -> str:
+        """Return the wrapped action string."""
+        return self.action.genstring(*args, **kwargs)
+
+    def get_presig(self, *args, **kwargs) -> bytes:
+        """Return the wrapped action signature contents."""
+        return self.action.get_presig(*args, **kwargs)
+
+    def get_contents(self, *args, **kwargs) -> bytes:
+        """Return the wrapped action contents, including the variable list contents."""
+        return self.action.get_contents(*args, **kwargs)
+
+    def get_implicit_deps(self, *args, **kwargs) -> list:
+        """Return the wrapped action implicit dependencies."""
+        return self.action.get_implicit_deps(*args, **kwargs)
+
+    def get_varlist(self, *args, **kwargs) -> tuple:
+        """Return the wrapped action variable list."""
+        return self.action.get_varlist(*args, **kwargs)
+
+    def get_targets(self, *args, **kwargs) -> list:
+        """Return the wrapped action targets."""
+        return self.action.get_targets(*args, **kwargs)
+
+    def presub_lines(self, *args, **kwargs) -> list[str]:
+        """Return the wrapped action pre-substitution lines."""
+        return self.action.presub_lines(*args, **kwargs)
+
+
+class ResourceAction(WrapperAction):
+    """SCons action wrapper admitting the wrapped action only when the task's requested resources are free.
+
+    The requested amounts are substituted per task with the task construction environment, so tasks may declare their
+    needs with builder or task keyword arguments, e.g. ``cpus=16``. If the task construction environment has no resource
+    pool, the wrapped action runs immediately.
+
+    Tasks which fail may be retried with exponential backoff when the end of a retry file, e.g. the task STDOUT file,
+    matches the retry pattern. The requested resources are released while waiting to retry.
+
+    :param action: Wrapped SCons action
+    :param requests: Resource name to requested amount mapping, e.g. ``{"cpus": "${cpus}"}``. Amounts are
+        substitution strings or callables with the ``(target, source, env)`` signature of SCons function actions.
+        Empty substitutions request zero, except ``cpus`` which requests one CPU.
+    :param retries: Number of times to retry a failed task
+    :param backoff: Seconds to wait before the first retry. Doubled for each subsequent retry.
+    :param retry_pattern: Case insensitive regular expression identifying retryable failures. If None, failed tasks
+        are not retried.
+    :param retry_files: Substitution strings of the files searched for the retry pattern after a failure
+    """
+
+    def __init__(
+        self,
+        action: SCons.Action.ActionBase,
+        requests: dict[str, str | collections.abc.Callable],
+        retries: int = 0,
+        backoff: float = 30.0,
+        retry_pattern: str | None = None,
+        retry_files: collections.abc.Iterable[str] = ("${TARGETS[-1].abspath}",),
+    ) -> None:
+        super().__init__(action)
+        self.requests = requests
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_pattern = re.compile(retry_pattern, re.IGNORECASE) if retry_pattern is not None else None
+        self.retry_files = list(retry_files)
+
+    def __call__(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action after acquiring the requested resources from the construction environment pool.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: wrapped action exit status of the final attempt
+        """
+        pool = env.get(_settings._resource_pool_variable)
+        # SCons executors pass empty node lists to their actions. Substitute with the executor nodes.
+        executor = kwargs.get("executor")
+        if executor:
+            task_target, task_source = executor.get_all_targets(), executor.get_all_sources()
+        else:
+            task_target, task_source = target, source
+        attempt = 0
+        while True:
+            request = self.request(task_target, task_source, env)
+            admission = pool.acquire(request) if pool is not None else contextlib.nullcontext()
+            with admission as cores:
+                nodes = (task_target, task_source)
+                status = self._execute(target, source, env, pool, cores, nodes, *args, **kwargs)
+            if not status or attempt >= self.retries or not self.retryable(task_target, task_source, env):
+                return status
+            delay = self.backoff * 2**attempt
+            attempt += 1
+            targets = " ".join(str(node) for node in task_target)
+            print(
+                f"Retrying '{targets}' in {delay:g} seconds (attempt {attempt} of {self.retries})",
+                file=sys.stderr,
+            )
+            time.sleep(delay)
+
+    def _execute(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        pool: ResourcePool | None,
+        cores: list[int] | None,
+        nodes: tuple[list, list],
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action pinned to the assigned CPU IDs, if any.
+
+        The affinity command prefixes the commands of the innermost construction environment ``SPAWN`` function, so
+        ``SPAWN`` wrappers, e.g. SSH connection multiplexing, see the original commands. The affinity command is
+        appended to the task STDOUT file, if the last task target is a STDOUT file.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param pool: Construction environment resource pool
+        :param cores: CPU IDs assigned to the task
+        :param nodes: Task target and source nodes used for substitution
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: wrapped action exit status
+        """
+        if pool is None or not cores or pool.affinity is None:
+            return self.action(target, source, env, *args, **kwargs)
+        prefix = pool.affinity.format(cores=_format_cpu_list(cores))
+        with _task_spawn(env, lambda spawn: AffinitySpawn(spawn, prefix)) as pinned:
+            status = self.action(target, source, pinned, *args, **kwargs)
+        stdout = pathlib.Path(str(nodes[0][-1])) if nodes[0] else None
+        if stdout is not None and stdout.suffix == _settings._stdout_extension and stdout.is_file():
+            with stdout.open("a") as stdout_file:
+                stdout_file.write(f"\nWAVES CPU affinity: {prefix}\n")
+        return status
+
+    def request(self, target: list, source: list, env: typing.Any) -> dict[str, str | float]:  # noqa: ANN401
+        """Return the requested resource amounts substituted for a task.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+
+        :returns: Resource name to requested amount mapping
+        """
+        request = {
+            name: amount(target, source, env) if callable(amount) else env.subst(amount, target=target, source=source)
+            for name, amount in self.requests.items()
+        }
+        if not str(request.get("cpus", "")).strip():
+            request["cpus"] = "1"
+        return request
+
+    def retryable(self, target: list, source: list, env: typing.Any) -> bool:  # noqa: ANN401
+        """Return True if the end of a retry file of a failed task matches the retry pattern.
+
+        Only the last ``waves._settings._retry_tail_bytes`` of each retry file are searched, such that large task
+        output files are not read into memory.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+
+        :returns: True if the task should be retried
+        """
+        if self.retry_pattern is None:
+            return False
+        for retry_file in self.retry_files:
+            path = pathlib.Path(env.subst(retry_file, target=target, source=source))
+            if path.is_file() and self.retry_pattern.search(_read_tail(path, _settings._retry_tail_bytes)):
+                return True
+        return False
+
+
+class TimeoutAction(WrapperAction):
+    """SCons action wrapper failing tasks which run longer than the task's wall clock timeout.
+
+    The timeout is substituted per task with the task construction environment, so tasks may override the builder
+    timeout with a task keyword argument, e.g. ``timeout=3600``. An empty, zero, or negative timeout disables the
+    timeout. Timed out tasks return an SCons build error naming the timeout, and the timeout is appended to the task
+    STDOUT file, if the last task target is a STDOUT file.
+
+    The timeout wraps the innermost ``SPAWN`` function, see :class:`TaskSpawn`, so the ``SPAWN`` wrappers matching task
+    commands, e.g. SSH connection multiplexing and ``waves slurm_export`` reconciliation, are unchanged. Commands which
+    these wrappers run without the wrapped ``SPAWN`` function, e.g. polled and packed ``sbatch`` jobs and journal
+    sessions, run without the timeout. Tasks with ``sbatch --wait`` commands and a timeout raise an error, because
+    killing the waiting ``sbatch`` process does not stop the SLURM job. Use the sbatch ``--time`` option instead.
+
+    :param action: Wrapped SCons action
+    :param timeout: Timeout in seconds substitution string
+    :param grace: Seconds to wait between ``SIGTERM`` and ``SIGKILL``
+    """
+
+    def __init__(
+        self,
+        action: SCons.Action.ActionBase,
+        timeout: str = "${waves_timeout}",
+        grace: float = _settings._timeout_kill_grace,
+    ) -> None:
+        super().__init__(action)
+        self.timeout = timeout
+        self.grace = grace
+
+    def __call__(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action with the task timeout.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: wrapped action exit status or an SCons build error if the task timed out
+
+        :raises RuntimeError: If the task timeout is malformed or the task submits ``sbatch --wait`` jobs
+        """
+        # SCons executors pass empty node lists to their actions. Substitute with the executor nodes.
+        executor = kwargs.get("executor")
+        targets = executor.get_all_targets() if executor else target
+        sources = executor.get_all_sources() if executor else source
+        timeout = self.task_timeout(targets, sources, env)
+        if timeout <= 0.0:
+            return self.action(target, source, env, *args, **kwargs)
+        command = env.subst(self.action.genstring(targets, sources, env), target=targets, source=sources)
+        if _sbatch_wait_regex.search(command):
+            raise RuntimeError(
+                f"Timeout '{timeout:g}' can not stop the SLURM jobs of 'sbatch --wait' commands. "
+                "Use the sbatch '--time' option instead."
+            )
+
+        expired: list[float] = []
+        with _task_spawn(env, lambda spawn: TimeoutSpawn(spawn, timeout, self.grace, expired)) as limited:
+            status = self.action(target, source, limited, *args, **kwargs)
+        if not expired:
+            return status
+        message = f"Timed out after {timeout:g} seconds"
+        stdout = pathlib.Path(str(targets[-1])) if targets else None
+        if stdout is not None and stdout.suffix == _settings._stdout_extension and stdout.is_file():
+            with stdout.open("a") as stdout_file:
+                stdout_file.write(f"\nWAVES timeout: {message}\n")
+        exit_status = status.status if isinstance(status, SCons.Errors.BuildError) else int(status or 0)
+        return SCons.Errors.BuildError(
+            node=targets,
+            errstr=message,
+            status=exit_status,
+            exitstatus=exit_status,
+            action=self.action,
+        )
+
+    def task_timeout(self, target: list, source: list, env: typing.Any) -> float:  # noqa: ANN401
+        """Return the task timeout substituted for a task.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+
+        :returns: timeout in seconds. Zero if the task has no timeout.
+
+        :raises RuntimeError: If the task timeout is malformed
+        """
+        timeout = env.subst(self.timeout, target=target, source=source).strip()
+        try:
+            return float(timeout) if timeout else 0.0
+        except ValueError as err:
+            raise RuntimeError(f"Malformed task timeout '{timeout}'") from err
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
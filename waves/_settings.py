@@ -36,6 +36,23 @@ _stdout_extension = ".stdout"
 _cd_action_prefix = "cd ${TARGET.dir.abspath} &&"
 _redirect_action_suffix = "> ${TARGETS[-1].abspath} 2>&1"
 _redirect_environment_suffix = "> ${TARGETS[-2].abspath} 2>&1"
+_builder_factory_action = (
+    "${environment} ${action_prefix} ${program} ${program_required} ${program_options} "
+    "${subcommand} ${subcommand_required} ${subcommand_options} ${action_suffix}"
+)
+_matlab_environment_statement = (
+    "path(path, '${SOURCE.dir.abspath}'); "
+    "[fileList, productList] = matlab.codetools.requiredFilesAndProducts('${SOURCE.file}'); "
+    "disp(cell2table(fileList)); disp(struct2table(productList, 'AsArray', true));"
+)
+_matlab_script_statement = "path(path, '${SOURCE.dir.abspath}'); ${SOURCE.filebase}(${script_options})"
+_matlab_environment_action = (
+    f'${{action_prefix}} ${{program}} ${{matlab_options}} -batch "{_matlab_environment_statement} exit;" '
+    "${environment_suffix}"
+)
+_matlab_script_action = (
+    f'${{action_prefix}} ${{program}} ${{matlab_options}} -batch "{_matlab_script_statement}" ${{action_suffix}}'
+)
 
 # Parameter generators
 _template_delimiter = "@"
@@ -168,6 +185,40 @@ _visualize_default_font_size = 10
 _default_sconstruct = pathlib.Path("SConstruct")
 _default_node_color = "#5AC7CB"  # Light blue from Waves Logo
 _default_edge_color = "#B7DEBE"  # Light green from Waves Logo
+_default_critical_path_color = "#F28C28"
+
+# Critical path
+_critical_path_default_jobs = [1, 2, 4, 8, 16, 32]
+
+# SLURM export
+_slurm_export_record_variable = "WAVES_SLURM_EXPORT_RECORD"
+_slurm_export_manifest_variable = "WAVES_SLURM_EXPORT_MANIFEST"
+_slurm_export_default_manifest = pathlib.Path("slurm_export.json")
+_slurm_export_sbatch_options = "--kill-on-invalid-dep=yes"
+_resource_pool_variable = "WAVES_RESOURCE_POOL"
+_task_accounting_variable = "WAVES_TASK_ACCOUNTING"
+_task_accounting_default_log = pathlib.Path("waves_task_accounting.jsonl")
+_progress_default_stream = pathlib.Path("waves_progress.jsonl")
+_timeout_kill_grace = 10.0
+_retry_tail_bytes = 64 * 1024
+_python_worker_pool_variable = "WAVES_PYTHON_WORKER_POOL"
+_matlab_engine_pool_variable = "WAVES_MATLAB_ENGINE_POOL"
+_affinity_commands = {
+    "taskset": "taskset --cpu-list {cores}",
+    "numactl": "numactl --physcpubind={cores} --localalloc",
+}
+_abaqus_tokens_resource = "abaqus_tokens"
+_abaqus_licence_error_pattern = (  # Case insensitive
+    r"Failed to check ?out|Licensed number of users already reached|License server machine is down"
+    r"|Cannot connect to licen[cs]e server|(?:Not enough|Insufficient) (?:licen[cs]e )?tokens"
+    r"|FlexNet Licensing error"
+)
+_ssh_detached_state_prefix = ".waves_ssh_"
+_fingerprint_prefix = "sampled:"
+_fingerprint_default_cache = pathlib.Path(".waves_fingerprints.json")
+_cache_compressed_suffix = ".gz"
+_scanner_cache_max_entries = 10000
+_scanner_block_size = 1024 * 1024
 
 # Remove third-party packages from the project namespace
 del pathlib
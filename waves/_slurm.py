@@ -0,0 +1,1037 @@
+"""Internal API module implementing SLURM job submission and tracking for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import atexit
+import collections
+import hashlib
+import json
+import pathlib
+import shlex
+import subprocess
+import sys
+import threading
+import typing
+
+import SCons.Action
+import SCons.Node
+import SCons.Node.FS
+import SCons.Subst
+
+from waves import _scheduler
+
+_exclude_from_namespace = set(globals().keys())
+
+_array_script_name = "sbatch_array.sh"
+_array_status_extension = ".status"
+
+#: SLURM job states after which the job will not run again without resubmission
+_terminal_states = frozenset(
+    (
+        "BOOT_FAIL",
+        "CANCELLED",
+        "COMPLETED",
+        "DEADLINE",
+        "FAILED",
+        "NODE_FAIL",
+        "OUT_OF_MEMORY",
+        "PREEMPTED",
+        "REVOKED",
+        "TIMEOUT",
+    )
+)
+_unknown_state = "UNKNOWN"
+
+
+def _array_index_list(indices: typing.Iterable[int]) -> str:
+    """Return a compact sbatch ``--array`` index specification, e.g. ``0-3,7,9-10``.
+
+    :param indices: Array indices
+
+    :returns: sbatch array index specification
+    """
+    ranges: list[tuple[int, int]] = []
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def _task_hash(task: dict) -> str:
+    """Return a repeatable hash of the array task command, directory, targets, and source content signatures.
+
+    Used to recognize array index status files written for an out-of-date command or out-of-date source files.
+
+    :param task: Array task dictionary with ``command``, ``directory``, and ``targets`` keys and an optional
+        ``source_signatures`` key
+
+    :returns: md5 hash
+    """
+    contents = json.dumps(
+        [task["command"], task["directory"], task["targets"], task.get("source_signatures", [])],
+        sort_keys=True,
+    )
+    return hashlib.md5(contents.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _write_array_script(path: pathlib.Path, tasks: list[dict], status_directory: pathlib.Path) -> None:
+    """Write the sbatch array batch script mapping ``SLURM_ARRAY_TASK_ID`` to array task commands.
+
+    Each array index changes to the task directory, redirects the task command output to the task STDOUT file, and
+    writes the task exit code and task hash to the array index status file.
+
+    :param path: Batch script file
+    :param tasks: Array task dictionaries with ``index``, ``command``, ``directory``, and ``stdout`` keys
+    :param status_directory: Directory for the array index status files
+    """
+    lines = ["#!/bin/bash", 'case "${SLURM_ARRAY_TASK_ID}" in']
+    for task in tasks:
+        status_file = status_directory / f"{task['index']}{_array_status_extension}"
+        lines.extend(
+            [
+                f"  {task['index']})",
+                (
+                    f"    {{ cd {shlex.quote(task['directory'])} && {task['command']} ; }}"
+                    f" > {shlex.quote(task['stdout'])} 2>&1"
+                ),
+                "    status=$?",
+                f'    echo "${{status}} {_task_hash(task)}" > {shlex.quote(str(status_file))}',
+                '    exit "${status}"',
+                "    ;;",
+            ]
+        )
+    lines.extend(
+        [
+            "  *)",
+            '    echo "Unknown array index ${SLURM_ARRAY_TASK_ID}" >&2',
+            "    exit 1",
+            "    ;;",
+            "esac",
+            "",
+        ]
+    )
+    path.write_text("\n".join(lines))
+
+
+def _read_array_status(status_directory: pathlib.Path, task: dict) -> int | None:
+    """Return the array task exit code recorded by the most recent array index run.
+
+    :param status_directory: Directory for the array index status files
+    :param task: Array task dictionary
+
+    :returns: exit code. None if the status file is missing, malformed, or written for a different task hash.
+    """
+    status_file = status_directory / f"{task['index']}{_array_status_extension}"
+    try:
+        exit_code, task_hash = status_file.read_text().split()
+        if task_hash != _task_hash(task):
+            return None
+        return int(exit_code)
+    except (OSError, ValueError):
+        return None
+
+
+def _array_task_complete(status_directory: pathlib.Path, task: dict) -> bool:
+    """Return True if the array task succeeded and all task targets exist.
+
+    :param status_directory: Directory for the array index status files
+    :param task: Array task dictionary
+
+    :returns: completion state
+    """
+    return _read_array_status(status_directory, task) == 0 and all(
+        pathlib.Path(path).exists() for path in task["targets"]
+    )
+
+
+def submit_array(
+    tasks: list[dict],
+    status_directory: pathlib.Path,
+    program: str = "sbatch",
+    sbatch_options: str = "",
+    max_running: int | None = None,
+) -> dict:
+    """Submit the incomplete array tasks as a single ``sbatch --wait --array`` job and report per-index completion.
+
+    Array tasks with a successful status file written by the same task hash and existing targets are not resubmitted.
+    The task hash includes the task ``source_signatures``, so tasks with changed source files are resubmitted.
+
+    :param tasks: Array task dictionaries with ``index``, ``set_name``, ``command``, ``directory``, ``stdout``, and
+        ``targets`` keys and an optional ``source_signatures`` key
+    :param status_directory: Directory for the batch script, array index status files, and scheduler output
+    :param program: The sbatch command line executable absolute or relative path
+    :param sbatch_options: Optional sbatch options
+    :param max_running: Maximum number of simultaneously running array tasks. Defaults to the scheduler limit.
+
+    :returns: Array manifest with the sbatch ``command``, scheduler ``job_id``, scheduler ``output``, and ``tasks``
+        with a per-task ``status`` of ``complete``, ``failed``, or ``pending``.
+
+    :raises RuntimeError: If the sbatch command cannot be executed
+    """
+    status_directory.mkdir(parents=True, exist_ok=True)
+    pending = [task for task in tasks if not _array_task_complete(status_directory, task)]
+    manifest: dict[str, typing.Any] = {"command": None, "job_id": None, "output": ""}
+
+    if pending:
+        for task in pending:
+            (status_directory / f"{task['index']}{_array_status_extension}").unlink(missing_ok=True)
+            pathlib.Path(task["stdout"]).parent.mkdir(parents=True, exist_ok=True)
+        script = status_directory / _array_script_name
+        _write_array_script(script, pending, status_directory)
+        array = _array_index_list(task["index"] for task in pending)
+        if max_running is not None:
+            array = f"{array}%{max_running}"
+        command = [
+            *shlex.split(program),
+            "--wait",
+            "--parsable",
+            f"--array={array}",
+            f"--output={status_directory / '%a.slurm.out'}",
+            *shlex.split(sbatch_options),
+            str(script),
+        ]
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, check=False)
+        except OSError as err:
+            raise RuntimeError(f"Could not execute sbatch command '{shlex.join(command)}': {err}") from err
+        output = process.stdout + process.stderr
+        manifest.update({"command": shlex.join(command), "job_id": _parse_job_id(process.stdout), "output": output})
+
+    manifest["tasks"] = []
+    for task in tasks:
+        exit_code = _read_array_status(status_directory, task)
+        if _array_task_complete(status_directory, task):
+            status = "complete"
+        elif exit_code is None:
+            status = "pending"
+        else:
+            status = "failed"
+        manifest["tasks"].append({**task, "exit_code": exit_code, "status": status})
+    return manifest
+
+
+def _parse_job_id(output: str) -> str | None:
+    """Return the job ID from ``sbatch --parsable`` output, e.g. ``1234`` or ``1234;cluster``.
+
+    :param output: sbatch STDOUT
+
+    :returns: job ID. None if the output does not end with a job ID.
+    """
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if not lines:
+        return None
+    job_id = lines[-1].split(";")[0]
+    return job_id if job_id.isdigit() else None
+
+
+def _query_scheduler(command: list[str], job_ids: list[str], separator: str | None) -> dict[str, str] | None:
+    """Return the ``{job_id: state}`` dictionary reported by a batch scheduler query.
+
+    :param command: Scheduler query command without the job ID list
+    :param job_ids: Job IDs to query with a single scheduler call
+    :param separator: Job ID and state separator of the query output lines. None splits on whitespace.
+
+    :returns: job states. None if the query command failed.
+    """
+    try:
+        process = subprocess.run([*command, "-j", ",".join(job_ids)], capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    if process.returncode != 0:
+        return None
+    states = {}
+    for line in process.stdout.splitlines():
+        fields = line.strip().split(separator, 1)
+        if len(fields) == 2 and fields[1].strip():
+            states[fields[0].strip()] = fields[1].split()[0].rstrip("+")
+    return states
+
+
+def _sbatch_submit_arguments(
+    args: list[str],
+    program: str = "sbatch",
+    options: collections.abc.Sequence[str] = (),
+) -> list[str] | None:
+    """Return the command arguments with the sbatch ``--wait`` option replaced by ``--parsable`` and ``options``.
+
+    :param args: SCons escaped command arguments
+    :param program: The sbatch command line executable absolute or relative path
+    :param options: Additional sbatch options inserted after ``--parsable``
+
+    :returns: Modified command arguments. None if the command is not an ``sbatch --wait`` command.
+    """
+    program = pathlib.PurePath(program).name
+    for index, argument in enumerate(args):
+        if pathlib.PurePath(argument.strip("'\"")).name != program:
+            continue
+        for option_index in range(index + 1, len(args)):
+            if args[option_index] == "--wrap":
+                break
+            if args[option_index] == "--wait":
+                return [*args[:option_index], "--parsable", *options, *args[option_index + 1 :]]
+    return None
+
+
+class JobPoller:
+    """Track SLURM job completion for many waiting threads with a single polling thread.
+
+    Threads block on :meth:`JobPoller.wait` at no scheduler cost. One daemon thread queries the scheduler for all
+    watched jobs once per ``interval``: ``squeue`` for the jobs that are still queued or running and ``sacct`` for the
+    final state of the jobs that left the queue.
+
+    The poller also owns the submission state file, a JSON dictionary of ``{command hash: job ID}``, used to re-attach
+    to previously submitted jobs when a build is interrupted and restarted.
+
+    :param state_file: Submission state file. If None, job IDs are not recorded.
+    :param squeue_program: The squeue command line executable absolute or relative path
+    :param sacct_program: The sacct command line executable absolute or relative path
+    :param interval: Seconds between scheduler queries
+    :param missing_limit: Number of consecutive queries a job may be missing from both squeue and sacct before it is
+        reported with the ``UNKNOWN`` state
+    """
+
+    def __init__(
+        self,
+        state_file: str | pathlib.Path | None = None,
+        squeue_program: str = "squeue",
+        sacct_program: str = "sacct",
+        interval: float = 30.0,
+        missing_limit: int = 3,
+    ) -> None:
+        self.state_file = pathlib.Path(state_file) if state_file is not None else None
+        self.squeue_program = squeue_program
+        self.sacct_program = sacct_program
+        self.interval = interval
+        self.missing_limit = missing_limit
+        self._condition = threading.Condition()
+        self._watched: dict[str, int] = {}
+        self._states: dict[str, str] = {}
+        self._missing: collections.Counter = collections.Counter()
+        self._thread: threading.Thread | None = None
+
+    def _read_state(self) -> dict[str, str]:
+        """Return the submission state file contents.
+
+        :returns: ``{command hash: job ID}`` dictionary. Empty if the state file does not exist or is malformed.
+        """
+        if self.state_file is None:
+            return {}
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def lookup(self, key: str) -> str | None:
+        """Return the job ID recorded for a command hash.
+
+        :param key: Command hash
+
+        :returns: job ID. None if no job is recorded.
+        """
+        with self._condition:
+            return self._read_state().get(key)
+
+    def record(self, key: str, job_id: str | None) -> None:
+        """Record or remove the job ID of a command hash in the submission state file.
+
+        :param key: Command hash
+        :param job_id: Job ID. None removes the command hash.
+        """
+        if self.state_file is None:
+            return
+        with self._condition:
+            state = self._read_state()
+            if job_id is None:
+                state.pop(key, None)
+            else:
+                state[key] = job_id
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            self.state_file.write_text(json.dumps(state, indent=4, sort_keys=True))
+
+    def wait(self, job_id: str) -> str:
+        """Block until the job reaches a terminal state.
+
+        :param job_id: SLURM job ID
+
+        :returns: Final SLURM job state, e.g. ``COMPLETED``, or ``UNKNOWN`` if the scheduler stopped reporting the job
+        """
+        with self._condition:
+            self._watched[job_id] = self._watched.get(job_id, 0) + 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="waves-sbatch-poller", daemon=True)
+                self._thread.start()
+            while job_id not in self._states:
+                self._condition.wait()
+            state = self._states[job_id]
+            self._watched[job_id] -= 1
+            if self._watched[job_id] == 0:
+                del self._watched[job_id]
+                del self._states[job_id]
+            return state
+
+    def _run(self) -> None:
+        """Poll the scheduler until no jobs are watched."""
+        while True:
+            with self._condition:
+                job_ids = [job_id for job_id in self._watched if job_id not in self._states]
+                if not self._watched:
+                    self._thread = None
+                    return
+            if job_ids:
+                states = self.poll(job_ids)
+                with self._condition:
+                    self._states.update(states)
+                    self._condition.notify_all()
+            with self._condition:
+                self._condition.wait(timeout=self.interval)
+
+    def poll(self, job_ids: list[str]) -> dict[str, str]:
+        """Query the scheduler once for the terminal job states of a batch of jobs.
+
+        :param job_ids: SLURM job IDs
+
+        :returns: ``{job_id: state}`` for the jobs that reached a terminal state
+        """
+        queued = _query_scheduler([self.squeue_program, "-h", "-o", "%i %T"], job_ids, None)
+        if queued is None:
+            queued = {}
+        candidates = [job_id for job_id in job_ids if job_id not in queued]
+        if not candidates:
+            return {}
+        accounting = _query_scheduler([self.sacct_program, "-n", "-X", "-P", "-o", "JobID,State"], candidates, "|")
+        if accounting is None:
+            accounting = {}
+        states = {}
+        for job_id in candidates:
+            state = accounting.get(job_id)
+            if state in _terminal_states:
+                states[job_id] = state
+                self._missing.pop(job_id, None)
+            elif state is None:
+                self._missing[job_id] += 1
+                if self._missing[job_id] >= self.missing_limit:
+                    states[job_id] = _unknown_state
+                    self._missing.pop(job_id, None)
+        return states
+
+
+class SbatchPollSpawn:
+    """SCons ``SPAWN`` construction variable replacement for submit-and-poll execution of ``sbatch --wait`` commands.
+
+    Commands that call the sbatch ``program`` with the ``--wait`` option are submitted with ``--parsable`` instead, so
+    the command returns as soon as the job is queued. The job ID is recorded in the poller's submission state file and
+    the calling SCons worker thread blocks on the :class:`JobPoller` until the job reaches a terminal state. All other
+    commands are passed through to the original ``SPAWN`` function.
+
+    If the submission state file contains a job for the same command, e.g. after an interrupted build, the job is
+    re-attached instead of resubmitted. Completed jobs are removed from the state file.
+
+    :param spawn: Original SCons ``SPAWN`` function
+    :param poller: Job poller
+    :param program: The sbatch command line executable absolute or relative path
+    """
+
+    def __init__(self, spawn: typing.Callable, poller: JobPoller, program: str = "sbatch") -> None:
+        self.spawn = spawn
+        self.poller = poller
+        self.program = program
+
+    def __call__(
+        self,
+        sh: str,
+        escape: typing.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Submit ``sbatch --wait`` commands without waiting and block on the job poller.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code. Zero if the job completed successfully.
+        """
+        submit_arguments = _sbatch_submit_arguments(args, self.program)
+        if submit_arguments is None:
+            return self.spawn(sh, escape, cmd, args, env)
+
+        command = " ".join(submit_arguments)
+        key = hashlib.md5(command.encode("utf-8"), usedforsecurity=False).hexdigest()
+        job_id = self.poller.lookup(key)
+        if job_id is not None:
+            state = self.poller.wait(job_id)
+            if state == "COMPLETED":
+                self.poller.record(key, None)
+                return 0
+
+        process = subprocess.run([sh, "-c", command], env=env, capture_output=True, text=True, check=False)
+        job_id = _parse_job_id(process.stdout)
+        if process.returncode != 0 or job_id is None:
+            sys.stdout.write(process.stdout)
+            sys.stderr.write(process.stderr)
+            return process.returncode or 1
+        self.poller.record(key, job_id)
+
+        state = self.poller.wait(job_id)
+        if state != "COMPLETED":
+            sys.stderr.write(f"sbatch job '{job_id}' finished with state '{state}'\n")
+            return 1
+        self.poller.record(key, None)
+        return 0
+
+
+#: sbatch options of packable tasks. Other sbatch options require a dedicated allocation.
+_pack_value_options = {
+    "--output": "output",
+    "-o": "output",
+    "--cpus-per-task": "cpus",
+    "-c": "cpus",
+    "--time": "time",
+    "-t": "time",
+    "--job-name": None,
+    "-J": None,
+}
+_pack_flag_options = frozenset(("--wait", "--parsable"))
+
+
+def _parse_slurm_time(value: str) -> int:
+    """Return the seconds of a SLURM time specification.
+
+    Accepts the sbatch ``--time`` formats: ``minutes``, ``minutes:seconds``, ``hours:minutes:seconds``, ``days-hours``,
+    ``days-hours:minutes``, and ``days-hours:minutes:seconds``.
+
+    :param value: SLURM time specification
+
+    :returns: seconds
+
+    :raises ValueError: If the time specification is malformed
+    """
+    days, separator, clock = value.strip("'\"").rpartition("-")
+    fields = [int(field) for field in clock.split(":")]
+    if len(fields) > 3 or any(field < 0 for field in fields):
+        raise ValueError(f"Malformed SLURM time specification '{value}'")
+    if separator:
+        # Day specifications require hours and optionally minutes and seconds
+        fields = fields + [0] * (3 - len(fields))
+        hours, minutes, seconds = fields
+        return int(days) * 86400 + hours * 3600 + minutes * 60 + seconds
+    if len(fields) == 1:
+        return fields[0] * 60
+    if len(fields) == 2:
+        return fields[0] * 60 + fields[1]
+    hours, minutes, seconds = fields
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _format_slurm_time(seconds: int) -> str:
+    """Return the SLURM ``days-hours:minutes:seconds`` time specification of a duration.
+
+    :param seconds: Duration in seconds
+
+    :returns: SLURM time specification
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"{days}-{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def _parse_pack_task(
+    args: list[str],
+    program: str = "sbatch",
+    default_time: int = 600,
+) -> dict | None:
+    """Return the packable task description of an ``sbatch --wait --wrap`` command.
+
+    :param args: SCons escaped command arguments
+    :param program: The sbatch command line executable absolute or relative path
+    :param default_time: Task time in seconds when the command does not specify ``--time``
+
+    :returns: Task dictionary with the shell ``prefix`` preceding the sbatch command, the escaped ``wrap`` command, the
+        escaped ``output`` file, ``cpus``, and ``time`` in seconds. None if the command is not an ``sbatch --wait
+        --wrap`` command or if the command uses sbatch options that require a dedicated allocation.
+    """
+    program = pathlib.PurePath(program).name
+    program_index = next(
+        (index for index, argument in enumerate(args) if pathlib.PurePath(argument.strip("'\"")).name == program),
+        None,
+    )
+    if program_index is None:
+        return None
+    task: dict = {"prefix": " ".join(args[:program_index]), "output": None, "cpus": 1, "time": default_time}
+    options = args[program_index + 1 :]
+    wait = False
+    index = 0
+    while index < len(options):
+        option, separator, value = options[index].partition("=")
+        if option == "--wrap":
+            if not wait or index + 2 != len(options):
+                return None
+            task["wrap"] = options[index + 1]
+            break
+        if option in _pack_flag_options and not separator:
+            wait = wait or option == "--wait"
+            index += 1
+            continue
+        if option not in _pack_value_options:
+            return None
+        if not separator:
+            if index + 1 >= len(options):
+                return None
+            value = options[index + 1]
+            index += 1
+        index += 1
+        key = _pack_value_options[option]
+        try:
+            if key == "cpus":
+                task["cpus"] = int(value.strip("'\""))
+            elif key == "time":
+                task["time"] = _parse_slurm_time(value)
+            elif key == "output":
+                task["output"] = value
+        except ValueError:
+            return None
+    if "wrap" not in task or (task["output"] is not None and "%" in task["output"]):
+        return None
+    return task
+
+
+def _pack_tasks(tasks: list[dict], cpus: int, time: int) -> list[list[list[int]]]:
+    """Pack tasks into allocations with first-fit decreasing-height shelf packing.
+
+    Tasks on a shelf run concurrently and shelves run in sequence. The CPU count of a shelf does not exceed ``cpus`` and
+    the sum of the longest task time of every shelf in an allocation does not exceed ``time``.
+
+    :param tasks: Task dictionaries with ``cpus`` and ``time`` keys
+    :param cpus: Allocation CPU count
+    :param time: Allocation time limit in seconds
+
+    :returns: Allocations as lists of shelves as lists of task indices
+
+    :raises ValueError: If a task requires more CPUs or time than the allocation provides
+    """
+    allocations: list[list[list[int]]] = []
+    allocation_times: list[int] = []
+    shelves: list[tuple[int, int, list[int]]] = []
+    order = sorted(range(len(tasks)), key=lambda index: (-tasks[index]["time"], index))
+    for index in order:
+        task = tasks[index]
+        if task["cpus"] > cpus or task["time"] > time:
+            raise ValueError(f"Task requires more than the {cpus} CPU, {time} second allocation")
+        for position, (allocation, shelf_cpus, shelf) in enumerate(shelves):
+            if shelf_cpus + task["cpus"] <= cpus:
+                shelf.append(index)
+                shelves[position] = (allocation, shelf_cpus + task["cpus"], shelf)
+                break
+        else:
+            # Decreasing order guarantees the first task is the tallest task on the shelf
+            available = next(
+                (number for number, used in enumerate(allocation_times) if used + task["time"] <= time),
+                None,
+            )
+            if available is None:
+                available = len(allocations)
+                allocations.append([])
+                allocation_times.append(0)
+            allocation_times[available] += task["time"]
+            shelf = [index]
+            allocations[available].append(shelf)
+            shelves.append((available, task["cpus"], shelf))
+    return allocations
+
+
+def _write_pack_script(
+    path: pathlib.Path,
+    tasks: list[dict],
+    shelves: list[list[int]],
+    status_directory: pathlib.Path,
+    step_command: str = "",
+) -> None:
+    """Write the batch script running packed tasks shelf by shelf.
+
+    Each task runs in a background subshell with the original command prefix, e.g. ``cd directory &&``, and writes the
+    combined STDOUT and STDERR to the task's sbatch output file. The task exit code is written to
+    ``status_directory/<index>.status``.
+
+    :param path: Batch script path
+    :param tasks: Task dictionaries with ``prefix``, ``wrap``, ``output``, and ``cpus`` keys
+    :param shelves: Lists of task indices to run concurrently
+    :param status_directory: Directory for the task status and default output files
+    :param step_command: Job step launcher format string with a ``{cpus}`` field, e.g. ``srun --ntasks=1
+        --cpus-per-task={cpus}``. Empty string runs tasks as local worker processes inside the allocation.
+    """
+    lines = ["#!/bin/bash", ""]
+    for number, shelf in enumerate(shelves):
+        lines.append(f"# Shelf {number}")
+        for index in shelf:
+            task = tasks[index]
+            output = task["output"] or shlex.quote(str(status_directory / f"{index}.out"))
+            status = shlex.quote(str(status_directory / f"{index}{_array_status_extension}"))
+            launcher = step_command.format(cpus=task["cpus"])
+            command = " ".join(part for part in (task["prefix"], launcher, "sh -c", task["wrap"]) if part)
+            lines.append(f"( {command} > {output} 2>&1 ; echo $? > {status} ) &")
+        lines.extend(["wait", ""])
+    path.write_text("\n".join(lines))
+
+
+class SbatchPackSpawn:
+    """SCons ``SPAWN`` construction variable replacement packing small ``sbatch --wait`` tasks into shared allocations.
+
+    Commands that call the sbatch ``program`` with ``--wait`` and ``--wrap`` are collected for ``window`` seconds after
+    the first task arrives. Collected tasks with the same shell and environment variables are packed by their
+    ``--cpus-per-task`` and ``--time`` options with :meth:`_pack_tasks` and each allocation is submitted as a single
+    ``sbatch --wait`` job running the tasks as concurrent job steps. The task ``--output`` files and task targets are
+    unchanged. Each calling SCons worker thread blocks until its allocation finishes and returns the exit code of its
+    own task.
+
+    Tasks longer than ``max_task_time``, tasks using other sbatch options, and all other commands are passed through to
+    the original ``SPAWN`` function.
+
+    :param spawn: Original SCons ``SPAWN`` function
+    :param pack_directory: Directory for the allocation batch scripts, task status files, and scheduler output
+    :param program: The sbatch command line executable absolute or relative path
+    :param cpus: Allocation CPU count
+    :param time: Allocation time limit in seconds
+    :param max_task_time: Longest packable task time in seconds
+    :param default_time: Task time in seconds when the command does not specify ``--time``
+    :param window: Seconds to collect ready tasks before packing
+    :param step_command: Job step launcher format string with a ``{cpus}`` field. Empty string runs tasks as local
+        worker processes inside the allocation.
+    :param sbatch_options: Additional sbatch options for the allocation jobs
+    """
+
+    def __init__(
+        self,
+        spawn: typing.Callable,
+        pack_directory: str | pathlib.Path,
+        program: str = "sbatch",
+        cpus: int = 1,
+        time: int = 3600,
+        max_task_time: int = 600,
+        default_time: int = 600,
+        window: float = 5.0,
+        step_command: str = "srun --exact --ntasks=1 --cpus-per-task={cpus}",
+        sbatch_options: str = "",
+    ) -> None:
+        self.spawn = spawn
+        self.pack_directory = pathlib.Path(pack_directory)
+        self.program = program
+        self.cpus = cpus
+        self.time = time
+        self.max_task_time = min(max_task_time, time)
+        self.default_time = default_time
+        self.window = window
+        self.step_command = step_command
+        self.sbatch_options = sbatch_options
+        self._lock = threading.Lock()
+        self._pending: list[tuple[dict, dict]] = []
+        self._timer: threading.Timer | None = None
+
+    def __call__(
+        self,
+        sh: str,
+        escape: typing.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Queue small ``sbatch --wait`` tasks for packing and block until the task finishes.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        task = _parse_pack_task(args, self.program, self.default_time)
+        if task is None or task["cpus"] > self.cpus or task["time"] > self.max_task_time:
+            return self.spawn(sh, escape, cmd, args, env)
+
+        result: dict = {"event": threading.Event(), "exit_code": 1, "sh": sh, "env": env}
+        with self._lock:
+            self._pending.append((task, result))
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        result["event"].wait()
+        return result["exit_code"]
+
+    def _flush(self) -> None:
+        """Pack the collected tasks and submit one allocation per pack.
+
+        Tasks are only packed with tasks spawned by the same shell with the same environment variables.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._timer = None
+        groups: dict[tuple, list[tuple[dict, dict]]] = {}
+        for task, result in pending:
+            environment = tuple(sorted((key, str(value)) for key, value in (result["env"] or {}).items()))
+            groups.setdefault((result["sh"], environment), []).append((task, result))
+        for group in groups.values():
+            sh = group[0][1]["sh"]
+            env = group[0][1]["env"]
+            tasks = [task for task, _result in group]
+            for shelves in _pack_tasks(tasks, self.cpus, self.time):
+                packed = [group[index] for shelf in shelves for index in shelf]
+                local_shelves = []
+                position = 0
+                for shelf in shelves:
+                    local_shelves.append(list(range(position, position + len(shelf))))
+                    position += len(shelf)
+                thread = threading.Thread(target=self._submit, args=(packed, local_shelves, sh, env), daemon=True)
+                thread.start()
+
+    def _submit(self, packed: list[tuple[dict, dict]], shelves: list[list[int]], sh: str, env: dict | None) -> None:
+        """Submit and wait for a single packed allocation and release the waiting SCons worker threads.
+
+        :param packed: Task dictionaries and result dictionaries in allocation order
+        :param shelves: Lists of allocation task indices to run concurrently
+        :param sh: Shell executable
+        :param env: Command environment variables
+        """
+        tasks = [task for task, _result in packed]
+        try:
+            key = hashlib.md5(json.dumps(tasks, sort_keys=True).encode("utf-8"), usedforsecurity=False).hexdigest()
+            status_directory = self.pack_directory / key
+            status_directory.mkdir(parents=True, exist_ok=True)
+            for status_file in status_directory.glob(f"*{_array_status_extension}"):
+                status_file.unlink()
+            script = status_directory / "sbatch_pack.sh"
+            _write_pack_script(script, tasks, shelves, status_directory, self.step_command)
+            shelf_times = [max(tasks[index]["time"] for index in shelf) for shelf in shelves]
+            shelf_cpus = [sum(tasks[index]["cpus"] for index in shelf) for shelf in shelves]
+            command = [
+                self.program,
+                "--wait",
+                "--parsable",
+                "--nodes=1",
+                "--ntasks=1",
+                f"--cpus-per-task={max(shelf_cpus)}",
+                f"--time={_format_slurm_time(sum(shelf_times))}",
+                f"--output={status_directory / 'sbatch_pack.slurm.out'}",
+                *shlex.split(self.sbatch_options),
+                str(script),
+            ]
+            process = subprocess.run(
+                [sh, "-c", shlex.join(command)], env=env, capture_output=True, text=True, check=False
+            )
+            if process.returncode != 0:
+                sys.stdout.write(process.stdout)
+                sys.stderr.write(process.stderr)
+            for index, (_task, result) in enumerate(packed):
+                status_file = status_directory / f"{index}{_array_status_extension}"
+                try:
+                    result["exit_code"] = int(status_file.read_text().strip())
+                except (OSError, ValueError):
+                    sys.stderr.write(f"Packed sbatch task '{index}' in '{status_directory}' did not finish\n")
+                    result["exit_code"] = process.returncode or 1
+        finally:
+            for _task, result in packed:
+                result["event"].set()
+
+
+def _expand_actions(
+    actions: list,
+    target: list,
+    source: list,
+    env: typing.Any,  # noqa: ANN401
+    executor: typing.Any,  # noqa: ANN401
+) -> list:
+    """Return the flat list of actions with list actions and generated actions expanded.
+
+    :param actions: SCons actions
+    :param target: Task target nodes
+    :param source: Task source nodes
+    :param env: Task construction environment
+    :param executor: Task executor
+
+    :returns: SCons actions without ``ListAction``, ``CommandGeneratorAction``, or
+        :class:`waves._scheduler.WrapperAction` objects
+    """
+    expanded = []
+    for action in actions:
+        if isinstance(action, SCons.Action.ListAction):
+            expanded.extend(_expand_actions(action.list, target, source, env, executor))
+        elif isinstance(action, _scheduler.WrapperAction):
+            expanded.extend(_expand_actions([action.action], target, source, env, executor))
+        elif isinstance(action, SCons.Action.CommandGeneratorAction):
+            generated = action._generate(target, source, env, 0, executor)
+            expanded.extend(_expand_actions([generated], target, source, env, executor))
+        else:
+            expanded.append(action)
+    return expanded
+
+
+class ExportRecorder:
+    """SCons ``PRINT_CMD_LINE_FUNC`` replacement recording the out-of-date tasks of an ``scons -n`` dry run.
+
+    Appends one JSON line per task to the ``record_file`` with the task ``targets``, the absolute paths of all target
+    ``children`` (sources, explicit dependencies, and scanned implicit dependencies), and the task ``commands`` as lists
+    of SCons escaped command arguments. Tasks with any non-command action, e.g. Python function actions, are recorded
+    with ``commands`` set to None.
+
+    SCons does not print silent actions, e.g. an empty ``cmdstr``, or any action of an ``scons -s`` run. After the dry
+    run, :meth:`finish` records the out-of-date targets of such tasks with ``silent`` set to True.
+
+    :param record_file: JSON lines record file
+    """
+
+    def __init__(self, record_file: str | pathlib.Path) -> None:
+        self.record_file = pathlib.Path(record_file)
+        self._recorded: set[int] = set()
+        self._targets: set[str] = set()
+
+    def __call__(
+        self,
+        s: str,  # noqa: ARG002
+        target: list,
+        source: list,  # noqa: ARG002
+        env: typing.Any,  # noqa: ARG002, ANN401
+    ) -> None:
+        """Record the task of the first action printed for each task executor.
+
+        :param s: Action string
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        """
+        executor = target[0].get_executor()
+        if id(executor) in self._recorded:
+            return
+        self._recorded.add(id(executor))
+
+        targets = executor.get_all_targets()
+        build_env = executor.get_build_env()
+        escape = build_env.get("ESCAPE", lambda argument: argument)
+        sources = executor.get_all_sources()
+        actions = _expand_actions(executor.get_action_list(), targets, sources, build_env, executor)
+        commands: list[list[str]] | None = None
+        if all(isinstance(action, SCons.Action.CommandAction) for action in actions):
+            commands = []
+            for action in actions:
+                command_list, _ignore, _silent = action.process(targets, sources, build_env, executor)
+                commands.extend(SCons.Subst.escape_list(line, escape) for line in command_list if line)
+
+        target_paths = [node.get_abspath() for node in targets]
+        self._targets.update(target_paths)
+        children = {
+            child.get_abspath()
+            for node in targets
+            for child in node.children()
+            if isinstance(child, SCons.Node.FS.Base) and child.get_abspath() not in target_paths
+        }
+        self._write({"targets": target_paths, "children": sorted(children), "commands": commands})
+
+    def finish(self) -> None:
+        """Record the out-of-date targets built without a printed action after the dry run."""
+        stack = list(SCons.Node.FS.get_default_fs().Root.values())
+        while stack:
+            directory = stack.pop()
+            for name, node in directory.entries.items():
+                if name in (".", ".."):
+                    continue
+                if isinstance(node, SCons.Node.FS.Dir):
+                    stack.append(node)
+                if (
+                    node.has_explicit_builder()
+                    and node.get_state() == SCons.Node.executed
+                    and node.get_build_env().get("PRINT_CMD_LINE_FUNC") is self
+                    and node.get_abspath() not in self._targets
+                ):
+                    self._targets.add(node.get_abspath())
+                    self._write({"targets": [node.get_abspath()], "children": [], "commands": None, "silent": True})
+
+    def _write(self, record: dict) -> None:
+        """Append a record to the record file.
+
+        :param record: Task record
+        """
+        with self.record_file.open(mode="a") as record_file:
+            record_file.write(f"{json.dumps(record)}\n")
+
+
+#: Shared export recorders by record file
+_export_recorders: dict[pathlib.Path, ExportRecorder] = {}
+
+
+def _export_recorder(record_file: str | pathlib.Path) -> ExportRecorder:
+    """Return the export recorder shared by all construction environments recording to the same file.
+
+    Registers :meth:`ExportRecorder.finish` to run at interpreter exit, after the SCons dry run.
+
+    :param record_file: JSON lines record file
+
+    :returns: Shared export recorder
+    """
+    record_file = pathlib.Path(record_file)
+    if record_file not in _export_recorders:
+        recorder = ExportRecorder(record_file)
+        _export_recorders[record_file] = recorder
+        atexit.register(recorder.finish)
+    return _export_recorders[record_file]
+
+
+class ReconcileSpawn:
+    """SCons ``SPAWN`` construction variable replacement reconciling exported tasks with their SLURM job states.
+
+    Commands found in the export ``manifest`` are not executed. Instead, the calling SCons worker thread waits for the
+    associated SLURM job to reach a terminal state and returns a zero exit code if the job completed successfully, which
+    allows SCons to record the task signatures without re-running the task. All other commands are passed through to
+    the original ``SPAWN`` function.
+
+    :param spawn: Original SCons ``SPAWN`` function
+    :param manifest: Export manifest file written by :meth:`waves._slurm_export.main`
+    :param poller: Job poller
+    """
+
+    def __init__(self, spawn: typing.Callable, manifest: str | pathlib.Path, poller: JobPoller) -> None:
+        self.spawn = spawn
+        self.poller = poller
+        manifest_data = json.loads(pathlib.Path(manifest).read_text())
+        self.jobs = {command: task["job_id"] for task in manifest_data["tasks"] for command in task["commands"]}
+        self.targets = [target for task in manifest_data["tasks"] for target in task.get("targets", [])]
+
+    def __call__(
+        self,
+        sh: str,
+        escape: typing.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Return the exported job state as an exit code or execute commands that were not exported.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code. Zero if the exported job completed successfully.
+        """
+        job_id = self.jobs.get(" ".join(args))
+        if job_id is None:
+            return self.spawn(sh, escape, cmd, args, env)
+        state = self.poller.wait(job_id)
+        if state != "COMPLETED":
+            sys.stderr.write(f"Exported sbatch job '{job_id}' finished with state '{state}'\n")
+            return 1
+        return 0
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,270 @@
+"""Internal API module implementing the ``slurm_export`` subcommand behavior.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the CLI implementation
+to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from waves import _settings, _slurm, _utilities
+
+_exclude_from_namespace = set(globals().keys())
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return a 'no-help' parser for the slurm_export subcommand.
+
+    :return: parser
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        "TARGET",
+        nargs="+",
+        help="SCons target(s)",
+    )
+    parser.add_argument(
+        "--sconstruct",
+        type=pathlib.Path,
+        default=_settings._default_sconstruct,
+        help="Path to SConstruct file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=pathlib.Path,
+        default=_settings._slurm_export_default_manifest,
+        help="Path to the JSON manifest mapping task targets to SLURM job IDs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sbatch-program",
+        type=str,
+        default="sbatch",
+        help="The sbatch command line executable absolute or relative path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sbatch-options",
+        type=str,
+        default=_settings._slurm_export_sbatch_options,
+        help="Additional sbatch options for every submitted job (default: '%(default)s')",
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help=(
+            "Run SCons with the exported tasks replaced by the state of their SLURM jobs to record the task "
+            "signatures without re-running the tasks (default: %(default)s)"
+        ),
+    )
+
+    return parser
+
+
+def main(
+    targets: list,
+    scons_args: list | None = None,
+    sconstruct: pathlib.Path = _settings._default_sconstruct,
+    manifest: pathlib.Path = _settings._slurm_export_default_manifest,
+    sbatch_program: str = "sbatch",
+    sbatch_options: str = _settings._slurm_export_sbatch_options,
+    reconcile: bool = False,
+) -> None:
+    """Submit the out-of-date tasks of an SCons build as SLURM jobs with ``afterok`` dependency chains.
+
+    Requires that the SCons project construction environments are :class:`waves.scons_extensions.WAVESEnvironment`
+    objects or call :meth:`waves.scons_extensions.slurm_export_hooks`.
+
+    Export walks the out-of-date tasks of the requested targets with an ``scons -n`` dry run and submits every task
+    in dependency order. Tasks defined with an ``sbatch --wait`` command, e.g. the
+    :meth:`waves.scons_extensions.sbatch` builder, are submitted with ``--parsable`` and the SLURM dependencies in place
+    of ``--wait``. All other command tasks are submitted with ``sbatch --wrap``. Tasks with Python function actions
+    cannot be exported and must be built prior to export.
+
+    Reconcile runs SCons with the exported tasks replaced by the final state of their SLURM jobs, such that SCons
+    records the task signatures without re-running the completed tasks.
+
+    :param targets: list of SCons targets (positional arguments)
+    :param scons_args: list of SCons arguments
+    :param sconstruct: Path to an SConstruct file or parent directory
+    :param manifest: Path to the JSON manifest mapping task targets to SLURM job IDs
+    :param sbatch_program: The sbatch command line executable absolute or relative path
+    :param sbatch_options: Additional sbatch options for every submitted job
+    :param reconcile: Reconcile the exported tasks instead of exporting tasks
+
+    :raises RuntimeError: If the SConstruct file or manifest does not exist, if the SCons command fails, if any task
+        cannot be exported, or if any job submission fails
+    """
+    if not scons_args:
+        scons_args = []
+    sconstruct = pathlib.Path(sconstruct).resolve()
+    if not sconstruct.is_file():
+        sconstruct = sconstruct / "SConstruct"
+    if not sconstruct.exists():
+        raise RuntimeError(f"\t{sconstruct} does not exist.")
+    manifest = pathlib.Path(manifest).resolve()
+    scons_command = [_settings._scons_command, *targets, f"--sconstruct={sconstruct.name}", *scons_args]
+
+    if reconcile:
+        if not manifest.exists():
+            raise RuntimeError(f"\t{manifest} does not exist.")
+        environment = {**os.environ, _settings._slurm_export_manifest_variable: str(manifest)}
+        return_code, _stdout = _utilities.tee_subprocess(scons_command, cwd=sconstruct.parent, env=environment)
+        if return_code != 0:
+            raise RuntimeError(f"command '{' '.join(scons_command)}' failed")
+        return
+
+    tasks = _record_tasks([*scons_command, "-n"], sconstruct.parent)
+    if not tasks:
+        print("Nothing to export. All targets are up-to-date.", file=sys.stdout)
+        return
+    manifest_tasks = _submit_tasks(
+        tasks,
+        sconstruct.parent,
+        manifest.parent / manifest.stem,
+        sbatch_program=sbatch_program,
+        sbatch_options=sbatch_options,
+        manifest=manifest,
+    )
+    for task in manifest_tasks:
+        print(f"Submitted job {task['job_id']}: {' '.join(task['targets'])}", file=sys.stdout)
+
+
+def _record_tasks(command: list[str], working_directory: pathlib.Path) -> list[dict]:
+    """Return the out-of-date tasks recorded during an SCons dry run.
+
+    :param command: SCons dry run command
+    :param working_directory: SCons command working directory
+
+    :returns: Task records in SCons execution order. See :class:`waves._slurm.ExportRecorder`.
+
+    :raises RuntimeError: If the SCons command fails or any out-of-date task was built without a printed action
+    """
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        record_file = pathlib.Path(temporary_directory) / "record.jsonl"
+        environment = {**os.environ, _settings._slurm_export_record_variable: str(record_file)}
+        process = subprocess.run(
+            command, cwd=working_directory, env=environment, capture_output=True, text=True, check=False
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"command '{' '.join(command)}' failed\n{process.stdout}{process.stderr}")
+        if not record_file.exists():
+            return []
+        records = [json.loads(line) for line in record_file.read_text().splitlines() if line.strip()]
+    silent = [target for record in records if record.get("silent") for target in record["targets"]]
+    if silent:
+        message = (
+            "Tasks without printed actions, e.g. from 'scons -s' or an empty 'cmdstr', cannot be exported. "
+            f"Remove the silent options or build these targets first: {' '.join(silent)}"
+        )
+        raise RuntimeError(message)
+    return records
+
+
+def _submission_arguments(
+    task: dict,
+    dependencies: list[str],
+    output_directory: pathlib.Path,
+    sbatch_program: str = "sbatch",
+    sbatch_options: str = "",
+) -> list[str]:
+    """Return the SCons escaped command arguments to submit a task with SLURM dependencies.
+
+    :param task: Task record. See :class:`waves._slurm.ExportRecorder`.
+    :param dependencies: Job IDs of the dependency tasks
+    :param output_directory: SLURM output directory for wrapped tasks
+    :param sbatch_program: The sbatch command line executable absolute or relative path
+    :param sbatch_options: Additional sbatch options
+
+    :returns: submission command arguments
+
+    :raises RuntimeError: If the task has non-command actions or mixes ``sbatch --wait`` with other commands
+    """
+    targets = " ".join(task["targets"])
+    if task["commands"] is None:
+        message = f"Task with Python function actions cannot be exported. Build these targets first: {targets}"
+        raise RuntimeError(message)
+    options = shlex.split(sbatch_options)
+    if dependencies:
+        options.append(f"--dependency=afterok:{':'.join(dependencies)}")
+
+    commands = task["commands"]
+    submissions = [_slurm._sbatch_submit_arguments(command, sbatch_program, options) for command in commands]
+    if len(commands) == 1 and submissions[0] is not None:
+        return submissions[0]
+    if any(submission is not None for submission in submissions):
+        raise RuntimeError(f"Task mixing 'sbatch --wait' and other commands cannot be exported: {targets}")
+    wrap = " && ".join(" ".join(command) for command in commands)
+    return [
+        sbatch_program,
+        "--parsable",
+        *options,
+        f"--output={output_directory / '%j.out'}",
+        "--wrap",
+        shlex.quote(wrap),
+    ]
+
+
+def _submit_tasks(
+    tasks: list[dict],
+    working_directory: pathlib.Path,
+    output_directory: pathlib.Path,
+    sbatch_program: str = "sbatch",
+    sbatch_options: str = "",
+    manifest: pathlib.Path | None = None,
+) -> list[dict]:
+    """Submit tasks in execution order with ``afterok`` dependencies on the jobs producing their dependencies.
+
+    :param tasks: Task records in SCons execution order. See :class:`waves._slurm.ExportRecorder`.
+    :param working_directory: SCons command working directory
+    :param output_directory: SLURM output directory for wrapped tasks
+    :param sbatch_program: The sbatch command line executable absolute or relative path
+    :param sbatch_options: Additional sbatch options
+    :param manifest: Path to the JSON manifest. Written after every submission. If None, no manifest is written.
+
+    :returns: manifest tasks with ``job_id``, ``dependencies``, ``targets``, ``commands``, and ``submission`` keys
+
+    :raises RuntimeError: If any task cannot be exported or if any job submission fails
+    """
+    # Validate every task before the first submission to avoid partially exported builds
+    task_dependencies = []
+    producers: dict[str, int] = {}
+    for index, task in enumerate(tasks):
+        _submission_arguments(task, [], output_directory, sbatch_program, sbatch_options)
+        task_dependencies.append(sorted({producers[child] for child in task["children"] if child in producers}))
+        producers.update(dict.fromkeys(task["targets"], index))
+
+    output_directory.mkdir(parents=True, exist_ok=True)
+    manifest_tasks: list[dict] = []
+    for task, dependencies in zip(tasks, task_dependencies, strict=True):
+        dependency_ids = [manifest_tasks[dependency]["job_id"] for dependency in dependencies]
+        arguments = _submission_arguments(task, dependency_ids, output_directory, sbatch_program, sbatch_options)
+        command = " ".join(arguments)
+        process = subprocess.run(
+            ["sh", "-c", command], cwd=working_directory, capture_output=True, text=True, check=False
+        )
+        job_id = _slurm._parse_job_id(process.stdout)
+        if process.returncode != 0 or job_id is None:
+            raise RuntimeError(f"command '{command}' failed\n{process.stdout}{process.stderr}")
+        manifest_tasks.append(
+            {
+                "job_id": job_id,
+                "dependencies": dependency_ids,
+                "targets": task["targets"],
+                "commands": [" ".join(arguments) for arguments in task["commands"]],
+                "submission": command,
+            }
+        )
+        if manifest is not None:
+            manifest.write_text(json.dumps({"tasks": manifest_tasks}, indent=4))
+    return manifest_tasks
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,384 @@
+"""Internal API module implementing multiplexed SSH connections and batched remote copies for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections
+import contextlib
+import hashlib
+import json
+import pathlib
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import typing
+
+_exclude_from_namespace = set(globals().keys())
+
+#: SSH short options taking a value
+_ssh_value_flags = frozenset("BbcDEeFIiJLlmOoPpQRSWw")
+
+#: Unquoted shell characters that prevent a path from being copied without the shell
+_shell_characters = frozenset("$`*?[~;|&<>(){}")
+
+
+def _unquote(argument: str) -> str | None:
+    """Return the value of an SCons escaped command argument.
+
+    :param argument: SCons escaped command argument
+
+    :returns: argument value. None if the argument is not a single word without shell expansions.
+    """
+    quoted = argument.startswith("'") and argument.endswith("'") and len(argument) > 1
+    if not quoted and _shell_characters.intersection(argument):
+        return None
+    try:
+        words = shlex.split(argument)
+    except ValueError:
+        return None
+    return words[0] if len(words) == 1 else None
+
+
+def _parse_ssh_command(args: list[str]) -> tuple[list[str], str] | None:
+    """Return the connection options and destination of an ``ssh`` command.
+
+    :param args: SCons escaped command arguments
+
+    :returns: escaped SSH options and escaped destination. None if the command is not an ``ssh`` command, if the
+        command is an SSH control command, or if the command sets its own control socket options.
+    """
+    if not args or pathlib.PurePath(args[0]).name != "ssh":
+        return None
+    options = []
+    index = 1
+    while index < len(args) and args[index].startswith("-"):
+        token = args[index]
+        options.append(token)
+        index += 1
+        for position, flag in enumerate(token[1:], start=1):
+            if flag in _ssh_value_flags:
+                if position == len(token) - 1:
+                    if index >= len(args):
+                        return None
+                    options.append(args[index])
+                    index += 1
+                break
+    if index >= len(args):
+        return None
+    if any(token.startswith(("-O", "-S", "-M")) or "control" in token.lower() for token in options):
+        return None
+    return options, args[index]
+
+
+def _parse_rsync_command(args: list[str]) -> dict | None:
+    """Return the remote host and transfer description of an ``rsync`` command over the default remote shell.
+
+    :param args: SCons escaped command arguments
+
+    :returns: rsync command dictionary with the escaped ``options``, the unquoted local ``sources``, the remote
+        ``host``, the remote ``directory`` of the first remote path, and ``push`` True when copying to the remote host.
+        None if the command is not an ``rsync`` command with exactly one remote host, if the command pushes to more than
+        one remote path, or if the command sets its own remote shell.
+    """
+    if not args or pathlib.PurePath(args[0]).name != "rsync":
+        return None
+    options = []
+    paths = []
+    for token in args[1:]:
+        if token.startswith("--"):
+            if token == "--rsh" or token.startswith("--rsh="):
+                return None
+            options.append(token)
+        elif token.startswith("-") and len(token) > 1:
+            if "e" in token[1:]:
+                return None
+            options.append(token)
+        else:
+            paths.append(token)
+    if len(paths) < 2:
+        return None
+    remote = [_unquote(path) for path in paths if ":" in path.split("/", 1)[0]]
+    if not remote or any(path is None or "::" in path for path in remote):
+        return None
+    hosts = [path.partition(":") for path in remote if path is not None]
+    push = ":" in paths[-1].split("/", 1)[0]
+    if len({host for host, _separator, _directory in hosts}) != 1 or (push and len(remote) != 1):
+        return None
+    host, _separator, directory = hosts[0]
+    sources = [_unquote(path) for path in paths[:-1]] if push else []
+    return {
+        "options": options,
+        "sources": sources,
+        "host": host,
+        "directory": directory,
+        "push": push,
+    }
+
+
+class SSHMultiplexSpawn:
+    """SCons ``SPAWN`` construction variable replacement sharing SSH master connections between ``ssh`` and ``rsync``.
+
+    The first ``ssh`` or ``rsync`` command to a destination starts a background SSH master connection with the
+    command's SSH options. Later ``ssh`` commands with the same destination and options, and ``rsync`` commands to the
+    same host, connect through the master connection's control socket instead of repeating the SSH handshake and
+    authentication. Commands fall back to a new SSH connection if the master connection fails to start or has exited.
+    Master connections exit after ``persist`` idle time or when :meth:`close` is called.
+
+    When ``push_window`` is set, ``rsync`` pushes to the same host with the same options that are ready within
+    ``push_window`` seconds of each other are copied in a single ``rsync --relative`` transfer. Each task's sources
+    are copied to the task's remote directory, which must exist. If the batched transfer fails, each task repeats its
+    own transfer. Pushes with source paths ending in ``/`` or source paths that do not exist are not batched.
+
+    All other commands are passed through to the original ``SPAWN`` function unchanged.
+
+    :param spawn: Original SCons ``SPAWN`` function
+    :param control_directory: Directory for the SSH control sockets. Unix socket paths are limited to about 100
+        characters, so the directory path should be short. If None, a new temporary directory is used.
+    :param persist: SSH ``ControlPersist`` idle time of the master connections
+    :param push_window: Seconds to collect ready ``rsync`` pushes before copying. If None, pushes are not batched.
+    """
+
+    def __init__(
+        self,
+        spawn: typing.Callable,
+        control_directory: str | pathlib.Path | None = None,
+        persist: str = "10m",
+        push_window: float | None = None,
+    ) -> None:
+        self.spawn = spawn
+        self.control_directory = pathlib.Path(control_directory) if control_directory is not None else None
+        self.persist = persist
+        self.push_window = push_window
+        self._temporary_directory: pathlib.Path | None = None
+        self._lock = threading.Lock()
+        self._masters: dict[str, dict] = {}
+        self._pending: list[tuple[dict, dict]] = []
+        self._timer: threading.Timer | None = None
+
+    def __call__(
+        self,
+        sh: str,
+        escape: typing.Callable,
+        cmd: str,
+        args: list[str],
+        env: dict,
+    ) -> int:
+        """Run ``ssh`` and ``rsync`` commands through the shared master connections.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+
+        :returns: command exit code
+        """
+        ssh = _parse_ssh_command(args)
+        if ssh is not None:
+            options, destination = ssh
+            control_path = self.control_path(sh, env, args[0], options, destination)
+            if control_path is None:
+                return self.spawn(sh, escape, cmd, args, env)
+            control_options = ["-o", "ControlMaster=no", "-o", shlex.quote(f"ControlPath={control_path}")]
+            return self.spawn(sh, escape, cmd, [args[0], *control_options, *args[1:]], env)
+
+        rsync = _parse_rsync_command(args)
+        if rsync is None:
+            return self.spawn(sh, escape, cmd, args, env)
+        if (
+            self.push_window is not None
+            and rsync["push"]
+            and rsync["directory"] is not None
+            and all(
+                source is not None and not source.endswith("/") and pathlib.Path(source).exists()
+                for source in rsync["sources"]
+            )
+        ):
+            result: dict = {"event": threading.Event(), "exit_code": 1}
+            with self._lock:
+                self._pending.append(({**rsync, "program": args[0], "sh": sh, "escape": escape, "env": env}, result))
+                if self._timer is None:
+                    self._timer = threading.Timer(self.push_window, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+            result["event"].wait()
+            if result["exit_code"] == 0:
+                return 0
+        return self._rsync(sh, escape, cmd, args, env, rsync["host"])
+
+    def _rsync(self, sh: str, escape: typing.Callable, cmd: str, args: list[str], env: dict, host: str) -> int:
+        """Run an ``rsync`` command with the master connection of the remote host as remote shell.
+
+        :param sh: Shell executable
+        :param escape: SCons argument escape function
+        :param cmd: Command executable
+        :param args: SCons escaped command arguments
+        :param env: Command environment variables
+        :param host: Escaped remote host
+
+        :returns: command exit code
+        """
+        control_path = self.control_path(sh, env, "ssh", [], host)
+        if control_path is None:
+            return self.spawn(sh, escape, cmd, args, env)
+        remote_shell = shlex.join(["ssh", "-o", "ControlMaster=no", "-o", f"ControlPath={control_path}"])
+        return self.spawn(sh, escape, cmd, [args[0], "-e", shlex.quote(remote_shell), *args[1:]], env)
+
+    def _directory(self) -> pathlib.Path:
+        """Return the control socket directory, creating a temporary directory on first use.
+
+        :returns: control socket directory
+        """
+        if self.control_directory is not None:
+            self.control_directory.mkdir(parents=True, exist_ok=True)
+            return self.control_directory
+        if self._temporary_directory is None:
+            self._temporary_directory = pathlib.Path(tempfile.mkdtemp(prefix="waves-ssh-"))
+        return self._temporary_directory
+
+    def control_path(self, sh: str, env: dict, program: str, options: list[str], destination: str) -> str | None:
+        """Return the control socket of the master connection to a destination, starting the master on first use.
+
+        Concurrent callers wait for the first caller to start the master connection. Master connections that fail to
+        start are not retried.
+
+        :param sh: Shell executable
+        :param env: Command environment variables
+        :param program: Escaped ssh program
+        :param options: Escaped SSH options
+        :param destination: Escaped SSH destination
+
+        :returns: control socket path. None if the master connection failed to start.
+        """
+        key = json.dumps([options, destination])
+        with self._lock:
+            master = self._masters.setdefault(
+                key, {"lock": threading.Lock(), "started": False, "path": None, "program": program, "host": destination}
+            )
+        with master["lock"]:
+            if not master["started"]:
+                master["started"] = True
+                digest = hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+                with self._lock:
+                    path = str(self._directory() / digest)
+                command = [
+                    program,
+                    *options,
+                    "-o",
+                    "ControlMaster=yes",
+                    "-o",
+                    shlex.quote(f"ControlPath={path}"),
+                    "-o",
+                    shlex.quote(f"ControlPersist={self.persist}"),
+                    "-f",
+                    "-N",
+                    destination,
+                ]
+                process = subprocess.run(
+                    [sh, "-c", " ".join(command)],
+                    env=env,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+                if process.returncode == 0:
+                    master["path"] = path
+            return master["path"]
+
+    def _flush(self) -> None:
+        """Copy the collected pushes with one transfer per remote host and release the waiting SCons worker threads."""
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            self._timer = None
+        groups: dict[str, list[tuple[dict, dict]]] = collections.defaultdict(list)
+        for push, result in pending:
+            key = json.dumps([push["program"], push["host"], push["options"], sorted(push["env"].items())], default=str)
+            groups[key].append((push, result))
+        for group in groups.values():
+            thread = threading.Thread(target=self._push, args=(group,), daemon=True)
+            thread.start()
+
+    def _push(self, group: list[tuple[dict, dict]]) -> None:
+        """Copy the sources of several pushes to one remote host in a single ``rsync --relative`` transfer.
+
+        The sources are linked into a local staging tree mirroring the remote directories and the staging tree is copied
+        with ``--copy-unsafe-links``, such that the links are replaced by the linked sources.
+
+        :param group: Push dictionaries and result dictionaries with the same program, host, options, and environment
+        """
+        first = group[0][0]
+        try:
+            with tempfile.TemporaryDirectory(prefix="waves-rsync-") as staging:
+                roots = {"absolute": f"{first['host']}:/", "relative": f"{first['host']}:"}
+                sources: dict[str, list[str]] = {"absolute": [], "relative": []}
+                for push, _result in group:
+                    directory = pathlib.PurePosixPath(push["directory"] or ".")
+                    tree = "absolute" if directory.is_absolute() else "relative"
+                    relative = directory.relative_to("/") if directory.is_absolute() else directory
+                    for source in push["sources"]:
+                        source_path = pathlib.Path(source).absolute()
+                        link = pathlib.Path(staging) / tree / relative / source_path.name
+                        link.parent.mkdir(parents=True, exist_ok=True)
+                        if not link.is_symlink():
+                            link.symlink_to(source_path)
+                        sources[tree].append(shlex.quote(f"{staging}/{tree}/./{relative / source_path.name}"))
+                exit_code = 0
+                for tree, tree_sources in sources.items():
+                    if not tree_sources or exit_code != 0:
+                        continue
+                    args = [
+                        first["program"],
+                        *first["options"],
+                        "--relative",
+                        "--no-implied-dirs",
+                        "--copy-unsafe-links",
+                        *tree_sources,
+                        shlex.quote(roots[tree]),
+                    ]
+                    exit_code = self._rsync(
+                        first["sh"], first["escape"], first["program"], args, first["env"], first["host"]
+                    )
+            for _push, result in group:
+                result["exit_code"] = exit_code
+        finally:
+            for _push, result in group:
+                result["event"].set()
+
+    def close(self) -> None:
+        """Stop the master connections and remove the temporary control socket directory."""
+        with self._lock:
+            masters = list(self._masters.values())
+            self._masters = {}
+        for master in masters:
+            if master["path"] is None:
+                continue
+            command = [
+                master["program"],
+                "-o",
+                shlex.quote(f"ControlPath={master['path']}"),
+                "-O",
+                "exit",
+                master["host"],
+            ]
+            with contextlib.suppress(OSError):
+                subprocess.run(
+                    " ".join(command),
+                    shell=True,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=False,
+                )
+        if self._temporary_directory is not None:
+            shutil.rmtree(self._temporary_directory, ignore_errors=True)
+            self._temporary_directory = None
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,208 @@
+"""Internal API module implementing the ``status`` subcommand behavior.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the CLI implementation
+to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import argparse
+import datetime
+import json
+import pathlib
+import statistics
+import time
+
+from waves import _settings, _task_report
+
+_exclude_from_namespace = set(globals().keys())
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return a 'no-help' parser for the status subcommand.
+
+    :return: parser
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "STREAM",
+        nargs="?",
+        type=pathlib.Path,
+        default=_settings._progress_default_stream,
+        help="Progress event stream file relative or absolute path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--log",
+        type=pathlib.Path,
+        default=_settings._task_accounting_default_log,
+        help="Task accounting log with historical task durations for the ETA (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        help="Re-print the status every WATCH seconds until the build finishes (default: %(default)s)",
+    )
+    return parser
+
+
+def main(
+    stream: pathlib.Path = _settings._progress_default_stream,
+    log: pathlib.Path = _settings._task_accounting_default_log,
+    watch: float | None = None,
+) -> None:
+    """Print the completion percentage and ETA of the latest build in a progress event stream.
+
+    :param stream: Progress event stream written by :meth:`waves.scons_extensions.progress_stream`
+    :param log: Task accounting log written by :meth:`waves.scons_extensions.task_accounting`. If the log does not
+        exist, the ETA uses the durations of the tasks finished by the current build.
+    :param watch: Re-print the status every ``watch`` seconds until the build finishes. If None, print once.
+
+    :raises RuntimeError: If the progress event stream does not exist or contains no events
+    """
+    try:
+        durations = {
+            target: duration for targets, duration in _task_report._task_durations(log).items() for target in targets
+        }
+    except RuntimeError:
+        durations = {}
+    while True:
+        status = _status(_read_events(stream), durations, time.time())
+        print(_format_status(status), flush=True)
+        if watch is None or status["finished"]:
+            return
+        time.sleep(watch)
+
+
+def _read_events(stream: pathlib.Path) -> list[dict]:
+    """Return the events of the latest build in a progress event stream.
+
+    Malformed lines, e.g. a line being written by the build, are skipped.
+
+    :param stream: Progress event stream
+
+    :returns: events of the latest build in stream order
+
+    :raises RuntimeError: If the stream does not exist or contains no events
+    """
+    if not stream.is_file():
+        raise RuntimeError(f"'{stream}' does not exist or is not a file.")
+    events = []
+    for line in stream.read_text().splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:  # noqa: PERF203
+            continue
+    if not events:
+        raise RuntimeError(f"'{stream}' contains no progress events.")
+    build = events[-1].get("build")
+    return [event for event in events if event.get("build") == build]
+
+
+def _status(events: list[dict], durations: dict[str, float], now: float) -> dict:
+    """Return the progress summary of a build.
+
+    Tasks without a finish or failure event are reported as running until the build finishes. The ETA is the expected
+    remaining work divided by the number of running tasks. The expected duration of a running
+    task is its historical duration, if available. The expected duration of pending tasks and of running tasks without
+    a historical duration is the mean duration of the tasks finished by this build, then the mean historical duration.
+
+    :param events: Events of one build in stream order
+    :param durations: Historical task duration by target absolute path
+    :param now: Current time in seconds since the epoch
+
+    :returns: progress summary with ``build``, ``tasks``, ``complete``, ``failed``, ``running``, ``elapsed``,
+        ``percent``, ``eta``, and ``finished`` keys. Running tasks are ``(target, elapsed, expected)`` tuples. The ETA
+        is None if no duration is known.
+    """
+    total = 0
+    start = events[0]["time"]
+    finished = False
+    end = now
+    complete: dict[str, float | None] = {}
+    failed: set[str] = set()
+    running: dict[str, float] = {}
+    for event in events:
+        name = event.get("event")
+        target = event["targets"][0] if event.get("targets") else None
+        if name == "build_start":
+            total = event.get("tasks", 0)
+            start = event["time"]
+        elif name == "build_finish":
+            finished = True
+            end = event["time"]
+        elif target is None:
+            continue
+        elif name == "start":
+            running[target] = event["time"]
+        elif name == "finish":
+            running.pop(target, None)
+            complete[target] = event.get("wall_time")
+        elif name == "up_to_date":
+            complete[target] = None
+        elif name == "failure":
+            running.pop(target, None)
+            failed.add(target)
+
+    # Tasks without a finish event after the build finished were interrupted
+    if finished:
+        running.clear()
+
+    finished_durations = [duration for duration in complete.values() if duration is not None]
+    if finished_durations:
+        mean_duration: float | None = statistics.fmean(finished_durations)
+    elif durations:
+        mean_duration = statistics.fmean(durations.values())
+    else:
+        mean_duration = None
+
+    total = max(total, len(complete) + len(failed) + len(running))
+    running_tasks = [
+        (target, now - started, durations.get(target, mean_duration)) for target, started in running.items()
+    ]
+    pending = total - len(complete) - len(failed) - len(running)
+    eta = None
+    if finished or (not running and not pending):
+        eta = 0.0
+    elif mean_duration is not None:
+        remaining = sum(max(expected - elapsed, 0.0) for _target, elapsed, expected in running_tasks if expected)
+        eta = (remaining + pending * mean_duration) / max(len(running), 1)
+    return {
+        "build": events[0].get("build"),
+        "tasks": total,
+        "complete": len(complete),
+        "failed": len(failed),
+        "running": running_tasks,
+        "elapsed": end - start,
+        "percent": 100.0 * len(complete) / total if total else 100.0,
+        "eta": eta,
+        "finished": finished,
+    }
+
+
+def _format_status(status: dict) -> str:
+    """Return the progress summary text.
+
+    :param status: Progress summary. See :meth:`_status`.
+
+    :returns: progress summary text with one line per running task
+    """
+
+    def duration(seconds: float) -> str:
+        return str(datetime.timedelta(seconds=round(seconds)))
+
+    eta = "unknown" if status["eta"] is None else duration(status["eta"])
+    state = "finished" if status["finished"] else f"ETA {eta}"
+    lines = [
+        (
+            f"Build {status['build']}: {status['complete']}/{status['tasks']} tasks complete "
+            f"({status['percent']:.1f}%), {status['failed']} failed, {len(status['running'])} running. "
+            f"Elapsed {duration(status['elapsed'])}, {state}"
+        )
+    ]
+    for target, elapsed, expected in status["running"]:
+        expected_text = f" of {duration(expected)} expected" if expected else ""
+        lines.append(f"  {target}: {duration(elapsed)}{expected_text}")
+    return "\n".join(lines)
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
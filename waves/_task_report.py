@@ -0,0 +1,174 @@
+"""Internal API module implementing the ``task_report`` subcommand behavior.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the CLI implementation
+to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import argparse
+import json
+import pathlib
+
+import pandas
+
+from waves import _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+_numeric_columns = ("wall_time", "user_time", "system_time", "max_rss", "bytes_written")
+_task_columns = ["targets", "builder", "parameter_set", *_numeric_columns, "exit_code"]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return a 'no-help' parser for the task_report subcommand.
+
+    :return: parser
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "LOG",
+        nargs="?",
+        type=pathlib.Path,
+        default=_settings._task_accounting_default_log,
+        help="Task accounting log relative or absolute path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--all-builds",
+        action="store_true",
+        help="Summarize the tasks of all builds recorded in the log instead of the latest build (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="Number of slowest tasks to report (default: %(default)s)",
+    )
+    return parser
+
+
+def main(
+    log: pathlib.Path = _settings._task_accounting_default_log,
+    all_builds: bool = False,
+    slowest: int = 10,
+) -> None:
+    """Print a task accounting log summary by builder, by parameter set, and by slowest tasks.
+
+    :param log: Task accounting log written by :meth:`waves.scons_extensions.task_accounting`
+    :param all_builds: Summarize all builds recorded in the log instead of the latest build
+    :param slowest: Number of slowest tasks to report
+
+    :raises RuntimeError: If the log does not exist or contains no task records
+    """
+    tasks = _read_log(log)
+    if not all_builds:
+        tasks = tasks[tasks["build"] == tasks["build"].iloc[-1]]
+    builds = tasks["build"].nunique()
+    print(f"{len(tasks)} tasks from {builds} build{'s' if builds > 1 else ''} in '{log}'\n")
+    with pandas.option_context("display.max_columns", None, "display.width", None, "display.max_colwidth", 80):
+        print(f"Tasks by builder\n{_summarize(tasks, 'builder')}\n")
+        by_parameter_set = tasks.dropna(subset=["parameter_set"])
+        if not by_parameter_set.empty:
+            print(f"Tasks by parameter set\n{_summarize(by_parameter_set, 'parameter_set')}\n")
+        print(f"Slowest tasks\n{_slowest_tasks(tasks, slowest)}")
+
+
+def _read_log(log: pathlib.Path) -> pandas.DataFrame:
+    """Return the task records of a task accounting log.
+
+    Malformed lines, e.g. lines truncated by an interrupted build, are skipped.
+
+    :param log: Task accounting log
+
+    :returns: task records in log order
+
+    :raises RuntimeError: If the log does not exist or contains no task records
+    """
+    if not log.is_file():
+        raise RuntimeError(f"'{log}' does not exist or is not a file.")
+    records = []
+    for line in log.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:  # noqa: PERF203
+            continue
+    if not records:
+        raise RuntimeError(f"'{log}' contains no task records.")
+    tasks = pandas.DataFrame.from_records(records)
+    for column in ("build", "builder", "parameter_set", "targets", "exit_code", *_numeric_columns):
+        if column not in tasks:
+            tasks[column] = None
+    tasks[list(_numeric_columns)] = tasks[list(_numeric_columns)].apply(pandas.to_numeric)
+    return tasks
+
+
+def _task_durations(log: pathlib.Path) -> dict[tuple[str, ...], float]:
+    """Return the most recent successful wall time of each task recorded in a task accounting log.
+
+    :param log: Task accounting log
+
+    :returns: Task wall time by task target paths
+
+    :raises RuntimeError: If the log does not exist or contains no task records
+    """
+    tasks = _read_log(log)
+    tasks = tasks[(tasks["exit_code"].fillna(0) == 0) & tasks["wall_time"].notna()]
+    durations = {}
+    for targets, wall_time in zip(tasks["targets"], tasks["wall_time"], strict=True):
+        if targets:
+            durations[tuple(targets)] = float(wall_time)
+    return durations
+
+
+def _builder_durations(log: pathlib.Path) -> dict[str, float]:
+    """Return the median successful wall time of each builder recorded in a task accounting log.
+
+    :param log: Task accounting log
+
+    :returns: Median task wall time by builder name
+
+    :raises RuntimeError: If the log does not exist or contains no task records
+    """
+    tasks = _read_log(log)
+    tasks = tasks[(tasks["exit_code"].fillna(0) == 0) & tasks["wall_time"].notna() & tasks["builder"].notna()]
+    return {
+        str(builder): float(wall_time) for builder, wall_time in tasks.groupby("builder")["wall_time"].median().items()
+    }
+
+
+def _summarize(tasks: pandas.DataFrame, key: str) -> pandas.DataFrame:
+    """Return the task totals grouped by a task record key, sorted by total wall time.
+
+    :param tasks: Task records
+    :param key: Task record grouping key
+
+    :returns: summary table with task counts, failed task counts, total times, peak memory, and total bytes written
+    """
+    grouped = tasks.assign(failed=tasks["exit_code"].fillna(0) != 0).groupby(key)
+    summary = grouped.agg(
+        tasks=("wall_time", "size"),
+        failed=("failed", "sum"),
+        wall_time=("wall_time", "sum"),
+        mean_wall_time=("wall_time", "mean"),
+        user_time=("user_time", "sum"),
+        system_time=("system_time", "sum"),
+        max_rss=("max_rss", "max"),
+        bytes_written=("bytes_written", "sum"),
+    )
+    return summary.sort_values("wall_time", ascending=False)
+
+
+def _slowest_tasks(tasks: pandas.DataFrame, count: int) -> pandas.DataFrame:
+    """Return the slowest tasks by wall time.
+
+    :param tasks: Task records
+    :param count: Number of tasks
+
+    :returns: slowest task table with the first target of each task as the index
+    """
+    slowest = tasks.sort_values("wall_time", ascending=False).head(count)[_task_columns]
+    slowest = slowest.assign(targets=[targets[0] if targets else "" for targets in slowest["targets"]])
+    return slowest.rename(columns={"targets": "target"}).set_index("target")
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
@@ -0,0 +1,169 @@
+"""Test per-task resource accounting internal API."""
+
+import json
+import pathlib
+import threading
+from unittest.mock import patch
+
+import pytest
+import SCons.Action
+import SCons.Builder
+import SCons.Environment
+
+from waves import _accounting, _scheduler, _settings, _workers
+
+
+def test_rss_megabytes() -> None:
+    with patch("sys.platform", "linux"):
+        assert _accounting._rss_megabytes(2048) == 2.0
+    with patch("sys.platform", "darwin"):
+        assert _accounting._rss_megabytes(2097152) == 2.0
+
+
+def test_thread_times() -> None:
+    user, system = _accounting._thread_times()
+    assert user >= 0.0
+    assert system >= 0.0
+    with patch("resource.getrusage", side_effect=AttributeError), patch("time.thread_time", return_value=1.5):
+        assert _accounting._thread_times() == (1.5, 0.0)
+
+
+parameter_set_cases = {
+    "no parameter set": (["/project/build/output.txt"], None),
+    "parameter set": (["/project/build/parameter_set12/output.txt"], "parameter_set12"),
+    "nested": (["/project/parameter_set1/sub/output.txt"], "parameter_set1"),
+    "second target": (["/project/output.txt", "/project/parameter_set3/output.txt"], "parameter_set3"),
+    "file name only": (["/project/parameter_set1.txt"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("targets", "expected"),
+    parameter_set_cases.values(),
+    ids=parameter_set_cases.keys(),
+)
+def test_parameter_set(targets: list[str], expected: str | None) -> None:
+    assert _accounting._parameter_set(targets) == expected
+
+
+def test_accounting_log(tmp_path: pathlib.Path) -> None:
+    log = _accounting.AccountingLog(tmp_path / "subdirectory" / "log.jsonl")
+    threads = [threading.Thread(target=log.write, args=({"index": index},)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    records = [json.loads(line) for line in log.path.read_text().splitlines()]
+    assert sorted(record["index"] for record in records) == list(range(8))
+    assert {record["build"] for record in records} == {log.build}
+
+
+def test_accounting_spawn(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    usage: list[dict] = []
+    spawn = _accounting.AccountingSpawn(env["SPAWN"], usage)
+    output = tmp_path / "output file.txt"
+    escape = env["ESCAPE"]
+    args = ["echo", "hello", ">", escape(str(output)), "&&", "exit", "3"]
+    assert spawn(env["SHELL"], escape, "echo", args, env["ENV"]) == 3
+    assert output.read_text() == "hello\n"
+    assert len(usage) == 1
+    assert set(usage[0]) == {"user_time", "system_time", "max_rss"}
+
+    # Systems without wait4 are not measured
+    with patch("waves._accounting.os", spec=[]):
+        assert spawn(env["SHELL"], escape, "echo", ["true"], env["ENV"]) == 0
+    assert len(usage) == 1
+
+
+def test_accounting_action(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    command = SCons.Action.Action("echo accounting > ${TARGET}")
+    action = _accounting.AccountingAction(command, builder="Echo")
+    (tmp_path / "parameter_set0").mkdir()
+    target = env.File(str(tmp_path / "parameter_set0" / "target.txt"))
+    log = _accounting.AccountingLog(tmp_path / "log.jsonl")
+
+    # Wrapped action strings are unchanged
+    assert str(action) == str(command)
+    assert action.get_contents([target], [], env) == command.get_contents([target], [], env)
+
+    # Execute without an accounting log
+    assert action([target], [], env, show=False) == 0
+    assert not log.path.exists()
+
+    # Dry runs are not recorded
+    env[_settings._task_accounting_variable] = log
+    with patch("SCons.Action.execute_actions", False):
+        action([target], [], env, show=False)
+    assert not log.path.exists()
+
+    assert action([target], [], env, show=False) == 0
+    record = json.loads(log.path.read_text())
+    assert record["targets"] == [str(target)]
+    assert record["builder"] == "Echo"
+    assert record["parameter_set"] == "parameter_set0"
+    assert record["exit_code"] == 0
+    assert record["bytes_written"] == len("accounting\n")
+    assert record["wall_time"] > 0.0
+    assert record["max_rss"] > 0.0
+
+    # Failed tasks and Python function actions
+    def fail(target: list, source: list, env: SCons.Environment.Environment) -> int:  # noqa: ARG001
+        return 2
+
+    log.path.unlink()
+    action = _accounting.AccountingAction(SCons.Action.Action(fail))
+    env.Append(BUILDERS={"Fail": SCons.Builder.Builder(action=action)})
+    nodes = env.Fail(target=[str(tmp_path / "failed.txt")], source=[])
+    with pytest.raises(SCons.Errors.BuildError):
+        nodes[0].build()
+    record = json.loads(log.path.read_text())
+    assert record["builder"] == "Fail"
+    assert record["exit_code"] == 2
+    assert record["max_rss"] is None
+    assert record["bytes_written"] == 0
+
+
+def test_builder_name() -> None:
+    env = SCons.Environment.Environment()
+    builder = SCons.Builder.Builder(action="touch ${TARGET}")
+    env.Append(BUILDERS={"Touch": builder})
+    nodes = env.Touch(target=["target.txt"], source=[])
+    assert _accounting.AccountingAction.builder_name(nodes, env) == "Touch"
+    assert _accounting.AccountingAction.builder_name(nodes, SCons.Environment.Environment()) == "BuilderBase"
+    assert _accounting.AccountingAction.builder_name([], env) == "unknown"
+
+
+def test_node_builder_name(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"Solver": SCons.Builder.Builder(action="solver ${SOURCE} > ${TARGET}")})
+    nodes = env.Solver(target=[str(tmp_path / "job.odb")], source=[str(tmp_path / "job.inp")])
+    assert _accounting._builder_name(nodes[0]) == "Solver"
+    assert _accounting._builder_name(env.File(str(tmp_path / "job.inp"))) is None
+
+    # Accounting builder names take precedence, including inside resource admission
+    builder = nodes[0].get_builder()
+    builder.action = _scheduler.ResourceAction(_accounting.AccountingAction(builder.action, builder="Abaqus"), {})
+    assert _accounting._builder_name(nodes[0]) == "Abaqus"
+
+
+def test_accounting_builder() -> None:
+    builder = SCons.Builder.Builder(action="touch ${TARGET}")
+    assert _accounting.accounting_builder(builder, name="Touch") is builder
+    assert isinstance(builder.action, _accounting.AccountingAction)
+    wrapped = builder.action
+    _accounting.accounting_builder(builder)
+    assert builder.action is wrapped
+
+    builder = SCons.Builder.Builder(action=_scheduler.ResourceAction(SCons.Action.Action("touch ${TARGET}"), {}))
+    _accounting.accounting_builder(builder)
+    assert isinstance(builder.action, _scheduler.ResourceAction)
+    assert isinstance(builder.action.action, _accounting.AccountingAction)
+
+    # Python worker pool and MATLAB engine pool tasks are recorded
+    for worker_action in (_workers.PythonWorkerAction, _workers.MatlabEngineAction):
+        builder = SCons.Builder.Builder(action=worker_action(SCons.Action.Action("touch ${TARGET}")))
+        _accounting.accounting_builder(builder)
+        assert isinstance(builder.action, _accounting.AccountingAction)
+        assert isinstance(builder.action.action, worker_action)
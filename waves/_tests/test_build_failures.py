@@ -0,0 +1,112 @@
+"""Test bounded build failure report internal API."""
+
+import pathlib
+import unittest.mock
+
+import pytest
+
+from waves import _build_failures
+
+
+def test_stdout_path(tmp_path: pathlib.Path) -> None:
+    target = tmp_path / "target.odb"
+    assert _build_failures._stdout_path(target) is None
+    target.with_suffix(".stdout").write_text("")
+    assert _build_failures._stdout_path(target) == target.with_suffix(".stdout")
+    pathlib.Path(f"{target}.stdout").write_text("")
+    assert _build_failures._stdout_path(target) == pathlib.Path(f"{target}.stdout")
+
+
+def test_read_tail(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "task.stdout"
+    path.write_text("".join(f"line {number}\n" for number in range(10)))
+
+    # The tail is limited by lines and by bytes without partial first lines
+    assert _build_failures._read_tail(path, None, None) == ("\n".join(f"line {number}" for number in range(10)), False)
+    assert _build_failures._read_tail(path, None, 2) == ("line 8\nline 9", True)
+    assert _build_failures._read_tail(path, 10, None) == ("line 9", True)
+    assert _build_failures._read_tail(path, 1000, 20) == _build_failures._read_tail(path, None, None)
+
+
+signature_start_cases = {
+    "error": (b"data\n***ERROR: message\n", 0, 5),
+    "indented error": (b"data\n \t***ERROR: message\n", 0, 5),
+    "traceback": (b"data\nTraceback (most recent call last):\n", 0, 5),
+    "first signature": (b"Traceback (most recent call last):\n***ERROR\n", 0, 0),
+    "search position": (b"***ERROR\n***ERROR\n", 9, 9),
+    "not at line start": (b"x ***ERROR\nx Traceback (most recent call last):\n****ERROR\n", 0, -1),
+    "indented traceback": (b" Traceback (most recent call last):\n", 0, -1),
+    "none": (b"data\n", 0, -1),
+}
+
+
+@pytest.mark.parametrize(
+    ("region", "position", "expected"),
+    signature_start_cases.values(),
+    ids=signature_start_cases.keys(),
+)
+def test_signature_start(region: bytes, position: int, expected: int) -> None:
+    assert _build_failures._signature_start(region, position) == expected
+
+
+error_signatures_text = (
+    "increment 1\n"
+    "***ERROR: TOO MANY ATTEMPTS\n"
+    "          FOR THIS INCREMENT\n"
+    "increment 2\n"
+    "Traceback (most recent call last):\n"
+    '  File "script.py", line 1, in <module>\n'
+    "    main()\n"
+    "ValueError: bad value\n"
+    "done\n"
+    "  ***ERROR: LAST ERROR"
+)
+error_signatures_expected = [
+    "***ERROR: TOO MANY ATTEMPTS\n          FOR THIS INCREMENT",
+    'Traceback (most recent call last):\n  File "script.py", line 1, in <module>\n    main()\nValueError: bad value',
+    "  ***ERROR: LAST ERROR",
+]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 7, 1024 * 1024])
+def test_error_signatures(tmp_path: pathlib.Path, block_size: int) -> None:
+    path = tmp_path / "task.stdout"
+    path.write_text(error_signatures_text)
+    assert _build_failures._error_signatures(path, block_size=block_size) == (error_signatures_expected, False)
+
+    # The file is not read past the maximum number of signatures
+    assert _build_failures._error_signatures(path, max_signatures=1, block_size=block_size) == (
+        error_signatures_expected[:1],
+        True,
+    )
+    assert _build_failures._error_signatures(path, max_signatures=3, block_size=block_size) == (
+        error_signatures_expected,
+        False,
+    )
+
+    # Long signatures keep their last lines
+    signatures, _more = _build_failures._error_signatures(path, max_lines=2, block_size=block_size)
+    assert signatures[1] == "    main()\nValueError: bad value"
+
+    # File content is searched without a file
+    assert _build_failures._error_signatures(error_signatures_text.encode(), block_size=block_size) == (
+        error_signatures_expected,
+        False,
+    )
+
+
+def test_error_signatures_long_lines(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "task.stdout"
+    path.write_text(f"{'x' * 50}\n***ERROR: {'y' * 50}\n{'z' * 50}***ERROR: not a signature\n")
+    with unittest.mock.patch.object(_build_failures, "_max_line_length", 20):
+        assert _build_failures._error_signatures(path, block_size=8) == (["***ERROR: yyyyyyyyyy"], False)
+
+
+def test_summary_table() -> None:
+    rows = [("build/solver.odb", "1", "10+", "***ERROR: TOO MANY ATTEMPTS"), ("script.csv", "2", "0", "")]
+    assert _build_failures._summary_table(rows).splitlines() == [
+        "Target            Exit  Errors  First error",
+        "build/solver.odb  1     10+     ***ERROR: TOO MANY ATTEMPTS",
+        "script.csv        2     0",
+    ]
+    assert _build_failures._summary_table(rows, width=40).splitlines()[1] == "build/solver.odb  1     10+     ***ER..."
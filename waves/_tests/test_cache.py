@@ -0,0 +1,198 @@
+"""Test shared artifact build cache internal API."""
+
+import gzip
+import os
+import pathlib
+import unittest.mock
+
+import pytest
+import SCons.Environment
+
+from waves import _cache, _settings
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [(0, "0 B"), (1023, "1023 B"), (1536, "1.5 KiB"), (3 * 1024**3, "3.0 GiB"), (2048 * 1024**4, "2048.0 TiB")],
+)
+def test_format_bytes(size: int, expected: str) -> None:
+    assert _cache._format_bytes(size) == expected
+
+
+def test_link(tmp_path: pathlib.Path) -> None:
+    source = tmp_path / "source.odb"
+    source.write_text("contents")
+
+    # Hardlinks share the source file
+    assert _cache._link(str(source), str(tmp_path / "hardlink"), "hardlink")
+    assert (tmp_path / "hardlink").stat().st_ino == source.stat().st_ino
+
+    # Hardlinks fall back to reflinks and reflinks fall back to copies
+    with (
+        unittest.mock.patch("os.link", side_effect=OSError),
+        unittest.mock.patch("waves._cache._reflink") as mock_reflink,
+        unittest.mock.patch("shutil.copystat"),
+    ):
+        assert _cache._link(str(source), str(tmp_path / "reflink"), "hardlink")
+        mock_reflink.assert_called_once_with(str(source), str(tmp_path / "reflink"))
+    with unittest.mock.patch("waves._cache._reflink", side_effect=OSError):
+        assert not _cache._link(str(source), str(tmp_path / "copy"), "reflink")
+    with unittest.mock.patch("waves._cache._reflink") as mock_reflink:
+        assert not _cache._link(str(source), str(tmp_path / "copy"), "copy")
+        mock_reflink.assert_not_called()
+
+    # Failed reflinks do not leave a destination file
+    with unittest.mock.patch("fcntl.ioctl", side_effect=OSError), pytest.raises(OSError):  # noqa: PT011
+        _cache._reflink(str(source), str(tmp_path / "failed"))
+    assert not (tmp_path / "failed").exists()
+
+
+def test_configure() -> None:
+    cache_class = _cache.ArtifactCacheDir.configure(link="copy", compress_after=10.0, size_budget=100)
+    assert issubclass(cache_class, _cache.ArtifactCacheDir)
+    assert (cache_class.link, cache_class.compress_after, cache_class.size_budget) == ("copy", 10.0, 100)
+
+    # Configured classes count their own statistics
+    cache_class.count(requests=2, hits=1)
+    assert cache_class.statistics["requests"] == 2
+    assert _cache.ArtifactCacheDir.configure().statistics["requests"] == 0
+
+    with pytest.raises(RuntimeError):
+        _cache.ArtifactCacheDir.configure(link="symlink")
+
+
+def test_copy(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    cache_class = _cache.ArtifactCacheDir.configure(link="hardlink")
+    target = tmp_path / "target.odb"
+    target.write_bytes(b"x" * 100)
+
+    # Targets are pushed and retrieved as links
+    entry = tmp_path / "entry"
+    cache_class.copy_to_cache(env, str(target), str(entry))
+    assert entry.stat().st_ino == target.stat().st_ino
+    retrieved = tmp_path / "retrieved.odb"
+    cache_class.copy_from_cache(env, str(entry), str(retrieved))
+    assert retrieved.stat().st_ino == entry.stat().st_ino
+    assert cache_class.statistics["linked"] == 200
+
+    # Compressed entries are decompressed, including entries compressed after the cache lookup
+    with gzip.open(f"{entry}{_settings._cache_compressed_suffix}", "wb") as compressed:
+        compressed.write(b"y" * 100)
+    entry.unlink()
+    decompressed = tmp_path / "decompressed.odb"
+    cache_class.copy_from_cache(env, str(entry), str(decompressed))
+    assert decompressed.read_bytes() == b"y" * 100
+    assert cache_class.statistics["linked"] == 200
+
+    # Copies are used without links
+    copy_class = _cache.ArtifactCacheDir.configure(link="copy")
+    copy = tmp_path / "copy.odb"
+    copy_class.copy_to_cache(env, str(target), str(copy))
+    assert copy.read_bytes() == target.read_bytes()
+    assert copy.stat().st_ino != target.stat().st_ino
+    assert copy_class.statistics["linked"] == 0
+
+
+def test_cachepath(tmp_path: pathlib.Path) -> None:
+    cache = _cache.ArtifactCacheDir.configure()(str(tmp_path / "cache"))
+    node = unittest.mock.Mock()
+    node.get_cachedir_bsig.return_value = "abcdef"
+    cachedir, cachefile = cache.cachepath(node)
+    assert cachefile == os.path.join(cachedir, "abcdef")  # noqa: PTH118
+
+    # Compressed entries are used only without an uncompressed entry
+    pathlib.Path(cachedir).mkdir(parents=True)
+    compressed = f"{cachefile}{_settings._cache_compressed_suffix}"
+    pathlib.Path(compressed).write_bytes(b"")
+    assert cache.cachepath(node) == (cachedir, compressed)
+    pathlib.Path(cachefile).write_bytes(b"")
+    assert cache.cachepath(node) == (cachedir, cachefile)
+
+
+def test_maintain(tmp_path: pathlib.Path) -> None:
+    cache_directory = tmp_path / "cache"
+    entries = {}
+    for index, name in enumerate(("ab01", "ab02", "cd03", "cd04")):
+        entry = cache_directory / name[:2].upper() / name
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        entry.write_bytes(bytes(1000))
+        entry.chmod(0o664)
+        os.utime(entry, (1000.0 + index, 1000.0 + index))
+        entries[name] = entry
+    (cache_directory / "config").write_text("{}")
+    (cache_directory / "AB" / ".temporary").write_bytes(bytes(1000))
+
+    # Cold entries are compressed with their permissions and modification time
+    cache_class = _cache.ArtifactCacheDir.configure(compress_after=1.5)
+    cache_class.maintain(cache_directory, now=1003.0)
+    compressed = [entry.with_name(f"{entry.name}{_settings._cache_compressed_suffix}") for entry in entries.values()]
+    assert [path.exists() for path in compressed] == [True, True, False, False]
+    assert not entries["ab01"].exists()
+    assert compressed[0].stat().st_mtime == 1000.0
+    assert compressed[0].stat().st_mode & 0o777 == 0o664
+    with gzip.open(compressed[0], "rb") as decompressed:
+        assert decompressed.read() == bytes(1000)
+    assert cache_class.statistics["compressed"] == 2
+
+    # The least recently used entries are evicted to the size budget
+    cache_class = _cache.ArtifactCacheDir.configure(size_budget=compressed[1].stat().st_size + 2000)
+    cache_class.maintain(cache_directory, now=1003.0)
+    assert not compressed[0].exists()
+    assert compressed[1].exists()
+    assert entries["cd03"].exists()
+    assert entries["cd04"].exists()
+    assert (cache_directory / "AB" / ".temporary").exists()
+    assert cache_class.statistics["evicted"] == 1
+
+
+def test_finish(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    cache_class = _cache.ArtifactCacheDir.configure()
+    cache_class.count(requests=4, hits=3, retrieved=3 * 1024**3, linked=1024**3, evicted=1, evicted_bytes=2048)
+    with unittest.mock.patch.object(cache_class, "maintain") as mock_maintain:
+        cache_class.finish(tmp_path)
+    mock_maintain.assert_called_once_with(tmp_path)
+    assert capsys.readouterr().out == (
+        f"WAVES artifact cache '{tmp_path}': 4 requests, 3 hits (75.0%), 1 misses, 3.0 GiB retrieved instead of built, "
+        "1.0 GiB linked instead of copied, 1 entries evicted (2.0 KiB)\n"
+    )
+
+    # Read only and missing caches are not maintained
+    with (
+        unittest.mock.patch("SCons.CacheDir.cache_readonly", True),
+        unittest.mock.patch.object(cache_class, "maintain") as mock_maintain,
+    ):
+        cache_class.finish(tmp_path, report=False)
+        cache_class.finish(tmp_path / "missing")
+    mock_maintain.assert_not_called()
+    assert capsys.readouterr().out == ""
+
+
+def test_retrieve(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    cache_class = _cache.ArtifactCacheDir.configure(link="hardlink")
+    env.CacheDir(str(tmp_path / "cache"), custom_class=cache_class)
+    target = env.File(str(tmp_path / "build" / "output.odb"))
+    env.Command(target, [], "touch $TARGET")
+    cache = env.get_CacheDir()
+    cachedir, cachefile = cache.cachepath(target)
+
+    # Cache misses and hits are counted with the retrieved bytes
+    assert not cache.retrieve(target)
+    pathlib.Path(cachedir).mkdir(parents=True)
+    pathlib.Path(cachefile).write_bytes(bytes(100))
+    pathlib.Path(target.get_dir().get_abspath()).mkdir()
+    assert cache.retrieve(target)
+    assert pathlib.Path(target.get_abspath()).stat().st_ino == pathlib.Path(cachefile).stat().st_ino
+    assert {key: cache_class.statistics[key] for key in ("requests", "hits", "retrieved")} == {
+        "requests": 2,
+        "hits": 1,
+        "retrieved": 100,
+    }
+
+    # Entries removed during retrieval are cache misses
+    pathlib.Path(target.get_abspath()).unlink()
+    with unittest.mock.patch.object(cache_class, "copy_from_cache", side_effect=FileNotFoundError):
+        assert not cache.retrieve(target)
+    assert not pathlib.Path(target.get_abspath()).exists()
+    assert cache_class.statistics["hits"] == 1
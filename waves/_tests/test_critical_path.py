@@ -0,0 +1,124 @@
+"""Test the critical_path subcommand internal API."""
+
+import json
+import pathlib
+
+import networkx
+import pytest
+
+from waves import _critical_path
+
+# Tree output of the ``scons -Q --tree=status -n`` command for two independent chains of tasks
+tree_output = """[E b   C        ]+-report.txt
+[E b   C        ]  +-long.txt
+[E b   C        ]  | +-source.txt
+[E b   C        ]  +-second.txt
+[E b   C        ]    +-first.txt
+[E b   C        ]      +-source.txt
+"""
+
+durations = {
+    ("/root/report.txt",): 1.0,
+    ("/root/long.txt", "/root/long.txt.stdout"): 10.0,
+    ("/root/first.txt",): 4.0,
+    ("/root/second.txt",): 3.0,
+}
+
+
+def task_graph() -> networkx.DiGraph:
+    """Return the test tree graph with recorded task durations.
+
+    :returns: graph with the ``task`` and ``duration`` node attributes
+    """
+    graph = networkx.DiGraph([("source.txt", "long.txt"), ("source.txt", "first.txt"), ("first.txt", "second.txt")])
+    graph.add_edges_from([("long.txt", "report.txt"), ("second.txt", "report.txt")])
+    graph, _tasks = _critical_path._task_graph(graph, durations, pathlib.Path("/root"))
+    return graph
+
+
+def test_task_graph() -> None:
+    graph = networkx.DiGraph([("source.txt", "sub/../long.txt")])
+    graph, tasks = _critical_path._task_graph(graph, durations, pathlib.Path("/root"))
+    assert tasks == {"/root/long.txt": 10.0}
+    assert graph.nodes["sub/../long.txt"] == {"task": "/root/long.txt", "duration": 10.0}
+    assert graph.nodes["source.txt"] == {"task": None, "duration": 0.0}
+
+
+def test_critical_path() -> None:
+    graph = task_graph()
+    assert _critical_path._critical_path(graph) == (11.0, ["source.txt", "long.txt", "report.txt"])
+    assert _critical_path._critical_path(graph, weights={"long.txt": 0.0}) == (
+        8.0,
+        ["source.txt", "first.txt", "second.txt", "report.txt"],
+    )
+    assert _critical_path._critical_path(networkx.DiGraph()) == (0.0, [])
+
+
+def test_path_tasks() -> None:
+    graph = task_graph()
+    _span, path = _critical_path._critical_path(graph)
+    assert _critical_path._path_tasks(graph, path) == ["/root/long.txt", "/root/report.txt"]
+
+    table = _critical_path._path_table(graph, ["/root/long.txt", "/root/report.txt"])
+    assert list(table["finish"]) == [10.0, 11.0]
+
+
+def test_speedup() -> None:
+    table = _critical_path._speedup(18.0, 11.0, [1, 2, 4])
+    assert list(table["minimum_makespan"]) == [18.0, 11.0, 11.0]
+    assert list(table["greedy_makespan"]) == [18.0, 14.5, 12.75]
+    assert table.loc[2, "maximum_speedup"] == pytest.approx(18.0 / 11.0)
+
+
+def test_shortening() -> None:
+    graph = task_graph()
+    table = _critical_path._shortening(graph, ["/root/long.txt", "/root/report.txt"], 10)
+    assert list(table.index) == ["/root/long.txt", "/root/report.txt"]
+    assert list(table["reduction"]) == [3.0, 1.0]
+    assert len(_critical_path._shortening(graph, ["/root/long.txt", "/root/report.txt"], 1)) == 1
+
+
+def test_mark_critical_path(tmp_path: pathlib.Path) -> None:
+    log = tmp_path / "log.jsonl"
+    log.write_text(
+        "".join(
+            f"{json.dumps({'targets': list(targets), 'wall_time': wall_time})}\n"
+            for targets, wall_time in durations.items()
+        )
+    )
+    graph = task_graph()
+    graph.add_node("Node count: 5")
+    graph = _critical_path._mark_critical_path(graph, log, pathlib.Path("/root"))
+    assert [node for node in graph.nodes if graph.nodes[node]["critical_path"]] == [
+        "source.txt",
+        "long.txt",
+        "report.txt",
+    ]
+    assert graph.edges["long.txt", "report.txt"]["critical_path"]
+    assert not graph.edges["second.txt", "report.txt"]["critical_path"]
+
+
+def test_main(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    input_file = tmp_path / "tree.txt"
+    input_file.write_text(tree_output)
+    log = tmp_path / "log.jsonl"
+    log.write_text(
+        "".join(
+            f"{json.dumps({'targets': [str(tmp_path / target) for target in targets], 'wall_time': wall_time})}\n"
+            for targets, wall_time in [(["report.txt"], 1.0), (["long.txt"], 10.0), (["first.txt"], 4.0)]
+        )
+    )
+
+    _critical_path.main(["report.txt"], log=log, sconstruct=tmp_path, input_file=input_file, jobs=[1, 2])
+    output = capsys.readouterr().out
+    assert output.startswith("Critical path: 11.0 s across 2 tasks. Total work: 15.0 s across 3 tasks.")
+    assert "Theoretical speedup" in output
+    assert "Tasks that most shorten the makespan" in output
+
+    with pytest.raises(RuntimeError, match="does not exist"):
+        _critical_path.main(["report.txt"], log=log, sconstruct=tmp_path)
+    with pytest.raises(RuntimeError, match="does not exist"):
+        _critical_path.main(["report.txt"], log=log, sconstruct=tmp_path, input_file=tmp_path / "missing.txt")
+    log.write_text(json.dumps({"targets": ["/elsewhere.txt"], "wall_time": 1.0}))
+    with pytest.raises(RuntimeError, match="No task of the SCons tree has a recorded duration"):
+        _critical_path.main(["report.txt"], log=log, sconstruct=tmp_path, input_file=input_file)
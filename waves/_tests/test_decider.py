@@ -0,0 +1,130 @@
+"""Test large file content decider internal API."""
+
+import pathlib
+import types
+import unittest.mock
+
+import pytest
+import SCons.Environment
+import SCons.Node.FS
+
+from waves import _decider, _settings
+
+
+@pytest.fixture
+def restore_csig(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Restore the SCons file node content signature method and the enabled deciders after the test."""
+    monkeypatch.setattr(SCons.Node.FS.File, "get_csig", SCons.Node.FS.File.get_csig)
+    monkeypatch.setattr(_decider, "_enabled_deciders", [])
+
+
+def test_sampled_fingerprint(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "file.odb"
+
+    def fingerprint(contents: bytes) -> str:
+        path.write_bytes(contents)
+        return _decider._sampled_fingerprint(path, len(contents), block_size=4, blocks=3)
+
+    # Small files are fingerprinted from their entire content
+    small = fingerprint(b"0123456789")
+    assert small.startswith(_settings._fingerprint_prefix)
+    assert fingerprint(b"0123456789") == small
+    assert fingerprint(b"01234x6789") != small
+
+    # Large files are fingerprinted from the size and the first, middle, and last sample blocks
+    contents = bytearray(b"abcdefghijklmnopqrstuvwxyz")
+    large = fingerprint(bytes(contents))
+    contents[5] = ord("X")
+    assert fingerprint(bytes(contents)) == large
+    contents[11] = ord("X")
+    assert fingerprint(bytes(contents)) != large
+    assert fingerprint(bytes(contents[:-1])) != large
+
+
+def test_fingerprint_cache(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "file.odb"
+    path.write_bytes(b"contents")
+    cache_file = tmp_path / "cache" / "fingerprints.json"
+    cache = _decider.FingerprintCache(cache_file)
+    fingerprint = cache.fingerprint(str(path))
+    assert fingerprint == _decider._sampled_fingerprint(path, 8, 1024 * 1024, 16)
+    assert cache.fingerprint(str(tmp_path / "missing.odb")) is None
+
+    # Unchanged files use the cached fingerprint without reading the file
+    with unittest.mock.patch("waves._decider._sampled_fingerprint") as mock_fingerprint:
+        assert cache.fingerprint(str(path)) == fingerprint
+        mock_fingerprint.assert_not_called()
+
+    # The cache file persists between builds for the same sample blocks
+    cache.save()
+    assert list(cache_file.parent.iterdir()) == [cache_file]
+    with unittest.mock.patch("waves._decider._sampled_fingerprint") as mock_fingerprint:
+        assert _decider.FingerprintCache(cache_file).fingerprint(str(path)) == fingerprint
+        mock_fingerprint.assert_not_called()
+    different_blocks = _decider.FingerprintCache(cache_file, blocks=4)
+    with unittest.mock.patch("waves._decider._sampled_fingerprint", return_value="new") as mock_fingerprint:
+        assert different_blocks.fingerprint(str(path)) == "new"
+        mock_fingerprint.assert_called_once()
+
+    # Modified files are fingerprinted again
+    path.write_bytes(b"modified contents")
+    assert cache.fingerprint(str(path)) != fingerprint
+
+
+@pytest.mark.usefixtures("restore_csig", "sconsign_database")
+def test_large_file_decider(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    large = tmp_path / "job.ODB"
+    large.write_bytes(b"x" * 100)
+    large_node = env.File(str(large))
+    sized = tmp_path / "data.bin"
+    sized.write_bytes(b"y" * 100)
+    small = tmp_path / "input.inp"
+    small.write_bytes(b"z")
+    target = env.File(str(tmp_path / "target.h5"))
+    fallback = unittest.mock.Mock(return_value=False)
+    decider = _decider.LargeFileDecider(fallback, _decider.FingerprintCache(), size_threshold=50)
+    decider.enable()
+    decider.enable()
+    assert _decider._enabled_deciders == [decider]
+
+    # Large files decided by the decider use the sampled fingerprint as the content signature
+    assert decider.large(large_node)
+    assert decider.large(env.File(str(sized)))
+    assert not decider.large(env.File(str(small)))
+    assert not decider.large(env.Value("value"))
+    assert not decider.scoped(large_node)
+    assert decider(large_node, target, None) is True
+    assert decider.scoped(large_node)
+    fingerprint = large_node.get_csig()
+    assert fingerprint.startswith(_settings._fingerprint_prefix)
+    assert not env.File(str(small)).get_csig().startswith(_settings._fingerprint_prefix)
+
+    # Large files of other construction environments use the SCons content signature
+    other = tmp_path / "other.odb"
+    other.write_bytes(b"x" * 100)
+    assert not env.File(str(other)).get_csig().startswith(_settings._fingerprint_prefix)
+    unscoped = env.Command(env.File(str(tmp_path / "unscoped.odb")), [], "touch ${TARGET}")[0]
+    pathlib.Path(str(unscoped)).write_bytes(b"x" * 100)
+    assert not unscoped.get_csig().startswith(_settings._fingerprint_prefix)
+
+    # Large targets built in construction environments using the decider use the sampled fingerprint
+    decider_env = env.Clone()
+    decider_env.Decider(decider)
+    built = decider_env.Command(env.File(str(tmp_path / "built.odb")), [], "touch ${TARGET}")[0]
+    pathlib.Path(str(built)).write_bytes(b"x" * 100)
+    assert decider.scoped(built)
+    assert built.get_csig().startswith(_settings._fingerprint_prefix)
+
+    # Large dependencies are decided by their fingerprint and other dependencies by the fallback decider
+    assert decider(large_node, target, types.SimpleNamespace(csig=fingerprint)) is False
+    assert decider(large_node, target, types.SimpleNamespace(csig=f"{_settings._fingerprint_prefix}other")) is True
+    assert decider(large_node, target, None) is True
+    small_node = env.File(str(small))
+    assert decider(small_node, target, None) is False
+    fallback.assert_called_once_with(small_node, target, None, None)
+
+    # Dependencies recorded with the SCons content signature are compared with the full content hash
+    content_hash = large_node.get_content_hash()
+    assert decider(large_node, target, types.SimpleNamespace(csig=content_hash)) is False
+    assert decider(large_node, target, types.SimpleNamespace(csig="0" * 32)) is True
@@ -0,0 +1,236 @@
+"""Test batched Abaqus CAE journal sessions internal API."""
+
+import os
+import pathlib
+import shlex
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import unittest.mock
+
+import pytest
+
+from waves import _journal_sessions
+from waves._tests.test_slurm import write_fake_program
+
+testing_windows = sys.platform.startswith("win")
+
+fake_abaqus = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import pathlib
+    import sys
+
+    calls = pathlib.Path(__file__).parent / "calls.txt"
+    with calls.open("a") as calls_file:
+        calls_file.write(" ".join(sys.argv[1:]) + "\\n")
+    arguments = sys.argv[1:]
+    script = arguments[arguments.index("-noGUI") + 1]
+    sys.argv = [script, *arguments[arguments.index("--") :]]
+    exec(compile(pathlib.Path(script).read_text(), script, "exec"), {{"__name__": "__main__"}})
+    """
+)
+
+journal = """import os, sys
+print("arguments", *sys.argv[sys.argv.index("--") + 1 :])
+print("directory", os.path.basename(os.getcwd()))
+print("pid", os.getpid())
+if "--fail" in sys.argv:
+    sys.exit(3)
+if "--raise" in sys.argv:
+    raise ValueError("bad input")
+if "--crash" in sys.argv:
+    sys.stdout.flush()
+    os._exit(5)
+with open("target.txt", "w") as target:
+    target.write("done")
+"""
+
+
+def shell_spawn(sh: str, escape: object, cmd: str, args: list[str], env: dict) -> int:  # noqa: ARG001
+    """Run SCons escaped command arguments in the shell as the SCons ``SPAWN`` function.
+
+    :param sh: Shell executable
+    :param escape: SCons argument escape function
+    :param cmd: Command executable
+    :param args: SCons escaped command arguments
+    :param env: Command environment variables
+
+    :returns: command exit code
+    """
+    return subprocess.run([sh, "-c", " ".join(args)], env=env, check=False).returncode
+
+
+def journal_command(abaqus: pathlib.Path, script: pathlib.Path, directory: pathlib.Path, *arguments: str) -> list[str]:
+    """Return the SCons escaped arguments of an Abaqus journal builder command.
+
+    :param abaqus: Abaqus program
+    :param script: Journal file
+    :param directory: Task directory
+    :param arguments: Journal arguments
+
+    :returns: command arguments
+    """
+    stdout = directory / "task.stdout"
+    return [
+        "cd",
+        str(directory),
+        "&&",
+        str(abaqus),
+        "cae",
+        "-noGUI",
+        str(script),
+        "--",
+        *arguments,
+        ">",
+        str(stdout),
+        "2>&1",
+    ]
+
+
+def read_output(stdout: pathlib.Path) -> dict[str, str]:
+    """Return the journal output by label.
+
+    :param stdout: Journal STDOUT file
+
+    :returns: output by label
+    """
+    lines = [line.split(" ", 1) for line in stdout.read_text().splitlines()]
+    return {line[0]: line[1] if len(line) > 1 else "" for line in lines}
+
+
+parse_journal_task_cases = {
+    "default action": (
+        ["cd", "/task", "&&", "abaqus", "cae", "-noGUI", "/journal.py", "--", "--width", "1.0", ">", "out", "2>&1"],
+        {
+            "program": "abaqus",
+            "options": [],
+            "script": "/journal.py",
+            "arguments": ["--width", "1.0"],
+            "cwd": "/task",
+            "stdout": "out",
+        },
+    ),
+    "options and quoted paths": (
+        [
+            "cd",
+            '"/task dir"',
+            "&&",
+            '"/opt/abaqus"',
+            "cae",
+            "-mesa",
+            "noGUI='/journal file.py'",
+            "--",
+            ">",
+            '"/task dir/out"',
+            "2>&1",
+        ],
+        {
+            "program": '"/opt/abaqus"',
+            "options": ["-mesa"],
+            "script": "/journal file.py",
+            "arguments": [],
+            "cwd": "/task dir",
+            "stdout": "/task dir/out",
+        },
+    ),
+    "environment prefix": (["source", "env.sh", "&&", "abaqus", "cae", "-noGUI", "j.py", "--", ">", "o", "2>&1"], None),
+    "other program": (["cd", "/task", "&&", "python", "cae", "-noGUI", "j.py", "--", ">", "o", "2>&1"], None),
+    "solver": (["cd", "/task", "&&", "abaqus", "-job", "job", "-interactive", ">", "o", "2>&1"], None),
+    "no redirect": (["cd", "/task", "&&", "abaqus", "cae", "-noGUI", "j.py", "--", "--width", "1.0"], None),
+    "no journal": (["cd", "/task", "&&", "abaqus", "cae", "-mesa", "--", ">", "o", "2>&1"], None),
+    "shell expansion": (
+        ["cd", "/task", "&&", "abaqus", "cae", "-noGUI", "j.py", "--", "$HOME", ">", "o", "2>&1"],
+        None,
+    ),
+    "split quote": (["cd", "/task", "&&", "abaqus", "cae", "-noGUI", "j.py", "--", "'a", "b'", ">", "o", "2>&1"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    parse_journal_task_cases.values(),
+    ids=parse_journal_task_cases.keys(),
+)
+def test_parse_journal_task(args: list[str], expected: dict | None) -> None:
+    assert _journal_sessions._parse_journal_task(args) == expected
+
+
+def run_tasks(spawn: _journal_sessions.JournalSessionSpawn, commands: dict[str, list[str]]) -> dict[str, int]:
+    """Run commands concurrently in SCons worker threads in dictionary order.
+
+    :param spawn: Journal session ``SPAWN`` function
+    :param commands: SCons escaped command arguments by task name
+
+    :returns: exit code by task name
+    """
+    exit_codes: dict[str, int] = {}
+
+    def run(name: str) -> None:
+        exit_codes[name] = spawn("sh", shlex.quote, "abaqus", commands[name], dict(os.environ))
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in commands]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=30)
+    return exit_codes
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_journal_session_spawn(tmp_path: pathlib.Path) -> None:
+    abaqus = write_fake_program(tmp_path, "abaqus", fake_abaqus)
+    script = tmp_path / "journal.py"
+    script.write_text(journal)
+    directories = {name: tmp_path / name for name in ("one", "two", "fail", "raise", "crash", "after")}
+    for directory in directories.values():
+        directory.mkdir()
+    passthrough = unittest.mock.Mock(wraps=shell_spawn)
+    spawn = _journal_sessions.JournalSessionSpawn(passthrough, tmp_path / "sessions", program="abaqus", window=0.5)
+
+    # Journals share one session with their own arguments, working directory, and STDOUT file
+    commands = {
+        "one": journal_command(abaqus, script, directories["one"], "--width", "1.0"),
+        "two": journal_command(abaqus, script, directories["two"], "--width", "2.0"),
+        "fail": journal_command(abaqus, script, directories["fail"], "--fail"),
+        "raise": journal_command(abaqus, script, directories["raise"], "--raise"),
+        "other": ["echo", "other"],
+    }
+    assert run_tasks(spawn, commands) == {"one": 0, "two": 0, "fail": 3, "raise": 1, "other": 0}
+    outputs = {name: read_output(directories[name] / "task.stdout") for name in ("one", "two", "fail", "raise")}
+    assert outputs["one"]["arguments"] == "--width 1.0"
+    assert outputs["two"]["arguments"] == "--width 2.0"
+    assert outputs["two"]["directory"] == "two"
+    assert len({output["pid"] for output in outputs.values()}) == 1
+    assert (directories["one"] / "target.txt").read_text() == "done"
+    assert "ValueError: bad input" in (directories["raise"] / "task.stdout").read_text()
+    assert len((tmp_path / "calls.txt").read_text().splitlines()) == 1
+    assert passthrough.call_count == 2
+    assert passthrough.call_args_list[0].args[3] == commands["other"]
+
+    # Journals after a session crash run in their own session
+    passthrough.reset_mock()
+    commands = {
+        "crash": journal_command(abaqus, script, directories["crash"], "--crash"),
+        "after": journal_command(abaqus, script, directories["after"]),
+    }
+    assert run_tasks(spawn, commands) == {"crash": 5, "after": 0}
+    assert (directories["after"] / "target.txt").read_text() == "done"
+    assert passthrough.call_count == 2
+    assert passthrough.call_args_list[1].args[3] == commands["after"]
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_journal_session_spawn_start_failure(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    abaqus = write_fake_program(tmp_path, "abaqus", "#!/bin/sh\necho 'licence unavailable'\nexit 7\n")
+    script = tmp_path / "journal.py"
+    script.write_text(journal)
+    spawn = _journal_sessions.JournalSessionSpawn(shell_spawn, tmp_path / "sessions", window=0.1, max_tasks=1)
+
+    # Sessions failing before the first journal fail all of their tasks with the session output
+    commands = {name: journal_command(abaqus, script, tmp_path, name) for name in ("one", "two")}
+    assert run_tasks(spawn, commands) == {"one": 7, "two": 7}
+    assert capsys.readouterr().err.count("licence unavailable") == 2
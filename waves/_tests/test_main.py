@@ -81,6 +81,45 @@ def test_main() -> None:
         mock_build.assert_called_once()
         assert mock_build.call_args[0][0] == [target_string]
 
+    # slurm_export subcommand
+    target_string = "dummy.target"
+    with (
+        patch("sys.argv", ["waves.py", "slurm_export", target_string, "--reconcile"]),
+        patch("waves._slurm_export.main") as mock_slurm_export,
+    ):
+        _main.main()
+        mock_slurm_export.assert_called_once()
+        assert mock_slurm_export.call_args[0][0] == [target_string]
+        assert mock_slurm_export.call_args[1]["reconcile"] is True
+
+    # task_report subcommand
+    with (
+        patch("sys.argv", ["waves.py", "task_report", "accounting.jsonl", "--slowest", "3"]),
+        patch("waves._task_report.main") as mock_task_report,
+    ):
+        _main.main()
+        mock_task_report.assert_called_once_with(pathlib.Path("accounting.jsonl"), all_builds=False, slowest=3)
+
+    # status subcommand
+    with (
+        patch("sys.argv", ["waves.py", "status", "progress.jsonl", "--watch", "30"]),
+        patch("waves._status.main") as mock_status,
+    ):
+        _main.main()
+        mock_status.assert_called_once_with(
+            pathlib.Path("progress.jsonl"), log=_settings._task_accounting_default_log, watch=30.0
+        )
+
+    # critical_path subcommand
+    with (
+        patch("sys.argv", ["waves.py", "critical_path", target_string, "--jobs", "4", "8"]),
+        patch("waves._critical_path.main") as mock_critical_path,
+    ):
+        _main.main()
+        mock_critical_path.assert_called_once()
+        assert mock_critical_path.call_args[0][0] == [target_string]
+        assert mock_critical_path.call_args[1]["jobs"] == [4, 8]
+
     # print_study subcommand
     parameter_study_file = "dummy.h5"
     with (
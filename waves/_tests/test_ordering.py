@@ -0,0 +1,93 @@
+"""Test longest expected duration first task ordering internal API."""
+
+import json
+import pathlib
+
+import SCons.Builder
+import SCons.Environment
+import SCons.Taskmaster
+
+from waves import _ordering, _progress
+
+
+def environment(tmp_path: pathlib.Path) -> tuple[SCons.Environment.Environment, dict]:
+    """Return a construction environment with a short and a long chain of tasks building a report.
+
+    :param tmp_path: Build directory
+
+    :returns: construction environment, target nodes by name
+    """
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"Solver": SCons.Builder.Builder(action="solver ${SOURCE} > ${TARGET}")})
+    env.Append(BUILDERS={"Report": SCons.Builder.Builder(action="report ${SOURCES} > ${TARGET}")})
+    nodes = {}
+    nodes["short"] = env.Solver(target=[str(tmp_path / "short.odb")], source=[str(tmp_path / "short.inp")])[0]
+    nodes["first"] = env.Solver(target=[str(tmp_path / "first.odb")], source=[str(tmp_path / "long.inp")])[0]
+    nodes["second"] = env.Solver(target=[str(tmp_path / "second.odb")], source=[nodes["first"]])[0]
+    nodes["report"] = env.Report(target=[str(tmp_path / "report.txt")], source=[nodes["short"], nodes["second"]])[0]
+    return env, nodes
+
+
+def test_longest_first_order(tmp_path: pathlib.Path) -> None:
+    _env, nodes = environment(tmp_path)
+    ordering = _ordering.LongestFirstOrder(
+        {nodes["short"].get_abspath(): 10.0, nodes["second"].get_abspath(): 4.0},
+        {"Solver": 3.0},
+        estimates={"Report": 1.0},
+    )
+    assert ordering.expected_duration(nodes["short"]) == 10.0
+    assert ordering.expected_duration(nodes["first"]) == 3.0
+    assert ordering.expected_duration(nodes["report"]) == 1.0
+    assert ordering.expected_duration(nodes["first"].sources[0]) == 0.0
+    assert ordering.priority(nodes["second"]) == 7.0
+    assert ordering.priority(nodes["report"]) == 11.0
+
+    # Longest chain last, because the Taskmaster pops candidates from the end of the stack
+    assert ordering([nodes["short"], nodes["second"]]) == [nodes["second"], nodes["short"]]
+    ordering.durations[nodes["first"].get_abspath()] = 20.0
+    ordering._priorities.clear()
+    assert ordering([nodes["second"], nodes["short"]]) == [nodes["short"], nodes["second"]]
+
+    # Missing history uses the default estimate
+    ordering = _ordering.LongestFirstOrder({}, {}, default=2.0)
+    assert ordering.priority(nodes["report"]) == 6.0
+
+
+def scons_order(dependencies: list) -> list:
+    """Return the dependencies in reverse order, e.g. an SCons Taskmaster order function.
+
+    :param dependencies: Unvisited dependency nodes
+
+    :returns: reversed dependency nodes
+    """
+    return dependencies[::-1]
+
+
+def test_ordered_taskmaster(tmp_path: pathlib.Path) -> None:
+    _env, nodes = environment(tmp_path)
+    ordering = _ordering.LongestFirstOrder({}, {})
+    try:
+        _ordering.OrderedTaskmaster.ordering = ordering
+        taskmaster = _ordering.OrderedTaskmaster([nodes["report"]], order=scons_order)
+    finally:
+        _ordering.OrderedTaskmaster.ordering = None
+    assert isinstance(taskmaster, SCons.Taskmaster.Taskmaster)
+    assert taskmaster.order is ordering
+    assert ordering.order is scons_order
+
+    taskmaster = _ordering.OrderedTaskmaster([nodes["report"]])
+    assert taskmaster.order([1, 2]) == [1, 2]
+    assert taskmaster.tasker is SCons.Taskmaster.OutOfDateTask
+
+    # Progress streams wrap the task class and write the build start event
+    stream = _progress.ProgressStream(tmp_path / "progress.jsonl")
+    try:
+        _ordering.OrderedTaskmaster.progress = stream
+        taskmaster = _ordering.OrderedTaskmaster([nodes["report"]], tasker=SCons.Taskmaster.AlwaysTask)
+    finally:
+        _ordering.OrderedTaskmaster.progress = None
+    assert issubclass(taskmaster.tasker, SCons.Taskmaster.AlwaysTask)
+    assert taskmaster.tasker.__name__ == "ProgressAlwaysTask"
+    event = json.loads((tmp_path / "progress.jsonl").read_text())
+    assert event["event"] == "build_start"
+    assert event["tasks"] == 4
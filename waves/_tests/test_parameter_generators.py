@@ -11,7 +11,7 @@ import pytest
 import xarray
 
 from waves import _settings, _utilities, parameter_generators
-from waves.exceptions import ChoicesError, MutuallyExclusiveError, SchemaValidationError
+from waves.exceptions import APIError, ChoicesError, MutuallyExclusiveError, SchemaValidationError
 
 does_not_raise = contextlib.nullcontext()
 
@@ -1146,6 +1146,47 @@ def test_create_set_names(
     assert test_set_names_reversed == expected_set_names
 
 
+parse_shard_cases = {
+    "None": (None, (0, 1), does_not_raise),
+    "string": ("1/4", (1, 4), does_not_raise),
+    "tuple": ((2, 3), (2, 3), does_not_raise),
+    "single shard": ("0/1", (0, 1), does_not_raise),
+    "index equal to count": ("4/4", None, pytest.raises(APIError)),
+    "negative index": ("-1/4", None, pytest.raises(APIError)),
+    "zero count": ((0, 0), None, pytest.raises(APIError)),
+    "missing count": ("1", None, pytest.raises(APIError)),
+    "not integers": ("one/two", None, pytest.raises(APIError)),
+    "too many values": ((0, 1, 2), None, pytest.raises(APIError)),
+}
+
+
+@pytest.mark.parametrize(
+    ("shard", "expected", "outcome"),
+    parse_shard_cases.values(),
+    ids=parse_shard_cases.keys(),
+)
+def test_parse_shard(
+    shard: str | tuple[int, ...] | None,
+    expected: tuple[int, int] | None,
+    outcome: contextlib.nullcontext | pytest.RaisesExc,
+) -> None:
+    with outcome:
+        # Ignore type checks on intentionally malformed shard selectors
+        assert parameter_generators._parse_shard(shard) == expected  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 7])
+def test_shard_member(shard_count: int) -> None:
+    """Test that every set hash belongs to exactly one shard."""
+    samples = numpy.array([[index] for index in range(20)], dtype=object)
+    test_set_hashes = parameter_generators._calculate_set_hashes(["parameter_1"], samples)
+    for set_hash in test_set_hashes:
+        membership = [
+            parameter_generators._shard_member(set_hash, shard_index, shard_count) for shard_index in range(shard_count)
+        ]
+        assert membership.count(True) == 1
+
+
 test_update_set_names_cases = {
     # Unit test by direct parameter study dataset creation in expected format
     "filled dataset, no kwargs, should return as original": (
@@ -1858,6 +1899,22 @@ class TestParameterGenerator:
             for parameter in set_value:
                 assert type(set_samples[set_name][parameter]) is type(set_value[parameter])
 
+    @pytest.mark.parametrize("shard_count", [1, 2, 3])
+    def test_parameter_study_to_dict_shard(self, shard_count: int) -> None:
+        scons_iterator = DummyGenerator({}, sets=10)
+        expected = scons_iterator.parameter_study_to_dict()
+        shards = [
+            scons_iterator.parameter_study_to_dict(shard=f"{shard_index}/{shard_count}")
+            for shard_index in range(shard_count)
+        ]
+        combined: dict[str, dict[str, typing.Any]] = {}
+        for shard in shards:
+            assert not set(combined.keys()) & set(shard.keys())
+            combined.update(shard)
+        assert combined == expected
+        # Shard membership is repeatable
+        assert scons_iterator.parameter_study_to_dict(shard=(0, shard_count)) == shards[0]
+
     @pytest.mark.parametrize(
         ("schema", "file_template", "set_template", "expected"),
         templates.values(),
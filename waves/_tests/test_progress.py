@@ -0,0 +1,132 @@
+"""Test the live build progress event stream internal API."""
+
+import json
+import pathlib
+import socket
+import threading
+import typing
+
+import pytest
+import SCons.Builder
+import SCons.Environment
+import SCons.Errors
+import SCons.Taskmaster
+
+from waves import _progress
+
+
+def read_events(path: pathlib.Path) -> list[dict]:
+    """Return the events of a progress event stream file.
+
+    :param path: Progress event stream file
+
+    :returns: events
+    """
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_progress_stream(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "nested" / "progress.jsonl"
+    stream = _progress.ProgressStream(path)
+    stream.write("build_start", tasks=3)
+    stream.write("start", targets=["/job.odb"])
+    events = read_events(path)
+    assert [event["event"] for event in events] == ["build_start", "start"]
+    assert events[0]["tasks"] == 3
+    assert events[1]["targets"] == ["/job.odb"]
+    assert {event["build"] for event in events} == {stream.build}
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Requires Unix domain sockets")
+def test_progress_stream_socket(tmp_path: pathlib.Path) -> None:
+    address = tmp_path / "progress.sock"
+
+    # Events without a listener are dropped
+    stream = _progress.ProgressStream(f"unix:{address}")
+    stream.write("start", targets=["/dropped.odb"])
+    assert stream._socket is None
+
+    received = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(address))
+        server.listen(1)
+
+        def receive() -> None:
+            connection, _address = server.accept()
+            with connection:
+                received.append(connection.makefile().readline())
+
+        listener = threading.Thread(target=receive)
+        listener.start()
+        stream.write("start", targets=["/job.odb"])
+        listener.join(timeout=10.0)
+    assert json.loads(received[0])["targets"] == ["/job.odb"]
+
+
+def environment(tmp_path: pathlib.Path) -> tuple[SCons.Environment.Environment, list]:
+    """Return a construction environment with a solver task and an alias.
+
+    :param tmp_path: Build directory
+
+    :returns: construction environment, solver target nodes
+    """
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"Solver": SCons.Builder.Builder(action="cat ${SOURCE} > ${TARGET}")})
+    nodes = env.Solver(target=[str(tmp_path / "parameter_set0" / "job.odb")], source=[str(tmp_path / "job.inp")])
+    return env, nodes
+
+
+def test_task_count(tmp_path: pathlib.Path) -> None:
+    env, nodes = environment(tmp_path)
+    second = env.Solver(target=[str(tmp_path / "second.odb")], source=nodes)
+    alias = env.Alias("solve", second)
+    assert _progress._task_count(alias) == 2
+    assert _progress._task_count(nodes) == 1
+    assert _progress._task_count([env.File(str(tmp_path / "job.inp"))]) == 0
+
+
+def next_task(taskmaster: SCons.Taskmaster.Taskmaster, node: typing.Any) -> SCons.Taskmaster.Task:  # noqa: ANN401
+    """Return the prepared Taskmaster task of a node after processing the tasks of its dependencies.
+
+    :param taskmaster: SCons Taskmaster
+    :param node: Task target node
+
+    :returns: prepared task
+    """
+    task = taskmaster.next_task()
+    while task.targets[0] is not node:
+        task.prepare()
+        task.executed()
+        task.postprocess()
+        task = taskmaster.next_task()
+    task.prepare()
+    return task
+
+
+@pytest.mark.usefixtures("sconsign_database")
+def test_progress_task(tmp_path: pathlib.Path) -> None:
+    env, nodes = environment(tmp_path)
+    env.Append(BUILDERS={"Fail": SCons.Builder.Builder(action="exit 1")})
+    failing = env.Fail(target=[str(tmp_path / "failing.odb")], source=[str(tmp_path / "job.inp")])
+    (tmp_path / "job.inp").write_text("input\n")
+    path = tmp_path / "progress.jsonl"
+    stream = _progress.ProgressStream(path)
+    tasker = _progress.progress_task(SCons.Taskmaster.OutOfDateTask, stream)
+    assert tasker.__name__ == "ProgressOutOfDateTask"
+
+    task = next_task(SCons.Taskmaster.Taskmaster(failing, tasker=tasker), failing[0])
+    with pytest.raises(SCons.Errors.BuildError):
+        task.execute()
+    events = read_events(path)
+    assert [event["event"] for event in events] == ["start", "failure"]
+    assert events[1]["targets"] == [failing[0].get_abspath()]
+    assert events[1]["builder"] == "Fail"
+    assert events[1]["message"]
+
+    path.unlink()
+    task = next_task(SCons.Taskmaster.Taskmaster(nodes, tasker=tasker), nodes[0])
+    task.execute()
+    events = read_events(path)
+    assert [event["event"] for event in events] == ["start", "finish"]
+    assert events[1]["parameter_set"] == "parameter_set0"
+    assert events[1]["wall_time"] >= 0.0
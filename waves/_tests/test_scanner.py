@@ -0,0 +1,105 @@
+"""Test dependency scanner cache and file reader internal API."""
+
+import codecs
+import json
+import pathlib
+import unittest.mock
+
+import pytest
+
+from waves import _scanner
+
+
+def test_scan_cache(tmp_path: pathlib.Path) -> None:
+    cache_file = tmp_path / "cache" / "scanner.json"
+    cache = _scanner.ScanCache(cache_file)
+    assert cache.get("scanner", "key") is None
+    cache.set("scanner", "key", ["mesh.inp"])
+    assert cache.get("scanner", "key") == ["mesh.inp"]
+    assert cache.get("other", "key") is None
+
+    # The cache file persists between builds
+    cache.save()
+    assert _scanner.ScanCache(cache_file).get("scanner", "key") == ["mesh.inp"]
+    assert list(cache_file.parent.iterdir()) == [cache_file]
+    assert _scanner.ScanCache().get("scanner", "key") is None
+
+    # Unreadable cache files start an empty cache
+    cache_file.write_text("not json")
+    assert _scanner.ScanCache(cache_file).get("scanner", "key") is None
+
+
+def test_file_key(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "model.inp"
+    path.write_text("*HEADING\n")
+    key = _scanner._file_key(path)
+    assert key.endswith(f":{path}")
+    assert _scanner._file_key(str(path)) == key
+
+    # Modified files have a new file key
+    path.write_text("*HEADING\n*NODE\n")
+    assert _scanner._file_key(path) != key
+
+
+def test_scan_cache_save(tmp_path: pathlib.Path) -> None:
+    cache_file = tmp_path / "scanner.json"
+    cache_file.write_text(json.dumps({"scanner": {"old1": [], "old2": [], "old3": ["used.inp"]}}))
+    cache = _scanner.ScanCache(cache_file, max_entries=3)
+
+    # The cache file is not written without new scanner results
+    assert cache.get("scanner", "old1") == []
+    cache.save()
+    assert json.loads(cache_file.read_text())["scanner"] == {"old1": [], "old2": [], "old3": ["used.inp"]}
+
+    # The used entries and the most recent older entries are kept
+    cache.set("scanner", "new", ["new.inp"])
+    cache.save()
+    assert json.loads(cache_file.read_text())["scanner"] == {"old3": ["used.inp"], "old1": [], "new": ["new.inp"]}
+
+
+def test_shared_cache(tmp_path: pathlib.Path) -> None:
+    cache_file = str(tmp_path / "scanner.json")
+    with (
+        unittest.mock.patch.dict(_scanner._shared_caches, clear=True),
+        unittest.mock.patch("atexit.register") as mock_register,
+    ):
+        cache = _scanner._shared_cache(cache_file)
+        assert _scanner._shared_cache(cache_file) is cache
+        assert _scanner._shared_cache(str(tmp_path / "other.json")) is not cache
+    assert cache.cache_file == pathlib.Path(cache_file)
+    assert mock_register.call_count == 2
+    mock_register.assert_any_call(cache.save)
+
+
+abaqus_keyword_text_cases = {
+    "keywords": ("*HEADING\n**comment\n*NODE\n1, 0.0\n2, 1.0\n*END STEP\n", "*HEADING\n**comment\n*NODE\n*END STEP"),
+    "continuation": ("*INCLUDE,\n  INPUT=mesh.inp\n1, 2\n", "*INCLUDE,\n  INPUT=mesh.inp"),
+    "no trailing newline": ("1, 2\n*INCLUDE, INPUT=mesh.inp", "*INCLUDE, INPUT=mesh.inp"),
+    "carriage return": ("*NODE\r\n1, 2\r\n*STEP\r\n", "*NODE\r\n*STEP\r"),
+    "data only": ("1, 2\n3, *4\n", ""),
+    "empty": ("", ""),
+}
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5, 1024])
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    abaqus_keyword_text_cases.values(),
+    ids=abaqus_keyword_text_cases.keys(),
+)
+def test_abaqus_keyword_text(tmp_path: pathlib.Path, content: str, expected: str, block_size: int) -> None:
+    path = tmp_path / "input.inp"
+    path.write_bytes(content.encode("utf-8"))
+    assert _scanner._abaqus_keyword_text(path, block_size=block_size) == expected
+
+
+def test_abaqus_keyword_text_encoding(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "input.inp"
+
+    # The UTF-8 byte order mark is removed before the first keyword line
+    path.write_bytes(codecs.BOM_UTF8 + b"*INCLUDE, INPUT=mesh.inp\n1, 2\n")
+    assert _scanner._abaqus_keyword_text(path) == "*INCLUDE, INPUT=mesh.inp"
+
+    # UTF-16 files are decoded entirely
+    path.write_bytes(codecs.BOM_UTF16_LE + "*INCLUDE, INPUT=mesh.inp\n1, 2\n".encode("utf-16-le"))
+    assert _scanner._abaqus_keyword_text(path) == "*INCLUDE, INPUT=mesh.inp\n1, 2\n"
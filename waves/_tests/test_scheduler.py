@@ -0,0 +1,479 @@
+"""Test resource aware local task admission internal API."""
+
+import contextlib
+import os
+import pathlib
+import re
+import shlex
+import sys
+import threading
+import time
+import typing
+from unittest.mock import Mock, patch
+
+import pytest
+import SCons.Action
+import SCons.Environment
+import SCons.Errors
+
+from waves import _scheduler, _settings
+
+does_not_raise = contextlib.nullcontext()
+
+parse_amount_cases = {
+    "none": (None, 0.0, does_not_raise),
+    "empty": ("  ", 0.0, does_not_raise),
+    "integer": (4, 4.0, does_not_raise),
+    "string": ("2.5", 2.5, does_not_raise),
+    "kilobytes": ("512K", 0.5, does_not_raise),
+    "megabytes": ("100M", 100.0, does_not_raise),
+    "gigabytes": ("16G", 16384.0, does_not_raise),
+    "lowercase with unit": ("1gb", 1024.0, does_not_raise),
+    "terabytes": ("1T", 1048576.0, does_not_raise),
+    "negative": (-1, None, pytest.raises(RuntimeError, match="non-negative")),
+    "malformed": ("lots", None, pytest.raises(RuntimeError, match="Malformed")),
+}
+
+
+@pytest.mark.parametrize(
+    ("value", "expected", "outcome"),
+    parse_amount_cases.values(),
+    ids=parse_amount_cases.keys(),
+)
+def test_parse_amount(
+    value: str | float | None, expected: float | None, outcome: contextlib.nullcontext | pytest.RaisesExc
+) -> None:
+    with outcome:
+        assert _scheduler._parse_amount(value) == expected
+
+
+abaqus_tokens_cases = {
+    "none": (None, 5),
+    "one": (1, 5),
+    "string": ("4", 8),
+    "eight": (8, 12),
+    "sixteen": (16, 16),
+    "sixty four": (64, 28),
+}
+
+
+@pytest.mark.parametrize(
+    ("cpus", "expected"),
+    abaqus_tokens_cases.values(),
+    ids=abaqus_tokens_cases.keys(),
+)
+def test_abaqus_tokens(cpus: str | float | None, expected: int) -> None:
+    assert _scheduler._abaqus_tokens(cpus) == expected
+
+
+def test_abaqus_task_tokens() -> None:
+    env = SCons.Environment.Environment()
+    assert _scheduler._abaqus_task_tokens([], [], env) == 5
+    assert _scheduler._abaqus_task_tokens([], [], env.Override({"cpus": 16})) == 16
+
+
+licence_error_cases = {
+    "checkout": ("***ERROR: Failed to check out license for abaqus", True),
+    "users": ("Licensed number of users already reached.", True),
+    "tokens": ("Insufficient license tokens available", True),
+    "server": ("License server machine is down or not responding.", True),
+    "success": ("Abaqus License Manager checked out the following licenses:", False),
+    "input error": ("***ERROR: in keyword *STEP", False),
+}
+
+
+@pytest.mark.parametrize(
+    ("output", "expected"),
+    licence_error_cases.values(),
+    ids=licence_error_cases.keys(),
+)
+def test_abaqus_licence_error_pattern(output: str, expected: bool) -> None:
+    match = re.search(_settings._abaqus_licence_error_pattern, output, re.IGNORECASE)
+    assert (match is not None) is expected
+
+
+def test_system_memory() -> None:
+    with patch("os.sysconf", side_effect=[4096, 1024]):
+        assert _scheduler._system_memory() == 4.0
+    with patch("os.sysconf", side_effect=ValueError):
+        assert _scheduler._system_memory() is None
+
+
+cpu_list_cases = {
+    "single": ("3", [3], does_not_raise),
+    "ranges": ("0-3,8,10-11", [0, 1, 2, 3, 8, 10, 11], does_not_raise),
+    "newline": ("0-1\n", [0, 1], does_not_raise),
+    "malformed": ("0-a", None, pytest.raises(RuntimeError, match="Malformed")),
+}
+
+
+@pytest.mark.parametrize(
+    ("value", "expected", "outcome"),
+    cpu_list_cases.values(),
+    ids=cpu_list_cases.keys(),
+)
+def test_parse_cpu_list(
+    value: str, expected: list[int] | None, outcome: contextlib.nullcontext | pytest.RaisesExc
+) -> None:
+    with outcome:
+        cores = _scheduler._parse_cpu_list(value)
+        assert cores == expected
+        assert _scheduler._parse_cpu_list(_scheduler._format_cpu_list(cores)) == cores
+
+
+def test_format_cpu_list() -> None:
+    assert _scheduler._format_cpu_list([]) == ""
+    assert _scheduler._format_cpu_list([11, 0, 1, 2, 3, 8, 10, 3]) == "0-3,8,10-11"
+
+
+def test_numa_nodes(tmp_path: pathlib.Path) -> None:
+    assert _scheduler._numa_nodes(tmp_path) == []
+    for node, cpulist in (("node10", "4-5"), ("node2", "0-3"), ("node3", "\n")):
+        (tmp_path / node).mkdir()
+        (tmp_path / node / "cpulist").write_text(cpulist)
+    assert _scheduler._numa_nodes(tmp_path) == [[0, 1, 2, 3], [4, 5]]
+
+
+select_cores_cases = {
+    "no numa nodes": ([0, 1, 2, 3], 2, [], [0, 1]),
+    "best fit numa node": ([0, 1, 2, 3, 4, 5], 2, [[0, 1, 2, 3], [4, 5]], [4, 5]),
+    "first fitting numa node": ([1, 2, 3, 5, 6, 7], 3, [[0, 1, 2, 3], [4, 5, 6, 7]], [1, 2, 3]),
+    "span numa nodes": ([2, 3, 4, 5, 6], 4, [[0, 1, 2, 3], [4, 5, 6, 7]], [2, 4, 5, 6]),
+    "cores without numa node": ([0, 8, 9], 2, [[0, 1]], [8, 9]),
+}
+
+
+@pytest.mark.parametrize(
+    ("free", "count", "numa_nodes", "expected"),
+    select_cores_cases.values(),
+    ids=select_cores_cases.keys(),
+)
+def test_select_cores(free: list[int], count: int, numa_nodes: list[list[int]], expected: list[int]) -> None:
+    assert _scheduler._select_cores(free, count, numa_nodes) == expected
+
+
+def test_affinity_spawn() -> None:
+    spawn = Mock(return_value=0)
+    affinity_spawn = _scheduler.AffinitySpawn(spawn, "taskset --cpu-list 0-3")
+    assert affinity_spawn("sh", str, "cd", ["cd", "/dir", "&&", "solver", ">", "'out file'"], {}) == 0
+    spawn.assert_called_once_with(
+        "sh",
+        str,
+        "taskset",
+        ["taskset", "--cpu-list", "0-3", "sh", "-c", "'cd /dir && solver > '\"'\"'out file'\"'\"''"],
+        {},
+    )
+
+
+def test_timeout_spawn() -> None:
+    spawn = Mock(return_value=0)
+    expired: list[float] = []
+    timeout_spawn = _scheduler.TimeoutSpawn(spawn, 60.0, 5.0, expired)
+    assert timeout_spawn("sh", str, "cd", ["cd", "/dir", "&&", "solver"], {}) == 0
+    arguments = spawn.call_args.args[3]
+    assert arguments[0] == shlex.quote(sys.executable)
+    assert arguments[4:] == ["60", "5", "sh", "-c", "'cd /dir && solver'"]
+    assert expired == []
+
+    # Commands exceeding the timeout are killed with their child processes
+    expired_spawn = _scheduler.TimeoutSpawn(SCons.Environment.Environment()["SPAWN"], 0.5, 1.0, expired)
+    start = time.monotonic()
+    exit_code = expired_spawn("sh", str, "sleep", ["sleep", "30", "&", "sleep", "30"], dict(os.environ))
+    assert exit_code == 124
+    assert time.monotonic() - start < 20.0
+    assert expired == [0.5]
+
+
+class MatchingSpawn:
+    """Stand-in for the ``SPAWN`` wrappers matching task commands, e.g. :class:`waves._slurm.SbatchPollSpawn`."""
+
+    def __init__(self, spawn: typing.Callable) -> None:
+        self.spawn = spawn
+        self.commands: list[list[str]] = []
+
+    def __call__(self, sh: str, escape: typing.Callable, cmd: str, args: list[str], env: dict) -> int:
+        self.commands.append(args)
+        return self.spawn(sh, escape, cmd, args, env)
+
+
+def prefix_spawn(prefix: str) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """Return a ``SPAWN`` wrapper factory prefixing the command arguments."""
+
+    def factory(spawn: typing.Callable) -> typing.Callable:
+        return lambda sh, escape, cmd, args, env: spawn(sh, escape, cmd, [prefix, *args], env)
+
+    return factory
+
+
+def test_task_spawn() -> None:
+    base = Mock(spec=[], return_value=0)
+    env = SCons.Environment.Environment(SPAWN=base)
+
+    # SPAWN functions without wrappers are wrapped for the task
+    with _scheduler._task_spawn(env, prefix_spawn("outer")) as task_env:
+        assert isinstance(task_env["SPAWN"], _scheduler.TaskSpawn)
+        assert env["SPAWN"] is base
+
+        # Nested task wrappers wrap the enclosing task wrappers
+        with _scheduler._task_spawn(task_env, prefix_spawn("inner")) as nested_env:
+            assert nested_env["SPAWN"] is task_env["SPAWN"]
+            assert nested_env["SPAWN"]("sh", str, "solver", ["solver"], {}) == 0
+        assert base.call_args.args[3] == ["outer", "inner", "solver"]
+
+        # Commands of other threads are not modified
+        thread = threading.Thread(target=task_env["SPAWN"], args=("sh", str, "solver", ["solver"], {}))
+        thread.start()
+        thread.join()
+        assert base.call_args.args[3] == ["solver"]
+    task_env["SPAWN"]("sh", str, "solver", ["solver"], {})
+    assert base.call_args.args[3] == ["solver"]
+
+    # The task wrappers are inserted below the SPAWN wrappers matching task commands
+    matching = MatchingSpawn(base)
+    env["SPAWN"] = matching
+    for _ in range(2):
+        with _scheduler._task_spawn(env, prefix_spawn("outer")) as task_env:
+            assert task_env["SPAWN"] is matching
+            assert task_env["SPAWN"]("sh", str, "solver", ["solver"], {}) == 0
+        assert isinstance(matching.spawn, _scheduler.TaskSpawn)
+        assert matching.spawn.spawn is base
+        assert matching.commands[-1] == ["solver"]
+        assert base.call_args.args[3] == ["outer", "solver"]
+
+
+def wait_for(condition: typing.Callable[[], bool], timeout: float = 10.0) -> None:
+    """Wait until the condition is True.
+
+    :param condition: Callable returning True when the wait is over
+    :param timeout: Seconds to wait before failing the test
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestResourcePool:
+    """Test the :class:`waves._scheduler.ResourcePool` class."""
+
+    def test_capacity(self) -> None:
+        pool = _scheduler.ResourcePool({"cpus": 4, "memory": "1G"})
+        assert pool.capacity == {"cpus": 4.0, "memory": 1024.0}
+        with pytest.raises(RuntimeError, match="exceeds the capacity"), pool.acquire({"cpus": 8}):
+            pass
+        # Resources without a capacity are not limited
+        with pool.acquire({"cpus": 4, "licence": 1000}):
+            assert pool._used == {"cpus": 4.0}
+        assert pool._used["cpus"] == 0
+
+    def test_acquire(self) -> None:
+        pool = _scheduler.ResourcePool({"cpus": 4, "tokens": 2})
+        order: list[str] = []
+        release = {name: threading.Event() for name in ("large", "blocked", "small", "tokens")}
+
+        def run(name: str, request: dict[str, float]) -> None:
+            with pool.acquire(request):
+                order.append(name)
+                release[name].wait()
+
+        threads = {
+            "large": threading.Thread(target=run, args=("large", {"cpus": 3})),
+            "blocked": threading.Thread(target=run, args=("blocked", {"cpus": 4})),
+            "small": threading.Thread(target=run, args=("small", {"cpus": 1})),
+            "tokens": threading.Thread(target=run, args=("tokens", {"cpus": 0, "tokens": 2})),
+        }
+        threads["large"].start()
+        wait_for(lambda: order == ["large"])
+        threads["blocked"].start()
+        wait_for(lambda: len(pool._waiting) == 1)
+        threads["small"].start()
+        threads["tokens"].start()
+
+        # The waiting request reserves CPUs against later requests, but not uncontested resources
+        wait_for(lambda: order == ["large", "tokens"])
+        assert len(pool._waiting) == 2
+        release["tokens"].set()
+        release["large"].set()
+        wait_for(lambda: order == ["large", "tokens", "blocked"])
+        release["blocked"].set()
+        wait_for(lambda: order == ["large", "tokens", "blocked", "small"])
+        release["small"].set()
+        for thread in threads.values():
+            thread.join(timeout=10)
+        assert pool._used["cpus"] == 0
+        assert pool._waiting == []
+
+    def test_cores(self) -> None:
+        pool = _scheduler.ResourcePool({"cpus": 64}, cores=[0, 1, 2, 3, 4, 5], numa_nodes=[[0, 1, 2], [3, 4, 5]])
+        assert pool.capacity == {"cpus": 6.0}
+        with pool.acquire({"cpus": 2}) as first, pool.acquire({"cpus": "1.5"}) as second:
+            assert first == [0, 1]
+            assert second == [3, 4]
+            assert pool._used["cpus"] == 4
+            with pool.acquire({"memory": "1G"}) as third:
+                assert third == []
+        assert pool._assigned == set()
+        assert pool._used["cpus"] == 0
+
+        # Pools without CPU IDs assign no CPUs
+        with _scheduler.ResourcePool({"cpus": 2}).acquire({"cpus": 2}) as cores:
+            assert cores == []
+
+
+def test_resource_action(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    command = SCons.Action.Action("touch ${TARGET}")
+    action = _scheduler.ResourceAction(command, {"cpus": "${cpus}", "memory": "${memory}"})
+    target = env.File(str(tmp_path / "target.txt"))
+    targets = [target]
+    sources: list = []
+
+    # Wrapped action strings and signatures are unchanged
+    assert str(action) == str(command)
+    assert action.genstring(targets, sources, env) == command.genstring(targets, sources, env)
+    assert action.get_contents(targets, sources, env) == command.get_contents(targets, sources, env)
+    assert action.get_presig(targets, sources, env) == command.get_presig(targets, sources, env)
+    assert action.get_implicit_deps(targets, sources, env) == command.get_implicit_deps(targets, sources, env)
+
+    # Task keyword arguments define the request and missing CPUs request one CPU
+    assert action.request(targets, sources, env.Override({"cpus": 4, "memory": "2G"})) == {"cpus": "4", "memory": "2G"}
+    assert action.request(targets, sources, env) == {"cpus": "1", "memory": ""}
+
+    # Execute without a resource pool
+    assert action(targets, sources, env, show=False) == 0
+    assert target.exists()
+
+    # Execute with a resource pool
+    pool = _scheduler.ResourcePool({"cpus": 2})
+    env[_settings._resource_pool_variable] = pool
+    with patch.object(pool, "acquire", wraps=pool.acquire) as mock_acquire:
+        assert action(targets, sources, env.Override({"cpus": 2}), show=False) == 0
+    mock_acquire.assert_called_once_with({"cpus": "2", "memory": ""})
+
+
+def test_resource_action_retry(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    stdout = env.File(str(tmp_path / "task.stdout"))
+    statuses = iter([1, 1, 0])
+
+    def task(target: list, source: list, env: SCons.Environment.Environment) -> int:  # noqa: ARG001
+        pathlib.Path(str(target[-1])).write_text("licence unavailable")
+        return next(statuses)
+
+    action = _scheduler.ResourceAction(
+        SCons.Action.Action(task), {"tokens": lambda *_args: 2}, retries=2, backoff=5.0, retry_pattern="LICENCE"
+    )
+    pool = _scheduler.ResourcePool({"tokens": 2})
+    env[_settings._resource_pool_variable] = pool
+    with (
+        patch.object(pool, "acquire", wraps=pool.acquire) as mock_acquire,
+        patch("time.sleep") as mock_sleep,
+    ):
+        assert action([stdout], [], env, show=False) == 0
+    assert mock_acquire.call_count == 3
+    mock_acquire.assert_called_with({"tokens": 2, "cpus": "1"})
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [5.0, 10.0]
+    assert pool._used["tokens"] == 0
+
+    # Retries are limited
+    statuses = iter([1, 1, 1])
+    with patch("time.sleep") as mock_sleep:
+        assert action([stdout], [], env, show=False)
+    assert mock_sleep.call_count == 2
+
+    # Failures without a matching retry file are not retried
+    stdout_missing = env.File(str(tmp_path / "missing" / "task.stdout"))
+    assert not action.retryable([stdout_missing], [], env)
+    assert not _scheduler.ResourceAction(SCons.Action.Action(task), {}).retryable([stdout], [], env)
+    assert action.retryable([stdout], [], env)
+
+    # Only the end of the retry files is searched
+    pathlib.Path(str(stdout)).write_text("licence unavailable\n" + "x" * 64)
+    with patch("waves._settings._retry_tail_bytes", 32):
+        assert not action.retryable([stdout], [], env)
+    pathlib.Path(str(stdout)).write_text("x" * 64 + "\nlicence unavailable")
+    with patch("waves._settings._retry_tail_bytes", 32):
+        assert action.retryable([stdout], [], env)
+
+
+def test_timeout_action(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    command = SCons.Action.Action("echo solver > ${TARGETS[-1]} && sleep ${seconds}")
+    action = _scheduler.TimeoutAction(command, grace=1.0)
+    targets = [env.File(str(tmp_path / "task.stdout"))]
+
+    # Tasks without a timeout run unchanged
+    assert action.task_timeout(targets, [], env) == 0.0
+    assert action(targets, [], env.Override({"seconds": 0}), show=False) == 0
+    assert (tmp_path / "task.stdout").read_text() == "solver\n"
+
+    # Tasks finishing within the timeout succeed
+    assert action(targets, [], env.Override({"seconds": 0, "waves_timeout": 30}), show=False) == 0
+
+    # Tasks exceeding the timeout fail with a build error
+    status = action(targets, [], env.Override({"seconds": 30, "waves_timeout": "0.5"}), show=False)
+    assert isinstance(status, SCons.Errors.BuildError)
+    assert status.errstr == "Timed out after 0.5 seconds"
+    assert status.exitstatus == 124
+    assert (tmp_path / "task.stdout").read_text() == "solver\n\nWAVES timeout: Timed out after 0.5 seconds\n"
+
+    with pytest.raises(RuntimeError, match="Malformed task timeout"):
+        action.task_timeout(targets, [], env.Override({"waves_timeout": "forever"}))
+
+    # The timeout wraps the innermost SPAWN function
+    matching = MatchingSpawn(env["SPAWN"])
+    assert action(targets, [], env.Override({"seconds": 0, "waves_timeout": 30, "SPAWN": matching}), show=False) == 0
+    assert matching.commands[-1][:2] == ["echo", "solver"]
+    assert isinstance(matching.spawn, _scheduler.TaskSpawn)
+
+    # Timeouts can not stop the SLURM jobs of sbatch --wait commands
+    sbatch = _scheduler.TimeoutAction(SCons.Action.Action("sbatch --wait --wrap 'solver' > ${TARGETS[-1]}"))
+    assert sbatch(targets, [], env.Override({"SPAWN": Mock(spec=[], return_value=0)}), show=False) == 0
+    with pytest.raises(RuntimeError, match="sbatch '--time' option"):
+        sbatch(targets, [], env.Override({"waves_timeout": 30}), show=False)
+
+
+sbatch_wait_cases = {
+    "sbatch wait": ("sbatch --wait --output=job.out --wrap 'solver'", True),
+    "option order": ('cd build && sbatch --output=job.out --wait --wrap "solver"', True),
+    "absolute path": ("/usr/bin/sbatch --wait --wrap solver", True),
+    "no wait": ("sbatch --parsable --wrap solver", False),
+    "wrapped wait": ("sbatch --output=job.out --wrap 'solver --wait'", False),
+    "other option": ("sbatch --wait-all-nodes=1 --wrap solver", False),
+    "other program": ("mysbatch --wait", False),
+    "separate commands": ("sbatch --wrap solver\nsolver --wait", False),
+}
+
+
+@pytest.mark.parametrize(
+    ("command", "expected"),
+    sbatch_wait_cases.values(),
+    ids=sbatch_wait_cases.keys(),
+)
+def test_sbatch_wait_regex(command: str, expected: bool) -> None:
+    assert bool(_scheduler._sbatch_wait_regex.search(command)) is expected
+
+
+def test_resource_action_affinity(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    command = SCons.Action.Action("echo $$WAVES_CORES > ${TARGETS[0]} && echo solver > ${TARGETS[-1]}")
+    action = _scheduler.ResourceAction(command, {"cpus": "${cpus}"})
+    targets = [env.File(str(tmp_path / "cores.txt")), env.File(str(tmp_path / "task.stdout"))]
+    env[_settings._resource_pool_variable] = _scheduler.ResourcePool(
+        {"cpus": 8}, cores=[4, 5, 6, 7], affinity="env WAVES_CORES={cores}"
+    )
+    assert action(targets, [], env.Override({"cpus": 2}), show=False) == 0
+    assert (tmp_path / "cores.txt").read_text() == "4-5\n"
+    assert (tmp_path / "task.stdout").read_text() == "solver\n\nWAVES CPU affinity: env WAVES_CORES=4-5\n"
+
+    # The affinity command wraps the innermost SPAWN function
+    matching = MatchingSpawn(env["SPAWN"])
+    assert action(targets, [], env.Override({"cpus": 2, "SPAWN": matching}), show=False) == 0
+    assert matching.commands[-1][0] == "echo"
+    assert (tmp_path / "cores.txt").read_text() == "4-5\n"
+
+    # Pools without an affinity command do not pin tasks
+    env[_settings._resource_pool_variable] = _scheduler.ResourcePool({"cpus": 8}, cores=[4, 5, 6, 7])
+    assert action(targets, [], env.Override({"cpus": 2}), show=False) == 0
+    assert (tmp_path / "cores.txt").read_text() == "\n"
+    assert (tmp_path / "task.stdout").read_text() == "solver\n"
@@ -3,16 +3,41 @@
 import collections
 import contextlib
 import copy
+import json
 import os
 import pathlib
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
 import typing
 import unittest
 from unittest.mock import Mock, call, patch
 
 import pytest
 import SCons.Node.FS
-
-from waves import _utilities, parameter_generators, scons_extensions
+import SCons.Taskmaster
+import xarray
+import yaml
+
+from waves import (
+    _accounting,
+    _build_failures,
+    _cache,
+    _decider,
+    _journal_sessions,
+    _ordering,
+    _scanner,
+    _scheduler,
+    _settings,
+    _slurm,
+    _ssh,
+    _utilities,
+    _workers,
+    parameter_generators,
+    scons_extensions,
+)
 from waves._settings import (
     _abaqus_common_extensions,
     _abaqus_datacheck_extensions,
@@ -20,12 +45,16 @@ from waves._settings import (
     _abaqus_explicit_extensions,
     _abaqus_standard_extensions,
     _cd_action_prefix,
+    _hash_coordinate_key,
     _redirect_action_suffix,
     _redirect_environment_suffix,
     _sbatch_wrapper_options,
+    _set_coordinate_key,
     _stdout_extension,
 )
 from waves._tests.common import platform_check
+from waves._tests.test_slurm import write_fake_program
+from waves._tests.test_ssh import fake_ssh
 
 does_not_raise = contextlib.nullcontext()
 
@@ -510,30 +539,72 @@ def first_target_builder_factory_test_cases(
 
 
 # Actual tests
-def test_print_failed_nodes_stdout() -> None:
-    mock_failure_file = unittest.mock.Mock()
-    mock_failure_file.node = unittest.mock.Mock()
-    mock_failure_file.node.abspath = "/failed_node_stdout.ext"
+def test_print_failed_nodes_stdout(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    solver = tmp_path / "solver.odb"
+    solver.with_suffix(".stdout").write_text(
+        "".join(f"increment {number}\n" for number in range(100))
+        + "***ERROR: TOO MANY ATTEMPTS MADE FOR THIS INCREMENT\n"
+        + "analysis terminated\n"
+    )
+    script = tmp_path / "script.csv"
+    pathlib.Path(f"{script}.stdout").write_text(
+        'Traceback (most recent call last):\n  File "script.py"\nValueError: bad\n'
+    )
+    failures = [
+        unittest.mock.Mock(node=unittest.mock.Mock(abspath=str(solver), __str__=lambda _self: "solver.odb"), status=1),
+        unittest.mock.Mock(node=unittest.mock.Mock(abspath=str(script), __str__=lambda _self: "script.csv"), status=2),
+        unittest.mock.Mock(node=unittest.mock.Mock(abspath=str(tmp_path / "missing"), __str__=lambda _self: "missing")),
+    ]
     with (
-        patch("SCons.Script.GetBuildFailures", return_value=[mock_failure_file]),
-        patch("pathlib.Path.exists", return_value=True) as mock_exists,
-        patch("pathlib.Path.open") as mock_open,
-        patch("builtins.print") as mock_print,
+        patch("SCons.Script.GetBuildFailures", return_value=failures),
+        patch("waves._build_failures._error_signatures", wraps=_build_failures._error_signatures) as mock_signatures,
     ):
-        scons_extensions._print_failed_nodes_stdout()
-        mock_exists.assert_called_once()
-        mock_open.assert_called_once()
-        mock_print.assert_called_once()
+        scons_extensions._print_failed_nodes_stdout(tail_bytes=1024, tail_lines=3)
+    stderr = capsys.readouterr().err
+
+    # Only the STDOUT files with a truncated tail are searched again
+    searched = [call.args[0] for call in mock_signatures.call_args_list]
+    assert searched[0] == solver.with_suffix(".stdout")
+    assert isinstance(searched[1], bytes)
+
+    # Error signatures and the bounded STDOUT file tail are printed for each failure
+    assert f"solver.odb failed with STDOUT file '{solver.with_suffix('.stdout')}'" in stderr
+    assert "Error signatures:\n***ERROR: TOO MANY ATTEMPTS MADE FOR THIS INCREMENT\n" in stderr
+    assert "Last 3 lines of STDOUT file:\nincrement 99\n***ERROR" in stderr
+    assert "increment 96" not in stderr
+    assert (
+        f"""script.csv failed with STDOUT file '{script}.stdout'
+Traceback (most recent call last):
+  File "script.py"
+ValueError: bad
+"""
+        in stderr
+    )
+    assert stderr.count("Error signatures") == 1
+    assert "\nmissing failed\n" in stderr
+
+    # The summary table lists every failure
+    summary = stderr.split("Build failure summary\n")[1].splitlines()
+    assert summary[0].split() == ["Target", "Exit", "Errors", "First", "error"]
+    assert summary[1].split()[:4] == ["solver.odb", "1", "1", "***ERROR:"]
+    assert summary[2].split()[:4] == ["script.csv", "2", "1", "Traceback"]
+    assert summary[3].split()[0] == "missing"
+
+    # Unbounded reports print the entire STDOUT file without a summary
+    with patch("SCons.Script.GetBuildFailures", return_value=failures[:1]):
+        scons_extensions._print_failed_nodes_stdout(tail_bytes=None, tail_lines=None, summary=False)
+    stderr = capsys.readouterr().err
+    assert "increment 0\n" in stderr
+    assert "Last" not in stderr
+    assert "Build failure summary" not in stderr
+
+    # Complete tails without a summary are not searched for error signatures
     with (
-        patch("SCons.Script.GetBuildFailures", return_value=[mock_failure_file]),
-        patch("pathlib.Path.exists", return_value=False) as mock_exists,
-        patch("pathlib.Path.open") as mock_open,
-        patch("builtins.print") as mock_print,
+        patch("SCons.Script.GetBuildFailures", return_value=failures[:1]),
+        patch("waves._build_failures._error_signatures") as mock_signatures,
     ):
-        scons_extensions._print_failed_nodes_stdout()
-        mock_exists.assert_called()
-        mock_open.assert_not_called()
-        mock_print.assert_called_once()
+        scons_extensions._print_failed_nodes_stdout(tail_bytes=None, tail_lines=None, summary=False)
+    mock_signatures.assert_not_called()
 
 
 @pytest.mark.parametrize("env", [None, SCons.Environment.Environment()])
@@ -541,7 +612,22 @@ def test_print_build_failures(env: SCons.Environment.Environment | None) -> None
     # Test the function call interface
     with patch("atexit.register") as mock_atexit:
         scons_extensions.print_build_failures(env=env, print_stdout=True)
-        mock_atexit.assert_called_once_with(scons_extensions._print_failed_nodes_stdout)
+        mock_atexit.assert_called_once_with(
+            scons_extensions._print_failed_nodes_stdout,
+            tail_bytes=64 * 1024,
+            tail_lines=50,
+            max_signatures=10,
+            summary=True,
+        )
+    with patch("atexit.register") as mock_atexit:
+        scons_extensions.print_build_failures(env=env, print_stdout=True, tail_lines=None, summary=False)
+        mock_atexit.assert_called_once_with(
+            scons_extensions._print_failed_nodes_stdout,
+            tail_bytes=64 * 1024,
+            tail_lines=None,
+            max_signatures=10,
+            summary=False,
+        )
     with patch("atexit.register") as mock_atexit:
         scons_extensions.print_build_failures(env=env, print_stdout=False)
         mock_atexit.assert_not_called()
@@ -551,7 +637,8 @@ def test_print_build_failures(env: SCons.Environment.Environment | None) -> None
         env.AddMethod(scons_extensions.print_build_failures, "PrintBuildFailures")
         with patch("atexit.register") as mock_atexit:
             env.PrintBuildFailures(True)
-            mock_atexit.assert_called_once_with(scons_extensions._print_failed_nodes_stdout)
+            mock_atexit.assert_called_once()
+            assert mock_atexit.call_args.args == (scons_extensions._print_failed_nodes_stdout,)
         with patch("atexit.register") as mock_atexit:
             env.PrintBuildFailures(False)
             mock_atexit.assert_not_called()
@@ -630,6 +717,497 @@ def test_catenate_actions() -> None:
     assert builder.action.cmd_list == 'bash -c "dog $SOURCE > $TARGET"'
 
 
+def test_resource_builder_actions() -> None:
+    builder = scons_extensions.resource_builder_actions(
+        SCons.Builder.Builder(action="solver ${SOURCE}"), cpus="${threads}", tokens="${tokens}"
+    )
+    assert isinstance(builder.action, _scheduler.ResourceAction)
+    assert builder.action.action.cmd_list == "solver ${SOURCE}"
+    assert builder.action.requests == {"cpus": "${threads}", "memory": "${memory}", "tokens": "${tokens}"}
+
+    @scons_extensions.resource_actions(cpus="4")
+    def solver() -> SCons.Builder.Builder:
+        return SCons.Builder.Builder(action="solver ${SOURCE}")
+
+    builder = solver()
+    assert isinstance(builder.action, _scheduler.ResourceAction)
+    assert builder.action.requests == {"cpus": "4", "memory": "${memory}"}
+
+
+def test_resource_builder_actions_task(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.resource_scheduler, "ResourceScheduler")
+    env.ResourceScheduler(cpus=4, memory="1G")
+    builder = scons_extensions.resource_builder_actions(SCons.Builder.Builder(action="touch ${TARGET}"))
+    env.Append(BUILDERS={"Touch": builder})
+    target = str(tmp_path / "target.txt")
+    nodes = env.Touch(target=[target], source=[], cpus=2, memory="512M")
+
+    pool = env[_settings._resource_pool_variable]
+    with patch.object(pool, "acquire", wraps=pool.acquire) as mock_acquire:
+        nodes[0].build()
+    mock_acquire.assert_called_once_with({"cpus": "2", "memory": "512M"})
+    assert pathlib.Path(target).exists()
+
+
+def test_abaqus_licence_builder_actions(tmp_path: pathlib.Path) -> None:
+    # Fake Abaqus program failing with a licence error until the third attempt
+    abaqus = tmp_path / "abaqus"
+    abaqus.write_text(
+        "#!/bin/sh\n"
+        "echo x >> attempts\n"
+        'if [ "$(wc -l < attempts)" -lt 3 ]; then\n'
+        '    echo "Failed to checkout license for abaqus."\n'
+        "    exit 1\n"
+        "fi\n"
+        "touch job.odb\n"
+    )
+    abaqus.chmod(0o755)
+    (tmp_path / "job.inp").touch()
+
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.resource_scheduler, "ResourceScheduler")
+    env.ResourceScheduler(cpus=4, abaqus_tokens=8)
+    builder = scons_extensions.abaqus_licence_builder_actions(
+        scons_extensions.abaqus_solver_builder_factory(program=str(abaqus)), backoff=1.0
+    )
+    assert builder.action.retries == 5
+    env.Append(BUILDERS={"AbaqusSolver": builder})
+    nodes = env.AbaqusSolver(target=[str(tmp_path / "job.odb")], source=[str(tmp_path / "job.inp")], job="job", cpus=4)
+
+    pool = env[_settings._resource_pool_variable]
+    with (
+        patch.object(pool, "acquire", wraps=pool.acquire) as mock_acquire,
+        patch("time.sleep") as mock_sleep,
+    ):
+        nodes[0].build()
+    assert mock_acquire.call_args.args[0] == {"cpus": "4", "memory": "", "abaqus_tokens": 8}
+    assert mock_acquire.call_count == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
+    assert (tmp_path / "job.odb").exists()
+
+    # Failures without licence errors are not retried
+    (tmp_path / "attempts").unlink()
+    abaqus.write_text("#!/bin/sh\necho x >> attempts\necho 'Abaqus Error: bad input'\nexit 1\n")
+    nodes = env.AbaqusSolver(
+        target=[str(tmp_path / "other.odb")], source=[str(tmp_path / "job.inp")], job="other", cpus=4
+    )
+    with patch("time.sleep") as mock_sleep, pytest.raises(SCons.Errors.BuildError):
+        nodes[0].build()
+    mock_sleep.assert_not_called()
+    assert (tmp_path / "attempts").read_text() == "x\n"
+
+
+def test_timeout_builder_actions() -> None:
+    builder = scons_extensions.timeout_builder_actions(SCons.Builder.Builder(action="solver ${SOURCE}"), grace=1.0)
+    assert isinstance(builder.action, _scheduler.TimeoutAction)
+    assert builder.action.action.cmd_list == "solver ${SOURCE}"
+    assert builder.action.timeout == "${waves_timeout}"
+    assert builder.action.grace == 1.0
+
+    @scons_extensions.timeout_actions(timeout="${limit}")
+    def solver() -> SCons.Builder.Builder:
+        return SCons.Builder.Builder(action="solver ${SOURCE}")
+
+    builder = solver()
+    assert isinstance(builder.action, _scheduler.TimeoutAction)
+    assert builder.action.timeout == "${limit}"
+
+    # Builder factories only wrap the action when a timeout is requested
+    for factory in (
+        scons_extensions.first_target_builder_factory,
+        scons_extensions.abaqus_solver_builder_factory,
+        scons_extensions.python_builder_factory,
+    ):
+        builder = factory()
+        assert not isinstance(builder.action, _scheduler.TimeoutAction)
+        assert "waves_timeout" not in builder.overrides
+        builder = factory(timeout=60)
+        assert isinstance(builder.action, _scheduler.TimeoutAction)
+        assert builder.overrides["waves_timeout"] == 60
+
+
+@pytest.mark.parametrize(
+    "modifier",
+    [
+        scons_extensions.catenate_builder_actions,
+        scons_extensions.ssh_builder_actions,
+        scons_extensions.scratch_builder_actions,
+    ],
+)
+def test_timeout_builder_actions_modifiers(modifier: collections.abc.Callable) -> None:
+    builder = modifier(scons_extensions.first_target_builder_factory(program="solver", timeout=60))
+    assert isinstance(builder.action, _scheduler.TimeoutAction)
+    assert not isinstance(builder.action.action, _scheduler.WrapperAction)
+    assert builder.overrides["waves_timeout"] == 60
+    assert any("${program}" in action for action in scons_extensions.action_list_strings(builder))
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        scons_extensions.sbatch_abaqus_journal_builder_factory,
+        scons_extensions.sbatch_abaqus_solver_builder_factory,
+        scons_extensions.sbatch_python_builder_factory,
+    ],
+)
+def test_timeout_builder_actions_sbatch(factory: collections.abc.Callable) -> None:
+    builder = factory(timeout=60)
+    assert isinstance(builder.action, _scheduler.TimeoutAction)
+    assert builder.overrides["waves_timeout"] == 60
+    action_list = scons_extensions.action_list_strings(builder)
+    assert len(action_list) == 1
+    assert action_list[0].startswith("sbatch")
+
+
+def test_timeout_builder_actions_task(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"Sleep": scons_extensions.first_target_builder_factory(program="sleep", timeout=60)})
+    target = str(tmp_path / "target.stdout")
+    nodes = env.Sleep(target=[target], source=[], program_required="30", waves_timeout=0.5)
+    start = time.monotonic()
+    with pytest.raises(SCons.Errors.BuildError, match=r"Timed out after 0\.5 seconds"):
+        nodes[0].build()
+    assert time.monotonic() - start < 20.0
+    assert "WAVES timeout: Timed out after 0.5 seconds" in pathlib.Path(target).read_text()
+
+    # The timeout task keyword argument does not collide with builder action variables
+    env.Append(BUILDERS={"Echo": scons_extensions.first_target_builder_factory(program="echo", timeout=60)})
+    echo_stdout = tmp_path / "echo.stdout"
+    nodes = env.Echo(target=[str(echo_stdout)], source=[], program_required="${timeout}", timeout=30)
+    nodes[0].build()
+    assert echo_stdout.read_text().strip() == "30"
+
+
+def test_accounting_builder_actions() -> None:
+    builder = scons_extensions.accounting_builder_actions(
+        SCons.Builder.Builder(action="solver ${SOURCE}"), name="Solver"
+    )
+    assert isinstance(builder.action, _accounting.AccountingAction)
+    assert builder.action.builder == "Solver"
+    assert builder.action.action.cmd_list == "solver ${SOURCE}"
+
+    # Resource admission wraps task accounting
+    builder = scons_extensions.resource_builder_actions(SCons.Builder.Builder(action="solver ${SOURCE}"))
+    builder = scons_extensions.accounting_builder_actions(builder)
+    builder = scons_extensions.accounting_builder_actions(builder)
+    assert isinstance(builder.action, _scheduler.ResourceAction)
+    assert isinstance(builder.action.action, _accounting.AccountingAction)
+    assert builder.action.action.action.cmd_list == "solver ${SOURCE}"
+
+
+def test_task_accounting(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment(tools=["gcc"])
+    env.Append(BUILDERS={"Solver": SCons.Builder.Builder(action="echo ${SOURCE} > ${TARGET}")})
+    resource_builder = scons_extensions.resource_builder_actions(SCons.Builder.Builder(action="echo ${TARGET}"))
+    env.Append(BUILDERS={"Resource": resource_builder})
+    env.AddMethod(scons_extensions.task_accounting, "TaskAccounting")
+    clone = env.Clone()
+    log = tmp_path / "accounting.jsonl"
+    env.TaskAccounting(log=str(log))
+    assert isinstance(env[_settings._task_accounting_variable], _accounting.AccountingLog)
+    assert env[_settings._task_accounting_variable].path == log
+    assert isinstance(env["BUILDERS"]["Solver"].action, _accounting.AccountingAction)
+    assert isinstance(env["BUILDERS"]["Resource"].action.action, _accounting.AccountingAction)
+    assert not isinstance(env["BUILDERS"]["Object"].action, _accounting.AccountingAction)
+
+    # Builders shared with other construction environments are unchanged
+    assert not isinstance(clone["BUILDERS"]["Solver"].action, _accounting.AccountingAction)
+    assert not isinstance(resource_builder.action.action, _accounting.AccountingAction)
+    assert clone["BUILDERS"]["Resource"] is resource_builder
+
+    target = str(tmp_path / "target.txt")
+    nodes = env.Solver(target=[target], source=[str(tmp_path / "source.txt")])
+    (tmp_path / "source.txt").touch()
+    nodes[0].build()
+    record = json.loads(log.read_text())
+    assert record["builder"] == "Solver"
+    assert record["targets"] == [target]
+    assert record["exit_code"] == 0
+
+    # The SPAWN wrappers matching task commands receive the task commands, e.g. to reconcile exported tasks
+    log.unlink()
+    source = str(tmp_path / "source.txt")
+    exported = str(tmp_path / "exported.txt")
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"tasks": [{"job_id": "1", "commands": [f'echo "{source}" > "{exported}"']}]}))
+    spawn = unittest.mock.Mock(spec=[], return_value=0)
+    poller = _slurm.JobPoller()
+    env["SPAWN"] = _slurm.ReconcileSpawn(spawn, manifest, poller)
+    nodes = env.Solver(target=[exported], source=[source])
+    with patch.object(poller, "wait", return_value="COMPLETED") as mock_wait:
+        nodes[0].build()
+    mock_wait.assert_called_once_with("1")
+    spawn.assert_not_called()
+    record = json.loads(log.read_text())
+    assert record["targets"] == [exported]
+    assert record["exit_code"] == 0
+
+    # Task commands which are not matched are measured by the innermost SPAWN function
+    log.unlink()
+    other = str(tmp_path / "other.txt")
+    nodes = env.Solver(target=[other], source=[source])
+    nodes[0].build()
+    assert spawn.call_args.args[3][0] == shlex.quote(sys.executable)
+    assert json.loads(log.read_text())["targets"] == [other]
+
+
+def test_ordered_taskmaster() -> None:
+    taskmaster = SCons.Taskmaster.Taskmaster
+    try:
+        scons_extensions.ordered_taskmaster()
+        assert SCons.Taskmaster.Taskmaster is _ordering.OrderedTaskmaster
+        scons_extensions.ordered_taskmaster()
+        assert SCons.Taskmaster.Taskmaster is _ordering.OrderedTaskmaster
+    finally:
+        SCons.Taskmaster.Taskmaster = taskmaster
+
+
+def test_longest_first_order(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.longest_first_order, "LongestFirstOrder")
+    log = tmp_path / "accounting.jsonl"
+    records = [
+        {"targets": [str(tmp_path / "job.odb"), str(tmp_path / "job.sta")], "builder": "Solver", "wall_time": 5.0},
+        {"targets": [str(tmp_path / "other.odb")], "builder": "Solver", "wall_time": 7.0, "exit_code": 0},
+        {"targets": [str(tmp_path / "failed.odb")], "builder": "Solver", "wall_time": 1.0, "exit_code": 1},
+    ]
+    log.write_text("".join(f"{json.dumps(record)}\n" for record in records))
+    taskmaster = SCons.Taskmaster.Taskmaster
+    try:
+        with pytest.raises(RuntimeError, match="ordered_taskmaster"):
+            env.LongestFirstOrder(log=str(log))
+        scons_extensions.ordered_taskmaster()
+        env.LongestFirstOrder(log=str(log), estimates={"Report": 1.0}, default=2.0)
+        ordering = _ordering.OrderedTaskmaster.ordering
+        assert ordering is not None
+        assert ordering.durations == {
+            str(tmp_path / "job.odb"): 5.0,
+            str(tmp_path / "job.sta"): 5.0,
+            str(tmp_path / "other.odb"): 7.0,
+        }
+        assert ordering.builder_durations == {"Solver": 6.0}
+        assert ordering.estimates == {"Report": 1.0}
+        assert ordering.default == 2.0
+
+        # Missing logs are an empty history
+        env.LongestFirstOrder(log=str(tmp_path / "missing.jsonl"))
+        ordering = _ordering.OrderedTaskmaster.ordering
+        assert ordering is not None
+        assert ordering.durations == {}
+        assert ordering.builder_durations == {}
+    finally:
+        SCons.Taskmaster.Taskmaster = taskmaster
+        _ordering.OrderedTaskmaster.ordering = None
+
+
+def test_progress_stream(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.progress_stream, "ProgressStream")
+    taskmaster = SCons.Taskmaster.Taskmaster
+    try:
+        with pytest.raises(RuntimeError, match="ordered_taskmaster"):
+            env.ProgressStream(stream=str(tmp_path / "progress.jsonl"))
+        scons_extensions.ordered_taskmaster()
+        with patch("atexit.register") as mock_register:
+            env.ProgressStream(stream=str(tmp_path / "progress.jsonl"))
+        progress = _ordering.OrderedTaskmaster.progress
+        assert progress is not None
+        assert progress.stream == str(tmp_path / "progress.jsonl")
+        with patch("SCons.Script.GetBuildFailures", return_value=[Mock()]):
+            mock_register.call_args.args[0]()
+        record = json.loads((tmp_path / "progress.jsonl").read_text())
+        assert record["event"] == "build_finish"
+        assert record["failures"] == 1
+
+        with patch("atexit.register"):
+            env.ProgressStream(stream="unix:/tmp/progress.sock")
+        progress = _ordering.OrderedTaskmaster.progress
+        assert progress is not None
+        assert progress.stream == "unix:/tmp/progress.sock"
+
+        # Dry runs write no events
+        _ordering.OrderedTaskmaster.progress = None
+        with patch("SCons.Script.GetOption", side_effect=lambda option: option == "no_exec"):
+            env.ProgressStream(stream=str(tmp_path / "dry_run.jsonl"))
+        assert _ordering.OrderedTaskmaster.progress is None
+    finally:
+        SCons.Taskmaster.Taskmaster = taskmaster
+        _ordering.OrderedTaskmaster.progress = None
+
+
+def test_python_worker_pool() -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.python_worker_pool, "PythonWorkerPool")
+    with patch("atexit.register") as mock_register:
+        env.PythonWorkerPool(workers=2, tasks_per_worker=10)
+    pool = env[_settings._python_worker_pool_variable]
+    assert isinstance(pool, _workers.PythonWorkerPool)
+    assert pool.workers == 2
+    assert pool.tasks_per_worker == 10
+    mock_register.assert_called_once_with(pool.close)
+
+
+def test_matlab_engine_pool() -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.matlab_engine_pool, "MatlabEnginePool")
+    with patch("atexit.register") as mock_register:
+        env.MatlabEnginePool(workers=2, tasks_per_worker=10)
+    pool = env[_settings._matlab_engine_pool_variable]
+    assert isinstance(pool, _workers.MatlabEnginePool)
+    assert pool.workers == 2
+    assert pool.tasks_per_worker == 10
+    mock_register.assert_called_once_with(pool.close)
+
+
+def test_matlab_engine_builder_actions() -> None:
+    builder = scons_extensions.matlab_engine_builder_actions(scons_extensions.matlab_script())
+    assert isinstance(builder.action, _workers.MatlabEngineAction)
+    assert builder.action.commands() is not None
+    wrapped = builder.action
+    assert scons_extensions.matlab_engine_builder_actions(builder).action is wrapped
+
+
+def test_abaqus_journal_sessions() -> None:
+    env = SCons.Environment.Environment()
+    original_spawn = env["SPAWN"]
+    env.AddMethod(scons_extensions.abaqus_journal_sessions, "AbaqusJournalSessions")
+    env.AbaqusJournalSessions(program="abq2024", window=1.0, max_tasks=10)
+
+    spawn = env["SPAWN"]
+    assert isinstance(spawn, _journal_sessions.JournalSessionSpawn)
+    assert spawn.spawn is original_spawn
+    assert spawn.program == "abq2024"
+    assert spawn.window == 1.0
+    assert spawn.max_tasks == 10
+    assert spawn.session_directory == pathlib.Path(env.Dir("#").abspath) / ".waves_journal_sessions"
+
+
+def test_large_file_decider(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SCons.Node.FS.File, "get_csig", SCons.Node.FS.File.get_csig)
+    monkeypatch.setattr(_decider, "_enabled_deciders", [])
+    env = SCons.Environment.Environment()
+    original_decider = env.decide_target
+    env.AddMethod(scons_extensions.large_file_decider, "LargeFileDecider")
+    with patch("atexit.register") as mock_register:
+        env.LargeFileDecider(extensions=[".ODB"], size_threshold=1024, block_size=64, blocks=4)
+
+    decider = env.decide_target
+    assert isinstance(decider, _decider.LargeFileDecider)
+    assert env.decide_source is decider
+    assert decider.fallback is original_decider
+    assert decider.extensions == (".odb",)
+    assert decider.size_threshold == 1024
+    assert decider.cache.cache_file == pathlib.Path(env.File("#/.waves_fingerprints.json").abspath)
+    assert decider.cache.block_size == 64
+    assert decider.cache.blocks == 4
+    assert _decider._enabled_deciders == [decider]
+    mock_register.assert_called_once_with(decider.cache.save)
+
+    # Fingerprints are not cached between builds without a cache file
+    with patch("atexit.register"):
+        env.LargeFileDecider(cache_file=None)
+    assert env.decide_target.cache.cache_file is None
+
+
+def test_artifact_cache(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.artifact_cache, "ArtifactCache")
+    with patch("atexit.register") as mock_register:
+        env.ArtifactCache(str(tmp_path / "cache"), link="hardlink", compress_after=60.0, size_budget=1024)
+
+    cache = env.get_CacheDir()
+    assert isinstance(cache, _cache.ArtifactCacheDir)
+    assert cache.path == str(tmp_path / "cache")
+    assert cache.link == "hardlink"
+    assert cache.compress_after == 60.0
+    assert cache.size_budget == 1024
+    assert env.Clone().get_CacheDir().statistics is cache.statistics
+    mock_register.assert_called_once_with(type(cache).finish, str(tmp_path / "cache"), report=True)
+
+    # The cache is not maintained for dry runs
+    with (
+        patch("SCons.Script.GetOption", side_effect=lambda option: option == "no_exec"),
+        patch("atexit.register") as mock_register,
+    ):
+        env.ArtifactCache(str(tmp_path / "cache"))
+    mock_register.assert_not_called()
+
+    with pytest.raises(RuntimeError):
+        env.ArtifactCache(str(tmp_path / "cache"), link="symlink")
+
+
+def test_ssh_multiplex() -> None:
+    env = SCons.Environment.Environment()
+    original_spawn = env["SPAWN"]
+    env.AddMethod(scons_extensions.ssh_multiplex, "SSHMultiplex")
+    with patch("atexit.register") as mock_register:
+        env.SSHMultiplex(control_directory="/tmp/sockets", persist="1h", push_window=2.0)
+
+    spawn = env["SPAWN"]
+    assert isinstance(spawn, _ssh.SSHMultiplexSpawn)
+    assert spawn.spawn is original_spawn
+    assert spawn.control_directory == pathlib.Path("/tmp/sockets")
+    assert spawn.persist == "1h"
+    assert spawn.push_window == 2.0
+    mock_register.assert_called_once_with(spawn.close)
+
+
+def test_python_worker_builder_actions() -> None:
+    builder = scons_extensions.python_worker_builder_actions(scons_extensions.python_builder_factory())
+    assert isinstance(builder.action, _workers.PythonWorkerAction)
+    assert builder.action.command() is not None
+    wrapped = builder.action
+    assert scons_extensions.python_worker_builder_actions(builder).action is wrapped
+
+    # WAVES environment Python tasks use the worker pool only when the construction environment has a pool
+    env = scons_extensions.WAVESEnvironment()
+    env.PythonScript(target=["without_pool.txt"], source=["script.py"])
+    assert not isinstance(env.File("without_pool.txt").builder.action, _workers.PythonWorkerAction)
+    with patch("atexit.register"):
+        env.PythonWorkerPool()
+    env.PythonScript(target=["with_pool.txt"], source=["script.py"])
+    assert isinstance(env.File("with_pool.txt").builder.action, _workers.PythonWorkerAction)
+
+
+def test_resource_scheduler() -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.resource_scheduler, "ResourceScheduler")
+    with patch("os.cpu_count", return_value=8), patch("waves._scheduler._system_memory", return_value=2048.0):
+        env.ResourceScheduler(tokens=10)
+    pool = env[_settings._resource_pool_variable]
+    assert isinstance(pool, _scheduler.ResourcePool)
+    assert pool.capacity == {"cpus": 8.0, "memory": 2048.0, "tokens": 10.0}
+
+    with patch("waves._scheduler._system_memory", return_value=None):
+        env.ResourceScheduler(cpus=2)
+    assert env[_settings._resource_pool_variable].capacity == {"cpus": 2.0}
+
+    # Affinity pins tasks to the CPUs available to the process
+    with (
+        patch("os.sched_getaffinity", return_value={0, 1, 2, 3}, create=True),
+        patch("waves._scheduler._numa_nodes", return_value=[[0, 1], [2, 3]]),
+    ):
+        env.ResourceScheduler(memory="1G", affinity="numactl")
+        pool = env[_settings._resource_pool_variable]
+        assert pool.cores == [0, 1, 2, 3]
+        assert pool.capacity == {"cpus": 4.0, "memory": 1024.0}
+        assert pool.numa_nodes == [[0, 1], [2, 3]]
+        assert pool.affinity == "numactl --physcpubind={cores} --localalloc"
+
+        env.ResourceScheduler(cpus=2, affinity="hwloc-bind --cpuset {cores}")
+        pool = env[_settings._resource_pool_variable]
+        assert pool.cores == [0, 1]
+        assert pool.affinity == "hwloc-bind --cpuset {cores}"
+
+    with pytest.raises(RuntimeError, match="Affinity must be one of"):
+        env.ResourceScheduler(affinity="pin")
+
+    # Cloned environments share the resource pool
+    env.ResourceScheduler(cpus=4, memory="1G")
+    assert env.Clone()[_settings._resource_pool_variable] is env[_settings._resource_pool_variable]
+
+
 ssh_builder_actions = {
     "default kwargs": (["ssh_builder_actions.out1"], {}, {}),
     "builder override kwargs": (
@@ -745,6 +1323,146 @@ def test_ssh_builder_actions(target: list[str], builder_kwargs: dict, task_kwarg
     assert ssh_python_builder_action_list == expected
 
 
+def test_ssh_builder_actions_pull_targets() -> None:
+    builder = scons_extensions.ssh_builder_actions(
+        SCons.Builder.Builder(action=["cat ${SOURCE.abspath} > ${TARGETS[0].abspath}"]),
+        pull_targets=True,
+        compress=True,
+    )
+    action_list = [action.cmd_list for action in builder.action.list]
+    assert (
+        action_list[1]
+        == "rsync --compress ${rsync_push_options} ${SOURCES.abspath} ${remote_server}:${remote_directory}"
+    )
+    assert action_list[-1] == (
+        "rsync --compress ${rsync_pull_options} "
+        "${_concat(remote_server + ':' + remote_directory + '/', TARGETS.file, '', __env__)} ${TARGET.dir.abspath}"
+    )
+
+    # Only the task targets are copied from the remote directory
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"SSHBuildCat": builder})
+    nodes = env.SSHBuildCat(
+        target=["pull/cat.txt", "pull/cat.txt.stdout"],
+        source=["dummy.txt"],
+        remote_server="server",
+        remote_directory="/scratch/${task_directory}",
+        task_directory="cat",
+    )
+    pull = nodes[0].env.subst(action_list[-1], target=nodes, source=env.File("dummy.txt"))
+    assert pull == (
+        f"rsync --compress -rlptv server:/scratch/cat/cat.txt server:/scratch/cat/cat.txt.stdout {nodes[0].dir.abspath}"
+    )
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_ssh_builder_actions_detach(tmp_path: pathlib.Path) -> None:
+    builder = scons_extensions.ssh_builder_actions(
+        SCons.Builder.Builder(
+            action=[
+                "cat ${SOURCE.abspath} > ${TARGETS[0].abspath}",
+                'echo "Hello World!" && echo run >> runs.txt && exit ${exit_code}',
+            ]
+        ),
+        detach=True,
+        poll_interval=0.1,
+    )
+    action_list = [action.cmd_list for action in builder.action.list]
+    assert len(action_list) == 6
+    assert action_list[2].startswith(
+        "ssh ${ssh_options} ${remote_server} 'cd ${remote_directory} && printf \"%s\\n\" '\\''('\\'' '\\''set -e'\\''"
+    )
+    assert "nohup setsid sh .waves_ssh_${TARGET.file}.sh" in action_list[2]
+    assert action_list[3].startswith("failures=0; until ssh ${ssh_options} ${remote_server}")
+    assert action_list[3].endswith("sleep 0.1; done")
+
+    # Remote tasks run detached, re-attach when repeated, and return the remote exit code
+    write_fake_program(tmp_path, "ssh", fake_ssh)
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    (remote / "input.txt").write_text("input")
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"SSHBuildCat": builder})
+    shell_env = {**os.environ, "PATH": f"{tmp_path}{os.pathsep}{os.environ['PATH']}"}
+    for exit_code in (0, 3):
+        nodes = env.SSHBuildCat(
+            target=[f"output{exit_code}.txt"],
+            source=["input.txt"],
+            remote_server="server",
+            remote_directory=str(remote),
+            exit_code=exit_code,
+        )
+        commands = [
+            nodes[0].env.subst(action, raw=1, target=nodes, source=nodes[0].sources) for action in action_list[2:4]
+        ]
+        assert _ssh._parse_ssh_command(commands[0].split()) == ([], "server")
+        for command in [*commands, *commands]:
+            subprocess.run(["sh", "-c", command], env=shell_env, check=True)
+        result = nodes[0].env.subst(action_list[4], raw=1, target=nodes, source=nodes[0].sources)
+        process = subprocess.run(["sh", "-c", result], env=shell_env, capture_output=True, text=True, check=False)
+        assert process.returncode == exit_code
+        assert process.stdout == "Hello World!\n"
+        assert (remote / f"output{exit_code}.txt").read_text() == "input"
+    assert (remote / "runs.txt").read_text() == "run\nrun\n"
+
+    # Status checks give up after the consecutive failed status check retries
+    builder = scons_extensions.ssh_builder_actions(
+        SCons.Builder.Builder(action=["true"]), detach=True, poll_interval=0.01, poll_retries=2
+    )
+    env.Append(BUILDERS={"SSHTrue": builder})
+    nodes = env.SSHTrue(
+        target=["true.txt"], source=[], remote_server="server", remote_directory=str(remote / "missing")
+    )
+    poll = nodes[0].env.subst(scons_extensions.action_list_strings(builder)[3], raw=1, target=nodes, source=[])
+    (tmp_path / "ssh_calls.txt").unlink()
+    process = subprocess.run(["sh", "-c", poll], env=shell_env, capture_output=True, text=True, check=False)
+    assert process.returncode == 255
+    assert "WAVES ssh: 2 status check retries failed" in process.stderr
+    assert len((tmp_path / "ssh_calls.txt").read_text().splitlines()) == 3
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_scratch_builder_actions(tmp_path: pathlib.Path) -> None:
+    builder = scons_extensions.scratch_builder_actions(
+        SCons.Builder.Builder(
+            action=[
+                "cat ${SOURCE.abspath} > ${TARGETS[0].abspath}",
+                "pwd > ${TARGETS[-1].abspath} && touch scratch.txt && exit ${exit_code}",
+            ]
+        ),
+        scratch_directory=str(tmp_path / "scratch"),
+    )
+    action_list = scons_extensions.action_list_strings(builder)
+    assert len(action_list) == 1
+    assert (
+        '{ ( cd "$$scratch" && cat ${SOURCE.file} > ${TARGETS[0].file} ) && ( cd "$$scratch" && pwd' in action_list[0]
+    )
+    assert builder.overrides["scratch_directory"] == str(tmp_path / "scratch")
+    assert (
+        scons_extensions.scratch_builder_actions(SCons.Builder.Builder(action=["true"])).overrides["scratch_directory"]
+        == tempfile.gettempdir()
+    )
+
+    # Only the targets are moved back, including for failed actions, and the scratch directory is removed
+    (tmp_path / "input.txt").write_text("input")
+    env = SCons.Environment.Environment()
+    env.Append(BUILDERS={"ScratchBuildCat": builder})
+    for exit_code in (0, 3):
+        build = tmp_path / f"build{exit_code}"
+        build.mkdir()
+        nodes = env.ScratchBuildCat(
+            target=[str(build / "output.txt"), str(build / "pwd.txt")],
+            source=[str(tmp_path / "input.txt")],
+            exit_code=exit_code,
+        )
+        command = nodes[0].env.subst(action_list[0], raw=1, target=nodes, source=nodes[0].sources)
+        assert subprocess.run(["sh", "-c", command], check=False).returncode == exit_code
+        assert (build / "output.txt").read_text() == "input"
+        assert (build / "pwd.txt").read_text().startswith(str(tmp_path / "scratch" / "waves-scratch."))
+        assert sorted(path.name for path in build.iterdir()) == ["output.txt", "pwd.txt"]
+    assert list((tmp_path / "scratch").iterdir()) == []
+
+
 prepend_env_input = {
     "path exists": (f"{root_fs}program", True, does_not_raise),
     "path does not exist": (f"{root_fs}notapath", False, pytest.raises(FileNotFoundError)),
@@ -1684,7 +2402,10 @@ def test_abaqus_pseudo_builder(
     mock_env = unittest.mock.Mock()
     with outcome:
         scons_extensions.AbaqusPseudoBuilder(builder=mock_builder, **class_kwargs)(env=mock_env, **call_kwargs)
-        mock_builder.assert_called_once_with(target=targets, source=sources, program_options=options, **builder_kwargs)
+        cpus = class_kwargs.get("override_cpus") or call_kwargs.get("cpus", 1)
+        mock_builder.assert_called_once_with(
+            target=targets, source=sources, program_options=options, cpus=cpus, **builder_kwargs
+        )
 
 
 def test_sbatch_abaqus_solver() -> None:
@@ -2446,6 +3167,83 @@ def test_sbatch(
             assert node.env[key] == expected_value
 
 
+def test_sbatch_poll() -> None:
+    env = SCons.Environment.Environment()
+    original_spawn = env["SPAWN"]
+    env.AddMethod(scons_extensions.sbatch_poll, "SbatchPoll")
+    env.SbatchPoll(program="mysbatch", squeue_program="mysqueue", sacct_program="mysacct", interval=1.0)
+
+    spawn = env["SPAWN"]
+    assert isinstance(spawn, _slurm.SbatchPollSpawn)
+    assert spawn.spawn is original_spawn
+    assert spawn.program == "mysbatch"
+    assert spawn.poller.squeue_program == "mysqueue"
+    assert spawn.poller.sacct_program == "mysacct"
+    assert spawn.poller.interval == 1.0
+    assert spawn.poller.state_file == pathlib.Path(env.Dir("#").abspath) / ".waves_sbatch_state.json"
+
+
+def test_sbatch_pack() -> None:
+    env = SCons.Environment.Environment()
+    original_spawn = env["SPAWN"]
+    env.AddMethod(scons_extensions.sbatch_pack, "SbatchPack")
+    env.SbatchPack(program="mysbatch", cpus=16, time="2:00:00", max_task_time="5", window=1.0, step_command="")
+
+    spawn = env["SPAWN"]
+    assert isinstance(spawn, _slurm.SbatchPackSpawn)
+    assert spawn.spawn is original_spawn
+    assert spawn.program == "mysbatch"
+    assert spawn.cpus == 16
+    assert spawn.time == 7200
+    assert spawn.max_task_time == 300
+    assert spawn.default_time == 600
+    assert spawn.window == 1.0
+    assert spawn.step_command == ""
+    assert spawn.pack_directory == pathlib.Path(env.Dir("#").abspath) / ".waves_sbatch_pack"
+
+
+def test_slurm_export_hooks(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    original_spawn = env["SPAWN"]
+    original_print = env.get("PRINT_CMD_LINE_FUNC")
+    with patch.dict("os.environ", {}, clear=True):
+        scons_extensions.slurm_export_hooks(env)
+    assert env["SPAWN"] is original_spawn
+    assert env.get("PRINT_CMD_LINE_FUNC") is original_print
+
+    record_file = tmp_path / "record.jsonl"
+    with (
+        patch.dict("os.environ", {_settings._slurm_export_record_variable: str(record_file)}),
+        patch.dict(_slurm._export_recorders, clear=True),
+        patch("atexit.register"),
+    ):
+        scons_extensions.slurm_export_hooks(env)
+        clone = env.Clone()
+        scons_extensions.slurm_export_hooks(clone)
+    assert isinstance(env["PRINT_CMD_LINE_FUNC"], _slurm.ExportRecorder)
+    assert env["PRINT_CMD_LINE_FUNC"].record_file == record_file
+    assert clone["PRINT_CMD_LINE_FUNC"] is env["PRINT_CMD_LINE_FUNC"]
+
+    manifest = tmp_path / "manifest.json"
+    target = tmp_path / "target.txt"
+    tasks = [{"job_id": "1", "targets": [str(target)], "commands": ["sbatch --wait"]}]
+    manifest.write_text(json.dumps({"tasks": tasks}))
+    with patch.dict("os.environ", {_settings._slurm_export_manifest_variable: str(manifest)}):
+        scons_extensions.slurm_export_hooks(env)
+    spawn = env["SPAWN"]
+    assert isinstance(spawn, _slurm.ReconcileSpawn)
+    assert spawn.spawn is original_spawn
+    assert spawn.jobs == {"sbatch --wait": "1"}
+    assert env.File(str(target)).precious
+
+    # Submit-and-poll spawn is wrapped by the reconcile spawn
+    env.AddMethod(scons_extensions.sbatch_poll, "SbatchPoll")
+    env.SbatchPoll()
+    assert env["SPAWN"] is spawn
+    assert isinstance(spawn.spawn, _slurm.SbatchPollSpawn)
+    assert spawn.spawn.spawn is original_spawn
+
+
 scanner_input = {
     "has_suffix": (
         "**\n*INCLUDE, INPUT=dummy.inp",
@@ -2495,6 +3293,10 @@ scanner_input = {
         "**\n*INCLUDE,    INPUT=dummy.out",
         ["dummy.out"],
     ),
+    "continuation_line": (
+        "*NODE\n1, 0.0, 0.0\n*INCLUDE,\n    INPUT=dummy.out\n*ELEMENT, TYPE=C3D8, INPUT=dummy2.inp\r\n1, 1, 2",
+        ["dummy.out", "dummy2.inp"],
+    ),
 }
 
 
@@ -2520,6 +3322,25 @@ def test_abaqus_input_scanner(content: str, expected_dependencies: list[str]) ->
     assert set(found_files) == set(expected_dependencies)
 
 
+@pytest.mark.parametrize(
+    ("content", "expected_dependencies"),
+    scanner_input.values(),
+    ids=scanner_input.keys(),
+)
+def test_abaqus_input_scanner_keyword_lines(
+    tmp_path: pathlib.Path, content: str, expected_dependencies: list[str]
+) -> None:
+    """Tests that only the keyword lines of existing input files are searched."""
+    input_file = tmp_path / "input.inp"
+    input_file.write_text(content)
+    env = SCons.Environment.Environment()
+    scanner = scons_extensions.abaqus_input_scanner(cache_file=None)
+    with patch("SCons.Node.FS.File.get_text_contents") as mock_contents:
+        dependencies = scanner(env.File(str(input_file)), env)
+    mock_contents.assert_not_called()
+    assert {file.name for file in dependencies} == set(expected_dependencies)
+
+
 sphinx_scanner_input = {
     # Test name, content, expected_dependencies
     "include directive": (".. include:: dummy.txt", ["dummy.txt"]),
@@ -2552,6 +3373,47 @@ def test_sphinx_scanner(content: str, expected_dependencies: list[str]) -> None:
     assert set(found_files) == set(expected_dependencies)
 
 
+@pytest.mark.usefixtures("sconsign_database")
+def test_custom_scanner_cache(tmp_path: pathlib.Path) -> None:
+    input_file = tmp_path / "model.inp"
+    input_file.write_text("*INCLUDE, INPUT=mesh.inp\n")
+    cache_file = tmp_path / "scanner.json"
+    env = SCons.Environment.Environment()
+    scanner = scons_extensions.abaqus_input_scanner(cache_file=cache_file)
+    with patch.dict(_scanner._shared_caches, clear=True), patch("atexit.register"):
+        assert [file.name for file in scanner(env.File(str(input_file)), env)] == ["mesh.inp"]
+
+        # Unchanged files are neither read nor hashed again
+        with (
+            patch("waves._scanner._abaqus_keyword_text") as mock_read,
+            patch("SCons.Node.FS.File.get_csig") as mock_csig,
+        ):
+            assert [file.name for file in scanner(env.File(str(input_file)), env)] == ["mesh.inp"]
+            mock_read.assert_not_called()
+            mock_csig.assert_not_called()
+
+        # Modified files are scanned again
+        input_file.write_text("*INCLUDE, INPUT=mesh.inp\n*INCLUDE, INPUT=nodes.inp\n")
+        assert [file.name for file in scanner(env.File(str(input_file)), env)] == ["mesh.inp", "nodes.inp"]
+
+        # Scanners with the same cache file share the cache
+        sphinx_file = tmp_path / "index.rst"
+        sphinx_file.write_text(".. include:: mesh.inp\n")
+        sphinx = scons_extensions.sphinx_scanner(cache_file=cache_file)
+        assert [file.name for file in sphinx(env.File(str(sphinx_file)), env)] == ["mesh.inp"]
+        cache = _scanner._shared_caches[str(cache_file)]
+        cache.save()
+    assert len(json.loads(cache_file.read_text())) == 2
+
+    # Scanners without a cache file scan every time
+    with patch("waves._scanner._shared_cache") as mock_cache:
+        uncached = scons_extensions.abaqus_input_scanner()
+        assert [file.name for file in uncached(env.File(str(input_file)), env)] == ["mesh.inp", "nodes.inp"]
+        uncached = scons_extensions.sphinx_scanner()
+        assert [file.name for file in uncached(env.File(str(sphinx_file)), env)] == ["mesh.inp"]
+        mock_cache.assert_not_called()
+
+
 def test_sphinx_build() -> None:
     env = SCons.Environment.Environment()
     env.Append(BUILDERS={"SphinxBuild": scons_extensions.sphinx_build()})
@@ -2630,6 +3492,30 @@ python_script_input = {
             "parameter_set1/file5.out.stdout",
         ],
     ),
+    "study shard: first of two": (
+        2,
+        1,
+        (),
+        {"target": ["@{set_name}file6.out"], "shard": "0/2"},
+        parameter_generators.CartesianProduct({"one": [1, 2]}),
+        ["parameter_set1_file6.out", "parameter_set1_file6.out.stdout"],
+    ),
+    "study shard: second of two": (
+        2,
+        1,
+        (),
+        {"target": ["@{set_name}file7.out"], "shard": (1, 2)},
+        parameter_generators.CartesianProduct({"one": [1, 2]}),
+        ["parameter_set0_file7.out", "parameter_set0_file7.out.stdout"],
+    ),
+    "pass through: dictionary ignores shard": (
+        2,
+        1,
+        (),
+        {"target": ["@{set_name}file8.out"], "shard": "1/2"},
+        {"parameter_one": 1},
+        ["file8.out", "file8.out.stdout"],
+    ),
 }
 
 
@@ -2724,9 +3610,32 @@ parameter_study_sconscript = {
         {"variant_dir": pathlib.Path("set0"), "exports": {"set_name": "set0", "parameters": {"parameter_one": 1}}},
         does_not_raise,
     ),
+    "parameter generator shard": (
+        ("SConscript",),
+        {"study": cartesian_product, "shard": "1/2"},
+        {"variant_dir": None, "exports": {"set_name": "set0", "parameters": {"parameter_one": 1}}},
+        does_not_raise,
+    ),
+    "dictionary study ignores shard": (
+        ("SConscript",),
+        {"study": {"parameter_one": 1}, "shard": "0/2"},
+        {"variant_dir": None, "exports": {"set_name": "", "parameters": {"parameter_one": 1}}},
+        does_not_raise,
+    ),
 }
 
 
+def test_parameter_study_sconscript_empty_shard() -> None:
+    env = SCons.Environment.Environment()
+    # Git commit 7a95cef7: Patch the WAVES module itself for Python <=3.10 compatibility.
+    with patch("waves.scons_extensions.SConsEnvironment.SConscript") as mock_sconscript:
+        sconscript_output = scons_extensions.parameter_study_sconscript(
+            env, "SConscript", study=cartesian_product, shard="0/2"
+        )
+    mock_sconscript.assert_not_called()
+    assert sconscript_output == []
+
+
 @pytest.mark.parametrize(
     ("args", "kwargs", "expected", "outcome"),
     parameter_study_sconscript.values(),
@@ -2817,6 +3726,192 @@ def test_parameter_study_write(
         assert [str(target) for target in targets] == expected
 
 
+parameter_study_gather_cases = {
+    "prefixes": (
+        "study_prefixes.h5",
+        {},
+        ["parameter_set0_results.h5", "parameter_set1_results.h5"],
+    ),
+    "subdirectories": (
+        "study_subdirectories.h5",
+        {"subdirectories": True},
+        ["parameter_set0/results.h5", "parameter_set1/results.h5"],
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    ("target", "kwargs", "expected_sources"),
+    parameter_study_gather_cases.values(),
+    ids=parameter_study_gather_cases.keys(),
+)
+def test_parameter_study_gather(target: str, kwargs: dict, expected_sources: list[str]) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.parameter_study_gather, "ParameterStudyGather")
+    study = parameter_generators.CartesianProduct({"one": [1, 2]})
+    nodes = env.ParameterStudyGather(target, "@{set_name}results.h5", study, **kwargs)
+
+    assert [str(node) for node in nodes] == [target]
+    sources = nodes[0].sources
+    assert [pathlib.Path(str(node)) for node in sources[:-1]] == [pathlib.Path(path) for path in expected_sources]
+    assert isinstance(sources[-1], SCons.Node.Python.Value)
+    assert nodes[0].env["set_names"] == ["parameter_set0", "parameter_set1"]
+
+
+def test_parameter_study_gather_action(tmp_path: pathlib.Path) -> None:
+    study = parameter_generators.CartesianProduct({"one": [1, 2]})
+    set_names = list(study.parameter_study_to_dict().keys())
+    env = SCons.Environment.Environment()
+    source = []
+    for index, set_name in enumerate(set_names):
+        path = tmp_path / f"{set_name}_results.h5"
+        xarray.Dataset({"result": ("time", [index, index + 1.0])}, coords={"time": [0.0, 1.0]}).to_netcdf(
+            path, engine="h5netcdf"
+        )
+        source.append(env.File(str(path)))
+    source.append(env.Value(yaml.dump(study.parameter_study.to_dict())))
+    target = [env.File(str(tmp_path / "study.h5"))]
+
+    scons_extensions._parameter_study_gather(target, source, {"set_names": set_names})
+
+    with xarray.open_dataset(tmp_path / "study.h5", engine="h5netcdf") as gathered:
+        assert list(gathered[_set_coordinate_key].values) == set_names
+        assert gathered["result"].sel({_set_coordinate_key: "parameter_set1", "time": 1.0}).item() == 2.0
+        assert list(gathered["one"].values) == [1, 2]
+        assert _hash_coordinate_key in gathered.coords
+
+
+parameter_study_sbatch_array_cases = {
+    "no study": (
+        {"target": ["@{set_name}nostudy.out"], "study": None},
+        ["nostudy.out", "nostudy.out.stdout"],
+        [""],
+        ["echo nostudy.out"],
+    ),
+    "dictionary": (
+        {"target": ["@{set_name}dictionary.out"], "study": {"one": 1}},
+        ["dictionary.out", "dictionary.out.stdout"],
+        [""],
+        ["echo 1 dictionary.out"],
+    ),
+    "parameter generator": (
+        {"target": ["@{set_name}generator.out"], "study": parameter_generators.CartesianProduct({"one": [1, 2]})},
+        [
+            "parameter_set0_generator.out",
+            "parameter_set0_generator.out.stdout",
+            "parameter_set1_generator.out",
+            "parameter_set1_generator.out.stdout",
+        ],
+        ["parameter_set0", "parameter_set1"],
+        ["echo 1 parameter_set0_generator.out", "echo 2 parameter_set1_generator.out"],
+    ),
+    "parameter generator subdirectories shard": (
+        {
+            "target": ["@{set_name}shard.out"],
+            "study": parameter_generators.CartesianProduct({"one": [1, 2]}),
+            "subdirectories": True,
+            "shard": "0/2",
+        },
+        ["parameter_set1/shard.out", "parameter_set1/shard.out.stdout"],
+        ["parameter_set1"],
+        ["echo 2 parameter_set1/shard.out"],
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected_set_targets", "expected_set_names", "expected_commands"),
+    parameter_study_sbatch_array_cases.values(),
+    ids=parameter_study_sbatch_array_cases.keys(),
+)
+def test_parameter_study_sbatch_array(
+    kwargs: dict,
+    expected_set_targets: list[str],
+    expected_set_names: list[str],
+    expected_commands: list[str],
+) -> None:
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.parameter_study_sbatch_array, "ParameterStudySbatchArray")
+    array_directory = f"sbatch_array_{kwargs['target'][0]}"
+    nodes = env.ParameterStudySbatchArray(
+        source=["source.txt"],
+        slurm_job="echo ${one} ${TARGET}",
+        array_directory=array_directory,
+        **kwargs,
+    )
+
+    expected_targets = [
+        *expected_set_targets,
+        f"{array_directory}/manifest.json",
+        f"{array_directory}/sbatch_array.stdout",
+    ]
+    assert [pathlib.Path(str(node)) for node in nodes] == [pathlib.Path(path) for path in expected_targets]
+    assert all(node.precious for node in nodes)
+    tasks = json.loads(nodes[0].sources[-1].read())
+    assert [task["set_name"] for task in tasks] == expected_set_names
+    assert [task["index"] for task in tasks] == list(range(len(expected_set_names)))
+    assert [task["command"] for task in tasks] == expected_commands
+    assert all(task["sources"] == [env.File("source.txt").abspath] for task in tasks)
+
+
+def test_parameter_study_sbatch_array_exceptions() -> None:
+    env = SCons.Environment.Environment()
+    with pytest.raises(ValueError, match="At least one target"):
+        scons_extensions.parameter_study_sbatch_array(env, [], ["source.txt"], "echo")
+
+
+sbatch_array_cases = {
+    "complete": (["complete", "complete"], does_not_raise),
+    "failed": (["complete", "failed"], pytest.raises(RuntimeError, match="1: set1 \\(failed")),
+    "pending": (["pending", "complete"], pytest.raises(RuntimeError, match="0: set0 \\(pending")),
+}
+
+
+@pytest.mark.parametrize(
+    ("statuses", "outcome"),
+    sbatch_array_cases.values(),
+    ids=sbatch_array_cases.keys(),
+)
+@pytest.mark.usefixtures("sconsign_database")
+def test_sbatch_array(
+    tmp_path: pathlib.Path,
+    statuses: list[str],
+    outcome: contextlib.nullcontext | pytest.RaisesExc,
+) -> None:
+    env = SCons.Environment.Environment()
+    sources = [tmp_path / "set0.txt", tmp_path / "set1.txt"]
+    for path in sources:
+        path.write_text(path.name)
+    tasks = [
+        {"index": index, "set_name": f"set{index}", "stdout": f"set{index}.stdout", "sources": [str(sources[index])]}
+        for index in range(2)
+    ]
+    manifest = {
+        "command": "sbatch",
+        "job_id": "1234",
+        "output": "scheduler output\n",
+        "tasks": [{**task, "status": status} for task, status in zip(tasks, statuses, strict=True)],
+    }
+    target = [env.File(str(tmp_path / "manifest.json")), env.File(str(tmp_path / "sbatch_array.stdout"))]
+    source_nodes = [env.File(str(path)) for path in sources]
+    source = [*source_nodes, env.Value(json.dumps(tasks))]
+    overrides = {"program": "sbatch", "sbatch_options": "--time=1", "max_running": None}
+    with patch("waves._slurm.submit_array", return_value=manifest) as mock_submit, outcome:
+        try:
+            scons_extensions._sbatch_array(target, source, overrides)
+        finally:
+            # Source content signatures are part of the array task hash
+            expected_tasks = [
+                {**task, "source_signatures": [node.get_csig()]} for task, node in zip(tasks, source_nodes, strict=True)
+            ]
+            assert expected_tasks[0]["source_signatures"] != expected_tasks[1]["source_signatures"]
+            mock_submit.assert_called_once_with(
+                expected_tasks, tmp_path, program="sbatch", sbatch_options="--time=1", max_running=None
+            )
+            assert (tmp_path / "sbatch_array.stdout").read_text() == "scheduler output\n"
+            assert json.loads((tmp_path / "manifest.json").read_text())["job_id"] == "1234"
+
+
 test_qoi_pseudo_builder_cases: dict[str, tuple] = {
     "default call": (
         {},
@@ -2914,9 +4009,24 @@ waves_environment_methods = {
     "ProjectHelp": ("ProjectHelp", "project_help"),
     "ProjectAlias": ("ProjectAlias", "project_alias"),
     "SubstitutionSyntax": ("SubstitutionSyntax", "substitution_syntax"),
+    "SbatchPoll": ("SbatchPoll", "sbatch_poll"),
+    "SbatchPack": ("SbatchPack", "sbatch_pack"),
+    "ResourceScheduler": ("ResourceScheduler", "resource_scheduler"),
+    "TaskAccounting": ("TaskAccounting", "task_accounting"),
+    "LongestFirstOrder": ("LongestFirstOrder", "longest_first_order"),
+    "ProgressStream": ("ProgressStream", "progress_stream"),
+    "PythonWorkerPool": ("PythonWorkerPool", "python_worker_pool"),
+    "MatlabEnginePool": ("MatlabEnginePool", "matlab_engine_pool"),
+    "AbaqusJournalSessions": ("AbaqusJournalSessions", "abaqus_journal_sessions"),
+    "SSHMultiplex": ("SSHMultiplex", "ssh_multiplex"),
+    "LargeFileDecider": ("LargeFileDecider", "large_file_decider"),
+    "ArtifactCache": ("ArtifactCache", "artifact_cache"),
+    "SlurmExportHooks": ("SlurmExportHooks", "slurm_export_hooks"),
     "ParameterStudyTask": ("ParameterStudyTask", "parameter_study_task"),
     "ParameterStudySConscript": ("ParameterStudySConscript", "parameter_study_sconscript"),
     "ParameterStudyWrite": ("ParameterStudyWrite", "parameter_study_write"),
+    "ParameterStudyGather": ("ParameterStudyGather", "parameter_study_gather"),
+    "ParameterStudySbatchArray": ("ParameterStudySbatchArray", "parameter_study_sbatch_array"),
 }
 
 
@@ -3011,6 +4121,15 @@ def test_waves_environment_builders(builder: str, factory: str, factory_kwargs:
         mock_factory.assert_called_once_with(**factory_kwargs)
         mock_builder.assert_called_once_with(env, *args, target=target, source=source, **kwargs)
 
+    # Task accounting modifies the builder
+    env[_settings._task_accounting_variable] = unittest.mock.Mock()
+    with (
+        patch(f"waves.scons_extensions.{factory}", return_value=mock_builder),
+        patch("waves.scons_extensions.accounting_builder_actions", return_value=mock_builder) as mock_accounting,
+    ):
+        attribute(target, source, *args, **kwargs)
+        mock_accounting.assert_called_once_with(mock_builder, name=builder)
+
 
 def test_waves_environment_abaqus_pseudo_builder() -> None:
     env = scons_extensions.WAVESEnvironment()
@@ -0,0 +1,725 @@
+"""Test SLURM submission and tracking internal API against a local stand-in scheduler."""
+
+import contextlib
+import json
+import pathlib
+import shlex
+import subprocess
+import sys
+import textwrap
+import threading
+import unittest
+from unittest.mock import patch
+
+import pytest
+import SCons.Action
+import SCons.Environment
+import SCons.Node
+
+from waves import _scheduler, _slurm
+from waves._tests.common import platform_check
+
+does_not_raise = contextlib.nullcontext()
+
+testing_windows, root_fs, testing_macos = platform_check()
+
+fake_sbatch_array = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import subprocess
+    import sys
+
+    array = next(argument.split("=", 1)[1] for argument in sys.argv if argument.startswith("--array="))
+    indices = []
+    for part in array.split("%")[0].split(","):
+        first, _, last = part.partition("-")
+        indices.extend(range(int(first), int(last or first) + 1))
+    exit_code = 0
+    for index in indices:
+        environment = dict(os.environ, SLURM_ARRAY_TASK_ID=str(index))
+        exit_code |= subprocess.run(["bash", sys.argv[-1]], env=environment).returncode
+    print("1234")
+    sys.exit(exit_code)
+    """
+)
+
+
+def write_fake_program(directory: pathlib.Path, name: str, contents: str) -> pathlib.Path:
+    """Write an executable stand-in for a scheduler command line program.
+
+    :param directory: Parent directory of the program
+    :param name: Program file name
+    :param contents: Program file contents
+
+    :returns: Program path
+    """
+    program = directory / name
+    program.write_text(contents)
+    program.chmod(0o755)
+    return program
+
+
+def array_tasks(directory: pathlib.Path, commands: list[str]) -> list[dict]:
+    """Return array task dictionaries with one task per command and one target per task.
+
+    :param directory: Parent directory of the array task directories
+    :param commands: Array task commands. The ``TARGET`` string is replaced with the task target path.
+
+    :returns: Array task dictionaries
+    """
+    tasks = []
+    for index, command in enumerate(commands):
+        set_directory = directory / f"set{index}"
+        set_directory.mkdir(parents=True, exist_ok=True)
+        target = set_directory / "output.txt"
+        stdout = set_directory / "output.txt.stdout"
+        tasks.append(
+            {
+                "index": index,
+                "set_name": f"set{index}",
+                "command": command.replace("TARGET", str(target)),
+                "directory": str(set_directory),
+                "stdout": str(stdout),
+                "targets": [str(target), str(stdout)],
+            }
+        )
+    return tasks
+
+
+array_index_list_cases = {
+    "empty": ([], ""),
+    "single": ([3], "3"),
+    "range": ([0, 1, 2, 3], "0-3"),
+    "mixed": ([9, 0, 1, 2, 3, 7, 10], "0-3,7,9-10"),
+    "duplicates": ([1, 1, 2], "1-2"),
+}
+
+
+@pytest.mark.parametrize(
+    ("indices", "expected"),
+    array_index_list_cases.values(),
+    ids=array_index_list_cases.keys(),
+)
+def test_array_index_list(indices: list[int], expected: str) -> None:
+    assert _slurm._array_index_list(indices) == expected
+
+
+def test_task_hash() -> None:
+    task = {"command": "echo a", "directory": "/a", "targets": ["/a/b"], "index": 0}
+    assert _slurm._task_hash(task) == _slurm._task_hash({**task, "index": 1})
+    assert _slurm._task_hash(task) != _slurm._task_hash({**task, "command": "echo b"})
+    assert _slurm._task_hash(task) == _slurm._task_hash({**task, "source_signatures": []})
+    assert _slurm._task_hash(task) != _slurm._task_hash({**task, "source_signatures": ["csig"]})
+
+
+def test_read_array_status(tmp_path: pathlib.Path) -> None:
+    task = {"command": "echo a", "directory": "/a", "targets": ["/a/b"], "index": 0}
+    status_file = tmp_path / "0.status"
+    assert _slurm._read_array_status(tmp_path, task) is None
+    status_file.write_text(f"2 {_slurm._task_hash(task)}\n")
+    assert _slurm._read_array_status(tmp_path, task) == 2
+    status_file.write_text("0 differenthash\n")
+    assert _slurm._read_array_status(tmp_path, task) is None
+    status_file.write_text("malformed\n")
+    assert _slurm._read_array_status(tmp_path, task) is None
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_write_array_script(tmp_path: pathlib.Path) -> None:
+    tasks = array_tasks(tmp_path, ["echo first > TARGET", "echo second > TARGET && false"])
+    script = tmp_path / "array.sh"
+    _slurm._write_array_script(script, tasks, tmp_path)
+
+    for task, expected_exit_code in zip(tasks, [0, 1], strict=True):
+        process = subprocess.run(["bash", str(script)], env={"SLURM_ARRAY_TASK_ID": str(task["index"])}, check=False)
+        assert process.returncode == expected_exit_code
+        assert _slurm._read_array_status(tmp_path, task) == expected_exit_code
+    assert pathlib.Path(tasks[0]["targets"][0]).read_text() == "first\n"
+
+    process = subprocess.run(["bash", str(script)], env={"SLURM_ARRAY_TASK_ID": "99"}, check=False)
+    assert process.returncode == 1
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_submit_array(tmp_path: pathlib.Path) -> None:
+    program = write_fake_program(tmp_path, "sbatch", fake_sbatch_array)
+    status_directory = tmp_path / "sbatch_array"
+    marker = tmp_path / "fail"
+    marker.touch()
+    tasks = array_tasks(tmp_path, ["echo zero > TARGET", f"test ! -f {marker} && echo one > TARGET"])
+
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program), max_running=2)
+    assert manifest["job_id"] == "1234"
+    assert "--array=0-1%2" in manifest["command"]
+    assert [task["status"] for task in manifest["tasks"]] == ["complete", "failed"]
+    assert [task["exit_code"] for task in manifest["tasks"]] == [0, 1]
+
+    # Only the failed array index is resubmitted
+    marker.unlink()
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program))
+    assert "--array=1 " in manifest["command"]
+    assert [task["status"] for task in manifest["tasks"]] == ["complete", "complete"]
+
+    # Nothing to submit
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program))
+    assert manifest["command"] is None
+    assert manifest["job_id"] is None
+
+    # Missing targets are resubmitted
+    pathlib.Path(tasks[0]["targets"][0]).unlink()
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program))
+    assert "--array=0 " in manifest["command"]
+    assert [task["status"] for task in manifest["tasks"]] == ["complete", "complete"]
+
+    # Changed sources are resubmitted although the previous status file and targets exist
+    tasks[1]["source_signatures"] = ["changed"]
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program))
+    assert "--array=1 " in manifest["command"]
+    assert [task["status"] for task in manifest["tasks"]] == ["complete", "complete"]
+    manifest = _slurm.submit_array(tasks, status_directory, program=str(program))
+    assert manifest["command"] is None
+
+
+def test_submit_array_exceptions(tmp_path: pathlib.Path) -> None:
+    tasks = array_tasks(tmp_path, ["echo zero > TARGET"])
+    with (
+        patch("subprocess.run", side_effect=FileNotFoundError("missing")),
+        pytest.raises(RuntimeError, match="Could not execute sbatch command"),
+    ):
+        _slurm.submit_array(tasks, tmp_path / "sbatch_array", program="notsbatch")
+
+
+def test_submit_array_pending(tmp_path: pathlib.Path) -> None:
+    tasks = array_tasks(tmp_path, ["echo zero > TARGET"])
+    completed = subprocess.CompletedProcess([], returncode=1, stdout="", stderr="sbatch: error: rejected")
+    with patch("subprocess.run", return_value=completed):
+        manifest = _slurm.submit_array(tasks, tmp_path / "sbatch_array")
+    assert manifest["job_id"] is None
+    assert manifest["output"] == "sbatch: error: rejected"
+    assert [task["status"] for task in manifest["tasks"]] == ["pending"]
+
+
+fake_scheduler_sbatch = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import pathlib
+    import subprocess
+    import sys
+
+    jobs = pathlib.Path(__file__).parent / "jobs"
+    jobs.mkdir(exist_ok=True)
+    job_id = str(len(list(jobs.iterdir())) + 100)
+    wrap = sys.argv[sys.argv.index("--wrap") + 1]
+    exit_code = subprocess.run(["bash", "-c", wrap]).returncode
+    (jobs / job_id).write_text("COMPLETED" if exit_code == 0 else "FAILED")
+    if "--parsable" in sys.argv:
+        print(f"{{job_id}};cluster")
+    else:
+        print(f"Submitted batch job {{job_id}}")
+    """
+)
+
+fake_scheduler_squeue = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    """
+)
+
+fake_scheduler_sacct = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import pathlib
+    import sys
+
+    jobs = pathlib.Path(__file__).parent / "jobs"
+    for job_id in sys.argv[sys.argv.index("-j") + 1].split(","):
+        job = jobs / job_id
+        if job.exists():
+            print(f"{{job_id}}|{{job.read_text()}}")
+    """
+)
+
+
+def fake_scheduler(directory: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path, pathlib.Path]:
+    """Write stand-in sbatch, squeue, and sacct programs sharing a job state directory.
+
+    The sbatch stand-in runs the ``--wrap`` command to completion before returning the job ID.
+
+    :param directory: Parent directory of the programs and job state directory
+
+    :returns: sbatch, squeue, and sacct program paths
+    """
+    return (
+        write_fake_program(directory, "sbatch", fake_scheduler_sbatch),
+        write_fake_program(directory, "squeue", fake_scheduler_squeue),
+        write_fake_program(directory, "sacct", fake_scheduler_sacct),
+    )
+
+
+parse_job_id_cases = {
+    "parsable": ("1234\n", "1234"),
+    "parsable cluster": ("1234;cluster\n", "1234"),
+    "preceding output": ("warning\n1234\n", "1234"),
+    "not parsable": ("Submitted batch job 1234\n", None),
+    "empty": ("", None),
+}
+
+
+@pytest.mark.parametrize(
+    ("output", "expected"),
+    parse_job_id_cases.values(),
+    ids=parse_job_id_cases.keys(),
+)
+def test_parse_job_id(output: str, expected: str | None) -> None:
+    assert _slurm._parse_job_id(output) == expected
+
+
+query_scheduler_cases = {
+    "squeue": (
+        subprocess.CompletedProcess([], 0, stdout="1 RUNNING\n2 PENDING\n", stderr=""),
+        None,
+        {"1": "RUNNING", "2": "PENDING"},
+    ),
+    "sacct": (
+        subprocess.CompletedProcess([], 0, stdout="1|COMPLETED\n2|CANCELLED by 100\n3|\n", stderr=""),
+        "|",
+        {"1": "COMPLETED", "2": "CANCELLED"},
+    ),
+    "failed query": (subprocess.CompletedProcess([], 1, stdout="", stderr="error"), None, None),
+}
+
+
+@pytest.mark.parametrize(
+    ("completed", "separator", "expected"),
+    query_scheduler_cases.values(),
+    ids=query_scheduler_cases.keys(),
+)
+def test_query_scheduler(
+    completed: subprocess.CompletedProcess, separator: str | None, expected: dict[str, str] | None
+) -> None:
+    with patch("subprocess.run", return_value=completed) as mock_run:
+        assert _slurm._query_scheduler(["squeue"], ["1", "2", "3"], separator) == expected
+    mock_run.assert_called_once_with(["squeue", "-j", "1,2,3"], capture_output=True, text=True, check=False)
+
+
+def test_query_scheduler_missing_program() -> None:
+    with patch("subprocess.run", side_effect=FileNotFoundError("missing")):
+        assert _slurm._query_scheduler(["squeue"], ["1"], None) is None
+
+
+class TestJobPoller:
+    """Test the :class:`waves._slurm.JobPoller` class."""
+
+    def test_record_and_lookup(self, tmp_path: pathlib.Path) -> None:
+        poller = _slurm.JobPoller(tmp_path / "state" / "state.json")
+        assert poller.lookup("key") is None
+        poller.record("key", "1234")
+        assert poller.lookup("key") == "1234"
+        assert _slurm.JobPoller(tmp_path / "state" / "state.json").lookup("key") == "1234"
+        poller.record("key", None)
+        assert poller.lookup("key") is None
+        (tmp_path / "state" / "state.json").write_text("not json")
+        assert poller.lookup("key") is None
+
+    def test_poll(self, tmp_path: pathlib.Path) -> None:
+        poller = _slurm.JobPoller(tmp_path / "state.json", missing_limit=2)
+        squeue = {"1": "RUNNING"}
+        sacct = {"2": "COMPLETED", "3": "COMPLETING"}
+        with patch("waves._slurm._query_scheduler", side_effect=[squeue, sacct]) as mock_query:
+            assert poller.poll(["1", "2", "3", "4"]) == {"2": "COMPLETED"}
+        assert mock_query.call_args_list[1].args[1] == ["2", "3", "4"]
+        with patch("waves._slurm._query_scheduler", side_effect=[None, None]):
+            assert poller.poll(["4"]) == {"4": "UNKNOWN"}
+        with patch("waves._slurm._query_scheduler", side_effect=[squeue]) as mock_query:
+            assert poller.poll(["1"]) == {}
+            mock_query.assert_called_once()
+
+    def test_wait(self, tmp_path: pathlib.Path) -> None:
+        poller = _slurm.JobPoller(tmp_path / "state.json", interval=0.01)
+        responses: list[dict[str, str]] = [{}, {}, {"1": "FAILED"}]
+        with patch.object(poller, "poll", side_effect=lambda _job_ids: responses.pop(0) if responses else {}):
+            assert poller.wait("1") == "FAILED"
+        assert not responses
+        assert poller._watched == {}
+        assert poller._states == {}
+
+
+sbatch_submit_arguments_cases = {
+    "sbatch wait": (
+        "sbatch",
+        ["cd", "/dir", "&&", "sbatch", "--wait", "--output=out", "--wrap", '"echo --wait"'],
+        ["cd", "/dir", "&&", "sbatch", "--parsable", "--output=out", "--wrap", '"echo --wait"'],
+    ),
+    "absolute program": (
+        "/usr/bin/sbatch",
+        ["/usr/bin/sbatch", "--output=out", "--wait", "--wrap", '"echo"'],
+        ["/usr/bin/sbatch", "--output=out", "--parsable", "--wrap", '"echo"'],
+    ),
+    "no wait": ("sbatch", ["sbatch", "--output=out", "--wrap", '"echo --wait"'], None),
+    "not sbatch": ("sbatch", ["python", "--wait"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("program", "args", "expected"),
+    sbatch_submit_arguments_cases.values(),
+    ids=sbatch_submit_arguments_cases.keys(),
+)
+def test_sbatch_submit_arguments(program: str, args: list[str], expected: list[str] | None) -> None:
+    assert _slurm._sbatch_submit_arguments(args, program) == expected
+
+
+def test_sbatch_submit_arguments_options() -> None:
+    args = ["sbatch", "--wait", "--wrap", '"echo"']
+    expected = ["sbatch", "--parsable", "--dependency=afterok:1", "--wrap", '"echo"']
+    assert _slurm._sbatch_submit_arguments(args, options=["--dependency=afterok:1"]) == expected
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_sbatch_poll_spawn(tmp_path: pathlib.Path) -> None:
+    sbatch, squeue, sacct = fake_scheduler(tmp_path)
+    poller = _slurm.JobPoller(tmp_path / "state.json", str(squeue), str(sacct), interval=0.01)
+    passthrough = unittest.mock.Mock(return_value=0)
+    spawn = _slurm.SbatchPollSpawn(passthrough, poller, program=str(sbatch))
+    target = tmp_path / "target.txt"
+    environment = {"PATH": "/usr/bin:/bin"}
+
+    # Successful job is removed from the state file
+    args = [str(sbatch), "--wait", "--wrap", f"'echo done > {target}'"]
+    assert spawn("sh", shlex.quote, str(sbatch), args, environment) == 0
+    assert target.read_text() == "done\n"
+    assert poller._read_state() == {}
+    passthrough.assert_not_called()
+
+    # Failed job remains in the state file
+    args = [str(sbatch), "--wait", "--wrap", "'false'"]
+    assert spawn("sh", shlex.quote, str(sbatch), args, environment) == 1
+    assert list(poller._read_state().values()) == ["101"]
+
+    # Resubmit after re-attaching to a failed job
+    (tmp_path / "jobs" / "101").write_text("FAILED")
+    assert spawn("sh", shlex.quote, str(sbatch), args, environment) == 1
+    assert list(poller._read_state().values()) == ["102"]
+
+    # Re-attach to a completed job without resubmission
+    (tmp_path / "jobs" / "102").write_text("COMPLETED")
+    assert spawn("sh", shlex.quote, str(sbatch), args, environment) == 0
+    assert len(list((tmp_path / "jobs").iterdir())) == 3
+    assert poller._read_state() == {}
+
+    # Other commands pass through to the original spawn function
+    args = ["echo", "--wait"]
+    assert spawn("sh", shlex.quote, "echo", args, environment) == 0
+    passthrough.assert_called_once_with("sh", shlex.quote, "echo", args, environment)
+
+
+def test_sbatch_poll_spawn_submission_failure(tmp_path: pathlib.Path) -> None:
+    poller = _slurm.JobPoller(tmp_path / "state.json")
+    spawn = _slurm.SbatchPollSpawn(lambda *_args: 0, poller)
+    completed = subprocess.CompletedProcess([], 1, stdout="", stderr="sbatch: error: rejected\n")
+    with patch("subprocess.run", return_value=completed), patch.object(poller, "wait") as mock_wait:
+        assert spawn("sh", shlex.quote, "sbatch", ["sbatch", "--wait", "--wrap", "'echo'"], {}) == 1
+    mock_wait.assert_not_called()
+    assert poller._read_state() == {}
+
+
+def test_export_recorder(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    env.Dir(str(tmp_path))
+    record_file = tmp_path / "record.jsonl"
+    recorder = _slurm.ExportRecorder(record_file)
+    source = tmp_path / "source.txt"
+    command_nodes = env.Command(
+        target=[str(tmp_path / "a.txt"), str(tmp_path / "b.txt")],
+        source=[str(source)],
+        action=["mkdir -p ${TARGET.dir}", "cat ${SOURCE} > ${TARGETS[0]} && touch ${TARGETS[1]}"],
+    )
+    function_nodes = env.Command(
+        target=[str(tmp_path / "c.txt")],
+        source=command_nodes[:1],
+        action=lambda target, source, env: None,  # noqa: ARG005
+    )
+
+    # Record each task once regardless of the number of printed actions
+    recorder("", command_nodes, [source], env)
+    recorder("", command_nodes[1:], [source], env)
+    recorder("", function_nodes, command_nodes[:1], env)
+    records = [json.loads(line) for line in record_file.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]["targets"] == [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+    # Children include the implicit command executable dependencies
+    assert str(source) in records[0]["children"]
+    # SCons escapes node paths with the same escape function used for the SPAWN arguments
+    commands = [[argument.strip('"') for argument in command] for command in records[0]["commands"]]
+    assert commands == [
+        ["mkdir", "-p", str(tmp_path)],
+        ["cat", str(source), ">", str(tmp_path / "a.txt"), "&&", "touch", str(tmp_path / "b.txt")],
+    ]
+    assert records[1]["targets"] == [str(tmp_path / "c.txt")]
+    assert str(tmp_path / "a.txt") in records[1]["children"]
+    assert records[1]["commands"] is None
+
+
+def test_export_recorder_silent_tasks(tmp_path: pathlib.Path) -> None:
+    env = SCons.Environment.Environment()
+    record_file = tmp_path / "record.jsonl"
+    recorder = _slurm.ExportRecorder(record_file)
+    env["PRINT_CMD_LINE_FUNC"] = recorder
+    silent = env.Command(str(tmp_path / "silent.txt"), [], SCons.Action.Action("touch ${TARGET}", cmdstr=None))
+    printed = env.Command(str(tmp_path / "printed.txt"), silent, "cat ${SOURCE} > ${TARGET}")
+    up_to_date = env.Command(str(tmp_path / "up_to_date.txt"), [], SCons.Action.Action("touch ${TARGET}", cmdstr=""))
+    unhooked = SCons.Environment.Environment().Command(str(tmp_path / "unhooked.txt"), [], "touch ${TARGET}")
+    for node in silent + printed + unhooked:
+        node.set_state(SCons.Node.executed)
+    up_to_date[0].set_state(SCons.Node.up_to_date)
+
+    recorder("", printed, silent, env)
+    recorder.finish()
+    records = [json.loads(line) for line in record_file.read_text().splitlines()]
+    assert records[0]["targets"] == [str(tmp_path / "printed.txt")]
+    assert records[1:] == [
+        {"targets": [str(tmp_path / "silent.txt")], "children": [], "commands": None, "silent": True}
+    ]
+
+
+def test_export_recorder_shared(tmp_path: pathlib.Path) -> None:
+    record_file = tmp_path / "record.jsonl"
+    with (
+        patch.dict(_slurm._export_recorders, clear=True),
+        patch("atexit.register") as mock_register,
+    ):
+        recorder = _slurm._export_recorder(str(record_file))
+        assert _slurm._export_recorder(record_file) is recorder
+    assert recorder.record_file == record_file
+    mock_register.assert_called_once_with(recorder.finish)
+
+
+def test_reconcile_spawn(tmp_path: pathlib.Path) -> None:
+    manifest = tmp_path / "manifest.json"
+    tasks = [
+        {"job_id": "1", "targets": ["/dir/a"], "commands": ["mkdir /dir", "touch /dir/a"]},
+        {"job_id": "2", "targets": ["/b"], "commands": ["touch /b"]},
+    ]
+    manifest.write_text(json.dumps({"tasks": tasks}))
+    poller = _slurm.JobPoller()
+    passthrough = unittest.mock.Mock(return_value=0)
+    spawn = _slurm.ReconcileSpawn(passthrough, manifest, poller)
+    assert spawn.jobs == {"mkdir /dir": "1", "touch /dir/a": "1", "touch /b": "2"}
+    assert spawn.targets == ["/dir/a", "/b"]
+
+    states = {"1": "COMPLETED", "2": "FAILED"}
+    with patch.object(poller, "wait", side_effect=lambda job_id: states[job_id]) as mock_wait:
+        assert spawn("sh", shlex.quote, "touch", ["touch", "/dir/a"], {}) == 0
+        assert spawn("sh", shlex.quote, "touch", ["touch", "/b"], {}) == 1
+        assert spawn("sh", shlex.quote, "echo", ["echo", "not", "exported"], {}) == 0
+    assert [call.args[0] for call in mock_wait.call_args_list] == ["1", "2"]
+    passthrough.assert_called_once_with("sh", shlex.quote, "echo", ["echo", "not", "exported"], {})
+
+
+def test_job_poller_without_state_file() -> None:
+    poller = _slurm.JobPoller()
+    poller.record("key", "1234")
+    assert poller.lookup("key") is None
+
+
+slurm_time_cases = {
+    "minutes": ("10", 600, does_not_raise),
+    "minutes seconds": ("10:30", 630, does_not_raise),
+    "hours minutes seconds": ("1:02:03", 3723, does_not_raise),
+    "days hours": ("1-2", 93600, does_not_raise),
+    "days hours minutes": ("1-02:03", 93780, does_not_raise),
+    "days hours minutes seconds": ("1-02:03:04", 93784, does_not_raise),
+    "quoted": ("'10'", 600, does_not_raise),
+    "too many fields": ("1:2:3:4", None, pytest.raises(ValueError, match="Malformed")),
+    "not a number": ("ten", None, pytest.raises(ValueError, match="invalid literal")),
+}
+
+
+@pytest.mark.parametrize(
+    ("value", "expected", "outcome"),
+    slurm_time_cases.values(),
+    ids=slurm_time_cases.keys(),
+)
+def test_parse_slurm_time(value: str, expected: int | None, outcome: contextlib.nullcontext | pytest.RaisesExc) -> None:
+    with outcome:
+        assert _slurm._parse_slurm_time(value) == expected
+
+
+def test_format_slurm_time() -> None:
+    assert _slurm._format_slurm_time(93784) == "1-02:03:04"
+    assert _slurm._format_slurm_time(59) == "0-00:00:59"
+    assert _slurm._parse_slurm_time(_slurm._format_slurm_time(12345)) == 12345
+
+
+parse_pack_task_cases = {
+    "sbatch builder": (
+        ["cd", "/dir", "&&", "sbatch", "--wait", "--output=/dir/a.stdout", "--time=2:00", "--wrap", '"echo a"'],
+        {"prefix": "cd /dir &&", "output": "/dir/a.stdout", "cpus": 1, "time": 120, "wrap": '"echo a"'},
+    ),
+    "separate values": (
+        ["/bin/sbatch", "--wait", "-o", "a.out", "-c", "4", "-t", "5", "-J", "name", "--wrap", '"echo a"'],
+        {"prefix": "", "output": "a.out", "cpus": 4, "time": 300, "wrap": '"echo a"'},
+    ),
+    "default output and time": (
+        ["sbatch", "--wait", "--wrap", '"echo a"'],
+        {"prefix": "", "output": None, "cpus": 1, "time": 600, "wrap": '"echo a"'},
+    ),
+    "no wait": (["sbatch", "--output=a.out", "--wrap", '"echo a"'], None),
+    "no wrap": (["sbatch", "--wait", "script.sh"], None),
+    "dedicated allocation option": (["sbatch", "--wait", "--mem=10G", "--wrap", '"echo a"'], None),
+    "output pattern": (["sbatch", "--wait", "--output=%j.out", "--wrap", '"echo a"'], None),
+    "malformed time": (["sbatch", "--wait", "--time=soon", "--wrap", '"echo a"'], None),
+    "trailing arguments": (["sbatch", "--wait", "--wrap", '"echo a"', "&&", "echo", "b"], None),
+    "not sbatch": (["echo", "--wait", "--wrap", "a"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    parse_pack_task_cases.values(),
+    ids=parse_pack_task_cases.keys(),
+)
+def test_parse_pack_task(args: list[str], expected: dict | None) -> None:
+    assert _slurm._parse_pack_task(args) == expected
+
+
+pack_tasks_cases = {
+    "one shelf": ([(1, 60), (1, 30), (2, 10)], 4, 600, [[[0, 1, 2]]]),
+    "cpu limited shelves": ([(2, 60), (2, 30), (2, 10)], 4, 600, [[[0, 1], [2]]]),
+    "time limited allocations": ([(4, 300), (4, 300), (4, 200)], 4, 600, [[[0], [1]], [[2]]]),
+    "decreasing time order": ([(1, 10), (1, 300), (1, 60)], 2, 600, [[[1, 2], [0]]]),
+    "second allocation fits later shelf": ([(2, 400), (2, 300), (2, 200)], 2, 600, [[[0], [2]], [[1]]]),
+}
+
+
+@pytest.mark.parametrize(
+    ("resources", "cpus", "time", "expected"),
+    pack_tasks_cases.values(),
+    ids=pack_tasks_cases.keys(),
+)
+def test_pack_tasks(resources: list[tuple[int, int]], cpus: int, time: int, expected: list[list[list[int]]]) -> None:
+    tasks = [{"cpus": task_cpus, "time": task_time} for task_cpus, task_time in resources]
+    assert _slurm._pack_tasks(tasks, cpus, time) == expected
+
+
+def test_pack_tasks_exceptions() -> None:
+    with pytest.raises(ValueError, match="allocation"):
+        _slurm._pack_tasks([{"cpus": 8, "time": 60}], 4, 600)
+    with pytest.raises(ValueError, match="allocation"):
+        _slurm._pack_tasks([{"cpus": 1, "time": 900}], 4, 600)
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_write_pack_script(tmp_path: pathlib.Path) -> None:
+    directory = tmp_path / "task"
+    directory.mkdir()
+    tasks: list[dict] = [
+        {"prefix": f"cd {directory} &&", "wrap": '"echo a > a.txt"', "output": "a.stdout", "cpus": 1},
+        {"prefix": "", "wrap": '"echo b; exit 3"', "output": None, "cpus": 2},
+    ]
+    script = tmp_path / "sbatch_pack.sh"
+    _slurm._write_pack_script(script, tasks, [[0], [1]], tmp_path, step_command="env CPUS={cpus}")
+    contents = script.read_text()
+    assert contents.count("wait\n") == 2
+    assert "env CPUS=2 sh -c" in contents
+
+    subprocess.run(["bash", str(script)], cwd=tmp_path, check=True)
+    assert (directory / "a.txt").read_text() == "a\n"
+    assert (directory / "a.stdout").exists()
+    assert (tmp_path / "0.status").read_text() == "0\n"
+    assert (tmp_path / "1.out").read_text() == "b\n"
+    assert (tmp_path / "1.status").read_text() == "3\n"
+
+
+fake_sbatch_pack = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import pathlib
+    import subprocess
+    import sys
+
+    calls = pathlib.Path(__file__).parent / "calls.txt"
+    with calls.open("a") as calls_file:
+        calls_file.write(" ".join(sys.argv[1:]) + "\\n")
+    exit_code = subprocess.run(["bash", sys.argv[-1]]).returncode
+    print("300")
+    sys.exit(exit_code)
+    """
+)
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_sbatch_pack_spawn(tmp_path: pathlib.Path) -> None:
+    sbatch = write_fake_program(tmp_path, "sbatch", fake_sbatch_pack)
+    passthrough = unittest.mock.Mock(return_value=0)
+    spawn = _slurm.SbatchPackSpawn(
+        passthrough,
+        tmp_path / "pack",
+        program=str(sbatch),
+        cpus=4,
+        time=3600,
+        max_task_time=600,
+        window=0.2,
+        step_command="",
+    )
+    environment = {"PATH": "/usr/bin:/bin"}
+    commands = {
+        "a": [str(sbatch), "--wait", f"--output={tmp_path / 'a.stdout'}", "--wrap", f"'echo a > {tmp_path / 'a'}'"],
+        "b": [str(sbatch), "--wait", "-c", "2", "--time=1", "--wrap", f"'echo b > {tmp_path / 'b'}'"],
+        "fail": [str(sbatch), "--wait", "--wrap", "'exit 2'"],
+        "long": [str(sbatch), "--wait", "--time=1:00:00", "--wrap", "'echo long'"],
+    }
+    exit_codes: dict[str, int] = {}
+
+    def run(name: str) -> None:
+        exit_codes[name] = spawn("sh", shlex.quote, str(sbatch), commands[name], environment)
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in commands]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert exit_codes == {"a": 0, "b": 0, "fail": 2, "long": 0}
+    assert (tmp_path / "a").read_text() == "a\n"
+    assert (tmp_path / "b").read_text() == "b\n"
+    assert (tmp_path / "a.stdout").exists()
+
+    # Small tasks share a single allocation and long tasks keep a dedicated allocation
+    calls = (tmp_path / "calls.txt").read_text().splitlines()
+    assert len(calls) == 1
+    assert "--cpus-per-task=4" in calls[0]
+    passthrough.assert_called_once()
+    assert passthrough.call_args.args[3] == commands["long"]
+
+
+def test_sbatch_pack_spawn_environments(tmp_path: pathlib.Path) -> None:
+    spawn = _slurm.SbatchPackSpawn(unittest.mock.Mock(), tmp_path, cpus=4, time=3600)
+    task = {"cpus": 1, "time": 60}
+    first = {"PATH": "/bin"}
+    second = {"PATH": "/usr/bin"}
+    spawn._pending = [
+        (task, {"sh": "sh", "env": first}),
+        (task, {"sh": "sh", "env": second}),
+        (task, {"sh": "sh", "env": dict(first)}),
+        (task, {"sh": "bash", "env": first}),
+    ]
+    with patch("threading.Thread") as mock_thread:
+        spawn._flush()
+
+    # Tasks are only packed with tasks spawned by the same shell and environment variables
+    submissions = [call.kwargs["args"] for call in mock_thread.call_args_list]
+    assert [(len(packed), sh, env) for packed, _shelves, sh, env in submissions] == [
+        (2, "sh", first),
+        (1, "sh", second),
+        (1, "bash", first),
+    ]
+
+
+def test_expand_actions() -> None:
+    env = SCons.Environment.Environment()
+    first = SCons.Action.Action("echo first")
+    second = SCons.Action.Action("echo second")
+    actions = [_scheduler.ResourceAction(SCons.Action.ListAction([first, second]), {"cpus": "1"})]
+    assert _slurm._expand_actions(actions, [], [], env, None) == [first, second]
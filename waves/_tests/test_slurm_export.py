@@ -0,0 +1,186 @@
+"""Test the slurm_export subcommand internal API."""
+
+import contextlib
+import json
+import pathlib
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from waves import _settings, _slurm_export
+
+does_not_raise = contextlib.nullcontext()
+
+
+def task_record(targets: list[str], children: list[str], commands: list[list[str]] | None) -> dict:
+    """Return a task record matching the :class:`waves._slurm.ExportRecorder` format.
+
+    :param targets: Task target paths
+    :param children: Task dependency paths
+    :param commands: Task commands as lists of command arguments
+
+    :returns: task record
+    """
+    return {"targets": targets, "children": children, "commands": commands}
+
+
+submission_arguments_cases = {
+    "wrapped command": (
+        task_record(["/out"], [], [["echo", "'hello world'", ">", "/out"]]),
+        [],
+        "",
+        ["sbatch", "--parsable", "--output=/manifest/%j.out", "--wrap", "'echo '\"'\"'hello world'\"'\"' > /out'"],
+        does_not_raise,
+    ),
+    "wrapped commands with dependencies": (
+        task_record(["/out"], [], [["mkdir", "/dir"], ["touch", "/out"]]),
+        ["1", "2"],
+        "--kill-on-invalid-dep=yes",
+        [
+            "sbatch",
+            "--parsable",
+            "--kill-on-invalid-dep=yes",
+            "--dependency=afterok:1:2",
+            "--output=/manifest/%j.out",
+            "--wrap",
+            "'mkdir /dir && touch /out'",
+        ],
+        does_not_raise,
+    ),
+    "sbatch wait": (
+        task_record(["/out"], [], [["cd", "/dir", "&&", "sbatch", "--wait", "--wrap", '"touch /out"']]),
+        ["1"],
+        "",
+        ["cd", "/dir", "&&", "sbatch", "--parsable", "--dependency=afterok:1", "--wrap", '"touch /out"'],
+        does_not_raise,
+    ),
+    "python function": (task_record(["/out"], [], None), [], "", None, pytest.raises(RuntimeError)),
+    "mixed sbatch": (
+        task_record(["/out"], [], [["mkdir", "/dir"], ["sbatch", "--wait", "--wrap", '"touch /out"']]),
+        [],
+        "",
+        None,
+        pytest.raises(RuntimeError),
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    ("task", "dependencies", "sbatch_options", "expected", "outcome"),
+    submission_arguments_cases.values(),
+    ids=submission_arguments_cases.keys(),
+)
+def test_submission_arguments(
+    task: dict,
+    dependencies: list[str],
+    sbatch_options: str,
+    expected: list[str] | None,
+    outcome: contextlib.nullcontext | pytest.RaisesExc,
+) -> None:
+    with outcome:
+        arguments = _slurm_export._submission_arguments(
+            task, dependencies, pathlib.Path("/manifest"), sbatch_options=sbatch_options
+        )
+        assert arguments == expected
+
+
+def test_submit_tasks(tmp_path: pathlib.Path) -> None:
+    tasks = [
+        task_record(["/a"], ["/source"], [["touch", "/a"]]),
+        task_record(["/b", "/c"], ["/a"], [["touch", "/b", "/c"]]),
+        task_record(["/d"], ["/a", "/c", "/source"], [["touch", "/d"]]),
+    ]
+    job_ids = iter(["10;cluster\n", "11\n", "12\n"])
+    manifest = tmp_path / "manifest.json"
+
+    def run(*args, **kwargs) -> subprocess.CompletedProcess:  # noqa: ARG001
+        return subprocess.CompletedProcess([], 0, stdout=next(job_ids), stderr="")
+
+    with patch("subprocess.run", side_effect=run) as mock_run:
+        manifest_tasks = _slurm_export._submit_tasks(tasks, tmp_path, tmp_path / "manifest", manifest=manifest)
+    assert [task["job_id"] for task in manifest_tasks] == ["10", "11", "12"]
+    assert [task["dependencies"] for task in manifest_tasks] == [[], ["10"], ["10", "11"]]
+    assert manifest_tasks[2]["commands"] == ["touch /d"]
+    assert "--dependency=afterok:10:11" in mock_run.call_args_list[2].args[0][-1]
+    assert json.loads(manifest.read_text()) == {"tasks": manifest_tasks}
+    assert (tmp_path / "manifest").is_dir()
+
+    # Failed submissions stop the export
+    failure = subprocess.CompletedProcess([], 1, stdout="", stderr="sbatch: error: rejected\n")
+    with patch("subprocess.run", return_value=failure), pytest.raises(RuntimeError):
+        _slurm_export._submit_tasks(tasks, tmp_path, tmp_path / "manifest")
+
+    # Invalid tasks are found before the first submission
+    with patch("subprocess.run") as mock_run, pytest.raises(RuntimeError):
+        _slurm_export._submit_tasks([*tasks, task_record(["/e"], [], None)], tmp_path, tmp_path / "manifest")
+    mock_run.assert_not_called()
+
+
+def test_record_tasks(tmp_path: pathlib.Path) -> None:
+    record = task_record(["/a"], [], [["touch", "/a"]])
+    records = [record]
+
+    def run(command: list[str], **kwargs) -> subprocess.CompletedProcess:
+        record_file = pathlib.Path(kwargs["env"][_settings._slurm_export_record_variable])
+        record_file.write_text("".join(f"{json.dumps(record)}\n" for record in records))
+        return subprocess.CompletedProcess(command, 0, stdout="", stderr="")
+
+    with patch("subprocess.run", side_effect=run):
+        assert _slurm_export._record_tasks(["scons", "-n"], tmp_path) == [record]
+
+    # Tasks built without a printed action are missing from the dependency graph
+    records.append({**task_record(["/b"], [], None), "silent": True})
+    with patch("subprocess.run", side_effect=run), pytest.raises(RuntimeError, match="/b"):
+        _slurm_export._record_tasks(["scons", "-n"], tmp_path)
+
+    with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0, stdout="", stderr="")):
+        assert _slurm_export._record_tasks(["scons", "-n"], tmp_path) == []
+
+    with (
+        patch("subprocess.run", return_value=subprocess.CompletedProcess([], 2, stdout="", stderr="error")),
+        pytest.raises(RuntimeError),
+    ):
+        _slurm_export._record_tasks(["scons", "-n"], tmp_path)
+
+
+def test_main(tmp_path: pathlib.Path) -> None:
+    sconstruct = tmp_path / "SConstruct"
+    manifest = tmp_path / "export.json"
+
+    # Missing SConstruct file
+    with pytest.raises(RuntimeError):
+        _slurm_export.main(["dummy.target"], sconstruct=tmp_path)
+
+    sconstruct.touch()
+
+    # Export
+    with (
+        patch("waves._slurm_export._record_tasks", return_value=[{}]) as mock_record_tasks,
+        patch("waves._slurm_export._submit_tasks", return_value=[]) as mock_submit_tasks,
+    ):
+        _slurm_export.main(["dummy.target"], scons_args=["--jobs=4"], sconstruct=tmp_path, manifest=manifest)
+    assert mock_record_tasks.call_args.args[0][-3:] == ["--sconstruct=SConstruct", "--jobs=4", "-n"]
+    assert mock_submit_tasks.call_args.args[2] == tmp_path / "export"
+    assert mock_submit_tasks.call_args.kwargs["manifest"] == manifest
+
+    # Nothing to export
+    with (
+        patch("waves._slurm_export._record_tasks", return_value=[]),
+        patch("waves._slurm_export._submit_tasks") as mock_submit_tasks,
+    ):
+        _slurm_export.main(["dummy.target"], sconstruct=sconstruct, manifest=manifest)
+    mock_submit_tasks.assert_not_called()
+
+    # Reconcile requires a manifest
+    with patch("waves._utilities.tee_subprocess") as mock_tee_subprocess, pytest.raises(RuntimeError):
+        _slurm_export.main(["dummy.target"], sconstruct=sconstruct, manifest=manifest, reconcile=True)
+    mock_tee_subprocess.assert_not_called()
+
+    manifest.write_text(json.dumps({"tasks": []}))
+    with patch("waves._utilities.tee_subprocess", return_value=(0, "")) as mock_tee_subprocess:
+        _slurm_export.main(["dummy.target"], sconstruct=sconstruct, manifest=manifest, reconcile=True)
+    assert mock_tee_subprocess.call_args.kwargs["env"][_settings._slurm_export_manifest_variable] == str(manifest)
+
+    with patch("waves._utilities.tee_subprocess", return_value=(2, "")), pytest.raises(RuntimeError):
+        _slurm_export.main(["dummy.target"], sconstruct=sconstruct, manifest=manifest, reconcile=True)
@@ -0,0 +1,250 @@
+"""Test multiplexed SSH connections and batched remote copies internal API."""
+
+import json
+import os
+import pathlib
+import shlex
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from waves import _ssh
+from waves._tests.test_journal_sessions import shell_spawn
+from waves._tests.test_slurm import write_fake_program
+
+testing_windows = sys.platform.startswith("win")
+
+fake_ssh = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import json
+    import os
+    import pathlib
+    import subprocess
+    import sys
+
+    arguments = sys.argv[1:]
+    with (pathlib.Path(__file__).parent / "ssh_calls.txt").open("a") as calls_file:
+        calls_file.write(json.dumps(arguments) + "\\n")
+    if "-O" in arguments:
+        sys.exit(0)
+    if "-N" in arguments:
+        sys.exit(int(os.environ.get("FAKE_SSH_MASTER_EXIT", "0")))
+    while arguments[0].startswith("-"):
+        arguments = arguments[2:] if arguments[0] in ("-o", "-p") else arguments[1:]
+    sys.exit(subprocess.run(" ".join(arguments[1:]), shell=True).returncode)
+    """
+)
+
+fake_rsync = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import json
+    import os
+    import pathlib
+    import shutil
+    import sys
+
+    arguments = sys.argv[1:]
+    with (pathlib.Path(__file__).parent / "rsync_calls.txt").open("a") as calls_file:
+        calls_file.write(json.dumps(arguments) + "\\n")
+    if "--relative" in arguments and os.environ.get("FAKE_RSYNC_FAIL_BATCH"):
+        sys.exit(23)
+    if "-e" in arguments:
+        index = arguments.index("-e")
+        arguments = arguments[:index] + arguments[index + 2 :]
+    paths = [argument for argument in arguments if not argument.startswith("-")]
+    destination = pathlib.Path(paths[-1].partition(":")[2] or paths[-1])
+    for source in paths[:-1]:
+        source = source.partition(":")[2] or source
+        if pathlib.Path(source).is_dir():
+            shutil.copytree(source, destination, dirs_exist_ok=True)
+            continue
+        relative = source.split("/./", 1)[1] if "--relative" in arguments else pathlib.Path(source).name
+        target = destination / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+    """
+)
+
+
+parse_ssh_command_cases = {
+    "destination": (["ssh", "server", "'cd /tmp && ls'"], ([], "server")),
+    "options": (
+        ["ssh", "-p", "2222", "-o", "User=me", "-v", "server", "ls"],
+        (["-p", "2222", "-o", "User=me", "-v"], "server"),
+    ),
+    "joined value": (["ssh", "-p2222", "server"], (["-p2222"], "server")),
+    "control command": (["ssh", "-O", "exit", "server"], None),
+    "control path": (["ssh", "-o", "ControlPath=/tmp/socket", "server"], None),
+    "no destination": (["ssh", "-p", "2222"], None),
+    "other program": (["scp", "file", "server:"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    parse_ssh_command_cases.values(),
+    ids=parse_ssh_command_cases.keys(),
+)
+def test_parse_ssh_command(args: list[str], expected: tuple[list[str], str] | None) -> None:
+    assert _ssh._parse_ssh_command(args) == expected
+
+
+parse_rsync_command_cases = {
+    "push": (
+        ["rsync", "-rlptv", "/a/input.inp", '"/a/b c.inp"', "server:/remote/task"],
+        {
+            "options": ["-rlptv"],
+            "sources": ["/a/input.inp", "/a/b c.inp"],
+            "host": "server",
+            "directory": "/remote/task",
+            "push": True,
+        },
+    ),
+    "pull": (
+        ["rsync", "-rlptv", "user@server:task/", "/local"],
+        {"options": ["-rlptv"], "sources": [], "host": "user@server", "directory": "task/", "push": False},
+    ),
+    "pull targets": (
+        ["rsync", "--compress", "-rlptv", "server:/task/a.odb", '"server:/task/b c.stdout"', "/local"],
+        {
+            "options": ["--compress", "-rlptv"],
+            "sources": [],
+            "host": "server",
+            "directory": "/task/a.odb",
+            "push": False,
+        },
+    ),
+    "pull hosts": (["rsync", "-rlptv", "one:/task/a", "two:/task/b", "/local"], None),
+    "push remote sources": (["rsync", "-rlptv", "one:/task/a", "one:/task/b"], None),
+    "remote shell": (["rsync", "-rlptv", "-e", "ssh -p 2222", "a", "server:b"], None),
+    "long remote shell": (["rsync", "--rsh=ssh", "a", "server:b"], None),
+    "local": (["rsync", "-rlptv", "a", "b"], None),
+    "daemon": (["rsync", "a", "server::module"], None),
+    "other program": (["cp", "a", "server:b"], None),
+}
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    parse_rsync_command_cases.values(),
+    ids=parse_rsync_command_cases.keys(),
+)
+def test_parse_rsync_command(args: list[str], expected: dict | None) -> None:
+    assert _ssh._parse_rsync_command(args) == expected
+
+
+def read_calls(calls: pathlib.Path) -> list[list[str]]:
+    """Return the recorded fake program arguments.
+
+    :param calls: Fake program call record
+
+    :returns: arguments of every call
+    """
+    if not calls.exists():
+        return []
+    return [json.loads(line) for line in calls.read_text().splitlines()]
+
+
+def run_commands(spawn: _ssh.SSHMultiplexSpawn, commands: list[list[str]], env: dict) -> list[int]:
+    """Run commands concurrently in SCons worker threads.
+
+    :param spawn: SSH multiplexing ``SPAWN`` function
+    :param commands: SCons escaped command arguments
+    :param env: Command environment variables
+
+    :returns: exit codes in command order
+    """
+    exit_codes = [-1] * len(commands)
+
+    def run(index: int) -> None:
+        exit_codes[index] = spawn("sh", shlex.quote, commands[index][0], commands[index], env)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(commands))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return exit_codes
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_ssh_multiplex_spawn(tmp_path: pathlib.Path) -> None:
+    ssh = write_fake_program(tmp_path, "ssh", fake_ssh)
+    rsync = write_fake_program(tmp_path, "rsync", fake_rsync)
+    env = {**os.environ, "PATH": f"{tmp_path}{os.pathsep}{os.environ['PATH']}"}
+    spawn = _ssh.SSHMultiplexSpawn(shell_spawn)
+
+    # Concurrent commands to one server share one master connection
+    commands = [[str(ssh), "server", f"'echo {number} > {tmp_path / str(number)}'"] for number in range(3)]
+    commands.append([str(ssh), "-p", "2222", "server", "true"])
+    (tmp_path / "remote").mkdir()
+    (tmp_path / "remote" / "output.odb").write_text("output")
+    commands.append([str(rsync), "-rlptv", f"server:{tmp_path / 'remote'}/", str(tmp_path / "pull")])
+    assert run_commands(spawn, commands, env) == [0, 0, 0, 0, 0]
+    assert (tmp_path / "2").read_text() == "2\n"
+    assert (tmp_path / "pull" / "output.odb").read_text() == "output"
+    calls = read_calls(tmp_path / "ssh_calls.txt")
+    masters = [call for call in calls if "-N" in call]
+    assert len(masters) == 2
+    assert ["-o", "ControlMaster=yes"] in [master[:2] for master in masters]
+    assert ["-p", "2222"] in [master[:2] for master in masters]
+    assert all(call[:3] == ["-o", "ControlMaster=no", "-o"] for call in calls if "-N" not in call)
+    rsync_call = read_calls(tmp_path / "rsync_calls.txt")[0]
+    assert rsync_call[0] == "-e"
+    control_path = spawn.control_path("sh", env, "ssh", [], "server")
+    assert f"ControlPath={control_path}" in rsync_call[1]
+
+    # Master connections are stopped and the control socket directory is removed
+    directory = pathlib.Path(control_path).parent  # type: ignore[arg-type]
+    spawn.close()
+    calls = read_calls(tmp_path / "ssh_calls.txt")
+    assert len([call for call in calls if "-O" in call]) == 2
+    assert not directory.exists()
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+def test_ssh_multiplex_spawn_master_failure(tmp_path: pathlib.Path) -> None:
+    ssh = write_fake_program(tmp_path, "ssh", fake_ssh)
+    env = {**os.environ, "FAKE_SSH_MASTER_EXIT": "255"}
+    spawn = _ssh.SSHMultiplexSpawn(shell_spawn, control_directory=tmp_path / "sockets")
+
+    # Commands connect directly without a master connection and the master connection is not retried
+    commands = [[str(ssh), "server", "true"], [str(ssh), "server", "false"]]
+    assert run_commands(spawn, commands, env) == [0, 1]
+    calls = read_calls(tmp_path / "ssh_calls.txt")
+    assert len([call for call in calls if "-N" in call]) == 1
+    assert ["server", "true"] in calls
+    assert ["server", "false"] in calls
+    spawn.close()
+    assert (tmp_path / "sockets").is_dir()
+
+
+@pytest.mark.skipif(testing_windows, reason="BASH shell specific function incompatible with Windows")
+@pytest.mark.parametrize("fail_batch", [False, True], ids=["batch", "fallback"])
+def test_ssh_multiplex_spawn_push(tmp_path: pathlib.Path, fail_batch: bool) -> None:
+    write_fake_program(tmp_path, "ssh", fake_ssh)
+    rsync = write_fake_program(tmp_path, "rsync", fake_rsync)
+    env = {**os.environ, "PATH": f"{tmp_path}{os.pathsep}{os.environ['PATH']}"}
+    if fail_batch:
+        env["FAKE_RSYNC_FAIL_BATCH"] = "1"
+    spawn = _ssh.SSHMultiplexSpawn(shell_spawn, push_window=0.3)
+    remote = tmp_path / "remote"
+    commands = []
+    for number in range(3):
+        source = tmp_path / f"input{number}.inp"
+        source.write_text(str(number))
+        (remote / f"task{number}").mkdir(parents=True)
+        commands.append([str(rsync), "-rlptv", str(source), f"server:{remote / f'task{number}'}"])
+
+    # Concurrent pushes to one server are copied in a single transfer
+    assert run_commands(spawn, commands, env) == [0, 0, 0]
+    for number in range(3):
+        assert (remote / f"task{number}" / f"input{number}.inp").read_text() == str(number)
+    calls = read_calls(tmp_path / "rsync_calls.txt")
+    assert "--relative" in calls[0]
+    assert len(calls) == (4 if fail_batch else 1)
+    spawn.close()
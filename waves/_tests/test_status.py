@@ -0,0 +1,111 @@
+"""Test the status subcommand internal API."""
+
+import json
+import pathlib
+from unittest.mock import patch
+
+import pytest
+
+from waves import _status
+
+
+def event(name: str, time: float, target: str | None = None, build: str = "second", **fields: float) -> dict:
+    """Return a progress event matching the :class:`waves._progress.ProgressStream` format.
+
+    :param name: Event name
+    :param time: Event time
+    :param target: Task target path
+    :param build: Build identifier
+    :param fields: Additional event fields
+
+    :returns: progress event
+    """
+    targets = {"targets": [target, f"{target}.stdout"]} if target is not None else {}
+    return {"build": build, "event": name, "time": time, **targets, **fields}
+
+
+events = [
+    event("build_start", 0.0, tasks=5),
+    event("up_to_date", 1.0, "/mesh.inp"),
+    event("start", 1.0, "/parameter_set0/job.odb"),
+    event("start", 1.0, "/parameter_set1/job.odb"),
+    event("finish", 11.0, "/parameter_set0/job.odb", wall_time=10.0),
+    event("start", 11.0, "/parameter_set2/job.odb"),
+    event("failure", 12.0, "/parameter_set2/job.odb", wall_time=1.0),
+    event("start", 12.0, "/parameter_set3/job.odb"),
+]
+
+
+def test_read_events(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(RuntimeError, match="does not exist"):
+        _status._read_events(tmp_path / "missing.jsonl")
+    stream = tmp_path / "empty.jsonl"
+    stream.write_text('{"truncated\n')
+    with pytest.raises(RuntimeError, match="contains no progress events"):
+        _status._read_events(stream)
+
+    stream = tmp_path / "progress.jsonl"
+    lines = [json.dumps(event("build_start", 0.0, build="first")), *(json.dumps(item) for item in events), '{"trunc']
+    stream.write_text("\n".join(lines))
+    assert _status._read_events(stream) == events
+
+
+def test_status() -> None:
+    status = _status._status(events, {"/parameter_set1/job.odb": 20.0}, 15.0)
+    assert status["build"] == "second"
+    assert status["tasks"] == 5
+    assert status["complete"] == 2
+    assert status["failed"] == 1
+    assert status["running"] == [("/parameter_set1/job.odb", 14.0, 20.0), ("/parameter_set3/job.odb", 3.0, 10.0)]
+    assert status["elapsed"] == 15.0
+    assert status["percent"] == 40.0
+    # Remaining running work (6 + 7) and no pending tasks over two running tasks
+    assert status["eta"] == 6.5
+    assert not status["finished"]
+
+    # Pending tasks without history or finished tasks have an unknown ETA
+    status = _status._status(events[:4], {}, 2.0)
+    assert status["running"][0] == ("/parameter_set0/job.odb", 1.0, None)
+    assert status["eta"] is None
+
+    # Pending tasks use the mean historical duration
+    status = _status._status(events[:4], {"/other.odb": 8.0}, 2.0)
+    assert status["eta"] == pytest.approx((7.0 + 7.0 + 2 * 8.0) / 2)
+
+    status = _status._status([*events, event("build_finish", 20.0, failures=1)], {}, 100.0)
+    assert status["finished"]
+    assert status["elapsed"] == 20.0
+    assert status["eta"] == 0.0
+
+
+def test_format_status() -> None:
+    text = _status._format_status(_status._status(events, {}, 15.0))
+    lines = text.splitlines()
+    assert lines[0] == ("Build second: 2/5 tasks complete (40.0%), 1 failed, 2 running. Elapsed 0:00:15, ETA 0:00:04")
+    assert lines[1] == "  /parameter_set1/job.odb: 0:00:14 of 0:00:10 expected"
+
+    text = _status._format_status(_status._status([*events, event("build_finish", 20.0)], {}, 100.0))
+    assert text.splitlines()[0].endswith("Elapsed 0:00:20, finished")
+
+
+def test_main(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    stream = tmp_path / "progress.jsonl"
+    stream.write_text("".join(f"{json.dumps(item)}\n" for item in events))
+    log = tmp_path / "accounting.jsonl"
+    log.write_text(json.dumps({"targets": ["/parameter_set3/job.odb"], "wall_time": 30.0}))
+
+    with patch("time.time", return_value=15.0):
+        _status.main(stream, log=log)
+    output = capsys.readouterr().out
+    assert "2/5 tasks complete" in output
+    assert "/parameter_set3/job.odb: 0:00:03 of 0:00:30 expected" in output
+
+    # Watch until the build finishes
+    def finish(_seconds: float) -> None:
+        with stream.open(mode="a") as stream_file:
+            stream_file.write(f"{json.dumps(event('build_finish', 20.0))}\n")
+
+    with patch("time.time", return_value=15.0), patch("time.sleep", side_effect=finish) as mock_sleep:
+        _status.main(stream, log=tmp_path / "missing.jsonl", watch=5.0)
+    mock_sleep.assert_called_once_with(5.0)
+    assert capsys.readouterr().out.splitlines()[-1].endswith("finished")
@@ -0,0 +1,136 @@
+"""Test the task_report subcommand internal API."""
+
+import json
+import pathlib
+
+import pandas
+import pytest
+
+from waves import _task_report
+
+
+def task_record(
+    build: str,
+    target: str,
+    builder: str,
+    parameter_set: str | None,
+    wall_time: float,
+    exit_code: int = 0,
+) -> dict:
+    """Return a task record matching the :class:`waves._accounting.AccountingAction` format.
+
+    :param build: Build identifier
+    :param target: Task target path
+    :param builder: Builder name
+    :param parameter_set: Parameter set name
+    :param wall_time: Task wall time
+    :param exit_code: Task exit code
+
+    :returns: task record
+    """
+    return {
+        "build": build,
+        "targets": [target, f"{target}.stdout"],
+        "builder": builder,
+        "parameter_set": parameter_set,
+        "start": "2025-01-01T00:00:00+00:00",
+        "wall_time": wall_time,
+        "user_time": wall_time / 2.0,
+        "system_time": 0.1,
+        "max_rss": wall_time * 10.0,
+        "exit_code": exit_code,
+        "bytes_written": 100,
+    }
+
+
+records = [
+    task_record("first", "/old.txt", "Old", None, 100.0),
+    task_record("second", "/parameter_set0/job.odb", "AbaqusSolver", "parameter_set0", 10.0),
+    task_record("second", "/parameter_set1/job.odb", "AbaqusSolver", "parameter_set1", 30.0, exit_code=1),
+    task_record("second", "/parameter_set1/job.csv", "PythonScript", "parameter_set1", 2.0),
+    task_record("second", "/plot.png", "PythonScript", None, 1.0),
+]
+
+
+def write_log(path: pathlib.Path, lines: list[str]) -> pathlib.Path:
+    """Write a task accounting log.
+
+    :param path: Log path
+    :param lines: Log lines
+
+    :returns: log path
+    """
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return path
+
+
+def test_read_log(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(RuntimeError, match="does not exist"):
+        _task_report._read_log(tmp_path / "missing.jsonl")
+    with pytest.raises(RuntimeError, match="contains no task records"):
+        _task_report._read_log(write_log(tmp_path / "empty.jsonl", ["", '{"truncated']))
+
+    log = write_log(tmp_path / "log.jsonl", [json.dumps(records[0]), '{"truncated', json.dumps({"build": "third"})])
+    tasks = _task_report._read_log(log)
+    assert list(tasks["build"]) == ["first", "third"]
+    assert tasks["wall_time"].iloc[0] == 100.0
+    assert pandas.isna(tasks["wall_time"].iloc[1])
+
+
+def test_task_durations(tmp_path: pathlib.Path) -> None:
+    lines = [json.dumps(record) for record in [*records, task_record("third", "/old.txt", "Old", None, 50.0)]]
+    durations = _task_report._task_durations(write_log(tmp_path / "log.jsonl", lines))
+    assert durations[("/old.txt", "/old.txt.stdout")] == 50.0
+    assert durations[("/parameter_set0/job.odb", "/parameter_set0/job.odb.stdout")] == 10.0
+    assert ("/parameter_set1/job.odb", "/parameter_set1/job.odb.stdout") not in durations
+    assert len(durations) == 4
+
+
+def test_builder_durations(tmp_path: pathlib.Path) -> None:
+    lines = [json.dumps(record) for record in [*records, task_record("third", "/extra.csv", "PythonScript", None, 6.0)]]
+    durations = _task_report._builder_durations(write_log(tmp_path / "log.jsonl", lines))
+    assert durations == {"Old": 100.0, "AbaqusSolver": 10.0, "PythonScript": 2.0}
+
+
+def test_summarize() -> None:
+    tasks = pandas.DataFrame.from_records(records[1:])
+    summary = _task_report._summarize(tasks, "builder")
+    assert list(summary.index) == ["AbaqusSolver", "PythonScript"]
+    assert summary.loc["AbaqusSolver", "tasks"] == 2
+    assert summary.loc["AbaqusSolver", "failed"] == 1
+    assert summary.loc["AbaqusSolver", "wall_time"] == 40.0
+    assert summary.loc["AbaqusSolver", "mean_wall_time"] == 20.0
+    assert summary.loc["AbaqusSolver", "max_rss"] == 300.0
+    assert summary.loc["PythonScript", "bytes_written"] == 200
+
+    summary = _task_report._summarize(tasks.dropna(subset=["parameter_set"]), "parameter_set")
+    assert list(summary.index) == ["parameter_set1", "parameter_set0"]
+    assert summary.loc["parameter_set1", "tasks"] == 2
+
+
+def test_slowest_tasks() -> None:
+    slowest = _task_report._slowest_tasks(pandas.DataFrame.from_records(records), 2)
+    assert list(slowest.index) == ["/old.txt", "/parameter_set1/job.odb"]
+    assert slowest.loc["/parameter_set1/job.odb", "exit_code"] == 1
+
+
+def test_main(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture) -> None:
+    log = write_log(tmp_path / "log.jsonl", [json.dumps(record) for record in records])
+
+    _task_report.main(log, slowest=1)
+    output = capsys.readouterr().out
+    assert output.startswith("4 tasks from 1 build in")
+    assert "Tasks by builder" in output
+    assert "Tasks by parameter set" in output
+    assert "/parameter_set1/job.odb" in output
+    assert "Old" not in output
+
+    _task_report.main(log, all_builds=True)
+    output = capsys.readouterr().out
+    assert output.startswith("5 tasks from 2 builds in")
+    assert "/old.txt" in output
+
+    # Logs without parameter sets
+    log = write_log(tmp_path / "no_sets.jsonl", [json.dumps(records[0])])
+    _task_report.main(log)
+    assert "Tasks by parameter set" not in capsys.readouterr().out
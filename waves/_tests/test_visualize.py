@@ -252,6 +252,13 @@ def test_visualize() -> None:
     graph.add_edge(1, 2)
     _visualize.visualize(graph)
 
+    graph.nodes[1]["critical_path"] = True
+    graph.edges[1, 2]["critical_path"] = True
+    figure = _visualize.visualize(graph, critical_path_color="red")
+    patches = [text.get_bbox_patch() for text in figure.axes[0].texts if text.get_text()]
+    facecolors = [patch.get_facecolor() for patch in patches if patch is not None]
+    assert matplotlib.colors.to_rgba("red") in facecolors
+
 
 def test_plot() -> None:
     """Check that the expected plot output function is called."""
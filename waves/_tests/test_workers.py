@@ -0,0 +1,413 @@
+"""Test persistent Python and MATLAB worker pool internal API."""
+
+import collections.abc
+import os
+import pathlib
+import sys
+import threading
+import types
+import typing
+from unittest.mock import patch
+
+import pytest
+import SCons.Action
+import SCons.Environment
+import SCons.Errors
+
+from waves import _settings, _workers, scons_extensions
+
+script = """import os, sys
+import helper
+print("arguments", *sys.argv[1:])
+print("directory", os.path.basename(os.getcwd()))
+print("pid", os.getpid())
+print("helper", helper.VALUE)
+print("error", file=sys.stderr)
+sys.stdout.flush()
+os.system("echo child")
+if "--fail" in sys.argv:
+    sys.exit(3)
+if "--crash" in sys.argv:
+    os._exit(5)
+if "--raise" in sys.argv:
+    raise ValueError("bad input")
+"""
+
+
+def write_script(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write the test script and its project helper module.
+
+    :param tmp_path: Temporary directory
+
+    :returns: script path
+    """
+    (tmp_path / "helper.py").write_text('VALUE = "first"\n')
+    script_file = tmp_path / "script.py"
+    script_file.write_text(script)
+    return script_file
+
+
+def read_output(stdout: pathlib.Path) -> dict[str, str]:
+    """Return the test script output by label.
+
+    :param stdout: Test script STDOUT file
+
+    :returns: output by label
+    """
+    lines = [line.split(" ", 1) for line in stdout.read_text().splitlines()]
+    return {line[0]: line[1] if len(line) > 1 else "" for line in lines}
+
+
+def test_python_worker(tmp_path: pathlib.Path) -> None:
+    script_file = write_script(tmp_path)
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    worker = _workers.PythonWorker(sys.executable, dict(os.environ))
+    try:
+        # Scripts run with their own arguments, working directory, and STDOUT file
+        stdout = tmp_path / "one" / "task.stdout"
+        assert worker.run([str(script_file), "a", "b"], str(tmp_path / "one"), str(stdout)) == 0
+        output = read_output(stdout)
+        assert output["arguments"] == "a b"
+        assert output["directory"] == "one"
+        assert output["helper"] == "first"
+        assert "error" in output
+        assert "child" in output
+        pid = output["pid"]
+
+        # The interpreter is reused and project modules are re-imported
+        (tmp_path / "helper.py").write_text('VALUE = "second"\n')
+        stdout = tmp_path / "two" / "task.stdout"
+        assert worker.run([str(script_file), "--fail"], str(tmp_path / "two"), str(stdout)) == 3
+        output = read_output(stdout)
+        assert output["pid"] == pid
+        assert output["directory"] == "two"
+        assert output["helper"] == "second"
+
+        # Uncaught exceptions fail the script with the traceback in the STDOUT file
+        assert worker.run([str(script_file), "--raise"], str(tmp_path), str(stdout)) == 1
+        assert "ValueError: bad input" in stdout.read_text()
+        assert worker.tasks == 3
+        assert worker.alive
+
+        # Scripts exiting the interpreter fail with the interpreter exit code
+        assert worker.run([str(script_file), "--crash"], str(tmp_path), str(stdout)) == 5
+        assert not worker.alive
+    finally:
+        worker.close()
+
+
+class TestPythonWorkerPool:
+    """Test :class:`waves._workers.PythonWorkerPool`."""
+
+    def test_reuse(self) -> None:
+        pool = _workers.PythonWorkerPool(tasks_per_worker=2)
+        environment = dict(os.environ)
+        with pool.worker(sys.executable, environment) as first:
+            first.tasks += 1
+        with pool.worker(sys.executable, environment) as second:
+            assert second is first
+            second.tasks += 1
+
+        # Workers are replaced after the task limit
+        assert not first.alive
+        with pool.worker(sys.executable, environment) as third:
+            assert third is not first
+        pool.close()
+        assert not third.alive
+        assert pool._count == 0
+
+    def test_limit(self) -> None:
+        pool = _workers.PythonWorkerPool(workers=1)
+        environment = dict(os.environ)
+        with pool.worker(sys.executable, environment) as first:
+            borrowed = threading.Event()
+
+            def borrow() -> None:
+                with pool.worker(sys.executable, environment):
+                    borrowed.set()
+
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            assert not borrowed.wait(timeout=0.2)
+        thread.join(timeout=10.0)
+        assert borrowed.is_set()
+
+        # Idle workers of another interpreter environment make room for new workers
+        with pool.worker(sys.executable, {**environment, "WAVES_TEST": "1"}) as other:
+            assert other is not first
+        assert not first.alive
+        pool.close()
+
+    def test_close_unlocked(self) -> None:
+        pool = _workers.PythonWorkerPool(workers=1)
+        locked = []
+
+        def acquire() -> None:
+            """Record if the pool lock is held by another thread."""
+            acquired = pool._condition.acquire(blocking=False)
+            locked.append(not acquired)
+            if acquired:
+                pool._condition.release()
+
+        def close() -> None:
+            """Record if the pool lock is held while the worker is stopped."""
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+
+        workers = [types.SimpleNamespace(alive=True, tasks=0, close=close) for _ in range(2)]
+        with patch.object(pool, "_start", side_effect=workers):
+            with pool.worker("first"):
+                pass
+
+            # Stale workers are stopped after releasing the pool lock
+            with pool.worker("second"):
+                assert locked == [False]
+            assert pool._count == 1
+
+            # Idle workers are stopped after releasing the pool lock
+            pool.close()
+        assert locked == [False, False]
+        assert pool._count == 0
+
+    def test_start_failure(self) -> None:
+        pool = _workers.PythonWorkerPool(workers=1)
+        with (
+            patch("waves._workers.PythonWorker", side_effect=FileNotFoundError("python")),
+            pytest.raises(FileNotFoundError),
+            pool.worker("python", {}),
+        ):
+            pass
+        assert pool._count == 0
+
+
+def test_worker_pool_abstract() -> None:
+    with pytest.raises(TypeError, match="_start"):
+        _workers.WorkerPool()  # type: ignore[abstract]
+
+
+def test_environment() -> None:
+    env = SCons.Environment.Environment(ENV={"PATH": ["/bin", "/usr/bin"], "COUNT": 1})
+    assert _workers._environment(env) == {"PATH": f"/bin{os.pathsep}/usr/bin", "COUNT": "1"}
+
+
+def test_python_worker_action(tmp_path: pathlib.Path) -> None:
+    script_file = write_script(tmp_path)
+    for directory in ("new", "pooled", "failed"):
+        (tmp_path / directory).mkdir()
+    env = SCons.Environment.Environment(ENV=dict(os.environ))
+    env.AddMethod(scons_extensions.python_worker_pool, "PythonWorkerPool")
+    builder = _workers.worker_builder(scons_extensions.python_builder_factory(program=sys.executable))
+    action = builder.action
+    env.Append(BUILDERS={"PythonScript": builder})
+
+    # Tasks without a worker pool run in a new interpreter
+    nodes = env.PythonScript(target=[str(tmp_path / "new" / "task.txt")], source=[str(script_file)])
+    nodes[0].build()
+    new_pid = read_output(tmp_path / "new" / "task.txt.stdout")["pid"]
+
+    with patch("atexit.register"):
+        env.PythonWorkerPool()
+    pool = env[_settings._python_worker_pool_variable]
+    try:
+        nodes = env.PythonScript(
+            target=[str(tmp_path / "pooled" / "task.txt")], source=[str(script_file)], subcommand_options="a b"
+        )
+        nodes[0].build()
+        output = read_output(tmp_path / "pooled" / "task.txt.stdout")
+        assert output["arguments"] == "a b"
+        assert output["directory"] == "pooled"
+        assert output["pid"] != new_pid
+        assert pool._count == 1
+
+        # Failed scripts fail the task
+        nodes = env.PythonScript(
+            target=[str(tmp_path / "failed" / "task.txt")], source=[str(script_file)], subcommand_options="--fail"
+        )
+        with pytest.raises(SCons.Errors.BuildError) as err:
+            nodes[0].build()
+        assert err.value.status == 3
+        assert read_output(tmp_path / "failed" / "task.txt.stdout")["pid"] == output["pid"]
+    finally:
+        pool.close()
+
+    # Only the default Python builder command runs in the worker pool
+    targets = [env.File(str(tmp_path / "task.txt")), env.File(str(tmp_path / "task.txt.stdout"))]
+    sources = [env.File(str(script_file))]
+    default = {
+        "action_prefix": _settings._cd_action_prefix,
+        "program": "python",
+        "subcommand": "${SOURCE.abspath}",
+        "action_suffix": _settings._redirect_action_suffix,
+    }
+    assert action.pooled(targets, sources, env.Override(default))
+    assert not action.pooled(targets, sources, env.Override({**default, "program_options": "-u"}))
+    assert not action.pooled(targets, sources, env.Override({**default, "environment": "source env.sh &&"}))
+    assert not action.pooled(targets, sources, env.Override({**default, "action_suffix": ""}))
+    assert not action.pooled(targets, sources, env.Override({**default, "subcommand": ""}))
+    assert not action.pooled([], sources, env.Override(default))
+    assert _workers.PythonWorkerAction(SCons.Action.Action("python ${SOURCE}")).command() is None
+
+    # Tasks with a timeout run in a new interpreter
+    timed = _workers.worker_builder(scons_extensions.python_builder_factory(program=sys.executable, timeout=60)).action
+    assert timed.command() is not None
+    assert timed.pooled(targets, sources, env.Override(default))
+    assert not timed.pooled(targets, sources, env.Override({**default, "waves_timeout": 60}))
+
+
+class MatlabExecutionError(Exception):
+    """Stand-in for the MATLAB Engine API MATLAB statement error."""
+
+
+class EngineError(Exception):
+    """Stand-in for the MATLAB Engine API session error."""
+
+
+class FakeEngine:
+    """Stand-in for a MATLAB Engine API session recording the evaluated statements.
+
+    :param options: MATLAB startup options
+    """
+
+    def __init__(self, options: str = "-nodesktop") -> None:
+        self.options = options
+        self.statements: list[str] = []
+        self.dead = False
+
+    def eval(self, statement: str, nargout: int = 1, stdout: typing.Any = None, stderr: typing.Any = None) -> None:  # noqa: ANN401, ARG002
+        if self.dead:
+            raise EngineError("MATLAB process cannot be found")
+        self.statements.append(statement)
+        if "exit" in statement:
+            self.dead = True
+            raise EngineError("MATLAB session exited")
+        if "error(" in statement:
+            raise MatlabExecutionError("bad input")
+        if stdout is not None:
+            stdout.write(f"ran {statement}\n")
+
+    def quit(self) -> None:
+        self.dead = True
+
+
+@pytest.fixture
+def fake_matlab() -> collections.abc.Generator[list[FakeEngine], None, None]:
+    """Install a stand-in MATLAB Engine API for Python.
+
+    :returns: started sessions
+    """
+    engines: list[FakeEngine] = []
+
+    def start_matlab(option: str = "-nodesktop") -> FakeEngine:
+        engines.append(FakeEngine(option))
+        return engines[-1]
+
+    engine_module = types.ModuleType("matlab.engine")
+    engine_module.start_matlab = start_matlab  # type: ignore[attr-defined]
+    engine_module.MatlabExecutionError = MatlabExecutionError  # type: ignore[attr-defined]
+    engine_module.EngineError = EngineError  # type: ignore[attr-defined]
+    matlab_module = types.ModuleType("matlab")
+    matlab_module.engine = engine_module  # type: ignore[attr-defined]
+    with patch.dict(sys.modules, {"matlab": matlab_module, "matlab.engine": engine_module}):
+        yield engines
+
+
+def test_matlab_engine(tmp_path: pathlib.Path, fake_matlab: list[FakeEngine]) -> None:
+    engine = _workers.MatlabEngine("-nojvm")
+    session = fake_matlab[0]
+    assert session.options == "-nojvm"
+    stdout = tmp_path / "task.stdout"
+
+    # Statements run in the task directory with the output written to the STDOUT file and the session reset
+    assert engine.run("plot_results('a''s')", "/task's", str(stdout)) == 0
+    assert "cd('/task''s');" in session.statements[0]
+    assert stdout.read_text() == "ran plot_results('a''s')\n"
+    assert "clear all;" in session.statements[-1]
+
+    # MATLAB errors fail the task and keep the session
+    assert engine.run("error('bad')", "/task", str(stdout)) == 1
+    assert "bad input" in stdout.read_text()
+    assert engine.alive
+
+    # Statements exiting the session fail the task
+    assert engine.run("exit", "/task", str(stdout)) == 1
+    assert "MATLAB session exited" in stdout.read_text()
+    assert not engine.alive
+    assert engine.tasks == 3
+
+    # Sessions exited before the task starts do not run the task
+    stdout.unlink()
+    assert engine.run("disp(1)", "/task", str(stdout)) is None
+    assert not stdout.exists()
+    engine.close()
+
+
+def test_matlab_engine_missing() -> None:
+    with (
+        patch.dict(sys.modules, {"matlab": None, "matlab.engine": None}),
+        pytest.raises(RuntimeError, match="MATLAB Engine API"),
+    ):
+        _workers.MatlabEngine()
+
+
+def test_matlab_engine_action(tmp_path: pathlib.Path, fake_matlab: list[FakeEngine]) -> None:
+    script_file = tmp_path / "plot_results.m"
+    script_file.write_text("function plot_results(name)\nend\n")
+    for directory in ("one", "two", "three", "failed"):
+        (tmp_path / directory).mkdir()
+    env = SCons.Environment.Environment()
+    env.AddMethod(scons_extensions.matlab_engine_pool, "MatlabEnginePool")
+    builder = _workers.matlab_engine_builder(scons_extensions.matlab_script())
+    action = builder.action
+    env.Append(BUILDERS={"MatlabScript": builder})
+    with patch("atexit.register"):
+        env.MatlabEnginePool()
+    pool = env[_settings._matlab_engine_pool_variable]
+    try:
+        # Tasks run in a persistent session and write the MATLAB environment and STDOUT targets
+        nodes = env.MatlabScript(
+            target=[str(tmp_path / "one" / "plot.png")], source=[str(script_file)], script_options="'one'"
+        )
+        nodes[0].build()
+        assert "requiredFilesAndProducts('plot_results.m')" in (tmp_path / "one" / "plot.png.matlab.env").read_text()
+        assert "plot_results('one')" in (tmp_path / "one" / "plot.png.stdout").read_text()
+        assert not any("exit" in statement for statement in fake_matlab[0].statements)
+
+        nodes = env.MatlabScript(target=[str(tmp_path / "two" / "plot.png")], source=[str(script_file)])
+        nodes[0].build()
+        assert len(fake_matlab) == 1
+        assert fake_matlab[0].options == "-nodesktop"
+
+        # Tasks are retried in a new session if the idle session exited
+        fake_matlab[0].dead = True
+        nodes = env.MatlabScript(
+            target=[str(tmp_path / "three" / "plot.png")], source=[str(script_file)], matlab_options="-nojvm"
+        )
+        nodes[0].build()
+        assert "plot_results()" in (tmp_path / "three" / "plot.png.stdout").read_text()
+        assert [engine.options for engine in fake_matlab] == ["-nodesktop", "-nojvm"]
+
+        # Failed statements fail the task
+        nodes = env.MatlabScript(
+            target=[str(tmp_path / "failed" / "plot.png")], source=[str(script_file)], script_options="error('x')"
+        )
+        with pytest.raises(SCons.Errors.BuildError) as err:
+            nodes[0].build()
+        assert err.value.status == 1
+        assert "bad input" in (tmp_path / "failed" / "plot.png.stdout").read_text()
+    finally:
+        pool.close()
+
+    # Only the default MATLAB script builder commands run in the engine pool
+    targets = [env.File(str(tmp_path / name)) for name in ("plot.png", "plot.png.matlab.env", "plot.png.stdout")]
+    sources = [env.File(str(script_file))]
+    default = {
+        "action_prefix": _settings._cd_action_prefix,
+        "action_suffix": _settings._redirect_action_suffix,
+        "environment_suffix": _settings._redirect_environment_suffix,
+    }
+    assert action.pooled(targets, sources, env.Override(default))
+    assert not action.pooled(targets, sources, env.Override({**default, "action_suffix": ""}))
+    assert not action.pooled(targets[:1], sources, env.Override(default))
+    assert _workers.MatlabEngineAction(SCons.Action.Action("matlab -batch disp(1)")).commands() is None
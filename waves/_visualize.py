@@ -53,6 +53,14 @@ def get_parser() -> argparse.ArgumentParser:
         type=str,
         help="Path to text file with output from SCons tree command (default: %(default)s)",
     )
+    parser.add_argument(
+        "--critical-path",
+        type=pathlib.Path,
+        help=(
+            "Path to a task accounting log. Highlight the critical path of the recorded task durations "
+            "(default: %(default)s)"
+        ),
+    )
 
     graph_options = parser.add_argument_group("graph options", "graph options affect plotting and graphml output")
     graph_options.add_argument(
@@ -112,6 +120,12 @@ def get_parser() -> argparse.ArgumentParser:
         default=_settings._default_edge_color,
         help="Edge (arrow) color (default: %(default)s)",
     )
+    plot_options.add_argument(
+        "--critical-path-color",
+        type=str,
+        default=_settings._default_critical_path_color,
+        help="Critical path node face and edge (arrow) color (default: %(default)s)",
+    )
     plot_options.add_argument(
         "--vertical",
         action="store_true",
@@ -165,6 +179,8 @@ def main(
     transparent: bool = False,
     break_paths: bool = False,
     input_file: str | pathlib.Path | None = None,
+    critical_path: pathlib.Path | None = None,
+    critical_path_color: str = _settings._default_critical_path_color,
 ) -> None:
     """Visualize the directed acyclic graph created by a SCons build.
 
@@ -189,6 +205,8 @@ def main(
     :param transparent: Use a transparent background
     :param break_paths: Format paths by breaking at path separator with a newline
     :param input_file: Path to text file storing output from SCons tree command
+    :param critical_path: Task accounting log used to highlight the critical path
+    :param critical_path_color: Critical path node face and edge (arrow) color
     """
     if not scons_args:
         scons_args = []
@@ -231,6 +249,10 @@ def main(
         break_paths=break_paths,
     )
     subgraph = ancestor_subgraph(graph, targets)
+    if critical_path is not None:
+        from waves import _critical_path
+
+        subgraph = _critical_path._mark_critical_path(subgraph, critical_path, sconstruct.parent)
     if node_count:
         subgraph = add_node_count(subgraph)
 
@@ -246,6 +268,7 @@ def main(
         node_color=node_color,
         edge_color=edge_color,
         vertical=vertical,
+        critical_path_color=critical_path_color,
     )
     plot(figure, output_file=output_file, transparent=transparent)
 
@@ -403,16 +426,19 @@ def visualize(
     node_color: str = _settings._default_node_color,
     edge_color: str = _settings._default_edge_color,
     vertical: bool = False,
+    critical_path_color: str = _settings._default_critical_path_color,
 ) -> matplotlib.figure.Figure:
     """Create a visualization showing the tree.
 
-    Nodes in graph require the ``layer`` and ``label`` attributes.
+    Nodes in graph require the ``layer`` and ``label`` attributes. Nodes and edges with a true ``critical_path``
+    attribute are drawn in the critical path color.
 
     :param tree: output of the scons tree command stored as dictionary
     :param height: Height of visualization if being saved to a file
     :param width: Width of visualization if being saved to a file
     :param font_size: Font size of file names in points
     :param vertical: Specifies a vertical layout of graph instead of the default horizontal layout
+    :param critical_path_color: Critical path node face and edge (arrow) color
     """
     multipartite_kwargs = {"align": "vertical"}
     if vertical:
@@ -438,14 +464,19 @@ def visualize(
         "bbox": {"facecolor": node_color, "boxstyle": "round"},
     }
 
+    critical_patch_kwargs = {**patch_kwargs, "bbox": {"facecolor": critical_path_color, "boxstyle": "round"}}
+
+    def node_kwargs(node: str) -> dict:
+        return critical_patch_kwargs if graph.nodes[node].get("critical_path", False) else patch_kwargs
+
     # Labels are written on top of existing nodes, which are laid out by networkx
     for source, target in sorted_edges:
-        patch_a = axes.annotate(graph.nodes[target]["label"], xy=node_positions[target], **patch_kwargs)
-        patch_b = axes.annotate(graph.nodes[source]["label"], xy=node_positions[source], **patch_kwargs)
+        patch_a = axes.annotate(graph.nodes[target]["label"], xy=node_positions[target], **node_kwargs(target))
+        patch_b = axes.annotate(graph.nodes[source]["label"], xy=node_positions[source], **node_kwargs(source))
 
         arrowprops = {
             "arrowstyle": "<-",
-            "color": edge_color,
+            "color": critical_path_color if graph.edges[source, target].get("critical_path", False) else edge_color,
             "connectionstyle": "arc3,rad=0.1",
             "patchA": patch_a,
             "patchB": patch_b,
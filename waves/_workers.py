@@ -0,0 +1,595 @@
+"""Internal API module implementing the persistent Python and MATLAB worker pools for the SCons extensions.
+
+Should raise ``RuntimeError`` or a derived class of :class:`waves.exceptions.WAVESError` to allow the SCons build
+failure reporting and CLI implementations to convert stack-trace/exceptions into STDERR message and non-zero exit codes.
+"""
+
+import collections
+import collections.abc
+import contextlib
+import io
+import json
+import os
+import pathlib
+import shlex
+import subprocess
+import threading
+import typing
+from abc import ABC, abstractmethod
+
+import SCons.Action
+import SCons.Util
+
+from waves import _scheduler, _settings
+
+_exclude_from_namespace = set(globals().keys())
+
+_worker_script = r"""import json, os, runpy, sys, traceback
+results = os.fdopen(os.dup(1), "w")
+tasks = os.fdopen(os.dup(0))
+null = os.open(os.devnull, os.O_RDONLY)
+os.dup2(null, 0)
+os.close(null)
+installation = {sys.prefix, sys.base_prefix, sys.exec_prefix}
+prefixes = tuple(os.path.join(os.path.realpath(prefix), "") for prefix in installation)
+for line in tasks:
+    task = json.loads(line)
+    cwd, argv, path, environ, modules = os.getcwd(), sys.argv, list(sys.path), dict(os.environ), set(sys.modules)
+    saved = os.dup(1), os.dup(2)
+    status = 0
+    try:
+        output = os.open(task["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        os.dup2(output, 1)
+        os.dup2(output, 2)
+        os.close(output)
+        os.chdir(task["cwd"])
+        sys.argv = task["argv"]
+        sys.path[0] = os.path.dirname(os.path.realpath(task["argv"][0]))
+        runpy.run_path(task["argv"][0], run_name="__main__")
+    except SystemExit as err:
+        if err.code is None or isinstance(err.code, int):
+            status = (err.code or 0) & 0xFF
+        else:
+            print(err.code, file=sys.stderr)
+            status = 1
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+        os.chdir(cwd)
+        sys.argv, sys.path[:] = argv, path
+        os.environ.clear()
+        os.environ.update(environ)
+        for name in set(sys.modules) - modules:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file and not os.path.realpath(module_file).startswith(prefixes):
+                del sys.modules[name]
+    results.write(json.dumps({"status": status}) + "\n")
+    results.flush()
+"""
+
+
+class PythonWorker:
+    """Persistent Python interpreter running Python scripts sent over its STDIN.
+
+    :param program: Python interpreter absolute or relative path
+    :param environment: Interpreter environment variables
+    """
+
+    def __init__(self, program: str, environment: dict[str, str]) -> None:
+        self.tasks = 0
+        self.process = subprocess.Popen(
+            [program, "-c", _worker_script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=environment,
+            text=True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        """Return True if the interpreter is running."""
+        return self.process.poll() is None
+
+    def run(self, argv: list[str], cwd: str, stdout: str) -> int:
+        """Run a Python script with STDOUT and STDERR redirected to a file.
+
+        The script runs as ``__main__`` with its own ``sys.argv``, working directory, and first ``sys.path`` entry.
+        Modules imported from the interpreter installation, e.g. ``xarray``, stay imported for later scripts. Modules
+        imported from other directories, e.g. project modules next to the script, are removed after each script.
+
+        :param argv: Script path and arguments
+        :param cwd: Script working directory
+        :param stdout: Script STDOUT and STDERR file
+
+        :returns: script exit code. The interpreter exit code if the interpreter exits while running the script.
+        """
+        self.tasks += 1
+        task = json.dumps({"argv": argv, "cwd": cwd, "stdout": stdout})
+        try:
+            self.process.stdin.write(f"{task}\n")  # type: ignore[union-attr]
+            self.process.stdin.flush()  # type: ignore[union-attr]
+            line = self.process.stdout.readline()  # type: ignore[union-attr]
+        except OSError:
+            line = ""
+        if not line:
+            exit_code = self.process.wait()
+            return exit_code if exit_code >= 0 else 128 - exit_code
+        return json.loads(line)["status"]
+
+    def close(self) -> None:
+        """Stop the interpreter."""
+        with contextlib.suppress(OSError):
+            self.process.stdin.close()  # type: ignore[union-attr]
+        try:
+            self.process.wait(timeout=5.0)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool(ABC):
+    """Thread safe pool of persistent worker processes shared by all SCons worker threads.
+
+    Workers are started on demand, one per concurrent task, and reused by later tasks with the same worker arguments.
+    Workers provide ``tasks`` and ``alive`` attributes and a ``close`` method. Derived classes implement
+    :meth:`_start`.
+
+    :param workers: Maximum number of workers. If None, the number of workers is limited by the number of concurrent
+        SCons tasks.
+    :param tasks_per_worker: Number of tasks run by a worker before it is replaced, which limits the growth of long
+        running workers. If None, workers are not replaced.
+    """
+
+    def __init__(self, workers: int | None = None, tasks_per_worker: int | None = None) -> None:
+        self.workers = workers
+        self.tasks_per_worker = tasks_per_worker
+        self._idle: dict[str, list] = collections.defaultdict(list)
+        self._count = 0
+        self._condition = threading.Condition()
+
+    @abstractmethod
+    def _start(self, *arguments: typing.Any) -> typing.Any:  # noqa: ANN401
+        """Start a new worker.
+
+        :param arguments: Worker arguments
+
+        :returns: worker
+        """
+
+    @contextlib.contextmanager
+    def worker(self, *arguments: typing.Any) -> collections.abc.Generator[typing.Any, None, None]:  # noqa: ANN401
+        """Borrow an idle worker, starting a new worker if none is idle.
+
+        Waits while the maximum number of workers is busy. Idle workers with different worker arguments are stopped to
+        make room for a new worker. Workers are stopped after releasing the pool lock, so a slow worker shutdown does
+        not block the other SCons worker threads.
+
+        :param arguments: Worker arguments
+
+        :returns: worker
+        """
+        key = json.dumps(arguments, sort_keys=True)
+        worker = None
+        stale = None
+        with self._condition:
+            while True:
+                if self._idle[key]:
+                    worker = self._idle[key].pop()
+                    break
+                if self.workers is None or self._count < self.workers:
+                    self._count += 1
+                    break
+                idle = next((workers for workers in self._idle.values() if workers), None)
+                if idle is not None:
+                    # The new worker takes the place of the stale worker
+                    stale = idle.pop()
+                    break
+                self._condition.wait()
+        if stale is not None:
+            stale.close()
+        try:
+            if worker is None:
+                worker = self._start(*arguments)
+        except Exception:
+            with self._condition:
+                self._count -= 1
+                self._condition.notify_all()
+            raise
+        try:
+            yield worker
+        finally:
+            retired = None
+            with self._condition:
+                if worker.alive and (self.tasks_per_worker is None or worker.tasks < self.tasks_per_worker):
+                    self._idle[key].append(worker)
+                else:
+                    retired = worker
+                    self._count -= 1
+                self._condition.notify_all()
+            if retired is not None:
+                retired.close()
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        with self._condition:
+            stopped = [worker for workers in self._idle.values() for worker in workers]
+            for workers in self._idle.values():
+                workers.clear()
+            self._count -= len(stopped)
+            self._condition.notify_all()
+        for worker in stopped:
+            worker.close()
+
+
+class PythonWorkerPool(WorkerPool):
+    """Thread safe pool of persistent Python interpreters shared by all SCons worker threads.
+
+    Interpreters are started on demand, one per concurrent task, and reused by later tasks with the same Python
+    interpreter and environment variables. Borrow interpreters with ``worker(program, environment)``.
+
+    :param workers: Maximum number of interpreters. If None, the number of interpreters is limited by the number of
+        concurrent SCons tasks.
+    :param tasks_per_worker: Number of scripts run by an interpreter before it is replaced, which limits the growth of
+        long running interpreters. If None, interpreters are not replaced.
+    """
+
+    def _start(self, program: str, environment: dict[str, str]) -> PythonWorker:  # type: ignore[override]
+        """Start a new Python interpreter.
+
+        :param program: Python interpreter absolute or relative path
+        :param environment: Interpreter environment variables
+
+        :returns: interpreter
+        """
+        return PythonWorker(program, environment)
+
+
+def _environment(env: typing.Any) -> dict[str, str]:  # noqa: ANN401
+    """Return the command environment variables of a construction environment as strings.
+
+    List values, e.g. ``PATH``, are joined with the path separator as in SCons command actions.
+
+    :param env: SCons construction environment
+
+    :returns: environment variables
+    """
+    environment = {}
+    for key, value in SCons.Action.get_default_ENV(env).items():
+        if SCons.Util.is_List(value):
+            environment[str(key)] = os.pathsep.join(map(str, SCons.Util.flatten_sequence(value)))
+        else:
+            environment[str(key)] = str(value)
+    return environment
+
+
+class PythonWorkerAction(_scheduler.WrapperAction):
+    """SCons action wrapper running Python builder scripts in the construction environment Python worker pool.
+
+    Tasks run in a persistent interpreter of the construction environment
+    :meth:`waves.scons_extensions.python_worker_pool` when the task command is the
+    :meth:`waves.scons_extensions.python_builder_factory` default command: the first target directory as working
+    directory, STDOUT and STDERR redirected to the last target, no interpreter options, and no ``environment`` prefix.
+    All other tasks, tasks without a worker pool, and dry runs run the wrapped command action unchanged. Switching
+    between the worker pool and subprocesses does not rebuild targets, see :class:`waves._scheduler.WrapperAction`.
+
+    Tasks in the worker pool do not run the construction environment ``SPAWN`` function, so ``SPAWN`` wrappers, e.g.
+    CPU affinity, do not apply. Tasks with a :class:`waves._scheduler.TimeoutAction` timeout run the wrapped command
+    action.
+
+    :param action: Wrapped SCons action
+    """
+
+    def __call__(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped action in the worker pool, if the task runs the default Python builder command.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: script exit status
+        """
+        pool = env.get(_settings._python_worker_pool_variable)
+        command = self.command()
+        executor = kwargs.get("executor")
+        targets = executor.get_all_targets() if executor else target
+        sources = executor.get_all_sources() if executor else source
+        if (
+            pool is None
+            or command is None
+            or not SCons.Action.execute_actions
+            or not self.pooled(targets, sources, env)
+        ):
+            return self.action(target, source, env, *args, **kwargs)
+
+        def execute(target: list, source: list, env: typing.Any) -> int:  # noqa: ANN401
+            def subst(string: str) -> str:
+                return env.subst(string, target=target, source=source)
+
+            argv = shlex.split(subst("${subcommand} ${subcommand_required} ${subcommand_options}"))
+            with pool.worker(subst("${program}"), _environment(env)) as worker:
+                return worker.run(argv, subst("${TARGET.dir.abspath}"), subst("${TARGETS[-1].abspath}"))
+
+        pooled = SCons.Action.FunctionAction(execute, {"strfunction": command.strfunction})
+        return pooled(target, source, env, *args, **kwargs)
+
+    def command(self) -> SCons.Action.CommandAction | None:
+        """Return the wrapped Python builder command action.
+
+        :returns: command action. None if the wrapped action is not a single Python builder command.
+        """
+        action = self.action
+        if isinstance(action, _scheduler.TimeoutAction):
+            action = action.action
+        if isinstance(action, SCons.Action.ListAction) and len(action.list) == 1:
+            action = action.list[0]
+        if isinstance(action, SCons.Action.CommandAction) and action.cmd_list == _settings._builder_factory_action:
+            return action
+        return None
+
+    def pooled(self, target: list, source: list, env: typing.Any) -> bool:  # noqa: ANN401
+        """Return True if a task runs the default Python builder command without a timeout.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+
+        :returns: True if the task can run in the worker pool
+        """
+
+        def subst(string: str) -> str:
+            return env.subst(string, target=target, source=source)
+
+        if isinstance(self.action, _scheduler.TimeoutAction) and self.action.task_timeout(target, source, env) > 0.0:
+            return False
+        return (
+            bool(target)
+            and not subst("${environment} ${program_required} ${program_options}").strip()
+            and bool(subst("${subcommand}").strip())
+            and subst("${action_prefix}") == subst(_settings._cd_action_prefix)
+            and subst("${action_suffix}") == subst(_settings._redirect_action_suffix)
+        )
+
+
+def worker_builder(builder: typing.Any) -> typing.Any:  # noqa: ANN401
+    """Wrap a builder's action with :class:`PythonWorkerAction`, unless the action is already wrapped.
+
+    :param builder: SCons builder
+
+    :returns: modified builder
+    """
+    if not isinstance(builder.action, PythonWorkerAction):
+        builder.action = PythonWorkerAction(builder.action)
+    return builder
+
+
+class MatlabEngine:
+    """Persistent MATLAB session started with the MATLAB Engine API for Python.
+
+    :param options: MATLAB startup options, e.g. ``-nojvm``. If empty, the MATLAB Engine API default options.
+
+    :raises RuntimeError: If the MATLAB Engine API for Python is not installed
+    """
+
+    def __init__(self, options: str = "") -> None:
+        try:
+            import matlab.engine  # type: ignore[import-not-found]
+        except ImportError as err:
+            raise RuntimeError(
+                "MATLAB engine tasks require the MATLAB Engine API for Python, e.g. 'pip install matlabengine'"
+            ) from err
+        self.tasks = 0
+        self.alive = True
+        self._execution_error = matlab.engine.MatlabExecutionError
+        self.engine = matlab.engine.start_matlab(options) if options else matlab.engine.start_matlab()
+
+    def run(self, statement: str, cwd: str, stdout: str) -> int | None:
+        """Evaluate MATLAB statements with the MATLAB output written to a file.
+
+        The statements run in the base workspace with the working directory ``cwd``. The MATLAB path and working
+        directory are restored, and the workspace variables, figures, and open files are cleared after each task.
+
+        :param statement: MATLAB statements
+        :param cwd: Task working directory
+        :param stdout: Task STDOUT and STDERR file
+
+        :returns: task exit code. None if the MATLAB session exits before the statements start.
+        """
+        self.tasks += 1
+        directory = cwd.replace("'", "''")
+        output = io.StringIO()
+        started = False
+        status = 0
+        try:
+            self.engine.eval(f"waves_path = path; waves_cwd = pwd; cd('{directory}');", nargout=0)
+            started = True
+            self.engine.eval(statement, nargout=0, stdout=output, stderr=output)
+        except self._execution_error as err:
+            output.write(f"{err}\n")
+            status = 1
+        except Exception as err:  # noqa: BLE001
+            self.alive = False
+            if not started:
+                return None
+            output.write(f"MATLAB session exited: {err}\n")
+            status = 1
+        pathlib.Path(stdout).write_text(output.getvalue())
+        if self.alive:
+            try:
+                self.engine.eval(
+                    "path(waves_path); cd(waves_cwd); fclose('all'); close('all', 'force'); clear all;", nargout=0
+                )
+            except Exception:  # noqa: BLE001
+                self.alive = False
+        return status
+
+    def close(self) -> None:
+        """Stop the MATLAB session."""
+        self.alive = False
+        with contextlib.suppress(Exception):
+            self.engine.quit()
+
+
+class MatlabEnginePool(WorkerPool):
+    """Thread safe pool of persistent MATLAB sessions shared by all SCons worker threads.
+
+    Sessions are started on demand, one per concurrent task, and reused by later tasks with the same MATLAB startup
+    options. Borrow sessions with ``worker(options)``.
+
+    :param workers: Maximum number of MATLAB sessions. If None, the number of sessions is limited by the number of
+        concurrent SCons tasks.
+    :param tasks_per_worker: Number of tasks run by a session before it is replaced. If None, sessions are not replaced.
+    """
+
+    def _start(self, options: str) -> MatlabEngine:  # type: ignore[override]
+        """Start a new MATLAB session.
+
+        :param options: MATLAB startup options
+
+        :returns: MATLAB session
+        """
+        return MatlabEngine(options)
+
+
+class MatlabEngineAction(_scheduler.WrapperAction):
+    """SCons action wrapper running MATLAB script builder tasks in the construction environment MATLAB engine pool.
+
+    Tasks run in a persistent MATLAB session of the construction environment
+    :meth:`waves.scons_extensions.matlab_engine_pool` when the task commands are the
+    :meth:`waves.scons_extensions.matlab_script` default commands: the first target directory as working directory and
+    the MATLAB output redirected to the MATLAB environment and STDOUT targets. The ``matlab_options`` are the session
+    startup options. All other tasks, tasks without an engine pool, and dry runs run the wrapped command actions
+    unchanged, so switching between the engine pool and MATLAB processes does not rebuild targets.
+
+    Tasks are retried once in a new session if their session exited before the task started. Sessions exiting while
+    running a task fail the task and are replaced.
+
+    :param action: Wrapped SCons action
+    """
+
+    def __call__(
+        self,
+        target: list,
+        source: list,
+        env: typing.Any,  # noqa: ANN401
+        *args,
+        **kwargs,
+    ) -> typing.Any:  # noqa: ANN401
+        """Execute the wrapped actions in the engine pool, if the task runs the default MATLAB script commands.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+        :param args: Positional arguments passed through to the wrapped action
+        :param kwargs: Keyword arguments passed through to the wrapped action
+
+        :returns: task exit status
+        """
+        pool = env.get(_settings._matlab_engine_pool_variable)
+        commands = self.commands()
+        executor = kwargs.get("executor")
+        targets = executor.get_all_targets() if executor else target
+        sources = executor.get_all_sources() if executor else source
+        if (
+            pool is None
+            or commands is None
+            or not SCons.Action.execute_actions
+            or not self.pooled(targets, sources, env)
+        ):
+            return self.action(target, source, env, *args, **kwargs)
+
+        def execute(target: list, source: list, env: typing.Any) -> int:  # noqa: ANN401
+            def subst(string: str) -> str:
+                return env.subst(string, target=target, source=source)
+
+            options = subst("${matlab_options}")
+            cwd = subst("${TARGET.dir.abspath}")
+            statements = (
+                (subst(_settings._matlab_environment_statement), subst("${TARGETS[-2].abspath}")),
+                (subst(_settings._matlab_script_statement), subst("${TARGETS[-1].abspath}")),
+            )
+            for statement, stdout in statements:
+                status = None
+                for _attempt in range(2):
+                    with pool.worker(options) as engine:
+                        status = engine.run(statement, cwd, stdout)
+                    if status is not None:
+                        break
+                if status != 0:
+                    return 1 if status is None else status
+            return 0
+
+        def strfunction(target: list, source: list, env: typing.Any, executor: typing.Any = None) -> str:  # noqa: ANN401
+            return "\n".join(command.strfunction(target, source, env, executor) for command in commands)
+
+        pooled = SCons.Action.FunctionAction(execute, {"strfunction": strfunction})
+        return pooled(target, source, env, *args, **kwargs)
+
+    def commands(self) -> list[SCons.Action.CommandAction] | None:
+        """Return the wrapped MATLAB script builder command actions.
+
+        :returns: command actions. None if the wrapped action is not the MATLAB script builder command list.
+        """
+        action = self.action
+        expected = [_settings._matlab_environment_action, _settings._matlab_script_action]
+        if (
+            isinstance(action, SCons.Action.ListAction)
+            and all(isinstance(command, SCons.Action.CommandAction) for command in action.list)
+            and [command.cmd_list for command in action.list] == expected
+        ):
+            return action.list
+        return None
+
+    def pooled(self, target: list, source: list, env: typing.Any) -> bool:  # noqa: ANN401
+        """Return True if a task runs the default MATLAB script builder commands.
+
+        :param target: Task target nodes
+        :param source: Task source nodes
+        :param env: Task construction environment
+
+        :returns: True if the task can run in the engine pool
+        """
+
+        def subst(string: str) -> str:
+            return env.subst(string, target=target, source=source)
+
+        return (
+            len(target) > 1
+            and subst("${action_prefix}") == subst(_settings._cd_action_prefix)
+            and subst("${action_suffix}") == subst(_settings._redirect_action_suffix)
+            and subst("${environment_suffix}") == subst(_settings._redirect_environment_suffix)
+        )
+
+
+def matlab_engine_builder(builder: typing.Any) -> typing.Any:  # noqa: ANN401
+    """Wrap a builder's action with :class:`MatlabEngineAction`, unless the action is already wrapped.
+
+    :param builder: SCons builder
+
+    :returns: modified builder
+    """
+    if not isinstance(builder.action, MatlabEngineAction):
+        builder.action = MatlabEngineAction(builder.action)
+    return builder
+
+
+# Limit help() and 'from module import *' behavior to the module's public API
+_module_objects = set(globals().keys()) - _exclude_from_namespace
+__all__ = [name for name in _module_objects if not name.startswith("_")]
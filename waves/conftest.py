@@ -1,8 +1,11 @@
 """Define the project's custom pytest options and CLI extensions."""
 
+import collections.abc
 import pathlib
+from unittest.mock import patch
 
 import pytest
+import SCons.SConsign
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -70,3 +73,15 @@ def abaqus_command(request: pytest.FixtureRequest) -> pathlib.Path:
 def cubit_command(request: pytest.FixtureRequest) -> pathlib.Path:
     """Return the argument of custom pytest ``--cubit-command`` command-line option."""
     return request.config.getoption("--cubit-command")
+
+
+@pytest.fixture
+def sconsign_database(tmp_path: pathlib.Path) -> collections.abc.Iterator[pathlib.Path]:
+    """Open the SCons signature database in the test directory instead of the current working directory."""
+    database = tmp_path / ".sconsign"
+    with (
+        patch.object(SCons.SConsign, "DB_Name", str(database)),
+        patch.dict(SCons.SConsign.DataBase, clear=True),
+        patch.object(SCons.SConsign, "DB_sync_list", []),
+    ):
+        yield database
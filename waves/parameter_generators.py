@@ -24,7 +24,7 @@ import yaml
 
 from waves import _settings, _utilities
 from waves._settings import _hash_coordinate_key, _set_coordinate_key
-from waves.exceptions import ChoicesError, MutuallyExclusiveError, SchemaValidationError
+from waves.exceptions import APIError, ChoicesError, MutuallyExclusiveError, SchemaValidationError
 
 _exclude_from_namespace = set(globals().keys())
 
@@ -474,7 +474,10 @@ class ParameterGenerator(ABC):
         """
         return _parameter_study_to_numpy(self.parameter_study)
 
-    def parameter_study_to_dict(self) -> dict[str, dict[str, typing.Any]]:
+    def parameter_study_to_dict(
+        self,
+        shard: str | tuple[int, int] | None = None,
+    ) -> dict[str, dict[str, typing.Any]]:
         """Return parameter study as a dictionary.
 
         Used for iterating on parameter sets in an SCons workflow with parameter substitution dictionaries, e.g.
@@ -489,10 +492,31 @@ class ParameterGenerator(ABC):
            parameter_set2: {'parameter_1': 2, 'parameter_2': 'a'}
            parameter_set3: {'parameter_1': 2, 'parameter_2': 'b'}
 
+        When a ``shard`` is provided, only the parameter sets belonging to that shard are returned. Shard membership is
+        calculated from the parameter set content hash, so every set belongs to exactly one shard and the assignment is
+        independent of set name, set order, and the host running the workflow. Independent SCons processes, e.g. one
+        per cluster node, may each build one shard of the same parameter study. Shard sizes are balanced on average, but
+        small parameter studies may have uneven or empty shards.
+
+        .. code-block::
+
+           >>> shards = [parameter_generator.parameter_study_to_dict(shard=(index, 2)) for index in range(2)]
+           >>> sorted(set_name for shard in shards for set_name in shard)
+           ['parameter_set0', 'parameter_set1', 'parameter_set2', 'parameter_set3']
+
+        :param shard: Shard selector as an ``"index/count"`` string or ``(index, count)`` tuple with zero based index,
+            e.g. ``"0/4"`` for the first of four shards. Defaults to all parameter sets.
+
         :return: parameter study sets and samples as a dictionary: {set_name: {parameter: value}, ...}
+
+        :raises waves.exceptions.APIError: If the shard selector is malformed or the index is out of range
         """
+        shard_index, shard_count = _parse_shard(shard)
         parameter_study_dictionary = {}
         for set_name, parameters in self.parameter_study.groupby(_set_coordinate_key):
+            set_hash = str(parameters[_hash_coordinate_key].values.item())
+            if not _shard_member(set_hash, shard_index, shard_count):
+                continue
             parameter_dict = {str(key): array.values.item() for key, array in parameters.items()}
             parameter_study_dictionary[str(set_name)] = parameter_dict
         return parameter_study_dictionary
@@ -1450,6 +1474,44 @@ def _calculate_set_hashes(parameter_names: list[str], samples: numpy.ndarray) ->
     return [_calculate_set_hash(parameter_names, set_samples) for set_samples in samples]
 
 
+def _parse_shard(shard: str | tuple[int, int] | None) -> tuple[int, int]:
+    """Return the zero based shard index and shard count from a shard selector.
+
+    :param shard: Shard selector as an ``"index/count"`` string, e.g. ``"1/4"``, or an ``(index, count)`` tuple. If
+        None, return the single shard ``(0, 1)`` containing all parameter sets.
+
+    :returns: shard index, shard count
+
+    :raises waves.exceptions.APIError: If the shard selector is malformed or the index is out of range
+    """
+    if shard is None:
+        return 0, 1
+    try:
+        if isinstance(shard, str):
+            index_string, count_string = shard.split("/")
+            shard_index, shard_count = int(index_string), int(count_string)
+        else:
+            shard_index, shard_count = (int(value) for value in shard)
+    except (TypeError, ValueError) as err:
+        raise APIError(f"Shard '{shard}' must be an 'index/count' string or (index, count) tuple") from err
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise APIError(f"Shard '{shard}' index must be in the range [0, count) and count must be positive")
+    return shard_index, shard_count
+
+
+def _shard_member(set_hash: str, shard_index: int, shard_count: int) -> bool:
+    """Return True if the parameter set hash belongs to the requested shard.
+
+    :param set_hash: Parameter set content hash. Expected to be a hexadecimal string as returned by
+        :meth:`_calculate_set_hash`.
+    :param shard_index: Zero based shard index
+    :param shard_count: Total number of shards
+
+    :returns: shard membership
+    """
+    return int(set_hash, 16) % shard_count == shard_index
+
+
 def _parameter_study_to_numpy(parameter_study: xarray.Dataset) -> numpy.ndarray:
     """Return the parameter study data as a 2D numpy array.
 
@@ -4,21 +4,42 @@ import atexit
 import collections
 import copy
 import functools
+import json
+import os
 import pathlib
 import re
 import shutil
 import sys
+import tempfile
 import typing
 
 import SCons.Builder
 import SCons.Defaults
 import SCons.Environment
 import SCons.Node
+import SCons.Node.FS
 import SCons.Scanner
 import SCons.Script
 from SCons.Script.SConscript import SConsEnvironment
 
-from waves import _settings, _utilities, parameter_generators
+from waves import (
+    _accounting,
+    _build_failures,
+    _cache,
+    _decider,
+    _journal_sessions,
+    _ordering,
+    _progress,
+    _scanner,
+    _scheduler,
+    _settings,
+    _slurm,
+    _ssh,
+    _task_report,
+    _utilities,
+    _workers,
+    parameter_generators,
+)
 
 _exclude_from_namespace = set(globals().keys())
 
@@ -66,32 +87,68 @@ def print_action_signature_string(
     return
 
 
-def _print_failed_nodes_stdout() -> None:
-    """Query the SCons reported build failures and print the associated node's STDOUT file, if it exists."""
+def _print_failed_nodes_stdout(
+    tail_bytes: int | None = 64 * 1024,
+    tail_lines: int | None = 50,
+    max_signatures: int = 10,
+    summary: bool = True,
+) -> None:
+    """Query the SCons reported build failures and print the associated node's STDOUT file, if it exists.
+
+    Prints the tail of each STDOUT file, preceded by the known error signatures if the tail is truncated, followed by a
+    failure summary table. The STDOUT file is searched for error signatures only if the tail is truncated. Otherwise,
+    the summary table error signatures are found in the tail.
+
+    :param tail_bytes: Maximum number of bytes read from the end of each STDOUT file. If None, read the entire file.
+    :param tail_lines: Maximum number of printed lines of each STDOUT file. If None, print all lines read.
+    :param max_signatures: Maximum number of printed error signatures of each STDOUT file
+    :param summary: Print the failure summary table
+    """
     build_failures = SCons.Script.GetBuildFailures()
+    rows = []
     for failure in build_failures:
-        node_path = pathlib.Path(failure.node.abspath)
-        stdout_path_options = [
-            node_path.parent / f"{node_path}{_settings._stdout_extension}",
-            node_path.with_suffix(_settings._stdout_extension),
-        ]
-        stdout_path_options = [path.resolve() for path in stdout_path_options]
-        try:
-            stdout_path = next(path for path in stdout_path_options if path.exists())
-            with stdout_path.open(mode="r") as stdout_file:
-                print(
-                    f"\n{failure.node} failed with STDOUT file '{stdout_path}'\n{stdout_file.read()}", file=sys.stderr
-                )
-        except StopIteration:
+        stdout_path = _build_failures._stdout_path(failure.node.abspath)
+        exit_status = str(getattr(failure, "status", ""))
+        if stdout_path is None:
             print(f"\n{failure.node} failed\n", file=sys.stderr)
+            rows.append((str(failure.node), exit_status, "", ""))
+            continue
+        tail, truncated = _build_failures._read_tail(stdout_path, tail_bytes, tail_lines)
+        signatures: list[str] = []
+        more = False
+        if truncated:
+            signatures, more = _build_failures._error_signatures(stdout_path, max_signatures=max_signatures)
+        elif summary:
+            signatures, more = _build_failures._error_signatures(tail.encode(), max_signatures=max_signatures)
+        message = f"\n{failure.node} failed with STDOUT file '{stdout_path}'\n"
+        if signatures and truncated:
+            limit = f" (first {max_signatures})" if more else ""
+            message += f"Error signatures{limit}:\n" + "\n".join(signatures) + "\n"
+        if truncated:
+            message += f"Last {len(tail.splitlines())} lines of STDOUT file:\n"
+        print(f"{message}{tail}", file=sys.stderr)
+        count = f"{len(signatures)}{'+' if more else ''}"
+        rows.append((str(failure.node), exit_status, count, signatures[0].splitlines()[0] if signatures else ""))
+    if summary and rows:
+        print(f"\nBuild failure summary\n{_build_failures._summary_table(rows)}", file=sys.stderr)
 
 
 def print_build_failures(
     env: SCons.Environment.Environment | None = None,
     print_stdout: bool = True,
+    tail_bytes: int | None = 64 * 1024,
+    tail_lines: int | None = 50,
+    max_signatures: int = 10,
+    summary: bool = True,
 ) -> None:
     """On exit, query the SCons reported build failures and print the associated node's STDOUT file, if it exists.
 
+    The STDOUT files of failed tasks may be hundreds of MB, e.g. Abaqus and MPI logs. Only the last ``tail_lines`` lines
+    in the last ``tail_bytes`` bytes of each STDOUT file are printed. The known error signatures, Abaqus ``***ERROR``
+    messages and Python tracebacks, are extracted by streaming through the STDOUT file and printed before a truncated
+    tail. STDOUT files with a complete tail are not searched again. A compact summary table of the failed targets, exit
+    statuses, error signature counts, and first error lines is printed last.
+
     .. code-block::
        :caption: SConstruct
 
@@ -110,11 +167,21 @@ def print_build_failures(
 
     :param env: SCons construction environment
     :param print_stdout: Boolean to set the exit behavior. If False, don't modify the exit behavior.
+    :param tail_bytes: Maximum number of bytes read from the end of each STDOUT file. If None, read the entire file.
+    :param tail_lines: Maximum number of printed lines of each STDOUT file. If None, print all lines read.
+    :param max_signatures: Maximum number of printed error signatures of each STDOUT file
+    :param summary: Print the failure summary table
     """
     if env is None:
         env = SCons.Environment.Environment()
     if print_stdout:
-        atexit.register(_print_failed_nodes_stdout)
+        atexit.register(
+            _print_failed_nodes_stdout,
+            tail_bytes=tail_bytes,
+            tail_lines=tail_lines,
+            max_signatures=max_signatures,
+            summary=summary,
+        )
 
 
 def action_list_scons(actions: typing.Iterable[str]) -> SCons.Action.ListAction:
@@ -131,11 +198,16 @@ def action_list_scons(actions: typing.Iterable[str]) -> SCons.Action.ListAction:
 def action_list_strings(builder: SCons.Builder.Builder) -> list[str]:
     """Return a builder's action list as a list of str.
 
+    Actions modified by :class:`waves._scheduler.WrapperAction` builder modifiers, e.g.
+    :meth:`waves.scons_extensions.timeout_builder_actions`, return the wrapped action list.
+
     :param builder: The builder to extract the action list from
 
     :returns: list of builder actions
     """
     action = builder.action
+    while isinstance(action, _scheduler.WrapperAction):
+        action = action.action
     if isinstance(action, SCons.Action.CommandAction):
         action_list = [action.cmd_list]
     else:
@@ -143,6 +215,18 @@ def action_list_strings(builder: SCons.Builder.Builder) -> list[str]:
     return action_list
 
 
+def _replace_wrapped_action(builder: SCons.Builder.Builder, action: SCons.Action.ActionBase) -> None:
+    """Replace a builder's action inside the :class:`waves._scheduler.WrapperAction` wrappers of the builder action.
+
+    :param builder: The SCons builder to modify
+    :param action: The replacement action
+    """
+    wrapper = builder
+    while isinstance(wrapper.action, _scheduler.WrapperAction):
+        wrapper = wrapper.action
+    wrapper.action = action
+
+
 def catenate_builder_actions(
     builder: SCons.Builder.Builder,
     program: str = "",
@@ -163,7 +247,7 @@ def catenate_builder_actions(
     action_list = action_list_strings(builder)
     action = " && ".join(action_list)
     action = f'{program} {options} "{action}"'
-    builder.action = SCons.Action.CommandAction(action)
+    _replace_wrapped_action(builder, SCons.Action.CommandAction(action))
     return builder
 
 
@@ -192,6 +276,368 @@ def catenate_actions(**outer_kwargs) -> collections.abc.Callable:
     return intermediate_decorator
 
 
+def resource_builder_actions(
+    builder: SCons.Builder.Builder,
+    cpus: str = "${cpus}",
+    memory: str = "${memory}",
+    retries: int = 0,
+    backoff: float = 30.0,
+    retry_pattern: str | None = None,
+    retry_files: collections.abc.Iterable[str] = ("${TARGETS[-1].abspath}",),
+    **resources: str | collections.abc.Callable,
+) -> SCons.Builder.Builder:
+    """Wrap a builder's action to wait for the task's requested resources before execution.
+
+    The requested amounts are construction variable substitution strings evaluated per task, so tasks may declare their
+    needs with task keyword arguments. Tasks run only when the resources are free in the construction environment's
+    :meth:`waves.scons_extensions.resource_scheduler` pool. Tasks without a ``cpus`` value request one CPU. Resource
+    admission does not change the build signatures, see :class:`waves._scheduler.WrapperAction`.
+
+    If the resource scheduler has an ``affinity`` command, the task commands are pinned to a disjoint set of CPUs with
+    the requested number of CPUs.
+
+    Failed tasks are retried with exponential backoff when one of the retry files matches the retry pattern. The
+    default retry file is the last task target, which is the STDOUT file of the WAVES builders that redirect STDOUT.
+    The requested resources are released while waiting to retry.
+
+    Apply this modification after any other builder action modifications, e.g.
+    :meth:`waves.scons_extensions.catenate_builder_actions`.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.ResourceScheduler(cpus=32, memory="128G", gpus=2)
+       env.Append(BUILDERS={
+           "Solver": waves.scons_extensions.resource_builder_actions(
+               waves.scons_extensions.first_target_builder_factory(
+                   program="solver", program_required="--threads ${cpus} ${SOURCES.abspath}"
+               ),
+               gpus="${gpus}",
+           )
+       })
+       env.Solver(target=["solution.out", "solution.stdout"], source=["model.in"], cpus=16, memory="32G", gpus=1)
+
+    :param builder: The SCons builder to modify
+    :param cpus: Requested CPUs substitution string
+    :param memory: Requested memory substitution string. Accepts ``K``, ``M``, ``G``, and ``T`` suffixes.
+    :param retries: Number of times to retry a failed task
+    :param backoff: Seconds to wait before the first retry. Doubled for each subsequent retry.
+    :param retry_pattern: Case insensitive regular expression identifying retryable failures. If None, failed tasks
+        are not retried.
+    :param retry_files: Substitution strings of the files searched for the retry pattern after a failure
+    :param resources: Other requested resource substitution strings, e.g. licence tokens. Also accepts callables with
+        the ``(target, source, env)`` signature of SCons function actions returning the requested amount.
+
+    :returns: modified builder
+    """
+    requests = {"cpus": cpus, "memory": memory, **resources}
+    builder.action = _scheduler.ResourceAction(
+        builder.action,
+        requests,
+        retries=retries,
+        backoff=backoff,
+        retry_pattern=retry_pattern,
+        retry_files=retry_files,
+    )
+    return builder
+
+
+def abaqus_licence_builder_actions(
+    builder: SCons.Builder.Builder,
+    retries: int = 5,
+    backoff: float = 60.0,
+    retry_pattern: str = _settings._abaqus_licence_error_pattern,
+    retry_files: collections.abc.Iterable[str] = ("${TARGETS[-1].abspath}",),
+) -> SCons.Builder.Builder:
+    """Wrap an Abaqus builder's action to wait for free Abaqus licence tokens and retry licence failures.
+
+    The licence token cost of each task is computed from the task's ``cpus`` construction variable with the Abaqus
+    token formula ``floor(5 * cpus ** 0.422)``. The total concurrent token cost is limited by the ``abaqus_tokens``
+    budget of the construction environment's :meth:`waves.scons_extensions.resource_scheduler` pool. CPUs and memory
+    are requested as with :meth:`waves.scons_extensions.resource_builder_actions`.
+
+    Licence checkouts may still fail when other users consume tokens from a shared licence server. Tasks which fail with
+    a licence error in a retry file, by default the Abaqus STDOUT target of the WAVES Abaqus builders, are requeued with
+    exponential backoff instead of failing the build. The licence tokens are released while waiting to retry.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.ResourceScheduler(cpus=32, abaqus_tokens=50)
+       env.Append(BUILDERS={
+           "AbaqusSolver": waves.scons_extensions.abaqus_licence_builder_actions(
+               waves.scons_extensions.abaqus_solver_builder_factory(program=env["ABAQUS_PROGRAM"])
+           )
+       })
+       env.AddMethod(waves.scons_extensions.AbaqusPseudoBuilder(builder=env.AbaqusSolver), "Abaqus")
+       env.Abaqus(job="simulation_1", cpus=16)
+
+    :param builder: The Abaqus SCons builder to modify
+    :param retries: Number of times to retry a task failing with a licence error
+    :param backoff: Seconds to wait before the first retry. Doubled for each subsequent retry.
+    :param retry_pattern: Case insensitive regular expression identifying licence errors
+    :param retry_files: Substitution strings of the files searched for licence errors after a failure
+
+    :returns: modified builder
+    """
+    resources: dict[str, typing.Any] = {_settings._abaqus_tokens_resource: _scheduler._abaqus_task_tokens}
+    return resource_builder_actions(
+        builder,
+        retries=retries,
+        backoff=backoff,
+        retry_pattern=retry_pattern,
+        retry_files=retry_files,
+        **resources,
+    )
+
+
+def resource_actions(**outer_kwargs) -> collections.abc.Callable:
+    """Apply the :func:`resource_builder_actions` action modifications to a function that returns an SCons Builder.
+
+    Accepts the same keyword arguments as the :func:`waves.scons_extensions.resource_builder_actions`
+
+    .. code-block::
+
+       import SCons.Builder
+       import waves
+
+       @waves.scons_extensions.resource_actions(cpus="${cpus}")
+       def my_builder():
+           return SCons.Builder.Builder(action=["solver --threads ${cpus} $SOURCE"])
+    """
+
+    def intermediate_decorator(function: collections.abc.Callable) -> collections.abc.Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs) -> SCons.Builder.Builder:
+            return resource_builder_actions(function(*args, **kwargs), **outer_kwargs)
+
+        return wrapper
+
+    return intermediate_decorator
+
+
+def timeout_builder_actions(
+    builder: SCons.Builder.Builder,
+    timeout: str = "${waves_timeout}",
+    grace: float = _settings._timeout_kill_grace,
+) -> SCons.Builder.Builder:
+    """Wrap a builder's action to fail tasks which run longer than a wall clock timeout.
+
+    The timeout is a construction variable substitution string evaluated per task, so tasks may declare or override the
+    timeout with a task keyword argument. Tasks without a timeout, or with an empty, zero, or negative timeout, run
+    without a timeout. Changing the timeout does not rebuild targets, see :class:`waves._scheduler.WrapperAction`.
+
+    Each task command runs in a new process group. When the timeout expires, the process group, including solver and MPI
+    child processes, is sent ``SIGTERM``, then ``SIGKILL`` if it is still running after the grace period. The task
+    fails with a ``Timed out after <timeout> seconds`` build error, which is also appended to the task STDOUT file. Use
+    the SCons ``--keep-going`` option to continue building the tasks that do not depend on the timed out task.
+
+    The timeout starts when the task commands start, so the time spent waiting for resources of builders modified by
+    :meth:`waves.scons_extensions.resource_builder_actions` does not count towards the timeout.
+    :meth:`waves.scons_extensions.catenate_builder_actions`, :meth:`waves.scons_extensions.ssh_builder_actions`, and
+    :meth:`waves.scons_extensions.scratch_builder_actions` replace the action inside the timeout wrapper, so the
+    timeout applies to the replacement action.
+
+    The timeout applies to the commands run by the innermost construction environment ``SPAWN`` function, below the
+    ``SPAWN`` wrappers of :meth:`waves.scons_extensions.ssh_multiplex` and ``waves slurm_export``. The timeout of an
+    SSH task stops the local ``ssh`` process, and the remote command may keep running. Tasks run by
+    :meth:`waves.scons_extensions.sbatch_poll`, :meth:`waves.scons_extensions.sbatch_pack`, and
+    :meth:`waves.scons_extensions.abaqus_journal_sessions` run without the timeout. Tasks with ``sbatch --wait``
+    commands fail with an error if they have a timeout, because killing the waiting ``sbatch`` process does not stop
+    the SLURM job. Use the sbatch ``--time`` option instead.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.Append(BUILDERS={
+           "Solver": waves.scons_extensions.timeout_builder_actions(
+               waves.scons_extensions.builder_factory(program="solver", waves_timeout=3600)
+           )
+       })
+       env.Solver(target=["solution.out"], source=["model.in"])
+       env.Solver(target=["large_solution.out"], source=["large_model.in"], waves_timeout=4 * 3600)
+
+    :param builder: The SCons builder to modify
+    :param timeout: Timeout in seconds substitution string
+    :param grace: Seconds to wait between ``SIGTERM`` and ``SIGKILL``
+
+    :returns: modified builder
+    """
+    builder.action = _scheduler.TimeoutAction(builder.action, timeout=timeout, grace=grace)
+    return builder
+
+
+def timeout_actions(**outer_kwargs) -> collections.abc.Callable:
+    """Apply the :func:`timeout_builder_actions` action modifications to a function that returns an SCons Builder.
+
+    Accepts the same keyword arguments as the :func:`waves.scons_extensions.timeout_builder_actions`
+
+    .. code-block::
+
+       import SCons.Builder
+       import waves
+
+       @waves.scons_extensions.timeout_actions(timeout="${solver_timeout}")
+       def my_builder():
+           return SCons.Builder.Builder(action=["solver $SOURCE"], solver_timeout=3600)
+    """
+
+    def intermediate_decorator(function: collections.abc.Callable) -> collections.abc.Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs) -> SCons.Builder.Builder:
+            return timeout_builder_actions(function(*args, **kwargs), **outer_kwargs)
+
+        return wrapper
+
+    return intermediate_decorator
+
+
+def accounting_builder_actions(builder: SCons.Builder.Builder, name: str | None = None) -> SCons.Builder.Builder:
+    """Wrap a builder's action to record the resource usage of each task in the task accounting log.
+
+    Tasks record their wall time, user and system CPU time, peak resident set size, exit code, and bytes written to the
+    accounting log enabled by :meth:`waves.scons_extensions.task_accounting`. Without an accounting log, tasks run
+    unchanged. Actions modified by :meth:`waves.scons_extensions.resource_builder_actions` are wrapped inside the
+    resource admission, such that the recorded wall time does not include the time spent waiting for resources.
+    Enabling the accounting log does not rebuild targets, see :class:`waves._scheduler.WrapperAction`.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.TaskAccounting()
+       env.Append(BUILDERS={
+           "Solver": waves.scons_extensions.accounting_builder_actions(
+               waves.scons_extensions.first_target_builder_factory(program="solver"), name="Solver"
+           )
+       })
+
+    :param builder: The SCons builder to modify
+    :param name: Builder name recorded with each task. Defaults to the builder's name in the construction environment
+        ``BUILDERS``.
+
+    :returns: modified builder
+    """
+    return _accounting.accounting_builder(builder, name=name)
+
+
+def python_worker_builder_actions(builder: SCons.Builder.Builder) -> SCons.Builder.Builder:
+    """Wrap a Python builder's action to run the task scripts in the construction environment Python worker pool.
+
+    Tasks run in a persistent Python interpreter of the :meth:`waves.scons_extensions.python_worker_pool` when the
+    construction environment has a worker pool and the task runs the
+    :meth:`waves.scons_extensions.python_builder_factory` default command. Other tasks run in a new Python interpreter
+    as before. The :meth:`waves.scons_extensions.WAVESEnvironment.PythonScript` builder method applies this
+    modification when the construction environment has a worker pool. Tasks keep their build signatures in either
+    case, see :class:`waves._scheduler.WrapperAction`.
+
+    Tasks with a timeout, see :meth:`waves.scons_extensions.timeout_builder_actions`, and builders modified by
+    :meth:`waves.scons_extensions.catenate_builder_actions` always run their tasks in a new Python interpreter.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.PythonWorkerPool()
+       env.Append(BUILDERS={
+           "PythonScript": waves.scons_extensions.python_worker_builder_actions(
+               waves.scons_extensions.python_builder_factory()
+           )
+       })
+
+    :param builder: The Python SCons builder to modify
+
+    :returns: modified builder
+    """
+    return _workers.worker_builder(builder)
+
+
+def matlab_engine_builder_actions(builder: SCons.Builder.Builder) -> SCons.Builder.Builder:
+    """Wrap a MATLAB script builder's action to run the tasks in the construction environment MATLAB engine pool.
+
+    Tasks run in a persistent MATLAB session of the :meth:`waves.scons_extensions.matlab_engine_pool` when the
+    construction environment has an engine pool and the task runs the :meth:`waves.scons_extensions.matlab_script`
+    default commands. Other tasks run in a new MATLAB process as before, with the same build signature, see
+    :class:`waves._scheduler.WrapperAction`.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.MatlabEnginePool(workers=2)
+       env.Append(BUILDERS={
+           "MatlabScript": waves.scons_extensions.matlab_engine_builder_actions(
+               waves.scons_extensions.matlab_script()
+           )
+       })
+
+    :param builder: The MATLAB script SCons builder to modify
+
+    :returns: modified builder
+    """
+    return _workers.matlab_engine_builder(builder)
+
+
+def _python_worker_builder(env: SCons.Environment.Environment, builder: SCons.Builder.Builder) -> SCons.Builder.Builder:
+    """Return the builder modified by :meth:`python_worker_builder_actions` if the environment has a worker pool.
+
+    :param env: SCons construction environment
+    :param builder: The SCons builder to modify
+
+    :returns: builder
+    """
+    if env.get(_settings._python_worker_pool_variable) is None:
+        return builder
+    return python_worker_builder_actions(builder)
+
+
+def _accounting_builder(
+    env: SCons.Environment.Environment, builder: SCons.Builder.Builder, name: str
+) -> SCons.Builder.Builder:
+    """Return the builder modified by :meth:`accounting_builder_actions` if the environment has an accounting log.
+
+    :param env: SCons construction environment
+    :param builder: The SCons builder to modify
+    :param name: Builder name recorded with each task
+
+    :returns: builder
+    """
+    if env.get(_settings._task_accounting_variable) is None:
+        return builder
+    return accounting_builder_actions(builder, name=name)
+
+
+def _flat_directory_substitutions(action: str, cd_prefix: str) -> str:
+    """Perform the action string substitutions for running actions in a flat, relocated task directory.
+
+    :param action: The original action string
+    :param cd_prefix: The relocated task directory ``cd`` operation
+
+    :returns: Modified action string with relocated task directory substitutions
+    """
+    action = action.replace("cd ${TARGET.dir.abspath} &&", cd_prefix)
+    action = action.replace("SOURCE.abspath", "SOURCE.file")
+    action = action.replace("SOURCES.abspath", "SOURCES.file")
+    action = re.sub(r"(SOURCES\[[-0-9]+\])\.abspath", r"\1.file", action)
+    action = re.sub(r"(TARGETS\[[-0-9]+\])\.abspath", r"\1.file", action)
+    return action
+
+
 def ssh_builder_actions(
     builder: SCons.Builder.Builder,
     remote_server: str = "",
@@ -199,6 +645,11 @@ def ssh_builder_actions(
     rsync_push_options: str = "-rlptv",
     rsync_pull_options: str = "-rlptv",
     ssh_options: str = "",
+    pull_targets: bool = False,
+    compress: bool = False,
+    detach: bool = False,
+    poll_interval: float = 30.0,
+    poll_retries: int = 10,
 ) -> SCons.Builder.Builder:
     r"""Wrap and modify a builder's action list with remote copy operations and SSH commands.
 
@@ -209,7 +660,8 @@ def ssh_builder_actions(
        will fail. This makes SSH wrapped builders fragile with respect to network connectivity. Users are strongly
        encouraged to seek solutions that allow full software installation and full workflow execution on the
        target compute server. If mixed server execution is required, a build directory on a shared network drive
-       and interrupted workflow execution should be preferred over SSH wrapped builders.
+       and interrupted workflow execution should be preferred over SSH wrapped builders. The ``detach`` option runs
+       the remote actions independently of the SSH connection.
 
     If the remote server and remote directory strings are not specified at builder instantation, then the task
     definitions *must* specify these keyword arguments. If a portion of the remote server and/or remote directory are
@@ -243,7 +695,26 @@ def ssh_builder_actions(
       part of the ``remote_server`` command. Shell variables, e.g. ``$USER``, will not be expanded on the
       ``remote_server``. If quotes are included in the original builder actions, they should be double quotes.
     * Returns the entire ``remote_directory`` to the original builder ``${TARGET.dir.abspath}`` with ``rysnc``.
-      ``rsync`` must exist on the local system.
+      ``rsync`` must exist on the local system. When ``pull_targets`` is True, returns only the task targets, including
+      the STDOUT file targets, from the ``remote_directory``. Remote scratch files and the targets of other tasks
+      sharing the ``remote_directory`` are not copied.
+
+    Every task opens several SSH connections. Use :meth:`waves.scons_extensions.ssh_multiplex` to share one
+    multiplexed SSH connection per remote server between all tasks.
+
+    When ``detach`` is True, the original builder actions are written to a task script in the ``remote_directory`` and
+    started in the background with ``nohup setsid``, so the remote task does not depend on the SSH connection. The task
+    script writes the original actions' output to a log file and the exit code to a status file. The local task then
+    checks the status file every ``poll_interval`` seconds with a short SSH command, and finally prints the log and
+    returns the remote exit code. Status checks that fail to connect, or to find the ``remote_directory``, are retried.
+    The local task fails after more than ``poll_retries`` consecutive failed status checks, and the remote task keeps
+    running. If SCons is interrupted or restarted, re-running the task with identical actions re-attaches to the running
+    or finished remote task instead of starting it again. The task script, log, and status files are named
+    ``.waves_ssh_${TARGET.file}.*`` in the ``remote_directory``. Detached tasks require ``nohup``, ``setsid``, and
+    ``cmp`` on the ``remote_server``. The status checks run in a local shell loop, so
+    :meth:`waves.scons_extensions.ssh_multiplex` does not share its connections with them. Set the SSH
+    ``ControlMaster``, ``ControlPath``, and ``ControlPersist`` options in ``ssh_options`` or the SSH configuration
+    file to reuse a connection for the status checks.
 
     .. code-block::
        :caption: SConstruct
@@ -313,29 +784,24 @@ def ssh_builder_actions(
     :param rsync_push_options: rsync options when pushing sources to the remote server
     :param rsync_pull_options: rsync options when pulling remote directory from the remote server
     :param ssh_options: SSH options when running the original builder's actions on the remote server
+    :param pull_targets: Copy only the task targets from the remote server instead of the entire remote directory
+    :param compress: Compress the ``rsync`` pushes and pulls in transit with ``rsync --compress``
+    :param detach: Run the original builder actions in a detached remote task and poll for completion
+    :param poll_interval: Seconds between remote status checks of detached tasks
+    :param poll_retries: Consecutive failed remote status checks of detached tasks before the task fails
 
     :returns: modified builder
     """
     cd_prefix = "cd ${remote_directory} &&"
-
-    def ssh_action_substitutions(action: str, cd_prefix: str = cd_prefix) -> str:
-        """Perform the SSH action string substitutions.
-
-        :param action: The original action string
-        :param cd_prefix: The SSH remote directory ``cd`` operation
-
-        :returns: Modified action string with SSH action substitutions
-        """
-        action = action.replace("cd ${TARGET.dir.abspath} &&", cd_prefix)
-        action = action.replace("SOURCE.abspath", "SOURCE.file")
-        action = action.replace("SOURCES.abspath", "SOURCES.file")
-        action = re.sub(r"(SOURCES\[[-0-9]+\])\.abspath", r"\1.file", action)
-        action = re.sub(r"(TARGETS\[[-0-9]+\])\.abspath", r"\1.file", action)
-        return action
+    rsync = "rsync --compress" if compress else "rsync"
+    if pull_targets:
+        pull_sources = "${_concat(remote_server + ':' + remote_directory + '/', TARGETS.file, '', __env__)}"
+    else:
+        pull_sources = "${remote_server}:${remote_directory}/"
 
     # Retrieve original builder actions and modify for design assumptions
     action_list = action_list_strings(builder)
-    action_list = [ssh_action_substitutions(action) for action in action_list]
+    action_list = [_flat_directory_substitutions(action, cd_prefix) for action in action_list]
     action_list = [
         (
             f"{cd_prefix} {action}"
@@ -344,22 +810,59 @@ def ssh_builder_actions(
         )
         for action in action_list
     ]
-    action_list = [f"ssh ${{ssh_options}} ${{remote_server}} '{action}'" for action in action_list]
+    if detach:
+        state = f"{_settings._ssh_detached_state_prefix}${{TARGET.file}}"
+        script = [
+            "(",
+            "set -e",
+            *action_list,
+            f") > {state}.log 2>&1",
+            f"echo $$? > {state}.status.tmp && mv {state}.status.tmp {state}.status",
+        ]
+        # Close and re-open the quoted remote command to single quote each script line for the remote printf
+        script_lines = " ".join(f"'\\''{line}'\\''" for line in script)
+        running = f"kill -0 $$(cat {state}.pid 2>/dev/null) 2>/dev/null"
+        action_list = [
+            (
+                f"ssh ${{ssh_options}} ${{remote_server}} '{cd_prefix} "
+                f'printf "%s\\n" {script_lines} > {state}.sh.new && '
+                f"if cmp -s {state}.sh.new {state}.sh && {{ test -f {state}.status || {running}; }}; "
+                f"then rm -f {state}.sh.new; "
+                f"else rm -f {state}.status && mv {state}.sh.new {state}.sh && "
+                f"{{ nohup setsid sh {state}.sh > /dev/null 2>&1 < /dev/null & echo $$! > {state}.pid; }}; fi'"
+            ),
+            (
+                f"failures=0; until ssh ${{ssh_options}} ${{remote_server}} 'cd ${{remote_directory}} || exit 255; "
+                f"test -f {state}.status || ! {running}'; do "
+                "if test $$? -eq 255; then failures=$$((failures + 1)); else failures=0; fi; "
+                f"if test $$failures -gt {poll_retries}; then "
+                f'echo "WAVES ssh: {poll_retries} status check retries failed" >&2; exit 255; fi; '
+                f"sleep {poll_interval:g}; done"
+            ),
+            (
+                f"ssh ${{ssh_options}} ${{remote_server}} '{cd_prefix} cat {state}.log; "
+                f"status=$$(cat {state}.status 2>/dev/null || echo 1); rm -f {state}.status {state}.pid; "
+                "exit $$status'"
+            ),
+        ]
+    else:
+        action_list = [f"ssh ${{ssh_options}} ${{remote_server}} '{action}'" for action in action_list]
 
     # Pre/Append SSH wrapper actions
     ssh_actions = [
         'ssh ${ssh_options} ${remote_server} "mkdir -p ${remote_directory}"',
-        "rsync ${rsync_push_options} ${SOURCES.abspath} ${remote_server}:${remote_directory}",
+        f"{rsync} ${{rsync_push_options}} ${{SOURCES.abspath}} ${{remote_server}}:${{remote_directory}}",
     ]
     ssh_actions.extend(action_list)
-    ssh_actions.append("rsync ${rsync_pull_options} ${remote_server}:${remote_directory}/ ${TARGET.dir.abspath}")
+    ssh_actions.append(f"{rsync} ${{rsync_pull_options}} {pull_sources} ${{TARGET.dir.abspath}}")
 
     # Override oroginal builder actions with SSH wrapped action updates
-    builder.action = action_list_scons(ssh_actions)
+    _replace_wrapped_action(builder, action_list_scons(ssh_actions))
 
     # Modify builder keyword arguments for design assumptions
     for key, value in builder.overrides.items():
-        builder.overrides[key] = ssh_action_substitutions(value)
+        if isinstance(value, str):
+            builder.overrides[key] = _flat_directory_substitutions(value, cd_prefix)
 
     # Add or override builder keyword arguments with SSH wrapper added keyword arguments
     builder.overrides.update(
@@ -375,6 +878,100 @@ def ssh_builder_actions(
     return builder
 
 
+def scratch_builder_actions(
+    builder: SCons.Builder.Builder,
+    scratch_directory: str | None = None,
+) -> SCons.Builder.Builder:
+    r"""Wrap and modify a builder's action list to run the actions in a temporary local scratch directory.
+
+    Solvers writing large scratch and result files run faster in node-local scratch storage, e.g. ``$TMPDIR`` or
+    ``/dev/shm``, than in a build directory on a network file system. The modified builder copies the task sources to a
+    new, unique directory in the ``scratch_directory``, runs the original builder actions there, and moves the task
+    targets back to the original builder ``${TARGET.dir.abspath}``. Other files written by the original builder actions
+    are not copied back. The scratch directory is removed when the task finishes, fails, or is interrupted.
+
+    *Builder/Task keyword arguments*
+
+    * ``scratch_directory``: local directory where the task scratch directories should be created
+
+    Design assumptions
+
+    * Creates the ``scratch_directory`` with ``mkdir -p`` and a unique task scratch directory with ``mktemp -d``.
+    * Copies all source files to a flat task scratch directory with ``cp``.
+    * Replaces instances of ``cd ${TARGET.dir.abspath} &&`` with ``cd`` to the task scratch directory in the original
+      builder actions and keyword arguments.
+    * Replaces instances of ``SOURCE.abspath`` or ``SOURCES.abspath`` with ``SOURCE[S].file`` in the original builder
+      actions and keyword arguments.
+    * Replaces instances of ``SOURCES[0-9]/TARGETS[0-9].abspath`` with  ``SOURCES[0-9]/TARGETS[0-9].file`` in the
+      original builder action and keyword arguments.
+    * Prefixes all original builder actions with ``cd`` to the task scratch directory.
+    * Runs all original builder actions in a single shell command, stopping at the first failing action.
+    * Moves the existing task targets to the original builder ``${TARGET.dir.abspath}`` with ``mv``, including when an
+      action fails, so that the STDOUT file targets are available for failure reporting.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.Append(BUILDERS={
+           "ScratchAbaqusSolver": waves.scons_extensions.scratch_builder_actions(
+               waves.scons_extensions.abaqus_solver(),
+               scratch_directory="/dev/shm",
+           )
+       })
+       env.ScratchAbaqusSolver(
+           target=["myjob.sta"],
+           source=["input.inp"],
+           job_name="myjob",
+           abaqus_options="-cpus 4",
+       )
+
+    :param builder: The SCons builder to modify
+    :param scratch_directory: local directory where the task scratch directories should be created. If None, defaults
+        to the Python :func:`tempfile.gettempdir` directory, which honors the ``TMPDIR`` environment variable.
+
+    :returns: modified builder
+    """
+    if scratch_directory is None:
+        scratch_directory = tempfile.gettempdir()
+    cd_prefix = 'cd "$$scratch" &&'
+
+    # Retrieve original builder actions and modify for design assumptions
+    action_list = action_list_strings(builder)
+    action_list = [_flat_directory_substitutions(action, cd_prefix) for action in action_list]
+    action_list = [
+        (
+            f"{cd_prefix} {action}"
+            if not action.startswith(cd_prefix) and not action.startswith("${action_prefix}")
+            else action
+        )
+        for action in action_list
+    ]
+    actions = " && ".join(f"( {action} )" for action in action_list)
+
+    # Override original builder actions with a single scratch directory action
+    scratch_action = (
+        "mkdir -p ${scratch_directory} && "
+        "scratch=$$(mktemp -d ${scratch_directory}/waves-scratch.XXXXXX) && "
+        "trap 'rm -rf \"$$scratch\"' EXIT && trap 'exit 1' HUP INT TERM && "
+        'cp -R ${SOURCES.abspath} "$$scratch" && '
+        f'{cd_prefix} {{ {actions}; status=$$?; for target in ${{TARGETS.file}}; do test ! -e "$$target" || '
+        'mv -f "$$target" ${TARGET.dir.abspath}; done; exit $$status; }'
+    )
+    _replace_wrapped_action(builder, action_list_scons([scratch_action]))
+
+    # Modify builder keyword arguments for design assumptions
+    for key, value in builder.overrides.items():
+        if isinstance(value, str):
+            builder.overrides[key] = _flat_directory_substitutions(value, cd_prefix)
+
+    # Add or override builder keyword arguments with scratch wrapper added keyword arguments
+    builder.overrides.update({"scratch_directory": scratch_directory})
+
+    return builder
+
+
 def project_help(
     env: SCons.Environment.Environment | None = None,
     append: bool = True,
@@ -933,12 +1530,7 @@ def builder_factory(
 
     :returns: SCons template builder
     """  # noqa: E501
-    action = [
-        (
-            "${environment} ${action_prefix} ${program} ${program_required} ${program_options} "
-            "${subcommand} ${subcommand_required} ${subcommand_options} ${action_suffix}"
-        ),
-    ]
+    action = [_settings._builder_factory_action]
     builder = SCons.Builder.Builder(
         action=action,
         emitter=emitter,
@@ -1030,6 +1622,7 @@ def first_target_builder_factory(
     emitter: collections.abc.Callable[
         [list, list, SCons.Environment.Environment], tuple[list, list]
     ] = first_target_emitter,
+    timeout: float | None = None,
     **kwargs,
 ) -> SCons.Builder.Builder:
     """Template builder factory with WAVES default action behaviors and a task STDOUT file emitter.
@@ -1082,10 +1675,15 @@ def first_target_builder_factory(
         clutter the terminal and make it difficult to isolate critical debugging information, so it is convenient to
         redirect each program's output to a task specific log file for later inspection and troubleshooting.
     :param emitter: An SCons emitter function. This is not a keyword argument in the action string.
+    :param timeout: Task wall clock timeout in seconds. Tasks may override the timeout with the ``waves_timeout`` task
+        keyword argument. If None, the builder action runs without a timeout. See
+        :meth:`waves.scons_extensions.timeout_builder_actions`.
     :param kwargs: Any additional keyword arguments are passed directly to the SCons builder object.
 
     :returns: SCons template builder
     """  # noqa: E501
+    if timeout is not None:
+        kwargs["waves_timeout"] = timeout
     builder = builder_factory(
         environment=environment,
         action_prefix=action_prefix,
@@ -1099,6 +1697,8 @@ def first_target_builder_factory(
         emitter=emitter,
         **kwargs,
     )
+    if timeout is not None:
+        builder = timeout_builder_actions(builder)
     return builder
 
 
@@ -1895,6 +2495,7 @@ def abaqus_solver_builder_factory(
     emitter: collections.abc.Callable[
         [list, list, SCons.Environment.Environment], tuple[list, list]
     ] = first_target_emitter,
+    timeout: float | None = None,
     **kwargs,
 ) -> SCons.Builder.Builder:
     """Abaqus solver builder factory.
@@ -1963,6 +2564,9 @@ def abaqus_solver_builder_factory(
         that can be freely modified by the user
     :param action_suffix: This variable is intended to perform program STDOUT and STDERR redirection operations.
     :param emitter: An SCons emitter function. This is not a keyword argument in the action string.
+    :param timeout: Task wall clock timeout in seconds. Tasks may override the timeout with the ``waves_timeout`` task
+        keyword argument. If None, the builder action runs without a timeout. See
+        :meth:`waves.scons_extensions.timeout_builder_actions`.
     :param kwargs: Any additional keyword arguments are passed directly to the SCons builder object.
 
     :return: Abaqus solver builder
@@ -1978,6 +2582,7 @@ def abaqus_solver_builder_factory(
         subcommand_options=subcommand_options,
         action_suffix=action_suffix,
         emitter=emitter,
+        timeout=timeout,
         **kwargs,
     )
     return builder
@@ -2234,7 +2839,15 @@ class AbaqusPseudoBuilder:
         if extra_options:
             options += f" {extra_options}"
 
-        return self.builder(target=targets, source=sources, job=job_option, program_options=options, **kwargs)
+        # Expose the CPU count to resource aware builders, e.g. ``resource_builder_actions(cpus="${cpus}")``
+        return self.builder(
+            target=targets,
+            source=sources,
+            job=job_option,
+            program_options=options,
+            cpus=self.override_cpus or cpus,
+            **kwargs,
+        )
 
 
 @catenate_actions(program="sbatch", options=_settings._sbatch_wrapper_options)
@@ -2352,6 +2965,7 @@ def python_builder_factory(
     emitter: collections.abc.Callable[
         [list, list, SCons.Environment.Environment], tuple[list, list]
     ] = first_target_emitter,
+    timeout: float | None = None,
     **kwargs,
 ) -> SCons.Builder.Builder:
     """Python builder factory.
@@ -2410,6 +3024,9 @@ def python_builder_factory(
         that can be freely modified by the user
     :param action_suffix: This variable is intended to perform program STDOUT and STDERR redirection operations.
     :param emitter: An SCons emitter function. This is not a keyword argument in the action string.
+    :param timeout: Task wall clock timeout in seconds. Tasks may override the timeout with the ``waves_timeout`` task
+        keyword argument. If None, the builder action runs without a timeout. See
+        :meth:`waves.scons_extensions.timeout_builder_actions`.
     :param kwargs: Any additional keyword arguments are passed directly to the SCons builder object.
 
     :return: Python builder
@@ -2425,6 +3042,7 @@ def python_builder_factory(
         subcommand_options=subcommand_options,
         action_suffix=action_suffix,
         emitter=emitter,
+        timeout=timeout,
         **kwargs,
     )
     return builder
@@ -2531,21 +3149,7 @@ def matlab_script(
 
     :return: Matlab script builder
     """  # noqa: E501
-    action = [
-        (
-            "${action_prefix} ${program} ${matlab_options} -batch "
-            "\"path(path, '${SOURCE.dir.abspath}'); "
-            "[fileList, productList] = matlab.codetools.requiredFilesAndProducts('${SOURCE.file}'); "
-            "disp(cell2table(fileList)); disp(struct2table(productList, 'AsArray', true)); exit;\" "
-            "${environment_suffix}"
-        ),
-        (
-            "${action_prefix} ${program} ${matlab_options} -batch "
-            "\"path(path, '${SOURCE.dir.abspath}'); "
-            '${SOURCE.filebase}(${script_options})" '
-            "${action_suffix}"
-        ),
-    ]
+    action = [_settings._matlab_environment_action, _settings._matlab_script_action]
     matlab_builder = SCons.Builder.Builder(
         action=action,
         emitter=_matlab_script_emitter,
@@ -2841,19 +3445,783 @@ def sbatch(
     return sbatch_builder
 
 
-def abaqus_input_scanner() -> SCons.Scanner.Scanner:
+def sbatch_poll(
+    env: SCons.Environment.Environment,
+    program: str = "sbatch",
+    squeue_program: str = "squeue",
+    sacct_program: str = "sacct",
+    state_file: str | pathlib.Path = "#/.waves_sbatch_state.json",
+    interval: float = 30.0,
+) -> None:
+    """Submit ``sbatch --wait`` tasks without waiting and poll for completion.
+
+    By default, the :meth:`waves.scons_extensions.sbatch` builder and the ``sbatch_*`` builders call ``sbatch --wait``,
+    which holds an sbatch process open per task. This method replaces the construction environment ``SPAWN`` function
+    with :class:`waves._slurm.SbatchPollSpawn` for all tasks defined with the construction environment. Commands calling
+    ``program`` with ``--wait`` are submitted with ``--parsable`` instead and the job ID is recorded in the
+    ``state_file``. The SCons worker thread then waits on a single polling thread which queries ``squeue`` and ``sacct``
+    for all submitted jobs once per ``interval``. The task succeeds if the job finishes in the ``COMPLETED`` state. All
+    other commands are executed with the original ``SPAWN`` function.
+
+    SCons still requires one worker thread per running task, but waiting threads do not call the scheduler or hold a
+    subprocess, so the ``-j`` option may be set to the desired scheduler queue depth instead of the local CPU count.
+
+    When a build is interrupted, the ``state_file`` preserves the job IDs of submitted jobs. Re-running the build with
+    identical task commands re-attaches to the recorded jobs instead of submitting new jobs.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.Append(BUILDERS={"SlurmSbatch": waves.scons_extensions.sbatch()})
+       env.SbatchPoll(interval=60.)
+       env.SlurmSbatch(target=["my_output.stdout"], source=["my_source.input"], slurm_job="cat $SOURCE > $TARGET")
+
+    .. code-block::
+       :caption: shell
+
+       $ scons -j 500
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.SbatchPoll``.
+    :param program: An absolute path or basename string for the sbatch program.
+    :param squeue_program: An absolute path or basename string for the squeue program.
+    :param sacct_program: An absolute path or basename string for the sacct program.
+    :param state_file: Job submission state file. Relative paths are resolved with SCons File node rules, e.g. ``#``
+        refers to the project root directory.
+    :param interval: Seconds between scheduler queries
+    """
+    poller = _slurm.JobPoller(
+        env.File(str(state_file)).abspath,
+        squeue_program=squeue_program,
+        sacct_program=sacct_program,
+        interval=interval,
+    )
+    _insert_spawn(env, lambda spawn: _slurm.SbatchPollSpawn(spawn, poller, program=program))
+
+
+def sbatch_pack(
+    env: SCons.Environment.Environment,
+    program: str = "sbatch",
+    cpus: int = 1,
+    time: str = "1:00:00",
+    max_task_time: str = "10:00",
+    default_time: str = "10:00",
+    window: float = 5.0,
+    step_command: str = "srun --exact --ntasks=1 --cpus-per-task={cpus}",
+    sbatch_options: str = "",
+    pack_directory: str | pathlib.Path = "#/.waves_sbatch_pack",
+) -> None:
+    """Pack small ``sbatch --wait`` tasks into shared SLURM allocations.
+
+    Short tasks wrapped with ``sbatch``, e.g. post-processing tasks from builders modified by
+    :meth:`waves.scons_extensions.catenate_actions` with ``program="sbatch"``, spend more time in the scheduler queue
+    than running when each task requests a dedicated allocation. This method replaces the construction environment
+    ``SPAWN`` function with :class:`waves._slurm.SbatchPackSpawn` for all tasks defined with the construction
+    environment.
+
+    Commands calling ``program`` with ``--wait`` and ``--wrap`` that are ready to run within ``window`` seconds of each
+    other are bin-packed into allocations of ``cpus`` CPUs and ``time`` wall time by their ``--cpus-per-task`` and
+    ``--time`` options. Tasks without a ``--time`` option are assumed to run for ``default_time``. Each allocation runs
+    its tasks as parallel ``step_command`` job steps and writes each task's output to the task's original ``--output``
+    file, so task targets and STDOUT files are unchanged. Tasks longer than ``max_task_time``, tasks with other sbatch
+    options, and all other commands are executed with the original ``SPAWN`` function.
+
+    SCons must run with enough worker threads to have the small tasks ready at the same time, e.g. ``scons -j 64``.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.Append(BUILDERS={"SlurmSbatch": waves.scons_extensions.sbatch()})
+       env.SbatchPack(cpus=16, time="2:00:00")
+       for number in range(64):
+           env.SlurmSbatch(
+               target=[f"extract_{number}.csv"],
+               source=[f"results_{number}.h5"],
+               slurm_job="python extract.py $SOURCE $TARGET",
+               sbatch_options="--time=2:00",
+           )
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.SbatchPack``.
+    :param program: An absolute path or basename string for the sbatch program.
+    :param cpus: Allocation CPU count
+    :param time: Allocation time limit as an sbatch ``--time`` specification
+    :param max_task_time: Longest packable task time as an sbatch ``--time`` specification
+    :param default_time: Task time as an sbatch ``--time`` specification for tasks without a ``--time`` option
+    :param window: Seconds to collect ready tasks before packing
+    :param step_command: Job step launcher format string with a ``{cpus}`` field. Empty string runs tasks as local
+        worker processes inside the allocation.
+    :param sbatch_options: Additional sbatch options for the allocation jobs
+    :param pack_directory: Directory for the allocation batch scripts, task status files, and scheduler output.
+        Relative paths are resolved with SCons Dir node rules, e.g. ``#`` refers to the project root directory.
+    """
+    spawn_kwargs: dict[str, typing.Any] = {
+        "program": program,
+        "cpus": cpus,
+        "time": _slurm._parse_slurm_time(time),
+        "max_task_time": _slurm._parse_slurm_time(max_task_time),
+        "default_time": _slurm._parse_slurm_time(default_time),
+        "window": window,
+        "step_command": step_command,
+        "sbatch_options": sbatch_options,
+    }
+    directory = env.Dir(str(pack_directory)).abspath
+    _insert_spawn(env, lambda spawn: _slurm.SbatchPackSpawn(spawn, directory, **spawn_kwargs))
+
+
+def resource_scheduler(
+    env: SCons.Environment.Environment,
+    cpus: int | None = None,
+    memory: str | float | None = None,
+    affinity: str | None = None,
+    **resources: str | float,
+) -> None:
+    """Admit resource aware tasks only when their requested resources are free.
+
+    SCons ``-j`` limits the number of concurrent tasks, not the number of CPUs, memory, or licence tokens used by those
+    tasks. This method adds a shared :class:`waves._scheduler.ResourcePool` to the construction environment. Tasks
+    defined with builders modified by :meth:`waves.scons_extensions.resource_builder_actions` or
+    :meth:`waves.scons_extensions.abaqus_licence_builder_actions` wait in their SCons worker thread until the task's
+    requested resources are free, so the ``-j`` option may be set to the desired queue depth instead of the local CPU
+    count. Requests are admitted first-come, first-served per resource. Tasks requesting more than the capacity of a
+    resource raise an exception. Resources without a capacity are not limited.
+
+    With the ``affinity`` option, each admitted task is assigned a disjoint set of CPU IDs from the CPUs available to
+    the SCons process, preferring CPUs on a single NUMA node, and the task commands are pinned to the assigned CPUs
+    with the affinity command. Fractional CPU requests are rounded up to whole CPUs. The affinity command is appended to
+    the task STDOUT file for tasks with a STDOUT file target, e.g. the WAVES solver builders. Python function actions
+    and the tasks run by :meth:`waves.scons_extensions.sbatch_poll` and :meth:`waves.scons_extensions.sbatch_pack`
+    are not pinned.
+
+    Construction environments cloned after calling this method share the same resource pool.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.ResourceScheduler(memory="128G", affinity="numactl", abaqus_tokens=50)
+
+    .. code-block::
+       :caption: shell
+
+       $ scons -j 64
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.ResourceScheduler``.
+    :param cpus: Total CPUs. Defaults to the local CPU count. With the ``affinity`` option, defaults to the number of
+        CPUs available to the SCons process and limits the assigned CPU IDs to the first ``cpus`` available CPUs.
+    :param memory: Total memory. Accepts ``K``, ``M``, ``G``, and ``T`` suffixes. Defaults to the local physical
+        memory, if available.
+    :param affinity: Pin tasks to their assigned CPUs with ``taskset``, ``numactl``, or an affinity command template
+        with a ``{cores}`` CPU list field, e.g. ``hwloc-bind --cpuset {cores}``. If None, tasks are not pinned.
+    :param resources: Total amounts of other resources, e.g. licence tokens
+
+    :raises RuntimeError: If the affinity command is not a known command or command template
+    """
+    capacity: dict[str, str | float] = {"cpus": cpus or os.cpu_count() or 1}
+    if memory is None:
+        memory = _scheduler._system_memory()
+    if memory is not None:
+        capacity["memory"] = memory
+    capacity.update(resources)
+
+    cores = None
+    numa_nodes = None
+    if affinity is not None:
+        affinity = _settings._affinity_commands.get(affinity, affinity)
+        if "{cores}" not in affinity:
+            commands = ", ".join(_settings._affinity_commands)
+            raise RuntimeError(f"Affinity must be one of {commands}, or a command template with a '{{cores}}' field")
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else range(os.cpu_count() or 1)
+        cores = list(available)[:cpus] if cpus else list(available)
+        numa_nodes = _scheduler._numa_nodes()
+    env[_settings._resource_pool_variable] = _scheduler.ResourcePool(
+        capacity, cores=cores, numa_nodes=numa_nodes, affinity=affinity
+    )
+
+
+def python_worker_pool(
+    env: SCons.Environment.Environment,
+    workers: int | None = None,
+    tasks_per_worker: int | None = None,
+) -> None:
+    """Run Python builder task scripts in a pool of persistent Python interpreters.
+
+    Every Python builder task normally starts a new Python interpreter, which then imports the script's packages, e.g.
+    ``xarray``, ``pandas``, and ``matplotlib``, again. The worker pool keeps the interpreters running between tasks, so
+    packages installed with the interpreter are imported once per interpreter. Each script runs as ``__main__`` with its
+    own ``sys.argv``, the first target directory as working directory, and STDOUT and STDERR redirected to the task
+    STDOUT file, so the targets and STDOUT files match the tasks run in a new interpreter. Modules imported from outside
+    the interpreter installation, e.g. project modules next to the script, are re-imported by every script.
+
+    Scripts share the interpreter state, so scripts modifying global state other than ``sys.argv``, ``sys.path``, the
+    working directory, environment variables, and ``matplotlib`` figures may affect later scripts. Scripts crashing the
+    interpreter fail their task and the interpreter is replaced.
+
+    The :class:`waves.scons_extensions.WAVESEnvironment` ``PythonScript`` builder method uses the worker pool for tasks
+    defined after calling this method. Other Python builders must be modified with
+    :meth:`waves.scons_extensions.python_worker_builder_actions`. Construction environments cloned after calling this
+    method share the same worker pool.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.PythonWorkerPool(tasks_per_worker=100)
+       env.PythonScript(target=["plot.png"], source=["plot.py"], subcommand_options="--output ${TARGET.file}")
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.PythonWorkerPool``.
+    :param workers: Maximum number of Python interpreters. If None, one interpreter per concurrent task, e.g.
+        ``scons -j``.
+    :param tasks_per_worker: Number of scripts run by an interpreter before it is replaced. If None, interpreters are
+        not replaced.
+    """
+    pool = _workers.PythonWorkerPool(workers=workers, tasks_per_worker=tasks_per_worker)
+    env[_settings._python_worker_pool_variable] = pool
+    atexit.register(pool.close)
+
+
+def large_file_decider(
+    env: SCons.Environment.Environment,
+    extensions: collections.abc.Iterable[str] = (".odb", ".h5"),
+    size_threshold: int | None = None,
+    cache_file: str | pathlib.Path | None = f"#/{_settings._fingerprint_default_cache}",
+    block_size: int = 1024 * 1024,
+    blocks: int = 16,
+) -> None:
+    """Decide if large simulation artifacts changed with sampled fingerprints instead of full content hashes.
+
+    By default, SCons hashes the full content of every changed or recently modified source and target file, which
+    takes minutes for multi-GB Abaqus output databases and extracted H5 files. This method sets the construction
+    environment ``Decider`` to :class:`waves._decider.LargeFileDecider`. The content signature of files with one of the
+    ``extensions``, or at least ``size_threshold`` bytes, is a fingerprint of the file size and ``blocks`` evenly spaced
+    sample blocks of ``block_size`` bytes. Fingerprints are kept in a persistent ``cache_file`` by path, size, and
+    modification time, so unchanged large files are not read at all. Other files are decided by the previous
+    construction environment decider.
+
+    The decider replaces the SCons file node ``get_csig`` method for the whole SCons process. The replacement only
+    returns fingerprints for the dependencies decided by, and the targets built in, construction environments using
+    this decider. Other construction environments record full content hashes.
+
+    Sampled fingerprints do not detect changes outside the sample blocks that preserve the file size. Solver output
+    files usually change throughout, including headers and time stamps, but files that may change in a few bytes, e.g.
+    edited input files, should not match the ``extensions``. Enabling the decider does not rebuild up-to-date targets.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.LargeFileDecider(size_threshold=1024**3)
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.LargeFileDecider``.
+    :param extensions: Large file extensions. Compared case insensitive.
+    :param size_threshold: Minimum size in bytes of large files with other extensions. If None, only files with the
+        ``extensions`` are fingerprinted.
+    :param cache_file: Fingerprint cache file. Relative paths are resolved with SCons File node rules, e.g. ``#``
+        refers to the project root directory. If None, fingerprints are not cached between builds.
+    :param block_size: Sample block size in bytes
+    :param blocks: Number of sample blocks per file
+    """
+    if cache_file is not None:
+        cache_file = env.File(str(cache_file)).abspath
+    cache = _decider.FingerprintCache(cache_file, block_size=block_size, blocks=blocks)
+    decider = _decider.LargeFileDecider(env.decide_target, cache, extensions=extensions, size_threshold=size_threshold)
+    decider.enable()
+    env.Decider(decider)
+    atexit.register(cache.save)
+
+
+def artifact_cache(
+    env: SCons.Environment.Environment,
+    path: str,
+    link: str = "reflink",
+    compress_after: float | None = None,
+    size_budget: int | None = None,
+    report: bool = True,
+) -> None:
+    """Share built targets between build directories with a cache tuned for large simulation artifacts.
+
+    Sets the construction environment ``CacheDir`` to ``path`` with the :class:`waves._cache.ArtifactCacheDir` cache
+    class, so task definitions are unchanged. Cache hits are retrieved, and built targets pushed, as copy-on-write
+    reflinks or hardlinks where the file system supports them and as copies otherwise. At the end of the build, entries
+    not used for ``compress_after`` seconds are compressed, the least recently used entries are evicted until the cache
+    is within ``size_budget`` bytes, and the cache hits, misses, and bytes saved of the build are printed. Compressed
+    entries are decompressed transparently when retrieved.
+
+    Hardlinked targets share their content with the cache entry. Use ``link="hardlink"`` only if tasks replace their
+    targets instead of modifying them in place, e.g. targets declared ``Precious``. All engineers sharing the cache
+    need read and write permissions to the cache directory. Construction environments cloned after calling this method
+    share the cache. The SCons ``--cache-disable``, ``--cache-readonly``, and ``--cache-show`` options are supported.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.ArtifactCache("/shared/project/cache", compress_after=7 * 24 * 60 * 60, size_budget=500 * 1024**3)
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.ArtifactCache``.
+    :param path: Shared cache directory
+    :param link: Cache hit retrieval and cache push link mode. One of ``copy``, ``reflink``, or ``hardlink``. Reflinks
+        fall back to copies and hardlinks fall back to reflinks.
+    :param compress_after: Seconds since last use before entries are compressed. If None, entries are not compressed.
+    :param size_budget: Cache size budget in bytes. If None, entries are not evicted.
+    :param report: Print the cache statistics at the end of the build
+
+    :raises RuntimeError: If the link mode is not supported
+    """
+    cache_class = _cache.ArtifactCacheDir.configure(link=link, compress_after=compress_after, size_budget=size_budget)
+    env.CacheDir(path, custom_class=cache_class)
+    if any(SCons.Script.GetOption(option) for option in ("no_exec", "clean", "question")):
+        return
+    atexit.register(cache_class.finish, env.subst(path), report=report)
+
+
+def matlab_engine_pool(
+    env: SCons.Environment.Environment,
+    workers: int | None = None,
+    tasks_per_worker: int | None = None,
+) -> None:
+    """Run MATLAB script tasks in a pool of persistent MATLAB sessions.
+
+    Every MATLAB script task normally starts a new ``matlab -batch`` process, which often takes longer to start than the
+    script takes to run. The engine pool keeps MATLAB sessions running between tasks with the `MATLAB Engine API for
+    Python <https://www.mathworks.com/help/matlab/matlab-engine-for-python.html>`_, which must be installed in the
+    SCons Python environment. Each task's MATLAB statements run in a free session with the first target directory as
+    working directory and the MATLAB output written to the task's MATLAB environment and STDOUT targets, so the targets
+    match the tasks run with ``matlab -batch``. The MATLAB path, working directory, workspace variables, figures, and
+    open files are reset after every task. Tasks with different ``matlab_options`` run in different sessions.
+
+    Tasks whose session exited while idle are retried in a new session. Tasks exiting or crashing their session fail
+    and the session is replaced.
+
+    Builders must be modified with :meth:`waves.scons_extensions.matlab_engine_builder_actions`. Construction
+    environments cloned after calling this method share the same engine pool.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.MatlabEnginePool(workers=4, tasks_per_worker=100)
+       env.Append(BUILDERS={
+           "MatlabScript": waves.scons_extensions.matlab_engine_builder_actions(
+               waves.scons_extensions.matlab_script()
+           )
+       })
+       env.MatlabScript(target=["plot.png"], source=["plot_results.m"], script_options="'plot.png'")
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.MatlabEnginePool``.
+    :param workers: Maximum number of MATLAB sessions. If None, one session per concurrent task, e.g. ``scons -j``.
+    :param tasks_per_worker: Number of tasks run by a session before it is replaced. If None, sessions are not
+        replaced.
+    """
+    pool = _workers.MatlabEnginePool(workers=workers, tasks_per_worker=tasks_per_worker)
+    env[_settings._matlab_engine_pool_variable] = pool
+    atexit.register(pool.close)
+
+
+def abaqus_journal_sessions(
+    env: SCons.Environment.Environment,
+    program: str = "abaqus",
+    window: float = 5.0,
+    max_tasks: int | None = None,
+    session_directory: str | pathlib.Path = "#/.waves_journal_sessions",
+) -> None:
+    """Run ready Abaqus CAE journal tasks in shared ``abaqus cae -noGUI`` sessions.
+
+    Every Abaqus journal task normally starts a new CAE session, which spends tens of seconds starting CAE and checking
+    out a licence before the journal runs. This method replaces the construction environment ``SPAWN`` function with
+    :class:`waves._journal_sessions.JournalSessionSpawn` for all tasks defined with the construction environment.
+
+    Journal commands calling ``program`` with the :meth:`waves.scons_extensions.abaqus_journal_builder_factory` default
+    action, ``cd ${TARGET.dir.abspath} && abaqus cae -noGUI journal.py [options] -- [arguments] > stdout 2>&1``, that
+    are ready to run within ``window`` seconds of each other run one after another in a single CAE session. Each journal
+    runs with its own journal arguments, working directory, and STDOUT file, so task targets and STDOUT files are
+    unchanged. Journals start with a new, empty model database. Journals raising exceptions or calling ``sys.exit`` fail
+    only their own task. Commands with an ``environment`` prefix, journal arguments requiring shell expansion, and all
+    other commands are executed with the original ``SPAWN`` function.
+
+    SCons must run with enough worker threads to have the journal tasks ready at the same time, e.g. ``scons -j 32``.
+    Resource aware tasks, e.g. from builders modified by :meth:`waves.scons_extensions.abaqus_licence_builder_actions`,
+    hold their resources while waiting for their session, so limit the session licence use with ``max_tasks`` instead.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.AbaqusJournalSessions(max_tasks=50)
+       for number in range(200):
+           env.AbaqusJournal(
+               target=[f"set{number}/geometry.cae"],
+               source=["geometry.py"],
+               subcommand_options=f"--width {number}",
+           )
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.AbaqusJournalSessions``.
+    :param program: An absolute path or basename string for the abaqus program.
+    :param window: Seconds to collect ready tasks before starting sessions
+    :param max_tasks: Maximum number of tasks per session. If None, all collected tasks run in one session.
+    :param session_directory: Directory for the session journals, task lists, task status files, and session output.
+        Relative paths are resolved with SCons Dir node rules, e.g. ``#`` refers to the project root directory.
+    """
+    directory = env.Dir(str(session_directory)).abspath
+    _insert_spawn(
+        env,
+        lambda spawn: _journal_sessions.JournalSessionSpawn(
+            spawn, directory, program=program, window=window, max_tasks=max_tasks
+        ),
+    )
+
+
+def ssh_multiplex(
+    env: SCons.Environment.Environment,
+    control_directory: str | pathlib.Path | None = None,
+    persist: str = "10m",
+    push_window: float | None = None,
+) -> None:
+    """Share multiplexed SSH master connections between the ``ssh`` and ``rsync`` commands of all tasks.
+
+    Every task of a builder modified by :meth:`waves.scons_extensions.ssh_builder_actions` runs an ``ssh mkdir``, an
+    ``rsync`` push, the ``ssh`` commands, and an ``rsync`` pull. Without multiplexing, every command repeats the SSH
+    handshake and authentication, which adds seconds per task and may exceed the server's connection limits when
+    running with ``scons -j``. This method replaces the construction environment ``SPAWN`` function with
+    :class:`waves._ssh.SSHMultiplexSpawn` for all tasks defined with the construction environment.
+
+    The first command to each remote server starts a background SSH master connection (``ControlMaster``). Later
+    ``ssh`` commands with the same ``ssh_options`` and all ``rsync`` commands to the same server connect through the
+    master connection's control socket. Commands connect directly if the master connection can not be started, e.g.
+    for servers requiring interactive authentication. The master connections are stopped when SCons exits and exit
+    after ``persist`` idle time if SCons is interrupted. Only the ``SPAWN`` function is replaced, so the build
+    signatures do not change.
+
+    When ``push_window`` is set, the ``rsync`` source pushes of concurrent tasks to the same server are collected for
+    ``push_window`` seconds and copied in a single transfer to the tasks' remote directories.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.SSHMultiplex(push_window=1.0)
+       env.Append(BUILDERS={
+           "SSHAbaqusSolver": waves.scons_extensions.ssh_builder_actions(
+               waves.scons_extensions.abaqus_solver(program="/remote/server/installation/path/of/abaqus"),
+               remote_server="myserver.mydomain.com",
+               remote_directory="/scratch/myproject/${task_directory}",
+           )
+       })
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.SSHMultiplex``.
+    :param control_directory: Directory for the SSH control sockets. Unix socket paths are limited to about 100
+        characters, so the directory path should be short. If None, a new temporary directory is used and removed when
+        SCons exits.
+    :param persist: SSH ``ControlPersist`` idle time of the master connections, e.g. ``10m``
+    :param push_window: Seconds to collect ready ``rsync`` pushes before copying. If None, pushes are not batched.
+    """
+    spawns = []
+
+    def factory(spawn: collections.abc.Callable) -> _ssh.SSHMultiplexSpawn:
+        spawns.append(
+            _ssh.SSHMultiplexSpawn(spawn, control_directory=control_directory, persist=persist, push_window=push_window)
+        )
+        return spawns[-1]
+
+    _insert_spawn(env, factory)
+    atexit.register(spawns[-1].close)
+
+
+def task_accounting(
+    env: SCons.Environment.Environment,
+    log: str = f"#/{_settings._task_accounting_default_log}",
+) -> None:
+    """Record the resource usage of every task in a JSON lines task accounting log.
+
+    Adds a shared :class:`waves._accounting.AccountingLog` to the construction environment and modifies the actions of
+    the construction environment ``BUILDERS`` with :meth:`waves.scons_extensions.accounting_builder_actions`, except for
+    composite builders which select their action by source suffix, e.g. the SCons ``Object`` builder. The
+    :class:`waves.scons_extensions.WAVESEnvironment` builder methods record their tasks when the accounting log is
+    enabled. Builders added to the construction environment after calling this method must be modified with
+    :meth:`waves.scons_extensions.accounting_builder_actions`. Tasks defined with the SCons ``Command`` method are not
+    recorded. The modified builders are copies, so builders shared with other construction environments are unchanged.
+
+    Each task appends one JSON line with the task ``targets``, ``builder``, ``parameter_set``, ``start`` time,
+    ``wall_time``, ``user_time`` and ``system_time`` in seconds, peak ``max_rss`` in megabytes, ``exit_code``, and
+    ``bytes_written``. The parameter set is found from the default WAVES parameter set directory names, e.g.
+    ``parameter_set0``. Summarize the log with the ``waves task_report`` subcommand.
+
+    Construction environments cloned after calling this method share the same accounting log.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.TaskAccounting()
+
+    .. code-block::
+       :caption: shell
+
+       $ scons -j 8
+       $ waves task_report
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.TaskAccounting``.
+    :param log: Path to the JSON lines task accounting log
+    """
+    env[_settings._task_accounting_variable] = _accounting.AccountingLog(env.File(log).abspath)
+    for name, builder in list(env["BUILDERS"].items()):
+        # Composite builders select their action by source suffix and must not be wrapped
+        if isinstance(builder, SCons.Builder.CompositeBuilder) or builder.action is None:
+            continue
+        # Builders and their wrapper actions may be shared with other construction environments, e.g. SCons tools
+        modified = copy.copy(builder)
+        wrapper = modified
+        while isinstance(wrapper.action, _scheduler.WrapperAction):
+            wrapper.action = copy.copy(wrapper.action)
+            wrapper = wrapper.action
+        env["BUILDERS"][name] = accounting_builder_actions(modified, name=name)
+
+
+def ordered_taskmaster() -> None:
+    """Replace the SCons Taskmaster class with :class:`waves._ordering.OrderedTaskmaster`.
+
+    Opt in to the Taskmaster hooks of :meth:`waves.scons_extensions.longest_first_order` and
+    :meth:`waves.scons_extensions.progress_stream`, which raise an exception without this replacement. SCons does not
+    support a Taskmaster per construction environment, so the replacement is global to the SCons process and applies
+    to every task of the build. Call this function once in the ``SConstruct`` file. Repeated calls have no effect.
+    Without configured hooks, the replacement Taskmaster behaves as the SCons Taskmaster.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       waves.scons_extensions.ordered_taskmaster()
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.LongestFirstOrder()
+    """
+    _ordering.install()
+
+
+def longest_first_order(
+    env: SCons.Environment.Environment,
+    log: str = f"#/{_settings._task_accounting_default_log}",
+    estimates: dict[str, float] | None = None,
+    default: float = 0.0,
+) -> None:
+    """Start the tasks with the longest expected dependency chains first.
+
+    Under ``scons -j``, SCons starts ready tasks in dependency graph walk order, so long running tasks, e.g. Abaqus
+    solves, may start last and leave a tail where one task runs alone. This method configures the
+    :class:`waves._ordering.OrderedTaskmaster` installed by :meth:`waves.scons_extensions.ordered_taskmaster` to sort
+    the dependencies of every node with :class:`waves._ordering.LongestFirstOrder` such that the tasks on the longest
+    expected dependency chains start first. The ordering applies to the whole build, not only to the tasks of this
+    construction environment.
+
+    Expected task durations are the most recent successful task wall times recorded in the task accounting log, see
+    :meth:`waves.scons_extensions.task_accounting`. Tasks are matched to the log by target path, so tasks of the same
+    parameter set directory match their previous durations. Tasks without a recorded duration use the builder
+    estimate, then the median recorded duration of the builder, then the default estimate. A missing log is treated as
+    an empty history.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       waves.scons_extensions.ordered_taskmaster()
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.TaskAccounting()
+       env.LongestFirstOrder(estimates={"AbaqusSolver": 3600.0, "AbaqusJournal": 60.0})
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.LongestFirstOrder``.
+    :param log: Path to the JSON lines task accounting log
+    :param estimates: Task duration estimates in seconds by builder name
+    :param default: Task duration estimate in seconds for tasks without a recorded duration or builder estimate
+
+    :raises RuntimeError: If :meth:`waves.scons_extensions.ordered_taskmaster` was not called
+    """
+    _ordering._check_installed("longest_first_order")
+    log_path = pathlib.Path(env.File(log).abspath)
+    try:
+        durations = {
+            target: duration
+            for targets, duration in _task_report._task_durations(log_path).items()
+            for target in targets
+        }
+        builder_durations = _task_report._builder_durations(log_path)
+    except RuntimeError:
+        durations = {}
+        builder_durations = {}
+    _ordering.OrderedTaskmaster.ordering = _ordering.LongestFirstOrder(
+        durations, builder_durations, estimates=estimates, default=default
+    )
+
+
+def progress_stream(
+    env: SCons.Environment.Environment,
+    stream: str = f"#/{_settings._progress_default_stream}",
+) -> None:
+    """Write live build progress events to a JSON lines file or a local socket.
+
+    Configures the :class:`waves._ordering.OrderedTaskmaster` installed by
+    :meth:`waves.scons_extensions.ordered_taskmaster` to write the progress events of every file task of the build
+    with a :class:`waves._progress.ProgressStream`, including tasks defined with the SCons ``Command`` method. The
+    stream applies to the whole build, not only to the tasks of this construction environment. Dry runs, cleaning, and
+    question mode builds write no events.
+
+    Each event is one JSON line with the ``build`` identifier, ``event`` name, and ``time`` in seconds since the epoch.
+
+    * ``build_start``: the number of file ``tasks`` of the requested targets and their dependencies. Dependencies
+      found by scanners are not counted.
+    * ``start``, ``finish``, ``failure``, and ``up_to_date``: the task ``targets``, ``builder``, and ``parameter_set``.
+      Finished and failed tasks include the task ``wall_time``. Failed tasks include the error ``message``.
+    * ``build_finish``: the number of ``failures`` when SCons exits.
+
+    Streams with a ``unix:`` prefix are sent to a listening Unix domain stream socket, e.g.
+    ``unix:/tmp/waves_progress.sock``. Without a listener, events are dropped. View the progress of a file stream with
+    the ``waves status`` subcommand.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       waves.scons_extensions.ordered_taskmaster()
+       env = waves.scons_extensions.WAVESEnvironment()
+       env.TaskAccounting()
+       env.ProgressStream()
+
+    .. code-block::
+       :caption: shell
+
+       $ scons -j 8 &
+       $ waves status --watch 60
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.ProgressStream``.
+    :param stream: Path to the JSON lines progress file or a ``unix:`` prefixed socket path
+
+    :raises RuntimeError: If :meth:`waves.scons_extensions.ordered_taskmaster` was not called
+    """
+    _ordering._check_installed("progress_stream")
+    if any(SCons.Script.GetOption(option) for option in ("no_exec", "clean", "question")):
+        return
+    if not stream.startswith(_progress._socket_prefix):
+        stream = env.File(stream).abspath
+    progress = _progress.ProgressStream(stream)
+    _ordering.OrderedTaskmaster.progress = progress
+    atexit.register(lambda: progress.write("build_finish", failures=len(SCons.Script.GetBuildFailures())))
+
+
+def _insert_spawn(
+    env: SCons.Environment.Environment,
+    factory: collections.abc.Callable[[collections.abc.Callable], collections.abc.Callable],
+) -> None:
+    """Replace the construction environment ``SPAWN`` function with a wrapper of the current ``SPAWN`` function.
+
+    Exported tasks must be reconciled before they can be re-submitted, so the wrapper is inserted inside the
+    :class:`waves._slurm.ReconcileSpawn` when the ``waves slurm_export`` reconcile hook is active.
+
+    :param env: SCons construction environment
+    :param factory: Callable returning the wrapper ``SPAWN`` function of the wrapped ``SPAWN`` function
+    """
+    if isinstance(env["SPAWN"], _slurm.ReconcileSpawn):
+        env["SPAWN"].spawn = factory(env["SPAWN"].spawn)
+    else:
+        env["SPAWN"] = factory(env["SPAWN"])
+
+
+def slurm_export_hooks(env: SCons.Environment.Environment) -> None:
+    """Enable the ``waves slurm_export`` subcommand for a construction environment.
+
+    The :class:`waves.scons_extensions.WAVESEnvironment` calls this method on construction. Projects using the SCons
+    ``Environment`` must call this method for every construction environment with tasks that should be exported.
+
+    The ``waves slurm_export`` subcommand sets environment variables to request one of two behaviors. Without these
+    environment variables, this method does not modify the construction environment.
+
+    * Export: replace ``PRINT_CMD_LINE_FUNC`` with :class:`waves._slurm.ExportRecorder` to record the commands,
+      targets, and dependencies of out-of-date tasks during an ``scons -n`` dry run. Construction environments share
+      one recorder. The export fails for out-of-date tasks without printed actions, e.g. with ``scons -s``.
+    * Reconcile: replace ``SPAWN`` with :class:`waves._slurm.ReconcileSpawn` so that exported tasks wait for the
+      exported SLURM job state instead of re-running the task. The exported task targets are marked as ``Precious``.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = Environment()
+       env.AddMethod(waves.scons_extensions.slurm_export_hooks, "SlurmExportHooks")
+       env.SlurmExportHooks()
+
+    :param env: SCons construction environment. Do not provide when using this function as a construction environment
+        method, e.g. ``env.SlurmExportHooks``.
+    """
+    record_file = os.environ.get(_settings._slurm_export_record_variable)
+    if record_file:
+        env["PRINT_CMD_LINE_FUNC"] = _slurm._export_recorder(record_file)
+    manifest = os.environ.get(_settings._slurm_export_manifest_variable)
+    if manifest:
+        reconcile_spawn = _slurm.ReconcileSpawn(env["SPAWN"], manifest, _slurm.JobPoller())
+        env["SPAWN"] = reconcile_spawn
+        # SCons removes non-precious targets prior to execution, which would remove the exported job output
+        env.Precious(*reconcile_spawn.targets)
+
+
+def abaqus_input_scanner(
+    cache_file: str | pathlib.Path | None = None,
+) -> SCons.Scanner.Scanner:
     """Abaqus input file dependency scanner.
 
     Custom SCons scanner that searches for the ``INPUT=`` parameter and associated file dependencies inside Abaqus
-    ``*.inp`` files.
+    ``*.inp`` files. Files are read in blocks and only the keyword lines, which start with ``*``, and their continuation
+    lines are searched, so large mesh include files are never loaded into memory. With a ``cache_file``, scanned
+    dependencies are cached by file size and modification time, so unchanged input files are not scanned again in later
+    builds.
+
+    :param cache_file: Scanner cache file. Relative paths are resolved with SCons File node rules, e.g. ``#`` refers
+        to the project root directory, e.g. ``#/.waves_scanner_cache.json``. If None, scanned dependencies are not
+        cached between builds.
 
     :return: Abaqus input file dependency Scanner
     """
     flags = re.IGNORECASE
-    return _custom_scanner(r"^\*[^*]*,\s*input=(.+)$", [".inp"], flags)
+    return _custom_scanner(
+        r"^\*[^*]*,\s*input=(.+)$", [".inp"], flags, cache_file=cache_file, read=_scanner._abaqus_keyword_text
+    )
 
 
-def sphinx_scanner() -> SCons.Scanner.Scanner:
+def sphinx_scanner(
+    cache_file: str | pathlib.Path | None = None,
+) -> SCons.Scanner.Scanner:
     """SCons scanner that searches for directives.
 
     * ``.. include::``
@@ -2862,11 +4230,20 @@ def sphinx_scanner() -> SCons.Scanner.Scanner:
     * ``.. figure::``
     * ``.. bibliography::``
 
-    inside ``.rst`` and ``.txt`` files
+    inside ``.rst`` and ``.txt`` files. With a ``cache_file``, scanned dependencies are cached by file size and
+    modification time.
+
+    :param cache_file: Scanner cache file. Relative paths are resolved with SCons File node rules, e.g. ``#`` refers
+        to the project root directory, e.g. ``#/.waves_scanner_cache.json``. If None, scanned dependencies are not
+        cached between builds.
 
     :return: Sphinx source file dependency Scanner
     """
-    return _custom_scanner(r"^\s*\.\. (?:include|literalinclude|image|figure|bibliography)::\s*(.+)$", [".rst", ".txt"])
+    return _custom_scanner(
+        r"^\s*\.\. (?:include|literalinclude|image|figure|bibliography)::\s*(.+)$",
+        [".rst", ".txt"],
+        cache_file=cache_file,
+    )
 
 
 def sphinx_build(
@@ -2971,6 +4348,8 @@ def _custom_scanner(
     pattern: str,
     suffixes: typing.Iterable[str],
     flags: int | None = None,
+    cache_file: str | pathlib.Path | None = None,
+    read: collections.abc.Callable[[str], str] | None = None,
 ) -> SCons.Scanner.Scanner:
     """Return a custom Scons scanner.
 
@@ -2978,16 +4357,25 @@ def _custom_scanner(
     suffixes provided. ``_custom_scanner`` will always use the ``re.MULTILINE`` flag
     https://docs.python.org/3/library/re.html#re.MULTILINE
 
+    With a ``cache_file``, the dependencies found in a file are cached by the pattern, the flags, and the file path,
+    size, and modification time in a :class:`waves._scanner.ScanCache` shared by all scanners with the same cache file.
+    Files with an unchanged size and modification time are not read again, including in later builds.
+
     :param pattern: Regular expression pattern.
     :param suffixes: List of suffixes of files to search
     :param flags: An integer representing the combination of re module flags to be used during compilation.
         Additional flags can be combined using the bitwise OR (|) operator. The re.MULTILINE flag is automatically added
         to the combination.
+    :param cache_file: Scanner cache file. Relative paths are resolved with SCons File node rules, e.g. ``#`` refers
+        to the project root directory. If None, scanned dependencies are not cached.
+    :param read: Function returning the text to search from the absolute file path, e.g. to search only part of a
+        large file. If None, the entire file content is searched.
 
     :return: Custom Scons scanner
     """
     flags = re.MULTILINE if not flags else re.MULTILINE | flags
     expression = re.compile(pattern, flags)
+    scanner_key = f"{int(flags)}:{pattern}"
 
     def suffix_only(node_list: list) -> list:
         """Recursively search for files that end in the given suffixes.
@@ -2998,9 +4386,19 @@ def _custom_scanner(
         """
         return [node for node in node_list if node.path.endswith(tuple(suffixes))]
 
+    def search(node: SCons.Node.FS.File) -> list[str]:
+        """Return the dependencies found in the text of an existing file.
+
+        :param node: SCons File node
+
+        :return: List of file dependencies found in the file text
+        """
+        contents = node.get_text_contents() if read is None else read(node.rfile().get_abspath())
+        return [file.strip() for file in expression.findall(contents)]
+
     def regex_scan(
         node: SCons.Node.FS,
-        env: SCons.Environment.Environment,  # noqa: ARG001, interface  dictated by SCons API
+        env: SCons.Environment.Environment,
         path: str,  # noqa: ARG001, interface  dictated by SCons API
     ) -> list:
         """Scan function for extracting dependencies from the content of a file based on the given regular expression.
@@ -3015,10 +4413,17 @@ def _custom_scanner(
 
         :return: List of file dependencies found during scanning
         """
-        contents = node.get_text_contents()
-        includes = expression.findall(contents)
-        includes = [file.strip() for file in includes]
-        return includes
+        if not isinstance(node, SCons.Node.FS.File) or not node.rexists():
+            return [file.strip() for file in expression.findall(node.get_text_contents())]
+        if cache_file is None:
+            return search(node)
+        cache = _scanner._shared_cache(env.File(str(cache_file)).abspath)
+        key = _scanner._file_key(node.rfile().get_abspath())
+        includes = cache.get(scanner_key, key)
+        if includes is None:
+            includes = search(node)
+            cache.set(scanner_key, key, includes)
+        return list(includes)
 
     custom_scanner = SCons.Scanner.Scanner(function=regex_scan, skeys=suffixes, recursive=suffix_only)
     return custom_scanner
@@ -3779,6 +5184,7 @@ def parameter_study_task(
     *args,
     study: dict | parameter_generators.ParameterGenerator | None = None,
     subdirectories: bool = False,
+    shard: str | tuple[int, int] | None = None,
     **kwargs,
 ) -> SCons.Node.NodeList:
     """Parameter study pseudo-builder.
@@ -3864,6 +5270,9 @@ def parameter_study_task(
         unpacked with set name directory prefixes. Dictionaries are unpacked as keyword arguments.
     :param subdirectories: Switch to use parameter generator ``study`` set names as subdirectories. Ignored when
         ``study`` is not a parameter generator.
+    :param shard: Parameter generator ``study`` shard selector, e.g. ``"0/4"``. Only the parameter sets belonging to the
+        shard are defined. See :meth:`waves.parameter_generators.ParameterGenerator.parameter_study_to_dict`. Ignored
+        when ``study`` is not a parameter generator.
     :param kwargs: all other keyword arguments are passed through to the builder after ``@{set_name}`` string
         substitutions
 
@@ -3876,7 +5285,7 @@ def parameter_study_task(
 
     return_targets = []
     if isinstance(study, parameter_generators.ParameterGenerator):
-        for set_name, parameters in study.parameter_study_to_dict().items():
+        for set_name, parameters in study.parameter_study_to_dict(shard=shard).items():
             modified_args = (
                 _utilities.set_name_substitution(positional, set_name, suffix=suffix) for positional in args
             )
@@ -3904,6 +5313,7 @@ def parameter_study_sconscript(
     study: dict | parameter_generators.ParameterGenerator | None = None,
     set_name: str = "",
     subdirectories: bool = False,
+    shard: str | tuple[int, int] | None = None,
     **kwargs,
 ) -> typing.Any | tuple[typing.Any] | None:  # noqa: ANN401
     """Wrap the SCons SConscript call to unpack parameter generators.
@@ -3978,6 +5388,10 @@ def parameter_study_sconscript(
     :param kwargs: All other keyword arguments are passed through to the SConscript call directly
     :param subdirectories: Switch to use parameter generator ``study`` set names as subdirectories. Ignored when
         ``study`` is not a parameter generator.
+    :param shard: Parameter generator ``study`` shard selector, e.g. ``"0/4"``. SConscript is only called for the
+        parameter sets belonging to the shard. See
+        :meth:`waves.parameter_generators.ParameterGenerator.parameter_study_to_dict`. Ignored when ``study`` is not a
+        parameter generator.
 
     :returns: SConscript ``Export()`` variables. When called with a parameter generator study, the ``Export()``
         variables are returned as a list with one entry per parameter set.
@@ -4021,7 +5435,7 @@ def parameter_study_sconscript(
             return variant_directory
 
     if isinstance(study, parameter_generators.ParameterGenerator):
-        for set_name, parameters in study.parameter_study_to_dict().items():
+        for set_name, parameters in study.parameter_study_to_dict(shard=shard).items():
             exports.update({"set_name": set_name, "parameters": parameters})
             build_directory = _variant_subdirectory(variant_dir, set_name, subdirectories)
             sconscript_output.append(env.SConscript(*args, variant_dir=build_directory, exports=exports, **kwargs))
@@ -4082,6 +5496,292 @@ def parameter_study_write(
     return targets
 
 
+def parameter_study_gather(
+    env: SCons.Environment.Environment,
+    target: str | pathlib.Path,
+    source: str | pathlib.Path,
+    study: parameter_generators.ParameterGenerator,
+    subdirectories: bool = False,
+    **kwargs,
+) -> SCons.Node.NodeList:
+    """Pseudo-builder to gather per-set parameter study results into a single study-level Xarray Dataset.
+
+    The ``source`` is a per-set file template containing the ``@{set_name}`` placeholder, e.g.
+    ``@{set_name}results.h5``. The template is expanded for every set in the ``study`` with the same substitution rules
+    as :meth:`waves.scons_extensions.parameter_study_task`. Each source file must be an h5netcdf Xarray Dataset. The
+    per-set datasets are concatenated along the ``set_name`` dimension and merged with the parameter study before
+    writing the ``target`` file.
+
+    This is the gather step for sharded parameter studies. Each SCons process, e.g. one per cluster node, builds a
+    shard of the parameter study and a final, unsharded SCons process gathers the per-set results. The gather step
+    always depends on every parameter set, so the gather task must be requested from an SCons process that has access
+    to the complete build directory. Use one SConsign database per directory, ``SConsignFile(None)``, with parameter set
+    subdirectories to avoid concurrent writes to a shared database file and so the unsharded process finds the shard
+    results up-to-date.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       AddOption(
+           "--study-shard",
+           dest="study_shard",
+           default=None,
+           nargs=1,
+           type="string",
+           action="store",
+           metavar="INDEX/COUNT",
+           help="Build only one shard of the parameter study, e.g. '0/4'. (default: all parameter sets)",
+       )
+       SConsignFile(None)
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       parameter_generator = waves.parameter_generators.CartesianProduct({"parameter_one": [1, 2, 3, 4]})
+
+       env.ParameterStudyTask(
+           env.PythonScript,
+           target=["@{set_name}results.h5"],
+           source=["simulation.py"],
+           subcommand_options="--parameter-one ${parameter_one} --output ${TARGET.abspath}",
+           study=parameter_generator,
+           subdirectories=True,
+           shard=GetOption("study_shard"),
+       )
+       if GetOption("study_shard") is None:
+           env.ParameterStudyGather(
+               "study_results.h5", "@{set_name}results.h5", parameter_generator, subdirectories=True
+           )
+
+    .. code-block::
+       :caption: shell
+
+       $ scons --study-shard=0/2 &
+       $ scons --study-shard=1/2 &
+       $ wait
+       $ scons study_results.h5
+
+    :param env: An SCons construction environment to use when defining the targets.
+    :param target: The gathered study-level Xarray Dataset file
+    :param source: Per-set source file template containing the ``@{set_name}`` placeholder
+    :param study: Parameter generator providing the set names and parameter study
+    :param subdirectories: Switch to use parameter generator ``study`` set names as subdirectories
+    :param kwargs: All other keyword arguments are passed through to the SCons Command builder
+
+    :return: SCons NodeList of target nodes
+    """
+    import yaml
+
+    suffix = "/" if subdirectories else "_"
+    set_names = list(study.parameter_study_to_dict().keys())
+    set_sources = [_utilities.set_name_substitution(source, set_name, suffix=suffix) for set_name in set_names]
+    return env.Command(
+        target=[target],
+        source=[*set_sources, env.Value(yaml.dump(study.parameter_study.to_dict()))],
+        action=[SCons.Action.Action(_parameter_study_gather, varlist=["set_names"])],
+        set_names=set_names,
+        **kwargs,
+    )
+
+
+def _parameter_study_gather(
+    target: list,
+    source: list,
+    env: SCons.Environment.Environment,
+) -> None:
+    """Concatenate per-set Xarray Datasets along the set name dimension and merge with the parameter study.
+
+    :param target: The target file list of SCons.Node.FS.File objects
+    :param source: The per-set source file list of SCons.Node.FS.File objects followed by the parameter study
+        SCons.Node.Python.Value object
+    :param env: The builder's SCons construction environment object
+    """
+    import xarray
+    import yaml
+
+    parameter_study = xarray.Dataset.from_dict(yaml.load(source[-1].read(), Loader=yaml.FullLoader))
+    set_datasets = []
+    for set_name, node in zip(env["set_names"], source[:-1], strict=True):
+        with xarray.open_dataset(node.abspath, engine="h5netcdf") as set_dataset:
+            set_datasets.append(set_dataset.load().assign_coords({_settings._set_coordinate_key: set_name}))
+    gathered = xarray.concat(set_datasets, _settings._set_coordinate_key, join="outer", compat="no_conflicts")
+    gathered = xarray.merge([gathered, parameter_study], join="outer", compat="no_conflicts")
+    gathered.to_netcdf(target[0].abspath, engine="h5netcdf")
+
+
+def parameter_study_sbatch_array(
+    env: SCons.Environment.Environment,
+    target: list,
+    source: list,
+    slurm_job: str,
+    study: dict | parameter_generators.ParameterGenerator | None = None,
+    subdirectories: bool = False,
+    shard: str | tuple[int, int] | None = None,
+    array_directory: str | pathlib.Path = "sbatch_array",
+    program: str = "sbatch",
+    sbatch_options: str = "",
+    max_running: int | None = None,
+    **kwargs,
+) -> SCons.Node.NodeList:
+    """Parameter study pseudo-builder submitting one `SLURM`_ `sbatch`_ job array for all parameter sets.
+
+    Where :meth:`waves.scons_extensions.parameter_study_task` with the :meth:`waves.scons_extensions.sbatch` builder
+    submits one ``sbatch --wait`` job per parameter set, this pseudo-builder defines a single task for the whole study
+    and submits a single ``sbatch --wait --array`` job with one array index per parameter set. The ``target``,
+    ``source``, and ``slurm_job`` arguments follow the :meth:`waves.scons_extensions.parameter_study_task`
+    ``@{set_name}`` substitution rules. The ``slurm_job`` command is substituted once per parameter set with the
+    parameter set ``target`` and ``source`` lists and the parameter set values, e.g. ``${TARGET.abspath}`` and
+    ``${parameter_one}``.
+
+    Each array index changes to the parameter set's first target parent directory, redirects the command output to
+    ``target[0]``.stdout, and writes its exit code to an array index status file in the ``array_directory``. When the
+    task is re-built, only the array indices without a successful status file, with missing targets, or with changed
+    source file contents are resubmitted. The ``array_directory`` also contains the batch script, the SLURM output per
+    array index, and the ``manifest.json`` file mapping array indices to parameter set names, targets, and completion
+    status.
+
+    The pseudo-builder marks all targets as ``Precious`` so that successful array indices are not removed by SCons
+    prior to resubmission of failed array indices. The ``array_directory``/sbatch_array.stdout file contains the
+    scheduler output and is always the last target.
+
+    .. code-block::
+       :caption: SConstruct
+
+       import waves
+
+       env = waves.scons_extensions.WAVESEnvironment()
+       parameter_generator = waves.parameter_generators.CartesianProduct({"parameter_one": [1, 2, 3]})
+       env.ParameterStudySbatchArray(
+           target=["@{set_name}output.txt"],
+           source=["source.txt"],
+           slurm_job="cat ${SOURCE.abspath} > ${TARGET.abspath} && echo ${parameter_one} >> ${TARGET.abspath}",
+           study=parameter_generator,
+           subdirectories=True,
+           sbatch_options="--time=00:10:00",
+           max_running=100,
+       )
+
+    :param env: An SCons construction environment to use when defining the targets.
+    :param target: Parameter set target list template
+    :param source: Parameter set source list template
+    :param slurm_job: Parameter set command template
+    :param study: Parameter generator or dictionary parameter set. Dictionaries and no study define a single array
+        index.
+    :param subdirectories: Switch to use parameter generator ``study`` set names as subdirectories. Ignored when
+        ``study`` is not a parameter generator.
+    :param shard: Parameter generator ``study`` shard selector, e.g. ``"0/4"``. Ignored when ``study`` is not a
+        parameter generator.
+    :param array_directory: Directory for the batch script, array index status files, SLURM output, and manifest
+    :param program: An absolute path or basename string for the sbatch program.
+    :param sbatch_options: Optional sbatch options, e.g. ``--time=00:10:00``
+    :param max_running: Maximum number of simultaneously running array indices. Defaults to the scheduler limit.
+    :param kwargs: All other keyword arguments are passed through to the SCons Command builder and are available for
+        ``slurm_job`` substitution
+
+    :return: SCons NodeList of target nodes
+
+    :raises ValueError: If a parameter set target list is empty
+    """
+    if subdirectories:
+        suffix = "/"
+    else:
+        suffix = "_"
+
+    if isinstance(study, parameter_generators.ParameterGenerator):
+        parameter_sets = list(study.parameter_study_to_dict(shard=shard).items())
+    elif isinstance(study, dict):
+        parameter_sets, suffix = [("", study)], ""
+    else:
+        parameter_sets, suffix = [("", {})], ""
+
+    array_node = env.Dir(str(array_directory))
+    tasks = []
+    array_targets: list[SCons.Node.FS.File] = []
+    array_sources: list[SCons.Node.FS.File] = []
+    for index, (set_name, parameters) in enumerate(parameter_sets):
+        set_targets = env.arg2nodes(_utilities.set_name_substitution(target, set_name, suffix=suffix), env.fs.File)
+        set_sources = env.arg2nodes(_utilities.set_name_substitution(source, set_name, suffix=suffix), env.fs.File)
+        if not set_targets:
+            raise ValueError("At least one target must be specified per parameter set")
+        set_stdout = env.File(f"{set_targets[0]}{_settings._stdout_extension}")
+        set_targets.append(set_stdout)
+        set_job = _utilities.set_name_substitution(slurm_job, set_name, suffix=suffix)
+        command = env.Override({**kwargs, **parameters}).subst(set_job, target=set_targets, source=set_sources)
+        tasks.append(
+            {
+                "index": index,
+                "set_name": set_name,
+                "command": command,
+                "directory": set_targets[0].dir.abspath,
+                "stdout": set_stdout.abspath,
+                "targets": [node.abspath for node in set_targets],
+                "sources": [node.abspath for node in set_sources],
+            }
+        )
+        array_targets.extend(set_targets)
+        array_sources.extend(node for node in set_sources if node not in array_sources)
+
+    manifest = array_node.File("manifest.json")
+    stdout = array_node.File(f"sbatch_array{_settings._stdout_extension}")
+    targets = env.Command(
+        target=[*array_targets, manifest, stdout],
+        source=[*array_sources, env.Value(json.dumps(tasks, sort_keys=True))],
+        action=[
+            SCons.Action.Action(
+                _sbatch_array,
+                cmdstr="${program} --array ${TARGETS[-2].dir}/sbatch_array.sh",
+                varlist=["program", "sbatch_options", "max_running"],
+            )
+        ],
+        program=program,
+        sbatch_options=sbatch_options,
+        max_running=max_running,
+        **kwargs,
+    )
+    env.Precious(targets)
+    return targets
+
+
+def _sbatch_array(
+    target: list,
+    source: list,
+    env: SCons.Environment.Environment,
+) -> None:
+    """Submit the incomplete parameter study array tasks and write the array manifest.
+
+    :param target: The target file list of SCons.Node.FS.File objects. The second to last target is the array manifest
+        and the last target is the scheduler STDOUT file.
+    :param source: The source file list of SCons.Node.FS.File objects followed by the array task SCons.Node.Python.Value
+        object
+    :param env: The builder's SCons construction environment object
+
+    :raises RuntimeError: If any array index failed or did not report a status
+    """
+    tasks = json.loads(source[-1].read())
+    # Array indices with changed sources must not match the status files written by the previous array job
+    signatures = {node.abspath: node.get_csig() for node in source[:-1]}
+    for task in tasks:
+        task["source_signatures"] = [signatures[path] for path in task["sources"]]
+    manifest_file = pathlib.Path(target[-2].abspath)
+    manifest = _slurm.submit_array(
+        tasks,
+        manifest_file.parent,
+        program=env["program"],
+        sbatch_options=env["sbatch_options"],
+        max_running=env["max_running"],
+    )
+    with pathlib.Path(target[-1].abspath).open(mode="a") as stdout:
+        stdout.write(manifest.pop("output"))
+    manifest_file.write_text(json.dumps(manifest, indent=4))
+
+    incomplete = [task for task in manifest["tasks"] if task["status"] != "complete"]
+    if incomplete:
+        summary = "\n".join(
+            f"    {task['index']}: {task['set_name']} ({task['status']}, {task['stdout']})" for task in incomplete
+        )
+        raise RuntimeError(f"sbatch array job '{manifest['job_id']}' has incomplete array indices:\n{summary}")
+
+
 class QOIPseudoBuilder:
     """SCons Pseudo-Builder class which allows users to customize the QOI Pseudo-Builder.
 
@@ -4254,6 +5954,7 @@ class WAVESEnvironment(SConsEnvironment):
             SPHINX_BUILD_PROGRAM=SPHINX_BUILD_PROGRAM,
             **kwargs,
         )
+        slurm_export_hooks(self)
 
     def PrintBuildFailures(self, *args, **kwargs) -> None:  # noqa: N802
         """Call :meth:`waves.scons_extensions.print_build_failures` as a construction environment method.
@@ -4325,6 +6026,97 @@ class WAVESEnvironment(SConsEnvironment):
         """
         return substitution_syntax(self, *args, **kwargs)
 
+    def SlurmExportHooks(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.slurm_export_hooks` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return slurm_export_hooks(self, *args, **kwargs)
+
+    def SbatchPoll(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.sbatch_poll` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return sbatch_poll(self, *args, **kwargs)
+
+    def ResourceScheduler(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.resource_scheduler` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return resource_scheduler(self, *args, **kwargs)
+
+    def PythonWorkerPool(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.python_worker_pool` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return python_worker_pool(self, *args, **kwargs)
+
+    def SSHMultiplex(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.ssh_multiplex` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return ssh_multiplex(self, *args, **kwargs)
+
+    def LargeFileDecider(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.large_file_decider` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return large_file_decider(self, *args, **kwargs)
+
+    def ArtifactCache(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.artifact_cache` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return artifact_cache(self, *args, **kwargs)
+
+    def MatlabEnginePool(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.matlab_engine_pool` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return matlab_engine_pool(self, *args, **kwargs)
+
+    def AbaqusJournalSessions(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.abaqus_journal_sessions` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return abaqus_journal_sessions(self, *args, **kwargs)
+
+    def TaskAccounting(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.task_accounting` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return task_accounting(self, *args, **kwargs)
+
+    def LongestFirstOrder(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.longest_first_order` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return longest_first_order(self, *args, **kwargs)
+
+    def ProgressStream(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.progress_stream` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return progress_stream(self, *args, **kwargs)
+
+    def SbatchPack(self, *args, **kwargs) -> None:  # noqa: N802
+        """Call :meth:`waves.scons_extensions.sbatch_pack` as a construction environment method.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return sbatch_pack(self, *args, **kwargs)
+
     def ParameterStudyTask(self, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
         """Call :meth:`waves.scons_extensions.parameter_study_task` as a construction environment method.
 
@@ -4346,6 +6138,20 @@ class WAVESEnvironment(SConsEnvironment):
         """
         return parameter_study_write(self, *args, **kwargs)
 
+    def ParameterStudyGather(self, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
+        """Define tasks with the :meth:`waves.scons_extensions.parameter_study_gather`.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return parameter_study_gather(self, *args, **kwargs)
+
+    def ParameterStudySbatchArray(self, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
+        """Define tasks with the :meth:`waves.scons_extensions.parameter_study_sbatch_array`.
+
+        When using this environment method, do not provide the first ``env`` argument
+        """
+        return parameter_study_sbatch_array(self, *args, **kwargs)
+
     def FirstTargetBuilder(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
         """Define tasks with the builder returned by :meth:`waves.scons_extensions.first_target_builder_factory`.
 
@@ -4355,6 +6161,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = first_target_builder_factory()
+        builder = _accounting_builder(self, builder, "FirstTargetBuilder")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusJournal(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4368,6 +6175,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = abaqus_journal_builder_factory(program="${ABAQUS_PROGRAM}")
+        builder = _accounting_builder(self, builder, "AbaqusJournal")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusSolver(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4381,6 +6189,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = abaqus_solver_builder_factory(program="${ABAQUS_PROGRAM}")
+        builder = _accounting_builder(self, builder, "AbaqusSolver")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusDatacheck(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4400,6 +6209,7 @@ class WAVESEnvironment(SConsEnvironment):
             program="${ABAQUS_PROGRAM}",
             emitter=abaqus_datacheck_emitter,
         )
+        builder = _accounting_builder(self, builder, "AbaqusDatacheck")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusExplicit(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4419,6 +6229,7 @@ class WAVESEnvironment(SConsEnvironment):
             program="${ABAQUS_PROGRAM}",
             emitter=abaqus_explicit_emitter,
         )
+        builder = _accounting_builder(self, builder, "AbaqusExplicit")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusStandard(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4438,6 +6249,7 @@ class WAVESEnvironment(SConsEnvironment):
             program="${ABAQUS_PROGRAM}",
             emitter=abaqus_standard_emitter,
         )
+        builder = _accounting_builder(self, builder, "AbaqusStandard")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AbaqusPseudoBuilder(  # noqa: N802
@@ -4476,6 +6288,8 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = python_builder_factory(program="${PYTHON_PROGRAM}")
+        builder = _python_worker_builder(self, builder)
+        builder = _accounting_builder(self, builder, "PythonScript")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def QuinoaSolver(  # noqa: N802
@@ -4492,6 +6306,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = quinoa_builder_factory(program="${CHARMRUN_PROGRAM}", subcommand="${INCITER_PROGRAM}")
+        builder = _accounting_builder(self, builder, "QuinoaSolver")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def CalculiX(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4505,6 +6320,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = calculix_builder_factory(program="${CCX_PROGRAM}")
+        builder = _accounting_builder(self, builder, "CalculiX")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def FierroExplicit(  # noqa: N802
@@ -4521,6 +6337,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = fierro_explicit_builder_factory(program="${MPIRUN_PROGRAM}", subcommand="${FIERRO_EXPLICIT_PROGRAM}")
+        builder = _accounting_builder(self, builder, "FierroExplicit")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def FierroImplicit(  # noqa: N802
@@ -4537,6 +6354,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = fierro_implicit_builder_factory(program="${MPIRUN_PROGRAM}", subcommand="${FIERRO_IMPLICIT_PROGRAM}")
+        builder = _accounting_builder(self, builder, "FierroImplicit")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def Sierra(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4550,6 +6368,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = sierra_builder_factory(program="${SIERRA_PROGRAM}")
+        builder = _accounting_builder(self, builder, "Sierra")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def AnsysAPDL(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4563,6 +6382,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = ansys_apdl_builder_factory(program="${ANSYS_PROGRAM}")
+        builder = _accounting_builder(self, builder, "AnsysAPDL")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def Truchas(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4577,6 +6397,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = truchas_builder_factory(program="${MPIRUN_PROGRAM}", subcommand="${TRUCHAS_PROGRAM}")
+        builder = _accounting_builder(self, builder, "Truchas")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def SphinxBuild(  # noqa: N802
@@ -4592,6 +6413,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = sphinx_build(program="${SPHINX_BUILD_PROGRAM}")
+        builder = _accounting_builder(self, builder, "SphinxBuild")
         return builder(self, *args, target=target, source=source, **kwargs)
 
     def SphinxPDF(self, target: list, source: list, *args, **kwargs) -> SCons.Node.NodeList:  # noqa: N802
@@ -4605,6 +6427,7 @@ class WAVESEnvironment(SConsEnvironment):
         :param kwargs: All keyword arguments are passed through to the builder (*not* to the builder factory)
         """
         builder = sphinx_latexpdf(program="${SPHINX_BUILD_PROGRAM}")
+        builder = _accounting_builder(self, builder, "SphinxPDF")
         return builder(self, *args, target=target, source=source, **kwargs)
 
 